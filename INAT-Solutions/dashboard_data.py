@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Kennzahlen für das Dashboard.
+
+load_snapshot() liest alle Karten-Werte in einer einzigen Abfrage (skalare
+Unterabfragen, die meisten davon Primärschlüssel-Lookups in den Rollups aus
+dashboard_metrics) und alle Warnlisten in einer zweiten (UNION ALL) statt wie
+bisher rund 15 Einzelabfragen. Aufgerufen wird es vom DashboardWorker in
+einem eigenen Thread, nie im GUI-Thread.
+
+data_version() liefert einen billigen Stempel, an dem der Worker erkennt, ob
+seit dem letzten Snapshot überhaupt etwas geändert wurde:
+- SQLite: PRAGMA data_version (ändert sich bei jedem Commit einer anderen
+  Verbindung, also auch des GUI-Threads oder eines anderen Prozesses),
+- PostgreSQL: pg_current_wal_lsn() (rückt bei jeder Schreib-Transaktion vor).
+Datum und pool_generation() gehören mit zum Stempel: "Termine heute" und
+Fälligkeiten ändern sich um Mitternacht, close_pool() heisst Backend-Wechsel
+oder Restore. None bedeutet "unbekannt" -> immer neu laden.
+"""
+import datetime
+from dataclasses import dataclass, field
+
+import dashboard_metrics
+import datum_iso
+import db_connection
+import rechnung_status
+from db_connection import get_db
+
+LISTEN_LIMIT = 10           # Einträge je Warnliste (Karte zeigt 4 + "weitere")
+DOT_ALTER_JAHRE = 5         # Reifen ab diesem Alter gelten als alt
+BESTAND_WARNUNG = 5         # Artikel unter diesem Bestand
+
+_columns_cache = {}         # (pool_generation, tabelle) -> Spaltennamen
+
+
+@dataclass
+class DashboardSnapshot:
+    """Alle Werte einer Dashboard-Aktualisierung. None = nicht ermittelbar ("—")."""
+    kunden: int | None = None
+    offene_rechnungen: int | None = None
+    offene_summe: float | None = None
+    faellig_woche: int | None = None
+    umsatz_monat: float | None = None
+    lieferanten: int | None = None
+    termine_heute: int | None = None
+    lagerwarnungen: int | None = None
+    reifen_eingelagert: int | None = None
+    artikel_bestand: int | None = None
+    ueberfaellige_rechnungen: list = field(default_factory=list)
+    alte_reifen: list = field(default_factory=list)
+    niedriger_bestand: list = field(default_factory=list)
+    termine: list = field(default_factory=list)
+    version: tuple | None = None
+    erstellt: datetime.datetime = field(default_factory=datetime.datetime.now)
+
+
+def _rollback(conn) -> None:
+    try:
+        conn.rollback()
+    except Exception:
+        pass
+
+
+def _version(conn, cur):
+    base = (db_connection.pool_generation(), datetime.date.today().isoformat())
+    try:
+        if getattr(conn, "is_sqlite", False):
+            cur.execute("PRAGMA data_version")
+            # data_version ist nur innerhalb derselben Verbindung vergleichbar
+            return base + (id(conn.raw), cur.fetchone()[0])
+        cur.execute("SELECT pg_current_wal_lsn()::text")
+        return base + (cur.fetchone()[0],)
+    except Exception:
+        _rollback(conn)
+        return None
+
+
+def data_version():
+    """Änderungsstempel der Datenbank (siehe Modul-Docstring) oder None."""
+    conn = get_db()
+    try:
+        with conn.cursor() as cur:
+            return _version(conn, cur)
+    finally:
+        conn.close()
+
+
+def _columns(conn, cur, table: str) -> set:
+    key = (db_connection.pool_generation(), table)
+    cols = _columns_cache.get(key)
+    if cols is None:
+        try:
+            if getattr(conn, "is_sqlite", False):
+                cur.execute(f"PRAGMA table_info({table})")
+                cols = {str(r[1]).lower() for r in cur.fetchall()}
+            else:
+                cur.execute(
+                    "SELECT column_name FROM information_schema.columns "
+                    "WHERE table_schema = current_schema() AND table_name = %s",
+                    (table,),
+                )
+                cols = {str(r[0]).lower() for r in cur.fetchall()}
+        except Exception:
+            _rollback(conn)
+            cols = set()
+        _columns_cache[key] = cols
+    return cols
+
+
+def _karten_sql(conn, cur, reifen: bool, artikel: bool, heute: datetime.date):
+    """(feld, unterabfrage, parameter) je Karte."""
+    monat_start = heute.replace(day=1).isoformat()
+    teile = []
+    # Ältere Datenbanken haben kunden.created_at: dann nur neue Kunden dieses Monats
+    if "created_at" in _columns(conn, cur, "kunden"):
+        teile.append(("kunden", "SELECT COUNT(*) FROM kunden WHERE created_at >= %s", [monat_start]))
+    else:
+        teile.append(("kunden", "SELECT COUNT(*) FROM kunden", []))
+    teile.append(("lieferanten", "SELECT COUNT(*) FROM lieferanten", []))
+    # Diese Woche fällig: Bereichsabfrage über den Index (status, faellig_am)
+    montag, sonntag = rechnung_status.diese_woche(heute)
+    teile.append((
+        "faellig_woche",
+        "SELECT COUNT(*) FROM rechnungen WHERE status = %s AND faellig_am >= %s AND faellig_am <= %s",
+        [rechnung_status.STATUS_OFFEN, montag.isoformat(), sonntag.isoformat()],
+    ))
+    # Übrige Karten aus den Rollups (dashboard_metrics), je ein Primärschlüssel-Lookup
+    rollups = [
+        ("offene_rechnungen", "offene_rechnungen"),
+        ("offene_summe", "offene_summe"),
+        ("umsatz_monat", f"umsatz:{heute:%Y-%m}"),
+        ("termine_heute", f"termine:{heute.isoformat()}"),
+        ("lagerwarnungen", "lagerwarnungen"),
+    ]
+    if reifen:
+        rollups.append(("reifen_eingelagert", "reifen_eingelagert"))
+    if artikel:
+        rollups.append(("artikel_bestand", "artikel_bestand"))
+    for feld, schluessel in rollups:
+        teile.append((
+            feld,
+            f"SELECT COALESCE(MAX(wert), 0) FROM {dashboard_metrics.METRICS_TABLE} WHERE schluessel = %s",
+            [schluessel],
+        ))
+    return teile
+
+
+def _lade_karten(conn, cur, snap, teile) -> None:
+    werte = {}
+    sql = "SELECT " + ", ".join(f"({q}) AS {feld}" for feld, q, _p in teile)
+    try:
+        cur.execute(sql, [p for _f, _q, params in teile for p in params])
+        werte = dict(zip([feld for feld, _q, _p in teile], cur.fetchone()))
+    except Exception:
+        # Eine kaputte Tabelle soll nicht alle Karten leeren: einzeln nachladen
+        _rollback(conn)
+        for feld, q, params in teile:
+            try:
+                cur.execute(q, params)
+                werte[feld] = cur.fetchone()[0]
+            except Exception:
+                _rollback(conn)
+    for feld, wert in werte.items():
+        if wert is None:
+            continue
+        if feld in ("offene_summe", "umsatz_monat"):
+            setattr(snap, feld, float(wert))
+        else:
+            setattr(snap, feld, int(wert))
+
+
+def _alte_dot_endungen(jahr: int) -> list:
+    """Zweistellige DOT-Jahresendungen, die mindestens DOT_ALTER_JAHRE alt sind."""
+    endungen = []
+    for yy in range(100):
+        voll = 2000 + yy if yy < 50 else 1900 + yy
+        if jahr - voll >= DOT_ALTER_JAHRE:
+            endungen.append(f"{yy:02d}")
+    return endungen
+
+
+def _listen_sql(reifen: bool, artikel: bool, heute: datetime.date):
+    # Gespeicherter Status (rechnung_status), Index (status, faellig_am)
+    zweige = [(
+        "SELECT 'rechnung' AS art, ROW_NUMBER() OVER (ORDER BY faellig_am DESC, id DESC) AS n, "
+        "CAST(rechnung_nr AS TEXT) AS a, CAST(kunde AS TEXT) AS b "
+        "FROM rechnungen WHERE status = %s",
+        [rechnung_status.STATUS_UEBERFAELLIG],
+    )]
+    if reifen:
+        endungen = _alte_dot_endungen(heute.year)
+        dot = "TRIM(dot)"
+        zweige.append((
+            "SELECT 'reifen', ROW_NUMBER() OVER (ORDER BY reifen_id), "
+            "CAST(dimension AS TEXT), CAST(kunde_anzeige AS TEXT) "
+            "FROM reifenlager WHERE ausgelagert_am IS NULL "
+            f"AND LENGTH({dot}) >= 4 AND SUBSTR({dot}, LENGTH({dot}) - 1, 2) IN ({', '.join(['%s'] * len(endungen))})",
+            endungen,
+        ))
+    if artikel:
+        zweige.append((
+            "SELECT 'bestand', ROW_NUMBER() OVER (ORDER BY bestand), "
+            "CAST(bezeichnung AS TEXT), CAST(bestand AS TEXT) "
+            "FROM artikellager WHERE bestand < %s",
+            [BESTAND_WARNUNG],
+        ))
+    zweige.append((
+        "SELECT 'termin', ROW_NUMBER() OVER (ORDER BY start_zeit), "
+        "CAST(titel AS TEXT), CAST(start_zeit AS TEXT) "
+        "FROM auftraege WHERE start_zeit >= %s AND start_zeit < %s",
+        list(datum_iso.tag_bereich(heute)),
+    ))
+    # Reifen werden vollständig gezählt
+    sql = (
+        "SELECT art, n, a, b FROM (" + " UNION ALL ".join(z for z, _p in zweige) + ") listen "
+        "WHERE art = 'reifen' OR n <= %s ORDER BY art, n"
+    )
+    return sql, [p for _z, params in zweige for p in params] + [LISTEN_LIMIT]
+
+
+def _lade_listen(conn, cur, snap, reifen: bool, artikel: bool, heute) -> None:
+    sql, params = _listen_sql(reifen, artikel, heute)
+    try:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    except Exception as e:
+        _rollback(conn)
+        print(f"[DBG] Dashboard Warnlisten: {e}", flush=True)
+        return
+    for art, _n, a, b in rows:
+        if art == "rechnung":
+            snap.ueberfaellige_rechnungen.append(f"{a} - {b}")
+        elif art == "reifen":
+            snap.alte_reifen.append(f"{a} ({b})")
+        elif art == "bestand":
+            snap.niedriger_bestand.append(f"{a} (Bestand: {b})")
+        elif art == "termin":
+            zeit = b[11:16] if b and len(b) > 11 else ""
+            snap.termine.append(f"{zeit} - {a}" if zeit else a)
+
+
+def load_snapshot(reifen: bool = False, artikel: bool = False, last_version=None):
+    """
+    Liefert (version, snapshot). snapshot ist None, wenn sich seit last_version
+    nichts geändert hat. reifen/artikel: nur für aktive Lager-Module abfragen.
+    """
+    heute = datetime.date.today()
+    # Nach Mitternacht zuerst offen -> überfällig umstellen (Datum gehört zur Version)
+    rechnung_status.rollover_taeglich()
+    conn = get_db()
+    try:
+        with conn.cursor() as cur:
+            version = _version(conn, cur)
+            if version is not None and version == last_version:
+                return version, None
+            snap = DashboardSnapshot(version=version)
+            _lade_karten(conn, cur, snap, _karten_sql(conn, cur, reifen, artikel, heute))
+            _lade_listen(conn, cur, snap, reifen, artikel, heute)
+    finally:
+        conn.close()
+    return version, snap
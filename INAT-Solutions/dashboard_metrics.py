@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Inkrementell gepflegte Kennzahlen (Rollups) für das Dashboard.
+
+Tabelle dashboard_metrics (schluessel TEXT PRIMARY KEY, wert NUMERIC):
+
+    offene_rechnungen, offene_summe    nicht bezahlte Rechnungen (Anzahl, brutto)
+    umsatz:YYYY-MM                     Einnahmen aus buchhaltung je Monat
+    reifen_eingelagert                 Reifen ohne ausgelagert_am
+    artikel_bestand                    SUM(artikellager.bestand)
+    lagerwarnungen                     bestand <= min_bestand (nur wo die Spalten existieren)
+    termine:YYYY-MM-DD                 Aufträge je Tag
+
+Gepflegt werden die Werte von Zeilen-Triggern auf den Basistabellen
+(SQLite: AFTER INSERT/UPDATE OF/DELETE, PostgreSQL: plpgsql-Funktion je
+Tabelle). Jede Änderung zieht den Beitrag der alten Zeile ab und addiert den
+der neuen; das Dashboard liest die Karten dann per Primärschlüssel.
+
+Trigger und Neuberechnung (rebuild/check) benutzen dieselben Ausdrücke aus
+_rollups(), damit beide Wege zwangsläufig dasselbe zählen. Angelegt wird alles
+in Migration 5; tools/check_dashboard_metrics.py prüft und repariert.
+TRUNCATE (PostgreSQL) feuert keine Zeilen-Trigger: clear_* in db_connection
+ruft deshalb danach rebuild() auf.
+"""
+
+METRICS_TABLE = "dashboard_metrics"
+TOLERANZ = 0.005
+
+# NEW/OLD-Platzhalter {r}; ISO-Datum ohne LIKE prüfen (kein '%' im SQL, psycopg2)
+_OFFEN = "LOWER(COALESCE({r}.abschluss, '')) != 'bezahlt'"
+_ISO_MONAT = "SUBSTR(CAST({r}.{c} AS TEXT), 5, 1) = '-'"
+_ISO_TAG = "SUBSTR(CAST({r}.{c} AS TEXT), 5, 1) = '-' AND SUBSTR(CAST({r}.{c} AS TEXT), 8, 1) = '-'"
+
+
+def _monat(spalte: str, prefix: str) -> str:
+    pruefung = _ISO_MONAT.replace("{c}", spalte)
+    return f"CASE WHEN {pruefung} THEN '{prefix}:' || SUBSTR(CAST({{r}}.{spalte} AS TEXT), 1, 7) END"
+
+
+def _tag(spalte: str, prefix: str) -> str:
+    pruefung = _ISO_TAG.replace("{c}", spalte)
+    return f"CASE WHEN {pruefung} THEN '{prefix}:' || SUBSTR(CAST({{r}}.{spalte} AS TEXT), 1, 10) END"
+
+
+def _columns(cur, table: str, is_sqlite: bool) -> set:
+    if is_sqlite:
+        cur.execute(f"PRAGMA table_info({table})")
+        return {str(r[1]).lower() for r in cur.fetchall()}
+    cur.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s",
+        (table,),
+    )
+    return {str(r[0]).lower() for r in cur.fetchall()}
+
+
+def _rollups(cur, is_sqlite: bool) -> list:
+    """[(tabelle, relevante Spalten, [(schluessel_ausdruck, beitrag_ausdruck), ...])]"""
+    lagerwarnung = "CASE WHEN {r}.bestand <= {r}.min_bestand THEN 1 ELSE 0 END"
+    rollups = [
+        ("rechnungen", ["abschluss", "brutto"], [
+            ("'offene_rechnungen'", f"CASE WHEN {_OFFEN} THEN 1 ELSE 0 END"),
+            ("'offene_summe'", f"CASE WHEN {_OFFEN} THEN COALESCE({{r}}.brutto, 0) ELSE 0 END"),
+        ]),
+        ("buchhaltung", ["typ", "betrag", "datum"], [
+            (_monat("datum", "umsatz"), "CASE WHEN {r}.typ = 'Einnahme' THEN COALESCE({r}.betrag, 0) ELSE 0 END"),
+        ]),
+        ("reifenlager", ["ausgelagert_am"], [
+            ("'reifen_eingelagert'", "CASE WHEN {r}.ausgelagert_am IS NULL THEN 1 ELSE 0 END"),
+        ]),
+        ("artikellager", ["bestand"], [
+            ("'artikel_bestand'", "COALESCE({r}.bestand, 0)"),
+        ]),
+        ("materiallager", [], []),
+        ("auftraege", ["start_zeit"], [
+            (_tag("start_zeit", "termine"), "1"),
+        ]),
+    ]
+    for table, spalten, teile in rollups:
+        if table in ("materiallager", "artikellager") and {"bestand", "min_bestand"} <= _columns(cur, table, is_sqlite):
+            spalten += [s for s in ("bestand", "min_bestand") if s not in spalten]
+            teile.append(("'lagerwarnungen'", lagerwarnung))
+    return [r for r in rollups if r[2]]
+
+
+# -------------------- Trigger --------------------
+
+def _sqlite_schritte(teile, r: str, vorzeichen: str) -> str:
+    out = []
+    for schluessel, beitrag in teile:
+        k, b = schluessel.format(r=r), beitrag.format(r=r)
+        out.append(
+            f"INSERT OR IGNORE INTO {METRICS_TABLE} (schluessel, wert) "
+            f"SELECT k, 0 FROM (SELECT {k} AS k) WHERE k IS NOT NULL;"
+        )
+        out.append(
+            f"UPDATE {METRICS_TABLE} SET wert = ROUND(wert {vorzeichen} ({b}), 2) WHERE schluessel = {k};"
+        )
+    return " ".join(out)
+
+
+def _install_sqlite(cur, rollups) -> None:
+    for table, spalten, teile in rollups:
+        for art in ("ins", "upd", "del"):
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_dm_{table}_{art}")
+        cur.execute(
+            f"CREATE TRIGGER trg_dm_{table}_ins AFTER INSERT ON {table} "
+            f"BEGIN {_sqlite_schritte(teile, 'NEW', '+')} END"
+        )
+        cur.execute(
+            f"CREATE TRIGGER trg_dm_{table}_upd AFTER UPDATE OF {', '.join(spalten)} ON {table} "
+            f"BEGIN {_sqlite_schritte(teile, 'OLD', '-')} {_sqlite_schritte(teile, 'NEW', '+')} END"
+        )
+        cur.execute(
+            f"CREATE TRIGGER trg_dm_{table}_del AFTER DELETE ON {table} "
+            f"BEGIN {_sqlite_schritte(teile, 'OLD', '-')} END"
+        )
+
+
+def _install_pg(cur, rollups) -> None:
+    cur.execute(
+        "CREATE OR REPLACE FUNCTION inat_dm_add(k TEXT, d NUMERIC) RETURNS void AS $$ "
+        "BEGIN "
+        "IF k IS NULL OR d IS NULL OR d = 0 THEN RETURN; END IF; "
+        f"INSERT INTO {METRICS_TABLE} (schluessel, wert) VALUES (k, d) "
+        f"ON CONFLICT (schluessel) DO UPDATE SET wert = ROUND({METRICS_TABLE}.wert + EXCLUDED.wert, 2); "
+        "END; $$ LANGUAGE plpgsql"
+    )
+    for table, spalten, teile in rollups:
+        alt = " ".join(f"PERFORM inat_dm_add({k.format(r='OLD')}, -({b.format(r='OLD')}));" for k, b in teile)
+        neu = " ".join(f"PERFORM inat_dm_add({k.format(r='NEW')}, {b.format(r='NEW')});" for k, b in teile)
+        cur.execute(
+            f"CREATE OR REPLACE FUNCTION inat_dm_{table}() RETURNS trigger AS $$ "
+            "BEGIN "
+            f"IF TG_OP IN ('UPDATE', 'DELETE') THEN {alt} END IF; "
+            f"IF TG_OP IN ('INSERT', 'UPDATE') THEN {neu} END IF; "
+            "RETURN NULL; "
+            "END; $$ LANGUAGE plpgsql"
+        )
+        cur.execute(f"DROP TRIGGER IF EXISTS trg_dm_{table} ON {table}")
+        cur.execute(
+            f"CREATE TRIGGER trg_dm_{table} AFTER INSERT OR DELETE OR UPDATE OF {', '.join(spalten)} "
+            f"ON {table} FOR EACH ROW EXECUTE PROCEDURE inat_dm_{table}()"
+        )
+
+
+def uninstall(cur, is_sqlite: bool) -> None:
+    """
+    Trigger entfernen, z.B. vor ALTER COLUMN ... TYPE (PostgreSQL verweigert
+    das für Spalten aus UPDATE OF). Danach install() und rebuild() aufrufen.
+    """
+    for table, _spalten, _teile in _rollups(cur, is_sqlite):
+        if is_sqlite:
+            for art in ("ins", "upd", "del"):
+                cur.execute(f"DROP TRIGGER IF EXISTS trg_dm_{table}_{art}")
+        else:
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_dm_{table} ON {table}")
+
+
+def install(cur, is_sqlite: bool) -> None:
+    """Tabelle und Trigger anlegen bzw. ersetzen (idempotent)."""
+    cur.execute(
+        f"CREATE TABLE IF NOT EXISTS {METRICS_TABLE} (schluessel TEXT PRIMARY KEY, wert NUMERIC NOT NULL DEFAULT 0)"
+    )
+    rollups = _rollups(cur, is_sqlite)
+    if is_sqlite:
+        _install_sqlite(cur, rollups)
+    else:
+        _install_pg(cur, rollups)
+
+
+# -------------------- Neuberechnung / Prüfung --------------------
+
+def berechne(cur, is_sqlite: bool) -> dict:
+    """Sollwerte aller Kennzahlen direkt aus den Basistabellen."""
+    werte = {}
+    for table, _spalten, teile in _rollups(cur, is_sqlite):
+        for schluessel, beitrag in teile:
+            cur.execute(
+                f"SELECT k, SUM(b) FROM (SELECT {schluessel.format(r='t')} AS k, {beitrag.format(r='t')} AS b "
+                f"FROM {table} t) x WHERE k IS NOT NULL GROUP BY k"
+            )
+            for k, summe in cur.fetchall():
+                werte[k] = round(werte.get(k, 0.0) + float(summe or 0), 2)
+    return werte
+
+
+def gespeichert(cur) -> dict:
+    cur.execute(f"SELECT schluessel, wert FROM {METRICS_TABLE}")
+    return {k: float(w or 0) for k, w in cur.fetchall()}
+
+
+def check(cur, is_sqlite: bool) -> list:
+    """Abweichungen [(schluessel, gespeichert, soll)]; leer = konsistent."""
+    soll = berechne(cur, is_sqlite)
+    ist = gespeichert(cur)
+    abweichungen = []
+    for k in sorted(set(soll) | set(ist)):
+        a, b = ist.get(k, 0.0), soll.get(k, 0.0)
+        if abs(a - b) > TOLERANZ:
+            abweichungen.append((k, a, b))
+    return abweichungen
+
+
+def rebuild(cur, is_sqlite: bool) -> int:
+    """
+    Alle Kennzahlen aus den Basistabellen neu aufbauen. Die Tabelle wird zuerst
+    gesperrt (PostgreSQL) bzw. beschrieben (SQLite), damit parallel laufende
+    Trigger erst nach dem Commit weiterzählen und nichts verloren geht.
+    """
+    if not is_sqlite:
+        cur.execute(f"LOCK TABLE {METRICS_TABLE} IN SHARE ROW EXCLUSIVE MODE")
+    cur.execute(f"DELETE FROM {METRICS_TABLE}")
+    werte = berechne(cur, is_sqlite)
+    if werte:
+        cur.executemany(
+            f"INSERT INTO {METRICS_TABLE} (schluessel, wert) VALUES (%s, %s)",
+            sorted(werte.items()),
+        )
+    return len(werte)
+
+
+def read(cur, schluessel) -> dict:
+    """Gespeicherte Werte für die angegebenen Schlüssel (fehlende = 0)."""
+    schluessel = list(schluessel)
+    cur.execute(
+        f"SELECT schluessel, wert FROM {METRICS_TABLE} WHERE schluessel IN ({', '.join(['%s'] * len(schluessel))})",
+        schluessel,
+    )
+    werte = dict.fromkeys(schluessel, 0.0)
+    werte.update({k: float(w or 0) for k, w in cur.fetchall()})
+    return werte
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Kanonische Datumswerte in der Datenbank.
+
+Alle Datumsspalten (SPALTEN) enthalten nur noch ISO-Werte:
+- Datum:     'YYYY-MM-DD'           (PostgreSQL: DATE, SQLite: TEXT)
+- Zeitpunkt: 'YYYY-MM-DD HH:MM:SS'  (PostgreSQL: TIMESTAMP, SQLite: TEXT)
+- leer:      NULL, nie ''
+Damit vergleichen und sortieren sich die Werte auf beiden Backends richtig,
+und Jahres-/Monats-/Tagesfilter werden Bereichsabfragen auf dem Index
+(jahr_bereich, monat_bereich, tag_bereich) statt Parsen in Python.
+
+Schreibpfade normalisieren mit datum() bzw. zeitpunkt(); unlesbare Eingaben
+ergeben ValueError. Altbestände bringt Migration 7 mit migriere() in diese
+Form. DATE-Werte liefert db_connection auch unter PostgreSQL als ISO-Text
+(wie SQLite), damit die Oberfläche nur einen Typ kennt.
+"""
+import datetime
+
+FORMATE_DATUM = ("%Y-%m-%d", "%d.%m.%Y", "%d.%m.%y", "%d/%m/%Y", "%Y/%m/%d")
+FORMATE_ZEITPUNKT = (
+    "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M",
+    "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d.%m.%y %H:%M",
+)
+ZEITPUNKT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# (tabelle, schlüssel, spalte, typ, NOT NULL)
+SPALTEN = [
+    ("rechnungen", "id", "datum", "DATE", False),
+    ("buchhaltung", "id", "datum", "DATE", False),
+    ("reifenlager", "reifen_id", "eingelagert_am", "DATE", False),
+    ("reifenlager", "reifen_id", "ausgelagert_am", "DATE", False),
+    ("auftraege", "id", "start_zeit", "TIMESTAMP", True),
+    ("auftraege", "id", "end_zeit", "TIMESTAMP", True),
+]
+
+MIGRATION_BATCH = 500
+
+
+def _text(wert) -> str:
+    if isinstance(wert, (bytes, bytearray, memoryview)):
+        wert = bytes(wert).decode("utf-8", "replace")
+    return str(wert).strip()
+
+
+def _als_datetime(wert):
+    """datetime für wert oder None, wenn leer. ValueError bei unlesbarem Text."""
+    if wert is None:
+        return None
+    if isinstance(wert, datetime.datetime):
+        if wert.tzinfo is not None:
+            wert = wert.astimezone().replace(tzinfo=None)
+        return wert
+    if isinstance(wert, datetime.date):
+        return datetime.datetime(wert.year, wert.month, wert.day)
+    text = _text(wert)
+    if not text:
+        return None
+    try:
+        return _als_datetime(datetime.datetime.fromisoformat(text.replace("Z", "+00:00")))
+    except ValueError:
+        pass
+    for fmt in FORMATE_ZEITPUNKT + FORMATE_DATUM:
+        try:
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"Ungültiges Datum: {text!r}")
+
+
+def datum(wert):
+    """Datum -> 'YYYY-MM-DD' oder None (leer). ValueError bei unlesbarem Wert."""
+    dt = _als_datetime(wert)
+    return dt.date().isoformat() if dt else None
+
+
+def zeitpunkt(wert):
+    """Zeitpunkt -> 'YYYY-MM-DD HH:MM:SS' oder None (leer). ValueError bei unlesbarem Wert."""
+    dt = _als_datetime(wert)
+    return dt.strftime(ZEITPUNKT_FORMAT) if dt else None
+
+
+def kanonisch(wert, typ: str):
+    return zeitpunkt(wert) if typ == "TIMESTAMP" else datum(wert)
+
+
+def jahr_bereich(jahr):
+    """(von, bis) für 'spalte >= von AND spalte < bis' über ein Kalenderjahr."""
+    jahr = int(jahr)
+    return f"{jahr:04d}-01-01", f"{jahr + 1:04d}-01-01"
+
+
+def monat_bereich(jahr, monat):
+    jahr, monat = int(jahr), int(monat)
+    folge = (jahr + 1, 1) if monat == 12 else (jahr, monat + 1)
+    return f"{jahr:04d}-{monat:02d}-01", f"{folge[0]:04d}-{folge[1]:02d}-01"
+
+
+def tag_bereich(von, bis=None):
+    """(von, bis + 1 Tag) für Tage von..bis (inklusive), auch für Zeitpunkt-Spalten."""
+    von = datetime.date.fromisoformat(datum(von))
+    bis = datetime.date.fromisoformat(datum(bis)) if bis is not None else von
+    return von.isoformat(), (bis + datetime.timedelta(days=1)).isoformat()
+
+
+# -------------------- Migration --------------------
+
+def _spalten_typen(cur, table: str, is_sqlite: bool) -> dict:
+    if is_sqlite:
+        cur.execute(f"PRAGMA table_info({table})")
+        return {str(r[1]).lower(): str(r[2] or "").upper() for r in cur.fetchall()}
+    cur.execute(
+        "SELECT column_name, data_type FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s",
+        (table,),
+    )
+    return {str(r[0]).lower(): str(r[1] or "").upper() for r in cur.fetchall()}
+
+
+def _normalisiere(cur, table: str, key: str, spalte: str, typ: str, pflicht: bool) -> tuple:
+    """
+    Schreibt abweichende Werte kanonisch zurück. Unlesbare Werte werden NULL
+    (protokolliert), in NOT-NULL-Spalten bleiben sie stehen. Liefert
+    (geändert, unlesbar).
+    """
+    cur.execute(f"SELECT {key}, CAST({spalte} AS TEXT) FROM {table} WHERE {spalte} IS NOT NULL")
+    aenderungen, unlesbar = [], 0
+    for pk, wert in cur.fetchall():
+        try:
+            neu = kanonisch(wert, typ)
+        except ValueError:
+            unlesbar += 1
+            print(f"[SCHEMA] {table}.{spalte} ({key}={pk}): unlesbares Datum {wert!r}"
+                  + (" belassen" if pflicht else " entfernt"), flush=True)
+            if pflicht:
+                continue
+            neu = None
+        if neu != wert and not (pflicht and neu is None):
+            aenderungen.append((neu, pk))
+    for start in range(0, len(aenderungen), MIGRATION_BATCH):
+        cur.executemany(
+            f"UPDATE {table} SET {spalte} = %s WHERE {key} = %s",
+            aenderungen[start:start + MIGRATION_BATCH],
+        )
+    return len(aenderungen), unlesbar
+
+
+def migriere(cur, is_sqlite: bool) -> dict:
+    """
+    Bringt alle SPALTEN auf kanonische ISO-Werte. PostgreSQL: TEXT-Spalten
+    werden danach DATE/TIMESTAMP (bereits typisierte Spalten sind kanonisch,
+    TIMESTAMP -> DATE wird nur umgewandelt). Liefert
+    {"tabelle.spalte": (geändert, unlesbar)}.
+    """
+    ergebnis = {}
+    for table, key, spalte, typ, pflicht in SPALTEN:
+        ist = _spalten_typen(cur, table, is_sqlite).get(spalte)
+        if ist is None:
+            continue
+        if is_sqlite or ist in ("TEXT", "CHARACTER VARYING"):
+            ergebnis[f"{table}.{spalte}"] = _normalisiere(cur, table, key, spalte, typ, pflicht)
+        if not is_sqlite and not ist.startswith(typ):
+            cur.execute(
+                f"ALTER TABLE {table} ALTER COLUMN {spalte} TYPE {typ} "
+                f"USING CAST(NULLIF(CAST({spalte} AS TEXT), '') AS {typ})"
+            )
+    return ergebnis
@@ -1,13 +1,23 @@
 ﻿# -*- coding: utf-8 -*-
 import os
 import re
+import atexit
 import json
 import sqlite3
-import traceback
+import threading
+import weakref
+from functools import lru_cache
 from typing import Iterable, List
 import psycopg2
+import psycopg2.extensions
 from paths import data_dir, local_db_path
 import time
+import query_profiler
+
+# DATE-Spalten wie unter SQLite als ISO-Text ('YYYY-MM-DD') liefern, siehe datum_iso
+psycopg2.extensions.register_type(
+    psycopg2.extensions.new_type(psycopg2.extensions.DATE.values, "INAT_DATE_ISO", lambda wert, cur: wert)
+)
 
 CONFIG_PATH = str(data_dir() / "config.json")
 
@@ -21,6 +31,8 @@ def _read_config():
         pass
     return {}
 
+query_profiler.enabled = bool(_read_config().get("query_profiler", True))
+
 def _write_config(cfg):
     try:
         with open(CONFIG_PATH, "w", encoding="utf-8") as f:
@@ -52,71 +64,90 @@ def _is_sqlite_cursor(cur) -> bool:
     except Exception:
         return False
 
+_RE_PG_CAST = re.compile(r"::[A-Za-z_][A-Za-z0-9_]*")     # ::int, ::numeric, ::text ...
+
 def _normalize_sql_for_sqlite(sql: str) -> str:
     # Entfernt Postgres-Details
-    sql = re.sub(r"::[A-Za-z_][A-Za-z0-9_]*", "", sql)  # ::int, ::numeric, ::text ...
+    sql = _RE_PG_CAST.sub("", sql)
     sql = sql.replace(" ILIKE ", " LIKE ")
     sql = sql.replace("public.", "")
     return sql
 
+# Übersetzte Statements werden gecacht: die App benutzt nur einige hundert
+# verschiedene SQL-Texte, die aber bei jedem Aufruf (und in Bulk-Schleifen bei
+# jeder Zeile) erneut übersetzt würden.
+SQL_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=SQL_CACHE_SIZE)
+def _translate_sql(sql: str, backend: str) -> str:
+    if backend == "sqlite":
+        return _normalize_sql_for_sqlite(sql).replace("%s", "?")
+    return sql
+
+def _translate_for_cursor(sql, is_sqlite: bool):
+    if not is_sqlite:
+        return sql
+    if isinstance(sql, str):
+        return _translate_sql(sql, "sqlite")
+    return _normalize_sql_for_sqlite(sql).replace("%s", "?")
+
+def sql_cache_stats() -> dict:
+    """Trefferstatistik des SQL-Übersetzungscaches."""
+    info = _translate_sql.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
 # --- Wrappers ------------------------------------------------------------
 class CursorWrapper:
     def __init__(self, cur, is_sqlite: bool):
         self._cur = cur
         self._is_sqlite = is_sqlite
-
-    # slow query threshold in milliseconds
-    SLOW_QUERY_MS = 100
+        self._fp = None   # Fingerprint des letzten Statements (Zeilenzählung im Profiler)
 
     def execute(self, sql, params=None):
-        start = time.time()
+        start = time.perf_counter()
+        raw = sql
         try:
-            if _is_sqlite_cursor(self._cur):
-                sql = _normalize_sql_for_sqlite(sql)
-                sql = sql.replace("%s", "?")
+            sql = _translate_for_cursor(sql, _is_sqlite_cursor(self._cur))
             res = self._cur.execute(sql, params or ())
             return res
         finally:
-            try:
-                dur = (time.time() - start) * 1000.0
-                if dur >= self.SLOW_QUERY_MS:
-                    # log SQL snippet, duration and short stacktrace for origin
-                    stack = traceback.format_list(traceback.extract_stack()[:-1])[-6:]
-                    print(f"[SLOW-DB] {dur:.0f}ms SQL: {str(sql)[:300]!r}", flush=True)
-                    print("".join(stack), flush=True)
-            except Exception:
-                pass
+            self._fp = query_profiler.record(raw, (time.perf_counter() - start) * 1000.0)
 
     def executemany(self, sql, seq_of_params):
-        start = time.time()
+        start = time.perf_counter()
+        raw = sql
         try:
-            if _is_sqlite_cursor(self._cur):
-                sql = _normalize_sql_for_sqlite(sql).replace("%s", "?")
+            sql = _translate_for_cursor(sql, _is_sqlite_cursor(self._cur))
             res = self._cur.executemany(sql, seq_of_params or [])
             return res
         finally:
-            try:
-                dur = (time.time() - start) * 1000.0
-                if dur >= CursorWrapper.SLOW_QUERY_MS:
-                    print(f"[SLOW-DB] {dur:.0f}ms executemany SQL: {str(sql)[:300]!r}", flush=True)
-            except Exception:
-                pass
+            self._fp = query_profiler.record(raw, (time.perf_counter() - start) * 1000.0, many=True)
 
     def fetchall(self):
-        return self._cur.fetchall()
+        rows = self._cur.fetchall()
+        query_profiler.add_rows(self._fp, len(rows))
+        return rows
 
     def fetchone(self):
-        return self._cur.fetchone()
+        row = self._cur.fetchone()
+        if row is not None:
+            query_profiler.add_rows(self._fp, 1)
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._cur.fetchmany(size) if size is not None else self._cur.fetchmany()
+        query_profiler.add_rows(self._fp, len(rows))
+        return rows
 
     def fetchall_dict(self):
-        rows = self._cur.fetchall()
+        rows = self.fetchall()
         try:
             return [dict(r) for r in rows]
         except Exception:
             return [{i: v for i, v in enumerate(r)} for r in rows]
 
     def fetchone_dict(self):
-        r = self._cur.fetchone()
+        r = self.fetchone()
         if r is None:
             return None
         try:
@@ -147,10 +178,13 @@ class CursorWrapper:
         return getattr(self._cur, name)
 
 class ConnectionWrapper:
-    def __init__(self, conn, is_sqlite: bool):
+    def __init__(self, conn, is_sqlite: bool, release=None):
         self._conn = conn
         self._is_sqlite = is_sqlite
         self.is_sqlite = is_sqlite
+        # release: Callback des Pools; close() gibt die Verbindung dann zurück
+        # statt sie zu schließen
+        self._release = release
         # ensure sqlite returns Row objects for easy dict conversion
         if self._is_sqlite:
             try:
@@ -199,11 +233,21 @@ class ConnectionWrapper:
             pass
 
     def close(self):
+        release, self._release = self._release, None
         try:
+            if release is not None:
+                return release()
+            if self._is_sqlite:
+                return _close_sqlite(self._conn)
             return self._conn.close()
         except Exception:
             pass
 
+    def __del__(self):
+        # vergessene close()-Aufrufe dürfen den Pool nicht leerlaufen lassen
+        if getattr(self, "_release", None) is not None:
+            self.close()
+
     # expose real connection for advanced usage
     @property
     def raw(self):
@@ -219,13 +263,266 @@ class ConnectionWrapper:
         finally:
             self.close()
 
+# --- SQLite-Profil ---------------------------------------------------------
+# Wird auf jede SQLite-Verbindung angewendet (Pool und connect_sqlite_at).
+# Einzelne Werte lassen sich in config.json unter "sqlite_pragmas" überschreiben,
+# z.B. {"sqlite_pragmas": {"journal_mode": "DELETE"}} für DB-Dateien auf Netzlaufwerken.
+SQLITE_PROFILE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -32000,         # negativ = KiB (~32 MB)
+    "mmap_size": 268435456,       # 256 MB
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,         # ms
+    "foreign_keys": "ON",
+}
+_RE_PRAGMA_VALUE = re.compile(r"^-?[A-Za-z0-9_]+$")
+
+def sqlite_profile() -> dict:
+    """Aktives SQLite-Profil (Defaults + Overrides aus config.json)."""
+    profile = dict(SQLITE_PROFILE)
+    overrides = (_read_config() or {}).get("sqlite_pragmas") or {}
+    if isinstance(overrides, dict):
+        for key, value in overrides.items():
+            # nur bekannte Pragmas, Werte ohne Sonderzeichen (landen im SQL-Text)
+            if key in SQLITE_PROFILE and _RE_PRAGMA_VALUE.match(str(value)):
+                profile[key] = value
+    return profile
+
+def _init_sqlite_connection(conn, profile: dict | None = None) -> None:
+    conn.row_factory = sqlite3.Row
+    for key, value in (profile if profile is not None else sqlite_profile()).items():
+        try:
+            conn.execute(f"PRAGMA {key}={value}")
+        except sqlite3.Error as e:
+            print(f"[SQLITE] PRAGMA {key}={value} fehlgeschlagen: {e}", flush=True)
+
+def _close_sqlite(conn) -> None:
+    # Statistiken für den Query-Planer aktualisieren (begrenzt, damit close() schnell bleibt)
+    try:
+        conn.execute("PRAGMA analysis_limit=400")
+        conn.execute("PRAGMA optimize")
+    except Exception:
+        pass
+    conn.close()
+
+
+# --- Connection pool ------------------------------------------------------
+# SQLite: eine langlebige Verbindung pro Thread und DB-Datei.
+# PostgreSQL: psycopg2 ThreadedConnectionPool pro DSN.
+# ConnectionWrapper.close() gibt die Verbindung an den Pool zurück.
+# Konfiguration in config.json: db_pool_size, db_pool_idle_timeout (s),
+# db_pool_timeout (s, maximale Wartezeit wenn alle Verbindungen belegt sind).
+# Gelesen beim Anlegen eines Pools; Änderungen gelten nach close_pool().
+DEFAULT_POOL_SIZE = 5
+DEFAULT_POOL_IDLE_TIMEOUT = 300.0
+DEFAULT_POOL_TIMEOUT = 10.0
+
+_POOL_LOCK = threading.RLock()
+_POOL_STATS = {"checkouts": 0, "waits": 0, "reconnects": 0, "overflow": 0}
+_pool_generation = 0              # erhöht durch close_pool(); alte Thread-Verbindungen werden neu geöffnet
+_sqlite_local = threading.local()
+_sqlite_slots = weakref.WeakSet()
+_pg_pools = {}
+_pool_config = None              # (size, idle_timeout, wait_timeout), siehe _pool_settings()
+
+
+def _count(key: str, n: int = 1) -> None:
+    with _POOL_LOCK:
+        _POOL_STATS[key] += n
+
+
+def _pool_settings(neu_lesen: bool = False):
+    """(size, idle_timeout, wait_timeout); config.json nur beim ersten Aufruf bzw. mit neu_lesen."""
+    global _pool_config
+    if _pool_config is not None and not neu_lesen:
+        return _pool_config
+    cfg = _read_config() or {}
+    def _num(key, default, cast):
+        try:
+            v = cast(cfg.get(key, default))
+            return v if v > 0 else default
+        except Exception:
+            return default
+    _pool_config = (
+        _num("db_pool_size", DEFAULT_POOL_SIZE, int),
+        _num("db_pool_idle_timeout", DEFAULT_POOL_IDLE_TIMEOUT, float),
+        _num("db_pool_timeout", DEFAULT_POOL_TIMEOUT, float),
+    )
+    return _pool_config
+
+
+class _SqliteSlot:
+    """Verbindung eines Threads zu einer SQLite-Datei (mit Referenzzähler)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = None
+        self.refs = 0
+        self.last_used = 0.0
+        self.generation = -1
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # check_same_thread=False nur, damit close_pool() aus einem anderen Thread schließen darf;
+        # benutzt wird die Verbindung ausschließlich vom besitzenden Thread.
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        _init_sqlite_connection(self.conn)
+        self.generation = _pool_generation
+
+    def close(self):
+        conn, self.conn = self.conn, None
+        if conn is not None:
+            try:
+                _close_sqlite(conn)
+            except Exception:
+                pass
+
+    def release(self):
+        with _POOL_LOCK:
+            self.refs = max(0, self.refs - 1)
+            last = self.refs == 0
+            self.last_used = time.monotonic()
+        if last and self.conn is not None:
+            # wie früher beim Schließen: nicht committete Änderungen verwerfen
+            try:
+                if self.conn.in_transaction:
+                    self.conn.rollback()
+            except Exception:
+                pass
+
+    def __del__(self):
+        self.close()
+
+
+def _sqlite_checkout(path: str) -> ConnectionWrapper:
+    _, idle_timeout, _ = _pool_settings()
+    slots = getattr(_sqlite_local, "slots", None)
+    if slots is None:
+        slots = _sqlite_local.slots = {}
+    slot = slots.get(path)
+    if slot is None:
+        slot = slots[path] = _SqliteSlot(path)
+        with _POOL_LOCK:
+            _sqlite_slots.add(slot)
+    if slot.conn is not None and slot.refs == 0 and (
+        slot.generation != _pool_generation
+        or time.monotonic() - slot.last_used > idle_timeout
+    ):
+        slot.close()
+        _count("reconnects")
+    if slot.conn is None:
+        slot.open()
+    with _POOL_LOCK:
+        slot.refs += 1
+        _POOL_STATS["checkouts"] += 1
+    return ConnectionWrapper(slot.conn, is_sqlite=True, release=slot.release)
+
+
+class _PgPool:
+    """ThreadedConnectionPool mit Wartezeit, Idle-Timeout und Verbindungsprüfung."""
+
+    def __init__(self, dsn: str, size: int):
+        from psycopg2.pool import ThreadedConnectionPool
+        self.dsn = dsn
+        self.size = size
+        self._pool = ThreadedConnectionPool(1, size, dsn, connect_timeout=8)
+        self._slots = threading.BoundedSemaphore(size)
+        # letzte Rückgabe je Verbindung; schwache Schlüssel, damit vom Pool
+        # geschlossene und verworfene Verbindungen keinen Eintrag hinterlassen
+        self._last_used = weakref.WeakKeyDictionary()
+
+    def checkout(self, idle_timeout: float, wait_timeout: float) -> ConnectionWrapper:
+        if not self._slots.acquire(blocking=False):
+            _count("waits")
+            if not self._slots.acquire(timeout=wait_timeout):
+                # Pool dauerhaft belegt (z.B. nicht geschlossene Verbindungen):
+                # lieber eine ungepoolte Verbindung als ein blockiertes GUI
+                _count("overflow")
+                return _try_postgres_connect(self.dsn)
+        try:
+            conn = self._pool.getconn()
+            last = self._last_used.get(conn)
+            if conn.closed or (last is not None and time.monotonic() - last > idle_timeout):
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+                _count("reconnects")
+        except Exception:
+            self._slots.release()
+            raise
+        _count("checkouts")
+        released = False
+
+        def _release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            try:
+                self._last_used[conn] = time.monotonic()
+                # putconn rollt offene Transaktionen zurück und verwirft defekte Verbindungen
+                self._pool.putconn(conn, close=bool(conn.closed))
+            finally:
+                self._slots.release()
+
+        return ConnectionWrapper(conn, is_sqlite=False, release=_release)
+
+    def close(self):
+        try:
+            self._pool.closeall()
+        except Exception:
+            pass
+
+
+def _pg_checkout(dsn: str) -> ConnectionWrapper:
+    with _POOL_LOCK:
+        pool = _pg_pools.get(dsn)
+        if pool is None:
+            # neues Ziel: Einstellungen frisch aus config.json
+            size, _, _ = _pool_settings(neu_lesen=True)
+            pool = _pg_pools[dsn] = _PgPool(dsn, size)
+    _, idle_timeout, wait_timeout = _pool_settings()
+    return pool.checkout(idle_timeout, wait_timeout)
+
+
+def close_pool() -> None:
+    """
+    Schließt alle gepoolten Verbindungen (z.B. vor Restore/Austausch der DB-Datei
+    oder nach Wechsel der DB-Einstellungen). Neue get_db()-Aufrufe verbinden neu.
+    """
+    global _pool_generation, _pool_config
+    with _POOL_LOCK:
+        _pool_generation += 1
+        _pool_config = None
+        pools = list(_pg_pools.values())
+        _pg_pools.clear()
+        slots = [s for s in _sqlite_slots if s.refs == 0]
+    for pool in pools:
+        pool.close()
+    for slot in slots:
+        slot.close()
+
+
+atexit.register(close_pool)
+
+
+def pool_generation() -> int:
+    """Zähler, der bei jedem close_pool() steigt (Caches erkennen so DB-Wechsel)."""
+    return _pool_generation
+
+
+def pool_stats() -> dict:
+    """Zähler des Verbindungspools (checkouts, waits, reconnects, overflow)."""
+    with _POOL_LOCK:
+        stats = dict(_POOL_STATS)
+        stats["sqlite_connections"] = sum(1 for s in _sqlite_slots if s.conn is not None)
+        stats["pg_pools"] = len(_pg_pools)
+    return stats
+
+
 # --- DB connect / policy -------------------------------------------------
 def _sqlite_connect(path=None):
-    db_path = str(local_db_path())
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return ConnectionWrapper(conn, is_sqlite=True)
+    return _sqlite_checkout(str(local_db_path()))
 
 def get_configured_url() -> str | None:
     """
@@ -248,22 +545,33 @@ def _try_postgres_connect(dsn):
 
 def _open_sqlite():
     # Nutzt deine lokale App-DB unter ProgramData
-    db_path = str(local_db_path())
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    conn = sqlite3.connect(db_path)
-    return ConnectionWrapper(conn, is_sqlite=True)
+    return _sqlite_checkout(str(local_db_path()))
 
 def get_db():
     url = get_configured_url()
     if url:
         try:
-            return _try_postgres_connect(url)
+            return _pg_checkout(url)
         except Exception:
             # Bei Fehler still auf SQLite zurückfallen
             return _open_sqlite()
     # Keine URL konfiguriert -> SQLite
     return _open_sqlite()
 
+def stream_cursor(conn, name: str, itersize: int = 2000):
+    """
+    Cursor für grosse Ergebnisse, die per fetchmany() abgeholt werden.
+    PostgreSQL: benannter (serverseitiger) Cursor, der jeweils itersize Zeilen
+    überträgt, statt das ganze Ergebnis in den Client zu laden. Gilt nur
+    innerhalb der laufenden Transaktion; description ist erst nach dem ersten
+    fetch gesetzt. SQLite: normaler Cursor (liest ohnehin schrittweise).
+    """
+    if getattr(conn, "is_sqlite", False):
+        return conn.cursor()
+    cur = conn.cursor(name=name)
+    cur._cur.itersize = itersize
+    return cur
+
 def get_local_db():
     """
     Erzwingt lokale SQLite, unabhängig von config/Remote.
@@ -279,12 +587,14 @@ def enable_remote(db_url):
     cfg["use_remote"] = True
     cfg["db_url"] = db_url
     _write_config(cfg)
+    close_pool()
 
 def disable_remote():
     cfg = _read_config()
     cfg["use_remote"] = False
     cfg.pop("db_url", None)
     _write_config(cfg)
+    close_pool()
 
 def get_remote_status():
     cfg = _read_config()
@@ -322,10 +632,7 @@ def connect_sqlite_at(path: str):
         raise ValueError("connect_sqlite_at: db_path ist None/leer. Übergib den Login-DB-Pfad.")
     os.makedirs(os.path.dirname(path), exist_ok=True)
     conn = sqlite3.connect(path)
-    try:
-        conn.row_factory = sqlite3.Row
-    except Exception:
-        pass
+    _init_sqlite_connection(conn)
     return ConnectionWrapper(conn, is_sqlite=True)
 
 def clear_business_database():
@@ -347,6 +654,9 @@ def clear_business_database():
                 tables = [str(_val(r)) for r in rows]
                 # Sicherheits-Exclude: 'users' nicht leeren, falls versehentlich in derselben Datei
                 tables = [t for t in tables if t.lower() != "users"]
+                # Schemastand, Rollups und FTS5-Suchindex (samt Schattentabellen)
+                # bleiben: Rollups/Index bauen Trigger bzw. _rebuild_metrics neu auf
+                tables = [t for t in tables if not _ist_interne_tabelle(t)]
                 for t in tables:
                     cur.execute(f"DELETE FROM {t}")
                 # Autoincrement zurücksetzen (falls vorhanden)
@@ -374,8 +684,8 @@ def clear_business_database():
                 for r in rows:
                     schema = _schema(r)
                     name = _name(r)
-                    # 'users' vorsorglich ausnehmen
-                    if name.lower() == "users":
+                    # 'users' vorsorglich ausnehmen, Schemastand/Rollups/Suchindex ebenso
+                    if name.lower() == "users" or _ist_interne_tabelle(name):
                         continue
                     tbls.append(f'{schema}."{name}"')
                 if tbls:
@@ -387,11 +697,14 @@ def clear_business_database():
             conn.close()
         except Exception:
             pass
+        _invalidate_settings()
+        _rebuild_metrics()
 
 def list_business_tables(exclude: Iterable[str] = ("users",)) -> List[str]:
     """
     Liefert alle 'Business'-Tabellen der aktiven DB (aktuelles Schema bei PG, alle User-Tabellen bei SQLite).
-    'users' wird standardmäßig ausgeschlossen.
+    'users' wird standardmäßig ausgeschlossen, interne Tabellen (Schemastand,
+    Dashboard-Rollups, Suchindex) immer.
     """
     ex = {str(x).lower() for x in (exclude or [])}
     conn = get_db()
@@ -403,7 +716,7 @@ def list_business_tables(exclude: Iterable[str] = ("users",)) -> List[str]:
                 rows = cur.fetchall()
                 for r in rows:
                     name = (r["name"] if isinstance(r, dict) else r[0])
-                    if str(name).lower() not in ex:
+                    if str(name).lower() not in ex and not _ist_interne_tabelle(name):
                         names.append(str(name))
             else:
                 cur.execute("""
@@ -414,7 +727,7 @@ def list_business_tables(exclude: Iterable[str] = ("users",)) -> List[str]:
                 rows = cur.fetchall()
                 for r in rows:
                     name = (r["table_name"] if isinstance(r, dict) else r[0])
-                    if str(name).lower() not in ex:
+                    if str(name).lower() not in ex and not _ist_interne_tabelle(name):
                         names.append(str(name))
         return sorted(names, key=lambda x: x.lower())
     finally:
@@ -427,12 +740,13 @@ def clear_selected_tables(tables: Iterable[str]) -> None:
     - SQLite: DELETE FROM "t"; sqlite_sequence für diese Tabellen zurücksetzen (falls vorhanden).
     - PostgreSQL: TRUNCATE schema."t" ... RESTART IDENTITY CASCADE im current_schema().
     """
-    to_clear = [t for t in (tables or []) if t]
+    to_clear = [t for t in (tables or []) if t and not _ist_interne_tabelle(t)]
     if not to_clear:
         return
     conn = get_db()
+    is_sqlite = getattr(conn, "is_sqlite", False)
     try:
-        if getattr(conn, "is_sqlite", False):
+        if is_sqlite:
             with conn.cursor() as cur:
                 cur.execute("PRAGMA foreign_keys=OFF")
                 for t in to_clear:
@@ -459,25 +773,67 @@ def clear_selected_tables(tables: Iterable[str]) -> None:
     finally:
         try: conn.close()
         except Exception: pass
+        _invalidate_settings()
+        _rebuild_metrics()
+        if not is_sqlite:
+            _rebuild_suchindex(to_clear)
 
 import json
 
-# Helper für config.json (DB-Backend, postgres_url, etc.)
-def get_config_value(key, default=None):
-    conn = get_db()
+def _invalidate_settings():
     try:
-        cur = conn.cursor()
-        # use %s placeholder so the project's SQL-adapter/wrapper kann es für SQLite anpassen
-        cur.execute("SELECT value FROM config WHERE key = %s", (key,))
-        row = cur.fetchone()
-        if row:
-            return row[0]
-        return default
-    finally:
+        import settings_cache
+        settings_cache.invalidate()
+    except Exception:
+        pass
+
+def _rebuild_metrics():
+    # TRUNCATE feuert keine Zeilen-Trigger, und geleerte Einzeltabellen passen
+    # nicht mehr zu den Rollups -> Dashboard-Kennzahlen neu aufbauen
+    try:
+        import dashboard_metrics
+        conn = get_db()
+        try:
+            with conn.cursor() as cur:
+                dashboard_metrics.rebuild(cur, getattr(conn, "is_sqlite", False))
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception:
+        pass
+
+def _ist_index_tabelle(name) -> bool:
+    import suchindex
+    return suchindex.ist_index_tabelle(name)
+
+def _ist_interne_tabelle(name) -> bool:
+    # schema_migrations zu leeren hiesse, beim nächsten Start alle Migrationen
+    # (Datums-Umschreibung, Backfills, Trigger) erneut auszuführen
+    import dashboard_metrics
+    import schema_migrations
+    n = str(name).lower()
+    return n in (schema_migrations.VERSION_TABLE, dashboard_metrics.METRICS_TABLE) or _ist_index_tabelle(name)
+
+def _rebuild_suchindex(tables):
+    # TRUNCATE feuert auch die Suchindex-Trigger nicht (PostgreSQL)
+    try:
+        import suchindex
+        conn = get_db()
         try:
+            with conn.cursor() as cur:
+                suchindex.rebuild(cur, getattr(conn, "is_sqlite", False), tables)
+            conn.commit()
+        finally:
             conn.close()
-        except Exception:
-            pass
+    except Exception:
+        pass
+
+# Helper für config.json (DB-Backend, postgres_url, etc.)
+def get_config_value(key, default=None):
+    # aus settings_cache (ein Laden für alle Einstellungen, danach Speicher)
+    import settings_cache
+    value = settings_cache.get("config", key)
+    return default if value is None else value
 
 def set_config_value(key, value):
     conn = get_db()
@@ -501,57 +857,31 @@ def set_config_value(key, value):
             conn.close()
         except Exception:
             pass
+        _invalidate_settings()
 
 # Helper für rechnung_layout.json
 def get_rechnung_layout() -> dict:
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT layout_data FROM rechnung_layout WHERE id = 1")
-    row = cur.fetchone()
-    conn.close()
-    return json.loads(row[0]) if row and row[0] else {}
-
-def set_rechnung_layout(data: dict):
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("INSERT OR REPLACE INTO rechnung_layout (id, layout_data) VALUES (1, %s)", (json.dumps(data),))
-    conn.commit()
-    conn.close()
+    import settings_cache
+    raw = settings_cache.get("rechnung_layout", "layout")
+    if isinstance(raw, dict):
+        return raw
+    try:
+        return json.loads(raw) if raw else {}
+    except Exception:
+        return {}
 
 # Helper für einstellungen.json
 def get_einstellungen(id=1):
     """
-    Liefert Einstellungen als dict.
-    Versucht DB (SELECT data FROM einstellungen WHERE id=%s), fällt bei Fehlern / fehlender Tabelle
-    auf config/einstellungen.json oder leeres dict zurück.
+    Liefert Einstellungen als dict (aus settings_cache), fällt bei Fehlern /
+    fehlender Tabelle auf config/einstellungen.json oder leeres dict zurück.
     """
-    # 1) Versuch DB
+    # 1) Versuch DB (gecacht)
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        try:
-            cur.execute("SELECT data FROM einstellungen WHERE id = %s", (id,))
-            row = cur.fetchone()
-            if row and row[0]:
-                # falls jsonb in DB, row[0] ist bereits dict
-                data = row[0]
-                try:
-                    # sicherstellen, dass dict zurückkommt
-                    return dict(data) if isinstance(data, dict) else json.loads(data)
-                except Exception:
-                    return data
-        except Exception:
-            # Tabelle fehlt oder andere DB-Fehler -> fallback unten
-            pass
-        finally:
-            try:
-                cur.close()
-            except Exception:
-                pass
-            try:
-                conn.close()
-            except Exception:
-                pass
+        import settings_cache
+        data = settings_cache.get("einstellungen", id)
+        if data:
+            return data
     except Exception:
         # kein DB-Zugriff möglich -> fallback
         pass
@@ -588,6 +918,7 @@ def set_einstellungen(data: dict):
             conn.close()
         except Exception:
             pass
+        _invalidate_settings()
 
 def set_rechnung_layout(data: dict):
     conn = get_db()
@@ -596,11 +927,11 @@ def set_rechnung_layout(data: dict):
         is_sqlite = getattr(conn, "is_sqlite", False) or getattr(conn, "is_sqlite_conn", False) or ("sqlite" in conn.__class__.__module__.lower())
         payload = json.dumps(data)
         if is_sqlite:
-            cur.execute("INSERT OR REPLACE INTO rechnung_layout (id, layout_data) VALUES (1, %s)", (payload,))
+            cur.execute("INSERT OR REPLACE INTO rechnung_layout (id, layout) VALUES (1, %s)", (payload,))
         else:
             cur.execute(
-                "INSERT INTO public.rechnung_layout (id, layout_data) VALUES (1, %s) "
-                "ON CONFLICT (id) DO UPDATE SET layout_data = EXCLUDED.layout_data",
+                "INSERT INTO public.rechnung_layout (id, layout) VALUES (1, %s) "
+                "ON CONFLICT (id) DO UPDATE SET layout = EXCLUDED.layout",
                 (payload,)
             )
         conn.commit()
@@ -609,6 +940,7 @@ def set_rechnung_layout(data: dict):
             conn.close()
         except Exception:
             pass
+        _invalidate_settings()
 
 def set_qr_daten(data: dict):
     conn = get_db()
@@ -630,257 +962,15 @@ def set_qr_daten(data: dict):
             conn.close()
         except Exception:
             pass
+        _invalidate_settings()
 
 def ensure_app_schema():
     """
-    Idempotent: legt Kern‑Tabellen an. Für SQLite werden Postgres‑Typen
-    normalisiert, damit sqlite_master keine BIGSERIAL-Literale behält.
+    Bringt das Schema der aktuellen DB über schema_migrations auf den neuesten
+    Stand. Ist die DB bereits aktuell, kostet das ein einzelnes SELECT.
     """
-    schema = {
-        "config": [
-            ("key", "TEXT PRIMARY KEY"),
-            ("value", "TEXT")
-        ],
-        "buchhaltung": [
-            ("id", "BIGSERIAL PRIMARY KEY"),
-            ("datum", "TIMESTAMP"),
-            ("typ", "TEXT"),
-            ("kategorie", "TEXT"),
-            ("betrag", "NUMERIC"),
-            ("beschreibung", "TEXT")
-        ],
-        "auftraege": [
-            ("id", "BIGSERIAL PRIMARY KEY"),
-            ("titel", "TEXT NOT NULL"),
-            ("beschreibung", "TEXT"),
-            ("start_zeit", "TIMESTAMP NOT NULL"),
-            ("end_zeit", "TIMESTAMP NOT NULL"),
-            ("ort", "TEXT"),
-            ("kunden_id", "INTEGER"),
-            ("rechnung_id", "INTEGER"),
-            ("outlook_event_id", "TEXT UNIQUE"),
-            ("created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
-        ],
-        # --- NEU: Tabelle für die Outlook-Synchronisation ---
-        "outlook_events": [
-            ("outlook_event_id", "TEXT PRIMARY KEY"),
-            ("auftrag_id", "INTEGER NOT NULL"),
-            ("last_sync", "TIMESTAMP")
-        ],
-        "invoices": [
-            ("id", "BIGSERIAL PRIMARY KEY" if not _is_sqlite(get_db()) else "INTEGER PRIMARY KEY AUTOINCREMENT"),
-            ("buchung_id", "BIGINT"),
-            ("filename", "TEXT"),
-            ("content", "BYTEA" if not _is_sqlite(get_db()) else "BLOB"),
-            ("content_type", "TEXT"),
-            ("size", "INTEGER"),
-            ("created_at", "TIMESTAMP")
-        ],
-        "lieferanten": [
-            ("id", "BIGSERIAL PRIMARY KEY"),
-            ("lieferantnr", "INTEGER"),
-            ("name", "TEXT"),
-            ("firma", "TEXT"),
-            ("strasse", "TEXT"),
-            ("plz", "TEXT"),
-            ("stadt", "TEXT"),
-            ("telefon", "TEXT"),
-            ("email", "TEXT"),
-            ("kommentare", "TEXT"),
-            ("portal_link", "TEXT"),
-            ("login", "TEXT"),
-            ("passwort", "TEXT"),
-        ],
-        "kunden": [
-            ("kundennr", "BIGSERIAL PRIMARY KEY" if not _is_sqlite(get_db()) else "INTEGER PRIMARY KEY AUTOINCREMENT"),
-            ("anrede", "TEXT"),
-            ("name", "TEXT"),
-            ("firma", "TEXT"),
-            ("strasse", "TEXT"),
-            ("plz", "TEXT"),
-            ("stadt", "TEXT"),
-            ("telefon", "TEXT"),
-            ("email", "TEXT"),
-            ("bemerkung", "TEXT")
-        ],
-        "materiallager": [
-            ("material_id", "BIGSERIAL PRIMARY KEY" if not _is_sqlite(get_db()) else "INTEGER PRIMARY KEY AUTOINCREMENT"),
-            ("materialnummer", "TEXT"),
-            ("bezeichnung", "TEXT"),
-            ("menge", "INTEGER"),
-            ("einheit", "TEXT"),
-            ("lagerort", "TEXT"),
-            ("lieferantnr", "INTEGER"),
-            ("preis", "NUMERIC"),
-            ("waehrung", "TEXT DEFAULT 'EUR'"),
-            ("bemerkung", "TEXT")
-        ],
-        "reifenlager": [
-            ("reifen_id", "BIGSERIAL PRIMARY KEY" if not _is_sqlite(get_db()) else "INTEGER PRIMARY KEY AUTOINCREMENT"),
-            ("kundennr", "INTEGER"),
-            ("kunde_anzeige", "TEXT"),
-            ("fahrzeug", "TEXT"),
-            ("dimension", "TEXT"),
-            ("typ", "TEXT"),
-            ("dot", "TEXT"),
-            ("lagerort", "TEXT"),
-            ("eingelagert_am", "TEXT"),
-            ("ausgelagert_am", "TEXT"),
-            ("preis", "NUMERIC"),
-            ("waehrung", "TEXT DEFAULT 'EUR'"),
-            ("bemerkung", "TEXT")
-        ],
-        "artikellager": [
-            ("artikel_id", "BIGSERIAL PRIMARY KEY" if not _is_sqlite(get_db()) else "INTEGER PRIMARY KEY AUTOINCREMENT"),
-            ("artikelnummer", "TEXT"),
-            ("bezeichnung", "TEXT"),
-            ("bestand", "INTEGER"),
-            ("lagerort", "TEXT"),
-            ("preis", "NUMERIC"),
-            ("waehrung", "TEXT DEFAULT 'EUR'")
-        ],
-        "dienstleistungen": [
-            ("dienstleistung_id", "BIGSERIAL PRIMARY KEY" if not _is_sqlite(get_db()) else "INTEGER PRIMARY KEY AUTOINCREMENT"),
-            ("name", "TEXT"),
-            ("beschreibung", "TEXT"),
-            ("preis", "NUMERIC"),
-            ("einheit", "TEXT"),
-            ("waehrung", "TEXT DEFAULT 'EUR'"),
-            ("bemerkung", "TEXT")
-        ],
-        # Einstellungen (App-Settings) — wichtig für get_einstellungen / set_einstellungen
-        "einstellungen": [
-            ("id", "BIGSERIAL PRIMARY KEY" if not _is_sqlite(get_db()) else "INTEGER PRIMARY KEY AUTOINCREMENT"),
-            ("data", "JSONB" if not _is_sqlite(get_db()) else "TEXT")
-        ],
-        "qr_daten": [
-            ("id", "BIGSERIAL PRIMARY KEY" if not _is_sqlite(get_db()) else "INTEGER PRIMARY KEY AUTOINCREMENT"),
-            ("data", "JSONB" if not _is_sqlite(get_db()) else "TEXT")
-        ],
-        "lager_einstellungen": [
-            ("id", "BIGSERIAL PRIMARY KEY" if not _is_sqlite(get_db()) else "INTEGER PRIMARY KEY AUTOINCREMENT"),
-            ("lager_typ", "TEXT UNIQUE"),  # UNIQUE hinzufügen
-            ("aktiv", "BOOLEAN DEFAULT FALSE")
-        ],
-        "rechnung_layout": [
-            ("id", "BIGSERIAL PRIMARY KEY" if not _is_sqlite(get_db()) else "INTEGER PRIMARY KEY AUTOINCREMENT"),
-            ("name", "TEXT"),
-            ("layout", "TEXT"),
-            ("kopfzeile", "TEXT"),
-            ("einleitung", "TEXT"),
-            ("fusszeile", "TEXT"),
-            ("logo", "BYTEA" if not _is_sqlite(get_db()) else "BLOB"),
-            ("logo_mime", "TEXT"),
-            ("logo_skala", "NUMERIC")
-        ],
-    }
-
-    conn = get_db()
-    try:
-        is_sqlite = getattr(conn, "is_sqlite", False)
-
-        for table, cols in schema.items():
-            # build SQL appropriate for backend
-            if is_sqlite:
-                col_defs = []
-                for name, typ in cols:
-                    t = typ
-                    # convert PK bigserial -> sqlite integer autoincrement
-                    if "PRIMARY KEY" in t and "BIGSERIAL" in t:
-                        t = "INTEGER PRIMARY KEY AUTOINCREMENT"
-                    else:
-                        t = t.replace("BIGSERIAL", "INTEGER").replace("SERIAL", "INTEGER") \
-                             .replace("BYTEA", "BLOB").replace("JSONB", "TEXT") \
-                             .replace("TIMESTAMP", "TEXT").replace("TIMESTAMPTZ", "TEXT")
-                    col_defs.append(f"{name} {t}")
-                create_sql = f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(col_defs)})"
-            else:
-                col_defs = [f"{name} {typ}" for name, typ in cols]
-                create_sql = f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(col_defs)})"
-
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(create_sql)
-            except Exception:
-                # defensive: ignore/create attempts failing due to subtle sqlite versions
-                try:
-                    conn.rollback()
-                except Exception:
-                    pass
-
-        # ensure missing columns added (ALTER TABLE ADD COLUMN)
-        with conn.cursor() as cur:
-            if is_sqlite:
-                for table, cols in schema.items():
-                    try:
-                        cur.execute(f"PRAGMA table_info({table})")
-                        existing = [r[1] for r in cur.fetchall()]
-                    except Exception:
-                        existing = []
-                    for name, typ in cols:
-                        if name not in existing:
-                            t = typ.replace("BIGSERIAL", "INTEGER").replace("SERIAL", "INTEGER") \
-                                   .replace("BYTEA", "BLOB").replace("JSONB", "TEXT") \
-                                   .replace("TIMESTAMP", "TEXT").replace("TIMESTAMPTZ", "TEXT")
-                            try:
-                                cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {t}")
-                            except Exception:
-                                pass
-                # optional: fill kundennr from rowid if missing
-                try:
-                    cur.execute("UPDATE kunden SET kundennr = COALESCE(kundennr, rowid) WHERE kundennr IS NULL")
-                except Exception:
-                    pass
-            else:
-                for table, cols in schema.items():
-                    for name, typ in cols:
-                        try:
-                            cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {name} {typ}")
-                        except Exception:
-                            pass
-                # Postgres sequences fallback
-                try:
-                    cur.execute("CREATE SEQUENCE IF NOT EXISTS kunden_kundennr_seq")
-                    cur.execute("ALTER TABLE kunden ALTER COLUMN kundennr SET DEFAULT nextval('kunden_kundennr_seq')")
-                    cur.execute("UPDATE kunden SET kundennr = nextval('kunden_kundennr_seq') WHERE kundennr IS NULL")
-                except Exception:
-                    pass
-
-        # --- PERFORMANCE: best-effort CREATE INDEX für häufige Abfragen ---
-        try:
-            with conn.cursor() as cur_idx:
-                stmts = [
-                    "CREATE INDEX IF NOT EXISTS idx_rechnungen_datum ON rechnungen(datum)",
-                    "CREATE INDEX IF NOT EXISTS idx_rechnungen_kunde ON rechnungen(kunde)",
-                    "CREATE INDEX IF NOT EXISTS idx_kunden_name ON kunden(name)",
-                    "CREATE INDEX IF NOT EXISTS idx_artikellager_bezeichnung ON artikellager(bezeichnung)",
-                    "CREATE INDEX IF NOT EXISTS idx_reifenlager_dimension ON reifenlager(dimension)",
-                    "CREATE INDEX IF NOT EXISTS idx_buchhaltung_datum ON buchhaltung(datum)"
-                ]
-                for s in stmts:
-                    try:
-                        cur_idx.execute(s)
-                    except Exception:
-                        # ignore individual failures (DB type differences / permission issues)
-                        pass
-            try:
-                conn.commit()
-            except Exception:
-                try:
-                    conn.rollback()
-                except Exception:
-                    pass
-        except Exception:
-            try:
-                conn.rollback()
-            except Exception:
-                pass
-        # Ende Index-Erzeugung / commit
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
+    import schema_migrations
+    return schema_migrations.migrate()
 
 # keep existing helper name for backward compatibility
 def ensure_database_and_tables():
@@ -888,33 +978,15 @@ def ensure_database_and_tables():
 
 def get_qr_daten():
     """
-    Liefert QR-Daten als dict.
-    Versucht DB (SELECT data FROM qr_daten WHERE id=1), fällt bei Fehlern auf config/qr_daten.json zurück.
+    Liefert QR-Daten als dict (aus settings_cache), fällt bei Fehlern auf
+    config/qr_daten.json zurück.
     """
-    # 1) Versuch DB
+    # 1) Versuch DB (gecacht)
     try:
-        conn = get_db()
-        cur = conn.cursor()
-        try:
-            cur.execute("SELECT data FROM qr_daten WHERE id = %s", (1,))
-            row = cur.fetchone()
-            if row and row[0]:
-                data = row[0]
-                try:
-                    return dict(data) if isinstance(data, dict) else json.loads(data)
-                except Exception:
-                    return data
-        except Exception:
-            pass
-        finally:
-            try:
-                cur.close()
-            except Exception:
-                pass
-            try:
-                conn.close()
-            except Exception:
-                pass
+        import settings_cache
+        data = settings_cache.get("qr_daten", 1)
+        if data:
+            return data
     except Exception:
         pass
 
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Globale Schnellsuche über Kunden, Rechnungen, Reifen, Aufträge und Lieferanten.
+
+KATEGORIEN beschreibt je Modul Quelltabelle, angezeigte Spalten und wie aus
+einer Zeile Titel/Untertitel eines Treffers werden. suche_kategorie() liefert
+die besten Treffer einer Kategorie mit einer Abfrage: über den Suchindex
+(suchindex.rang_join, nach Relevanz) oder, wo es keinen gibt, wie bisher per
+ILIKE über die Suchspalten. suche() geht die Kategorien der Reihe nach durch
+und meldet jede einzeln, sobald sie fertig ist.
+
+Ohne Qt: Entprellung, Hintergrund-Thread und Abbruch überholter Suchen
+übernimmt gui/globale_suche.py (über gui.load_scheduler).
+"""
+import datetime
+from dataclasses import dataclass
+
+import suchindex
+
+TREFFER_JE_KATEGORIE = 8    # so viele Treffer zeigt die Schnellsuche je Kategorie
+MIN_ZEICHEN = 2             # kürzere Eingaben werden nicht gesucht
+
+
+@dataclass
+class Kategorie:
+    """Ein Modul der globalen Suche; spalten werden zu record()-Keys."""
+    name: str
+    titel: str
+    tabelle: str
+    schluessel: str
+    spalten: list
+    anzeige: object                     # record -> (titel, untertitel)
+
+
+@dataclass
+class Treffer:
+    kategorie: str
+    schluessel: object
+    titel: str
+    untertitel: str = ""
+    daten: dict = None                  # Zeile (z.B. start_zeit für den Kalender)
+
+
+def _t(wert) -> str:
+    return "" if wert is None else str(wert).strip()
+
+
+def _datum_text(wert) -> str:
+    """ISO-Datum/-Zeitpunkt (TEXT oder DATE/TIMESTAMP) als dd.mm.yyyy."""
+    if isinstance(wert, (datetime.date, datetime.datetime)):
+        return wert.strftime("%d.%m.%Y")
+    text = _t(wert)
+    try:
+        return datetime.date.fromisoformat(text[:10]).strftime("%d.%m.%Y")
+    except ValueError:
+        return text
+
+
+def _verbinde(*teile, trenner=" · ") -> str:
+    return trenner.join(t for t in (_t(x) for x in teile) if t)
+
+
+def _kunde(r):
+    return (_t(r["name"]) or _t(r["firma"]),
+            _verbinde(r["firma"] if _t(r["name"]) else "", _verbinde(r["plz"], r["stadt"], trenner=" ")))
+
+
+def _rechnung(r):
+    return (_verbinde(_t(r["rechnung_nr"]) and f"Nr. {_t(r['rechnung_nr'])}", r["kunde"] or r["firma"]),
+            _verbinde(_datum_text(r["datum"]), r["status"]))
+
+
+def _reifen(r):
+    return (_t(r["kunde_anzeige"]) or _t(r["kundennr"]),
+            _verbinde(r["dimension"], r["dot"] and f"DOT {_t(r['dot'])}", r["fahrzeug"]))
+
+
+def _auftrag(r):
+    return _t(r["titel"]), _verbinde(_datum_text(r["start_zeit"]), r["ort"])
+
+
+def _lieferant(r):
+    return _t(r["name"]) or _t(r["firma"]), _verbinde(r["kontaktperson"], r["stadt"])
+
+
+KATEGORIEN = [
+    Kategorie("kunden", "Kunden", "kunden", "kundennr",
+              ["name", "firma", "plz", "stadt"], _kunde),
+    Kategorie("rechnungen", "Rechnungen", "rechnungen", "id",
+              ["rechnung_nr", "kunde", "firma", "datum", "status"], _rechnung),
+    Kategorie("reifenlager", "Reifen", "reifenlager", "reifen_id",
+              ["kundennr", "kunde_anzeige", "dimension", "dot", "fahrzeug"], _reifen),
+    Kategorie("auftraege", "Aufträge", "auftraege", "id",
+              ["titel", "start_zeit", "ort"], _auftrag),
+    Kategorie("lieferanten", "Lieferanten", "lieferanten", "id",
+              ["name", "firma", "kontaktperson", "stadt"], _lieferant),
+]
+KATEGORIE = {k.name: k for k in KATEGORIEN}
+
+
+def suchbar(text: str) -> bool:
+    return len((text or "").strip()) >= MIN_ZEICHEN and bool(suchindex.begriffe(text))
+
+
+def _like_pattern(text: str) -> str:
+    text = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{text}%"
+
+
+def _abfrage(conn, kat: Kategorie, text: str, limit: int):
+    """(sql, params): Treffer der Kategorie, beste zuerst."""
+    cols = ", ".join(f"t.{s}" for s in [kat.schluessel] + kat.spalten)
+    rang = suchindex.rang_join(conn, kat.tabelle, text, f"t.{kat.schluessel}")
+    if rang is not None:
+        join_sql, join_args, rang_sql = rang
+        return (f"SELECT {cols} FROM {kat.tabelle} t {join_sql} "
+                f"ORDER BY {rang_sql}, t.{kat.schluessel} DESC LIMIT {int(limit)}", join_args)
+    _key, suchspalten = suchindex.QUELLEN[kat.tabelle]
+    like = " OR ".join(f"CAST(t.{s} AS TEXT) ILIKE %s ESCAPE '\\'" for s in suchspalten)
+    return (f"SELECT {cols} FROM {kat.tabelle} t WHERE {like} "
+            f"ORDER BY t.{kat.schluessel} DESC LIMIT {int(limit)}",
+            [_like_pattern(text.strip())] * len(suchspalten))
+
+
+def suche_kategorie(conn, kategorie: str, text: str, limit: int = TREFFER_JE_KATEGORIE) -> list:
+    """Treffer (Liste von Treffer) einer Kategorie; Fehler -> leere Liste."""
+    kat = KATEGORIE[kategorie]
+    try:
+        sql, params = _abfrage(conn, kat, text, limit)
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+    except Exception as e:
+        print(f"[DBG] globale_suche {kategorie}: {e}", flush=True)
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return []
+    keys = [kat.schluessel] + kat.spalten
+    treffer = []
+    for row in rows:
+        record = dict(row) if isinstance(row, dict) else dict(zip(keys, row))
+        titel, untertitel = kat.anzeige(record)
+        treffer.append(Treffer(kat.name, record[kat.schluessel], titel or "—", untertitel, record))
+    return treffer
+
+
+def suche(text: str, melde, abgebrochen=lambda: False, limit: int = TREFFER_JE_KATEGORIE, conn=None) -> None:
+    """
+    Alle Kategorien nacheinander durchsuchen; melde(kategorie, treffer) nach
+    jeder einzelnen. abgebrochen() wird vor jeder Kategorie geprüft.
+    """
+    if not suchbar(text):
+        return
+    own = conn is None
+    if own:
+        from db_connection import get_db
+        conn = get_db()
+    try:
+        for kat in KATEGORIEN:
+            if abgebrochen():
+                return
+            melde(kat.name, suche_kategorie(conn, kat.name, text, limit))
+    finally:
+        if own:
+            try:
+                conn.close()
+            except Exception:
+                pass
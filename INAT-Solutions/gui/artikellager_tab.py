@@ -1,23 +1,33 @@
 ﻿# gui/artikellager_tab.py
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-    QTableWidgetItem, QDialog, QMessageBox, QToolButton
+    QWidget, QVBoxLayout, QHBoxLayout, QDialog, QMessageBox, QToolButton
 )
 from db_connection import get_db, dict_cursor_factory
 from gui.artikellager_dialog import ArtikellagerDialog
+from gui.data_grid import DataGrid, GridColumn, SqlTableModel
 from i18n import _
 
 
 class ArtikellagerTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.table = QTableWidget()
-        self.table.setSelectionBehavior(self.table.SelectRows)
-        # klassisches Verhalten: Shift/Ctrl für Mehrfachauswahl
-        self.table.setSelectionMode(self.table.ExtendedSelection)
-        self.table.verticalHeader().setVisible(False)
+        self.model = SqlTableModel(
+            "artikellager",
+            [
+                GridColumn("artikel_id", _("ID"), hidden=True, nullable=False),
+                GridColumn("artikelnummer", _("Artikelnummer"), width=140),
+                GridColumn("bezeichnung", _("Bezeichnung"), width=260),
+                GridColumn("bestand", _("Bestand"), width=90, numeric=True),
+                GridColumn("lagerort", _("Lagerort"), width=120),
+                GridColumn("preis", _("Preis"), width=100, numeric=True),
+                GridColumn("waehrung", _("Währung"), width=80),
+            ],
+            key="artikel_id", order_by="bezeichnung",
+            suchindex="artikellager",
+        )
+        # klassisches Verhalten: Shift/Ctrl für Mehrfachauswahl (DataGrid-Default)
+        self.table = DataGrid(self.model)
 
-        self._ensure_table()
         self.lade_artikel()
 
         btn_layout = QVBoxLayout()
@@ -40,67 +50,8 @@ class ArtikellagerTab(QWidget):
         btn_loeschen.clicked.connect(self.artikel_loeschen)
 
     # ---------- DB ----------
-    def _ensure_table(self):
-        conn = get_db()
-        is_sqlite = getattr(conn, "is_sqlite", False) or getattr(conn, "is_sqlite_conn", False)
-        if is_sqlite:
-            sql = """
-            CREATE TABLE IF NOT EXISTS artikellager (
-                artikel_id     INTEGER PRIMARY KEY AUTOINCREMENT,
-                artikelnummer  TEXT,
-                bezeichnung    TEXT,
-                bestand        INTEGER,
-                lagerort       TEXT,
-                preis          REAL,
-                waehrung       TEXT
-            )
-            """
-        else:
-            sql = """
-            CREATE TABLE IF NOT EXISTS artikellager (
-                artikel_id     BIGSERIAL PRIMARY KEY,
-                artikelnummer  TEXT,
-                bezeichnung    TEXT,
-                bestand        INTEGER,
-                lagerort       TEXT,
-                preis          REAL,
-                waehrung       TEXT
-            )
-            """
-        try:
-            with conn.cursor() as cur:
-                cur.execute(sql)
-            conn.commit()
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
-
     def lade_artikel(self):
-        with get_db() as con:
-            with con.cursor() as cur:
-                cur.execute("""
-                    SELECT artikel_id, artikelnummer, bezeichnung, COALESCE(bestand,0), COALESCE(lagerort,''),
-                           COALESCE(preis,0), COALESCE(waehrung,'')
-                    FROM public.artikellager
-                    ORDER BY bezeichnung
-                """)
-                daten = cur.fetchall()
-
-        self.table.setRowCount(len(daten))
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([_("ID"), _("Artikelnummer"), _("Bezeichnung"), _("Bestand"), _("Lagerort"), _("Preis"), _("Währung")])
-        self.table.setColumnHidden(0, True)  # ID-Spalte verstecken
-        for r, row in enumerate(daten):
-            for c, val in enumerate(row):
-                self.table.setItem(r, c, QTableWidgetItem(str(val)))
-        self.table.setColumnWidth(1, 140)
-        self.table.setColumnWidth(2, 260)
-        self.table.setColumnWidth(3, 90)
-        self.table.setColumnWidth(4, 120)
-        self.table.setColumnWidth(5, 100)  # Preis
-        self.table.setColumnWidth(6, 80)   # Währung
+        self.table.reload()
 
     def artikel_hinzufuegen(self):
         dlg = ArtikellagerDialog(self, artikel=None)
@@ -116,17 +67,17 @@ class ArtikellagerTab(QWidget):
             self.lade_artikel()
 
     def artikel_bearbeiten(self):
-        z = self.table.currentRow()
-        if z < 0:
+        rec = self.table.current_record()
+        if not rec:
             return
         artikel = {
-            "artikel_id": int(self.table.item(z, 0).text()),
-            "artikelnummer": self.table.item(z, 1).text(),
-            "bezeichnung": self.table.item(z, 2).text(),
-            "bestand": int(self.table.item(z, 3).text()),
-            "lagerort": self.table.item(z, 4).text(),
-            "preis": float(self.table.item(z, 5).text()),
-            "waehrung": self.table.item(z, 6).text()
+            "artikel_id": int(rec["artikel_id"]),
+            "artikelnummer": rec["artikelnummer"] or "",
+            "bezeichnung": rec["bezeichnung"] or "",
+            "bestand": int(rec["bestand"] or 0),
+            "lagerort": rec["lagerort"] or "",
+            "preis": float(rec["preis"] or 0),
+            "waehrung": rec["waehrung"] or ""
         }
         dlg = ArtikellagerDialog(self, artikel=artikel)
         if dlg.exec_() == QDialog.Accepted:
@@ -143,15 +94,7 @@ class ArtikellagerTab(QWidget):
 
     def artikel_loeschen(self):
         # support bulk delete
-        sel = self.table.selectionModel().selectedRows()
-        if not sel:
-            return
-        ids = []
-        for idx in sel:
-            try:
-                ids.append(int(self.table.item(idx.row(), 0).text()))
-            except Exception:
-                pass
+        ids = [int(k) for k in self.table.selected_keys()]
         if not ids:
             return
         if QMessageBox.question(self, _("Löschen bestätigen"), _("Soll(en) die ausgewählten {0} Artikel gelöscht werden?").format(len(ids)), QMessageBox.Yes | QMessageBox.No) != QMessageBox.Yes:
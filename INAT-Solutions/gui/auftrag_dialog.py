@@ -6,6 +6,7 @@ from PyQt5.QtCore import QDateTime, Qt
 from .base_dialog import BaseDialog
 from .dialog_styles import GROUPBOX_STYLE
 from db_connection import get_db
+import datum_iso
 from datetime import datetime, timezone, date
 from i18n import _
 
@@ -240,13 +241,13 @@ class AuftragDialog(BaseDialog):
                     UPDATE auftraege 
                     SET titel={ph}, beschreibung={ph}, start_zeit={ph}, end_zeit={ph}, ort={ph}, kunden_id={ph}, outlook_event_id={ph}
                     WHERE id={ph}
-                """, (titel, beschreibung, start_dt.isoformat(), end_dt.isoformat(), ort, kunden_id, outlook_event_id, self.auftrag_id))
+                """, (titel, beschreibung, datum_iso.zeitpunkt(start_dt), datum_iso.zeitpunkt(end_dt), ort, kunden_id, outlook_event_id, self.auftrag_id))
             else:
                 # Insert
                 cur.execute(f"""
                     INSERT INTO auftraege (titel, beschreibung, start_zeit, end_zeit, ort, kunden_id, outlook_event_id)
                     VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
-                """, (titel, beschreibung, start_dt.isoformat(), end_dt.isoformat(), ort, kunden_id, outlook_event_id))
+                """, (titel, beschreibung, datum_iso.zeitpunkt(start_dt), datum_iso.zeitpunkt(end_dt), ort, kunden_id, outlook_event_id))
             
             conn.commit()
             conn.close()
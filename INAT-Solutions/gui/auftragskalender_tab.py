@@ -6,6 +6,7 @@
 from PyQt5.QtCore import QDate, Qt
 from PyQt5.QtGui import QFont, QTextCharFormat, QColor, QPainter, QBrush
 from db_connection import get_db
+import datum_iso
 from gui.auftrag_dialog import AuftragDialog
 from gui.themed_input_dialog import get_int as themed_get_int
 from gui.modern_widgets import COLORS, FONT_SIZES, SPACING, BORDER_RADIUS
@@ -145,6 +146,22 @@ class AuftragskalenderTab(QWidget):
         self.load_day_termine()
         self.load_week_termine()
 
+    def zeige_treffer(self, treffer):
+        """Treffer der globalen Suche: Tag des Auftrags wählen und seine Karte markieren."""
+        start = (treffer.daten or {}).get("start_zeit")
+        try:
+            tag = start.date() if isinstance(start, datetime) else (
+                start if isinstance(start, date) else date.fromisoformat(str(start)[:10]))
+        except ValueError:
+            return
+        # selectionChanged lädt die Tagestermine (am selben Tag sind sie schon da)
+        self.calendar.setSelectedDate(QDate(tag.year, tag.month, tag.day))
+        for i in range(self.day_layout.count()):
+            card = self.day_layout.itemAt(i).widget()
+            if isinstance(card, TerminCard) and card.termin_data.get("id") == treffer.schluessel:
+                self.select_card(card)
+                break
+
     def init_ui(self):
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -458,9 +475,10 @@ class AuftragskalenderTab(QWidget):
         query = """
             SELECT a.id, a.titel, a.beschreibung, a.start_zeit, a.end_zeit, a.ort, k.name 
             FROM auftraege a LEFT JOIN kunden k ON a.kunden_id = k.kundennr
-            WHERE DATE(a.start_zeit) BETWEEN {ph} AND {ph} ORDER BY a.start_zeit
+            WHERE a.start_zeit >= {ph} AND a.start_zeit < {ph} ORDER BY a.start_zeit
         """
-        params = (start_of_week.toString("yyyy-MM-dd"), end_of_week.toString("yyyy-MM-dd"))
+        # start_zeit ist kanonisch ISO: Bereich statt DATE() nutzt den Index
+        params = datum_iso.tag_bereich(start_of_week.toString("yyyy-MM-dd"), end_of_week.toString("yyyy-MM-dd"))
         
         try:
             conn = get_db()
@@ -480,9 +498,9 @@ class AuftragskalenderTab(QWidget):
         query = """
             SELECT a.id, a.titel, a.beschreibung, a.start_zeit, a.end_zeit, a.ort, k.name 
             FROM auftraege a LEFT JOIN kunden k ON a.kunden_id = k.kundennr
-            WHERE DATE(a.start_zeit) = {ph} ORDER BY a.start_zeit
+            WHERE a.start_zeit >= {ph} AND a.start_zeit < {ph} ORDER BY a.start_zeit
         """
-        params = (selected_date.toString("yyyy-MM-dd"),)
+        params = datum_iso.tag_bereich(selected_date.toString("yyyy-MM-dd"))
 
         try:
             conn = get_db()
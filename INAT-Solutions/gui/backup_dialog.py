@@ -16,7 +16,7 @@ from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
 from PyQt5.QtGui import QFont
 from gui.base_dialog import BaseDialog
 from gui.dialog_styles import GROUPBOX_STYLE
-from db_connection import get_db, get_config_value, set_config_value
+from db_connection import get_db, get_config_value, set_config_value, close_pool
 from paths import data_dir, local_db_path
 from i18n import _
 
@@ -62,6 +62,32 @@ def list_backups(backup_dir=None):
     return backups
 
 
+def sichere_sqlite(quelle, ziel):
+    """
+    Konsistente Kopie einer SQLite-Datenbank über die Online-Backup-API.
+    Im WAL-Modus liegen bestätigte Änderungen evtl. noch in der -wal-Datei,
+    eine reine Dateikopie der .sqlite würde sie verlieren.
+    """
+    src = sqlite3.connect(str(quelle))
+    try:
+        dst = sqlite3.connect(str(ziel))
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+
+
+def _entferne_wal_dateien(db_path):
+    """Veraltete -wal/-shm neben der Datenbank löschen (nach close_pool)."""
+    for endung in ("-wal", "-shm"):
+        try:
+            os.remove(str(db_path) + endung)
+        except FileNotFoundError:
+            pass
+
+
 class BackupWorker(QThread):
     """Worker-Thread für Backup-Operationen."""
     progress = pyqtSignal(int, str)
@@ -80,8 +106,8 @@ class BackupWorker(QThread):
                 
                 self.progress.emit(30, _("Datenbank wird kopiert..."))
                 
-                # SQLite-Datei kopieren
-                shutil.copy2(self.source_path, self.target_path)
+                # SQLite-Datenbank inkl. WAL-Inhalt sichern
+                sichere_sqlite(self.source_path, self.target_path)
                 
                 self.progress.emit(80, _("Backup wird verifiziert..."))
                 
@@ -106,10 +132,15 @@ class BackupWorker(QThread):
                 # Aktuelle DB sichern (falls Restore fehlschlägt)
                 if os.path.exists(self.target_path):
                     temp_backup = self.target_path + ".temp_restore_backup"
-                    shutil.copy2(self.target_path, temp_backup)
+                    sichere_sqlite(self.target_path, temp_backup)
                 
                 self.progress.emit(50, _("Backup wird wiederhergestellt..."))
                 
+                # gepoolte Verbindungen auf die alte Datei schließen
+                close_pool()
+                # WAL der alten Datenbank würde sonst auf das Backup angewendet
+                _entferne_wal_dateien(self.target_path)
+
                 # Backup wiederherstellen
                 shutil.copy2(self.source_path, self.target_path)
                 
@@ -119,6 +150,11 @@ class BackupWorker(QThread):
                 conn = sqlite3.connect(self.target_path)
                 conn.execute("SELECT 1")
                 conn.close()
+
+                # ältere Backups auf den aktuellen Schemastand bringen
+                import schema_migrations
+                schema_migrations.invalidate()
+                schema_migrations.migrate()
                 
                 # Temp-Backup löschen
                 if os.path.exists(self.target_path + ".temp_restore_backup"):
@@ -505,7 +541,7 @@ def create_auto_backup():
         backup_filename = f"backup_{timestamp}.db"
         backup_path = os.path.join(backup_dir, backup_filename)
         
-        shutil.copy2(db_path, backup_path)
+        sichere_sqlite(db_path, backup_path)
         
         # Alte Backups aufräumen
         keep = int(get_config_value("keep_backups") or "10")
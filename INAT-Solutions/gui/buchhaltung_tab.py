@@ -1,22 +1,23 @@
 ﻿# -*- coding: utf-8 -*-
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget, QTableWidgetItem,
-    QMessageBox, QLineEdit, QFileDialog, QLabel, QAbstractItemView, QToolButton,
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+    QMessageBox, QLineEdit, QFileDialog, QLabel, QToolButton,
     QHeaderView, QSizePolicy, QFrame, QGraphicsDropShadowEffect
 )
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QColor, QFont, QStandardItemModel, QStandardItem, QIcon
-from fpdf import FPDF
 from db_connection import get_db, dict_cursor_factory, get_einstellungen, get_config_value
 from gui.popup_calendar import PopupCalendarWidget
+from gui.data_grid import DataGrid, GridColumn, SqlTableModel
 from gui.modern_widgets import (
     COLORS, FONT_SIZES, SPACING, BORDER_RADIUS,
     get_table_stylesheet, get_button_primary_stylesheet,
     get_button_secondary_stylesheet, get_input_stylesheet
 )
 from paths import data_dir, local_db_path
-import pandas as pd
+# fpdf und pandas erst im PDF-Export bzw. Excel-Import importieren
 import datetime
+import datum_iso
 import os, shutil, glob
 import sqlite3
 from gui.buchhaltung_dialog import BuchhaltungDialog
@@ -131,27 +132,19 @@ def to_qdate(val) -> QDate:
     s = normalize_date_for_display(val)
     return QDate.fromString(s, "yyyy-MM-dd")
 
-def to_db_date(val) -> str:
-    """Return ISO 'YYYY-MM-DD' string for DB storage (no time)."""
-    if val is None or val == "":
-        return ""
+def to_db_date(val):
+    """ISO 'YYYY-MM-DD' for DB storage (no time), None if empty; ValueError if unreadable."""
     if isinstance(val, QDate):
-        return val.toString("yyyy-MM-dd")
-    if isinstance(val, datetime.datetime):
-        return val.date().isoformat()
-    if isinstance(val, datetime.date):
-        return val.isoformat()
-    return normalize_date_for_display(val)
+        return val.toString("yyyy-MM-dd") if val.isValid() else None
+    return datum_iso.datum(val)
 # ------------------------------------------------------------------------------------
 
 class BuchhaltungTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.init_ui()
-        # --- NEU: Temporäre Liste für initiales Laden ---
-        self._initial_load_rows = []
-        # blocking initial load - REMOVE or comment out
-        # self.lade_eintraege()
+        # lädt nur die erste Seite, weitere Zeilen beim Scrollen (fetchMore)
+        self.lade_eintraege()
     
     def _create_stat_card(self, title: str, value: str, accent_color: str) -> QFrame:
         """Erstellt eine Statistik-Karte im modernen Design."""
@@ -306,10 +299,34 @@ class BuchhaltungTab(QWidget):
         
         content_layout.addWidget(table_header)
 
-        self.table = QTableWidget()
+        self.model = SqlTableModel(
+            "buchhaltung b",
+            [
+                GridColumn("id", _("Nr"), expr="b.id", nullable=False),
+                GridColumn("datum", _("Datum"), expr="b.datum", fmt=normalize_date_for_display,
+                           sort_expr="COALESCE(CAST(b.datum AS TEXT), '')"),
+                GridColumn("typ", _("Typ"), expr="b.typ"),
+                GridColumn("kategorie", _("Kategorie"), expr="b.kategorie"),
+                GridColumn("betrag", _("Betrag (CHF)"), expr="b.betrag", numeric=True,
+                           fmt=lambda v: f"{float(v):.2f}"),
+                GridColumn("beschreibung", _("Beschreibung"), expr="b.beschreibung", stretch=True),
+                GridColumn("invoice_count", _("Rechnung"),
+                           expr="(SELECT COUNT(*) FROM invoices i WHERE i.buchung_id = b.id)",
+                           numeric=True, searchable=False, align=Qt.AlignCenter,
+                           fmt=lambda n: f"✔ ({n})" if n else ""),
+            ],
+            key="b.id", order_by="id", descending=True,
+            background=self._zeilenfarbe,
+        )
+        self.table = DataGrid(self.model, single_selection=True)
         self.table.setStyleSheet(get_table_stylesheet())
-        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
+        font = header.font()
+        font.setBold(True)
+        header.setFont(font)
+        # Summen (Karten/Gesamtbilanz) nach jedem Neuladen/Filtern per SQL
+        self.model.modelReset.connect(self._recalc_gesamtbilanz_from_table)
         content_layout.addWidget(self.table, stretch=1)
         main_layout.addWidget(content, stretch=1)
         
@@ -345,50 +362,10 @@ class BuchhaltungTab(QWidget):
         Lies 'firmenname' aus der Config-Tabelle (funktioniert für SQLite und Postgres).
         Fallback: "Meine Firma".
         """
-        import json
-        from db_connection import get_db
-
-        conn = None
         try:
-            conn = get_db()
-            cur = conn.cursor()
-            sql = "SELECT value FROM config WHERE key=%s LIMIT 1"
-            try:
-                cur.execute(sql, ("firmenname",))
-            except Exception:
-                # fallback to sqlite paramstyle
-                cur.execute(sql.replace("%s", "?"), ("firmenname",))
-            row = cur.fetchone()
-
-            if not row:
-                return "Meine Firma"
-
-            # normalize row -> dict/tuple handling
-            if isinstance(row, dict):
-                val = row.get("value")
-            elif hasattr(row, "keys"):
-                try:
-                    val = dict(row).get("value")
-                except Exception:
-                    desc = getattr(cur, "description", None)
-                    if desc:
-                        cols = [d[0] for d in desc]
-                        val = dict(zip(cols, row)).get("value")
-                    else:
-                        val = row[0] if len(row) > 0 else None
-            else:
-                # tuple/list fallback
-                val = row[0] if len(row) > 0 else None
-
-            return val or "Meine Firma"
+            return get_config_value("firmenname") or "Meine Firma"
         except Exception:
             return "Meine Firma"
-        finally:
-            try:
-                if conn:
-                    conn.close()
-            except Exception:
-                pass
 
     def lade_kategorien_aus_einstellungen(self):
         """Liest die Kategorien aus der Datenbank."""
@@ -412,36 +389,24 @@ class BuchhaltungTab(QWidget):
         dialog = BuchhaltungDialog(eintrag={"id": vorschlag_nr}, kategorien=self.kategorien)
         if dialog.exec_() == dialog.Accepted:
             self.speichere_eintrag_aus_dialog(dialog)
-            # --- KORREKTUR: Langsamen Ladevorgang durch schnellen, asynchronen ersetzen ---
-            self.lade_eintraege_async()
+            self.lade_eintraege()
 
     def get_row_id(self, row_index) -> int | None:
         """Return numeric ID for given row or None if not found."""
-        try:
-            if row_index < 0 or row_index >= self.table.rowCount():
-                return None
-            # try UserRole on first cell
-            it = self.table.item(row_index, 0)
-            if it is not None:
-                d = it.data(Qt.UserRole)
-                if isinstance(d, int):
-                    return d
-                txt = (it.text() or "").strip()
-                if txt.lstrip("-").isdigit():
-                    return int(txt)
-            # fallback: scan row for any numeric-looking cell
-            for c in range(self.table.columnCount()):
-                it = self.table.item(row_index, c)
-                if it:
-                    txt = (it.text() or "").strip()
-                    if txt.lstrip("-").isdigit():
-                        return int(txt)
-        except Exception:
-            pass
+        key = self.model.row_key(row_index)
+        return int(key) if key is not None else None
+
+    @staticmethod
+    def _zeilenfarbe(rec):
+        typ = (rec.get("typ") or "").strip().lower()
+        if typ == "einnahme":
+            return QColor(230, 255, 230)
+        if typ == "ausgabe":
+            return QColor(255, 230, 230)
         return None
 
     def eintrag_bearbeiten(self):
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, _("Keine Auswahl"), _("Bitte zuerst einen Eintrag auswählen."))
             return
@@ -459,11 +424,10 @@ class BuchhaltungTab(QWidget):
         dialog = BuchhaltungDialog(eintrag=eintrag, kategorien=self.kategorien)
         if dialog.exec_() == dialog.Accepted:
             self.speichere_eintrag_aus_dialog(dialog, eintrag_id=eintrag_id)
-            # --- KORREKTUR: Langsamen Ladevorgang durch schnellen, asynchronen ersetzen ---
-            self.lade_eintraege_async()
+            self.lade_eintraege()
 
     def eintrag_loeschen(self):
-        selected = self.table.currentRow()
+        selected = self.table.currentIndex().row()
         if selected < 0:
             QMessageBox.warning(self, _("Keine Auswahl"), _("Bitte zuerst einen Eintrag auswählen."))
             return
@@ -483,11 +447,10 @@ class BuchhaltungTab(QWidget):
             cursor.execute("DELETE FROM buchhaltung WHERE id = %s", (eintrag_id,))
             conn.commit()
             conn.close()
-            # --- KORREKTUR: Langsamen Ladevorgang durch schnellen, asynchronen ersetzen ---
-            self.lade_eintraege_async()
+            self.lade_eintraege()
 
     def vorschau_pdf(self):
-        if self.table.rowCount() == 0:
+        if self.model.rowCount() == 0:
             QMessageBox.warning(self, _("Vorschau"), _("Keine Daten zum Anzeigen."))
             return
 
@@ -506,7 +469,7 @@ class BuchhaltungTab(QWidget):
 
 
     def export_pdf(self):
-        if self.table.rowCount() == 0:
+        if self.model.rowCount() == 0:
             QMessageBox.warning(self, _("Export"), _("Keine Daten zum Exportieren."))
             return
 
@@ -526,6 +489,7 @@ class BuchhaltungTab(QWidget):
 
     def erzeuge_buchhaltungs_pdf(self, pfad, von_datum, bis_datum, firmenname, open_after=False):
         from datetime import datetime
+        from fpdf import FPDF
 
         def safe_text(text):
             return text.encode("latin-1", errors="replace").decode("latin-1")
@@ -556,9 +520,10 @@ class BuchhaltungTab(QWidget):
         total_einnahmen = 0.0
         total_ausgaben = 0.0
 
-        for row in range(self.table.rowCount()):
-            typ = self.table.item(row, 2).text().lower()
-            betrag = float(self.table.item(row, 4).text())
+        # Alle Buchungen (aktueller Filter) direkt aus der DB, nicht nur die geladenen Seiten
+        for rec in self.model.iter_records():
+            typ = (rec["typ"] or "").lower()
+            betrag = float(rec["betrag"] or 0)
             if typ == "einnahme":
                 saldo += betrag
                 total_einnahmen += betrag
@@ -566,7 +531,7 @@ class BuchhaltungTab(QWidget):
                 saldo -= betrag
                 total_ausgaben += betrag
 
-            beschreibung = self.table.item(row, 5).text() if self.table.item(row, 5) else ""
+            beschreibung = rec["beschreibung"] or ""
             beschreibung_lines = pdf.multi_cell(col_widths[5], 8, safe_text(beschreibung), border=0, align="L", split_only=True)
             num_lines = len(beschreibung_lines)
             row_height = 6 * max(1, num_lines)
@@ -585,7 +550,7 @@ class BuchhaltungTab(QWidget):
                 elif col == 5:  # Beschreibung
                     pdf.multi_cell(width, 6, safe_text(beschreibung), border=1, align="L")
                 else:
-                    text = self.table.item(row, col).text() if self.table.item(row, col) else ""
+                    text = self.model.columns()[col].text(rec[self.model.columns()[col].key])
                     align = "C" if col == 1 else "L"
                     pdf.cell(width, row_height, safe_text(text), border=1, align=align)
             pdf.set_y(y_start + row_height)
@@ -667,8 +632,12 @@ class BuchhaltungTab(QWidget):
 
         # sicherstellen: datum als ISO-String (YYYY-MM-DD) bevor SQL
         try:
-            # konvertiere datum vor SQL
             daten["datum"] = to_db_date(daten.get("datum"))
+        except ValueError as e:
+            QMessageBox.warning(dialog, _("Fehler"), str(e))
+            conn.close()
+            return
+        try:
             if eintrag_id:
                 # Update - Achtung: auch ID darf geändert werden
                 if neue_id is not None:
@@ -727,113 +696,10 @@ class BuchhaltungTab(QWidget):
 
 
     def lade_eintraege(self):
-        # --- HINWEIS: Diese Funktion wird jetzt nur noch selten direkt verwendet. ---
-        # Der Haupt-Ladevorgang läuft über lade_eintraege_async.
-        conn = get_db()
-        cursor = conn.cursor(cursor_factory=dict_cursor_factory(conn))
-
-        # backend-aware CREATE TABLE
-        if _is_sqlite_conn(conn):
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS buchhaltung (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    datum TEXT,
-                    typ TEXT,
-                    kategorie TEXT,
-                    betrag REAL,
-                    beschreibung TEXT
-                )
-            """)
-        else:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS public.buchhaltung (
-                    id SERIAL PRIMARY KEY,
-                    datum TEXT,
-                    typ TEXT,
-                    kategorie TEXT,
-                    betrag REAL,
-                    beschreibung TEXT
-                )
-            """)
-
-        # --- OPTIMIERUNG: N+1-Problem beheben durch JOIN ---
-        query = """
-            SELECT b.id, b.datum, b.typ, b.kategorie, b.betrag, b.beschreibung, 
-                   (SELECT COUNT(*) FROM invoices i WHERE i.buchung_id = b.id) as invoice_count
-            FROM buchhaltung b 
-            ORDER BY id DESC
-        """
-
-        cursor.execute(query)
-        daten = cursor.fetchall()
-
-        self.table.setRowCount(len(daten))
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            _("Nr"), _("Datum"), _("Typ"), _("Kategorie"), _("Betrag (CHF)"), _("Beschreibung"), _("Rechnung")
-        ])
-        self.table.verticalHeader().setVisible(False)
-        self.table.horizontalHeader().setStretchLastSection(False)
-        self.table.setAlternatingRowColors(True)
-
-        font = self.table.horizontalHeader().font()
-        font.setBold(True)
-        self.table.horizontalHeader().setFont(font)
-
-
-        header = self.table.horizontalHeader()
-        # Spalte 5 (Beschreibung) dehnt sich aus
-        header.setSectionResizeMode(5, QHeaderView.Stretch)
-        # Spalte 6 (Rechnung) passt sich nur dem Inhalt an
-        header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
-
-        gesamt = 0.0
-        
-        for row_idx, row in enumerate(daten):
-            # --- ANPASSUNG: Spaltenindizes haben sich durch die neue Abfrage geändert ---
-            # row ist jetzt (id, datum, typ, kategorie, betrag, beschreibung, invoice_count)
-            for col_idx, value in enumerate(row[:-1]): # Letzte Spalte (invoice_count) ignorieren
-                if col_idx == 1:  # Datum-Spalte
-                    text = normalize_date_for_display(value)
-                else:
-                    text = "" if value is None else str(value)
-                item = QTableWidgetItem(text)
-                # ...existing code...
-                self.table.setItem(row_idx, col_idx, item)
-
-            # Spalte "Rechnung" ganz am Ende hinzufügen
-            invoice_count = row[6] # Letzte Spalte der neuen Abfrage
-            if invoice_count > 0:
-                invoice_item = QTableWidgetItem(f"✔ ({invoice_count})")
-                invoice_item.setTextAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-            else:
-                invoice_item = QTableWidgetItem("")
-                invoice_item.setTextAlignment(Qt.AlignCenter)
-            self.table.setItem(row_idx, 6, invoice_item)
-
-            # Typ und Farbe
-            typ = row[2].lower()
-            if typ == "einnahme":
-                color = QColor(230, 255, 230)
-                gesamt += float(row[4])
-            elif typ == "ausgabe":
-                color = QColor(255, 230, 230)
-                gesamt -= float(row[4])
-            else:
-                color = QColor(255, 255, 255)
-
-            # JETZT für ALLE Spalten (inkl. Rechnung!) die Farbe setzen:
-            for col in range(self.table.columnCount()):
-                cell = self.table.item(row_idx, col)
-                if cell:
-                    cell.setBackground(color)
+        """Lädt die Buchungen neu (erste Seite, Rest beim Scrollen)."""
+        self.table.reload()
 
-         
-
-        conn.close()
-        self.zeige_gesamtbilanz(gesamt)
-
-    def zeige_gesamtbilanz(self, betrag):
+    def zeige_gesamtbilanz(self, betrag, summen=None):
         self.gesamtbilanz_label.setText(f"Gesamtbilanz: {betrag:.2f} CHF")
         if betrag < 0:
             self.gesamtbilanz_label.setStyleSheet("color: red; background-color: #ffe6e6;")
@@ -841,37 +707,12 @@ class BuchhaltungTab(QWidget):
             self.gesamtbilanz_label.setStyleSheet("color: green; background-color: #e6ffe6;")
         
         # Aktualisiere auch die Statistik-Karten
-        self._update_stat_cards()
+        self._update_stat_cards(summen)
     
-    def _update_stat_cards(self):
+    def _update_stat_cards(self, summen=None):
         """Aktualisiert die Einnahmen/Ausgaben/Gewinn Karten."""
         try:
-            einnahmen = 0.0
-            ausgaben = 0.0
-            
-            for row in range(self.table.rowCount()):
-                if self.table.isRowHidden(row):
-                    continue
-                
-                # Typ-Spalte (Index 2)
-                typ_item = self.table.item(row, 2)
-                typ = typ_item.text() if typ_item else ""
-                
-                # Betrag-Spalte (Index 4)
-                betrag_item = self.table.item(row, 4)
-                if betrag_item:
-                    try:
-                        betrag_text = betrag_item.text().replace("CHF", "").replace("'", "").replace(",", ".").strip()
-                        betrag = float(betrag_text)
-                    except:
-                        betrag = 0.0
-                else:
-                    betrag = 0.0
-                
-                if typ.lower() == "einnahme":
-                    einnahmen += betrag
-                elif typ.lower() == "ausgabe":
-                    ausgaben += betrag
+            einnahmen, ausgaben = summen if summen is not None else self._summen()
             
             gewinn = einnahmen - ausgaben
             
@@ -894,14 +735,10 @@ class BuchhaltungTab(QWidget):
             print(f"[DBG] _update_stat_cards error: {e}", flush=True)
 
     def filter_tabelle(self, text):
-        for row in range(self.table.rowCount()):
-            match = any(text.lower() in self.table.item(row, col).text().lower()
-                        for col in range(self.table.columnCount())
-                        if self.table.item(row, col))
-            self.table.setRowHidden(row, not match)
+        self.table.set_filter_text(text)
 
     def rechnung_hinzufuegen(self):
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             QMessageBox.warning(self, _("Keine Auswahl"), _("Bitte zuerst einen Eintrag auswählen."))
             return
@@ -911,7 +748,7 @@ class BuchhaltungTab(QWidget):
             QMessageBox.warning(self, _("Fehler"), _("Kann ID der ausgewählten Zeile nicht bestimmen."))
             return
 
-        datum_text = self.table.item(row, 1).text() if self.table.item(row, 1) else ""
+        datum_text = normalize_date_for_display((self.model.record(row) or {}).get("datum"))
         datum_qdate = to_qdate(datum_text)
         if not datum_qdate.isValid():
             QMessageBox.warning(self, _("Fehler"), _("Ungültiges Datum: ") + datum_text)
@@ -927,13 +764,12 @@ class BuchhaltungTab(QWidget):
             filename = os.path.basename(pfad_src)
             save_invoice_db(eintrag_id, filename, data)
             QMessageBox.information(self, _("Erfolgreich"), _("Rechnung in Datenbank gespeichert: ") + filename)
-            # --- KORREKTUR: Langsamen Ladevorgang durch schnellen, asynchronen ersetzen ---
-            self.lade_eintraege_async()
+            self.lade_eintraege()
         except Exception as e:
             QMessageBox.critical(self, _("Fehler"), _("Rechnung konnte nicht gespeichert werden:\n") + f"{e}")
 
     def rechnung_oeffnen(self):
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             QMessageBox.warning(self, _("Keine Auswahl"), _("Bitte zuerst einen Eintrag auswählen."))
             return
@@ -966,7 +802,7 @@ class BuchhaltungTab(QWidget):
             QMessageBox.critical(self, _("Fehler"), _("Rechnung konnte nicht geöffnet werden:\n") + f"{e}")
 
     def rechnung_loeschen(self):
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             QMessageBox.warning(self, _("Keine Auswahl"), _("Bitte zuerst einen Eintrag auswählen."))
             return
@@ -987,8 +823,7 @@ class BuchhaltungTab(QWidget):
         try:
             delete_invoices_for_buchung(eintrag_id)
             QMessageBox.information(self, _("Erfolgreich"), _("Rechnung(en) in der Datenbank erfolgreich gelöscht."))
-            # --- KORREKTUR: Langsamen Ladevorgang durch schnellen, asynchronen ersetzen ---
-            self.lade_eintraege_async()
+            self.lade_eintraege()
         except Exception as e:
             QMessageBox.critical(self, _("Fehler"), _("Rechnung(en) konnten nicht gelöscht werden:\n") + f"{e}")
 
@@ -996,6 +831,7 @@ class BuchhaltungTab(QWidget):
         excel_path, _filter = QFileDialog.getOpenFileName(self, "Excel auswählen", "", "Excel-Dateien (*.xlsx *.xls)")
         if not excel_path:
             return
+        import pandas as pd
         # ALT: db_path = "db/datenbank.sqlite"
         # NEU: Immer zentralen Pfad verwenden
         db_path = str(local_db_path())
@@ -1019,34 +855,10 @@ class BuchhaltungTab(QWidget):
         conn = get_db()
         cursor = conn.cursor(cursor_factory=dict_cursor_factory(conn))
 
-        # backend-aware CREATE TABLE
-        if _is_sqlite_conn(conn):
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS buchhaltung (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    datum TEXT,
-                    typ TEXT,
-                    kategorie TEXT,
-                    betrag REAL,
-                    beschreibung TEXT
-                )
-            """)
-        else:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS public.buchhaltung (
-                    id SERIAL PRIMARY KEY,
-                    datum TEXT,
-                    typ TEXT,
-                    kategorie TEXT,
-                    betrag REAL,
-                    beschreibung TEXT
-                )
-            """)
-
         def parse_datum(val):
             import datetime
             if pd.isnull(val) or str(val).strip() == "":
-                return ""
+                return None
             if isinstance(val, (float, int)):
                 return pd.to_datetime(val, unit='d', origin='1899-12-30').strftime("%Y-%m-%d")
             s = str(val).strip()
@@ -1058,7 +870,7 @@ class BuchhaltungTab(QWidget):
             try:
                 return pd.to_datetime(s).strftime("%Y-%m-%d")
             except:
-                return ""
+                return None
 
 
         for index, row in df.iterrows():
@@ -1090,315 +902,22 @@ class BuchhaltungTab(QWidget):
         conn.commit()
         conn.close()
         QMessageBox.information(self, _("Fertig"), _("{} Buchungen importiert!").format(len(daten)))
-        # --- KORREKTUR: Langsamen Ladevorgang durch schnellen, asynchronen ersetzen ---
-        self.lade_eintraege_async()
-
-    def append_rows(self, rows):
-        """Append a chunk of rows (dicts or sequences) into QTableWidget with fixed column order and coloring."""
-        # --- NEU: Logik zum Sammeln der initialen Daten ---
-        # Wenn der Filter-Prozess aktiv ist (erkennbar an _temp_filtered_rows),
-        # soll diese Funktion nichts tun, da die Daten dort gesammelt werden.
-        if hasattr(self, '_temp_filtered_rows') and self._temp_filtered_rows is not None:
-             # Wenn display_collected_rows aufgerufen wird, ist die Liste nicht mehr None
-            if rows == self._temp_filtered_rows:
-                pass # Fortfahren, da dies der beabsichtigte Aufruf ist
-            else:
-                return # Ignorieren, da der Filter-Prozess die Kontrolle hat
-
-        # Wenn es der initiale Ladevorgang ist, Daten sammeln
-        elif hasattr(self, '_initial_load_rows') and self._initial_load_rows is not None:
-            self._initial_load_rows.extend(rows)
-            return # Noch nicht anzeigen, nur sammeln
-
-        # --- Ab hier beginnt die eigentliche Anzeige-Logik ---
-        try:
-            if not rows:
-                return
-
-            # --- KORREKTUR: Spaltenliste an die SQL-Abfrage anpassen ---
-            expected_cols = ["id", "datum", "typ", "kategorie", "betrag", "beschreibung", "invoice_count"]
-            headers = [_("Nr"), _("Datum"), _("Typ"), _("Kategorie"), _("Betrag (CHF)"), _("Beschreibung"), _("Rechnung")]
-
-            if self.table.columnCount() == 0:
-                self.table.setColumnCount(len(headers))
-                self.table.setHorizontalHeaderLabels(headers)
-                self.table.verticalHeader().setVisible(False)
-                header = self.table.horizontalHeader()
-                header.setSectionResizeMode(5, QHeaderView.Stretch)
-                header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
-                self.table.setAlternatingRowColors(True)
-
-            # suspend updates for speed
-            try:
-                self.table.setSortingEnabled(False)
-                self.table.setUpdatesEnabled(False)
-            except Exception:
-                pass
-
-            # Data is already sorted by SQL (ORDER BY id DESC).
-            # We just need to append it to the end of the table.
-            try:
-                for r in rows:  # <-- KEIN reversed()
-                    if isinstance(r, dict):
-                        values = [r.get(c, "") for c in expected_cols]
-                    else:
-                        # --- KORREKTUR: Die gesamte Zeile verwenden ---
-                        values = list(r)
-                        while len(values) < len(expected_cols):
-                            values.append("")
-
-                    # ensure id_text and numeric id
-                    id_val = values[0]
-                    id_text = "" if id_val is None else str(id_val)
-                    try:
-                        numeric_id = int(id_val) if (isinstance(id_val, int) or (isinstance(id_val, str) and id_text.lstrip("-").isdigit())) else None
-                    except Exception:
-                        numeric_id = None
-
-                    # Append row at the END of the table
-                    row_position = self.table.rowCount()
-                    self.table.insertRow(row_position)
-                    
-                    # --- KORREKTUR: Nur die ersten 6 Spalten durchlaufen ---
-                    for col_idx, val in enumerate(values[:-1]):
-                        if col_idx == 1:
-                            text = normalize_date_for_display(val)
-                        elif col_idx == 4:
-                            try:
-                                text = f"{float(val):.2f}"
-                            except Exception:
-                                text = "" if val is None else str(val)
-                        else:
-                            text = "" if val is None else str(val)
-                        
-                        if col_idx == 0:
-                            item = QTableWidgetItem(id_text)
-                            if numeric_id is not None:
-                                try:
-                                    item.setData(Qt.UserRole, numeric_id)
-                                except Exception:
-                                    pass
-                        else:
-                            item = QTableWidgetItem(text)
-                        self.table.setItem(row_position, col_idx, item)
-
-                    # --- KORREKTUR: invoice_count auswerten und in die letzte Spalte schreiben ---
-                    invoice_count = values[6] if len(values) > 6 and values[6] else 0
-                    invoice_col = self.table.columnCount() - 1
-                    
-                    if invoice_count > 0:
-                        inv_item = QTableWidgetItem(f"✔ ({invoice_count})")
-                        inv_item.setTextAlignment(Qt.AlignCenter | Qt.AlignVCenter)
-                    else:
-                        inv_item = QTableWidgetItem("")
-                        inv_item.setTextAlignment(Qt.AlignCenter)
-                    self.table.setItem(row_position, invoice_col, inv_item)
-
-
-                    # apply color by typ (column index 2)
-                    try:
-                        typ_text = (values[2] or "").strip().lower()
-                        if typ_text == "einnahme":
-                            color = QColor(230, 255, 230)
-                        elif typ_text == "ausgabe":
-                            color = QColor(255, 230, 230)
-                        else:
-                            color = QColor(255, 255, 255)
-                        for c in range(self.table.columnCount()):
-                            it = self.table.item(row_position, c)
-                            if it:
-                                it.setBackground(color)
-                    except Exception:
-                        pass
-
-            except Exception:
-                # fallback: append if insert fails for any reason
-                start_row = self.table.rowCount()
-                self.table.setRowCount(start_row + len(rows))
-                for r_idx, r in enumerate(rows):
-                    rownum = start_row + r_idx
-                    if isinstance(r, dict):
-                        values = [r.get(c, "") for c in expected_cols]
-                    else:
-                        seq = list(r)
-                        while len(seq) < len(expected_cols):
-                            seq.append("")
-                        values = seq[:len(expected_cols)]
-
-                    id_val = values[0]
-                    id_text = "" if id_val is None else str(id_val)
-                    try:
-                        numeric_id = int(id_val) if (isinstance(id_val, int) or (isinstance(id_val, str) and id_text.lstrip("-").isdigit())) else None
-                    except Exception:
-                        numeric_id = None
-
-                    for col_idx, val in enumerate(values):
-                        if col_idx == 1:
-                            text = normalize_date_for_display(val)
-                        elif col_idx == 4:
-                            try:
-                                text = f"{float(val):.2f}"
-                            except Exception:
-                                text = "" if val is None else str(val)
-                        else:
-                            text = "" if val is None else str(val)
-
-                        if col_idx == 0:
-                            item = QTableWidgetItem(id_text)
-                            if numeric_id is not None:
-                                try:
-                                    item.setData(Qt.UserRole, numeric_id)
-                                except Exception:
-                                    pass
-                        else:
-                            item = QTableWidgetItem(text)
-                        self.table.setItem(rownum, col_idx, item)
-
-                    # invoice column (last)
-                    invoice_col = self.table.columnCount() - 1
-                    inv_item = QTableWidgetItem("")
-                    inv_item.setTextAlignment(Qt.AlignCenter)
-                    self.table.setItem(rownum, invoice_col, inv_item)
-
-            # restore updates and do a single resize for visible columns
-            try:
-                self.table.setUpdatesEnabled(True)
-                self.table.setSortingEnabled(True)
-                self.table.sortItems(0, Qt.DescendingOrder)
-                self.table.resizeColumnsToContents()
-            except Exception:
-                pass
-
-            # update Gesamtbilanz based on current table contents
-            try:
-                self._recalc_gesamtbilanz_from_table()
-            except Exception:
-                pass
-
-        except Exception as e:
-            print(f"[DBG] BuchhaltungTab.append_rows error: {e}", flush=True)
-
-    def load_finished(self):
-        """Call when loader finished. Show 'Keine Einträge' if nothing loaded."""
-        # --- NEU: Gesammelte initiale Daten jetzt anzeigen ---
-        if hasattr(self, '_initial_load_rows') and self._initial_load_rows is not None:
-            # Rufe append_rows mit den gesammelten Daten auf und setze die Sammelliste auf None,
-            # um den Sammel-Modus zu beenden und die Anzeige zu erlauben.
-            collected_rows = self._initial_load_rows
-            self._initial_load_rows = None # WICHTIG: Sammelmodus beenden
-            self.append_rows(collected_rows)
-
+        self.lade_eintraege()
 
-
-        # ensure Gesamtbilanz is up-to-date when loading finished
-        try:
-            self._recalc_gesamtbilanz_from_table()
-        except Exception:
-            pass
+    def _summen(self):
+        """(einnahmen, ausgaben) über alle Buchungen des aktuellen Filters."""
+        row = self.model.aggregate(
+            "COALESCE(SUM(CASE WHEN LOWER(b.typ) = 'einnahme' THEN b.betrag ELSE 0 END), 0), "
+            "COALESCE(SUM(CASE WHEN LOWER(b.typ) = 'ausgabe' THEN b.betrag ELSE 0 END), 0)"
+        )
+        if not row:
+            return 0.0, 0.0
+        return float(row[0] or 0), float(row[1] or 0)
 
     def _recalc_gesamtbilanz_from_table(self):
-        """Recalculate the total balance from table rows and update the label."""
+        """Recalculate the total balance (SQL aggregate) and update the label."""
         try:
-            gesamt = 0.0
-            for row in range(self.table.rowCount()):
-                typ_it = self.table.item(row, 2)
-                betrag_it = self.table.item(row, 4)
-                if betrag_it is None:
-                    continue
-                txt = betrag_it.text().strip()
-                if not txt:
-                    continue
-                # normalize number: allow commas/apostrophes
-                norm = txt.replace("'", "").replace("’", "").replace(" ", "").replace(",", ".")
-                try:
-                    wert = float(norm)
-                except Exception:
-                    continue
-                typ = (typ_it.text().strip().lower() if typ_it else "")
-                if typ == "einnahme":
-                    gesamt += wert
-                elif typ == "ausgabe":
-                    gesamt -= wert
-            self.zeige_gesamtbilanz(gesamt)
+            einnahmen, ausgaben = self._summen()
+            self.zeige_gesamtbilanz(einnahmen - ausgaben, (einnahmen, ausgaben))
         except Exception as e:
             print(f"[DBG] _recalc_gesamtbilanz_from_table error: {e}", flush=True)
-
-    def append_row(self, row):
-        """Compat wrapper: single-row convenience."""
-        try:
-            if row is None:
-                return
-            self.append_rows([row])
-        except Exception as e:
-            print(f"[DBG] BuchhaltungTab.append_row error: {e}", flush=True)
-
-    def lade_eintraege_async(self):
-        """Lädt alle Einträge asynchron (non-blocking)."""
-        try:
-            # Clear table
-            self.table.setRowCount(0)
-            
-            # --- NEU: Temporäre Liste zum Sammeln ---
-            self._temp_filtered_rows = []
-
-            # --- OPTIMIERUNG: N+1-Problem beheben durch JOIN ---
-            query = """
-                SELECT b.id, b.datum, b.typ, b.kategorie, b.betrag, b.beschreibung,
-                       (SELECT COUNT(*) FROM invoices i WHERE i.buchung_id = b.id) as invoice_count
-                FROM buchhaltung b
-                ORDER BY id DESC
-            """
-
-            # Start async loader
-            from gui.tab_loader import TabLoader
-            from PyQt5.QtCore import QThread
-
-            loader = TabLoader(
-                key="buchhaltung_all",
-                query=query,
-                params=[],
-                chunk_size=100
-            )
-            thread = QThread()
-            loader.moveToThread(thread)
-
-            # --- NEU: An temporäre Liste anhängen ---
-            loader.chunk_ready.connect(lambda key, chunk: self._temp_filtered_rows.extend(chunk))
-            loader.finished.connect(self.display_collected_rows)
-            loader.error.connect(lambda k, msg: QMessageBox.critical(self, _("Fehler"), _("Ladefehler:\n") + f"{msg}"))
-
-            thread.started.connect(loader.run)
-            thread.start()
-
-            # Keep thread reference (cleanup on finished)
-            if not hasattr(self, "_filter_threads"):
-                self._filter_threads = []
-            # Clean up old threads
-            self._filter_threads = [(t, l) for t, l in self._filter_threads if t.isRunning()]
-            self._filter_threads.append((thread, loader))
-
-        except Exception as e:
-            print(f"[DBG] lade_eintraege_async error: {e}", flush=True)
-            QMessageBox.critical(self, _("Fehler"), _("Daten konnten nicht geladen werden:\n") + f"{e}")
-
-    def display_collected_rows(self):
-        """NEU: Diese Funktion wird aufgerufen, wenn ALLE Chunks geladen sind."""
-        # Rufe append_rows mit der kompletten, sortierten Liste auf
-        collected_rows = self._temp_filtered_rows
-        self._temp_filtered_rows = collected_rows # Setze es auf sich selbst, damit append_rows es erkennt
-        self.append_rows(collected_rows)
-        self.load_finished() # Rufe finished manuell auf
-        self._temp_filtered_rows = None # Speicher leeren und Filter-Modus beenden
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -7,6 +7,7 @@ from PyQt5.QtCore import Qt
 from .base_dialog import BaseDialog
 from .dialog_styles import GROUPBOX_STYLE
 from db_connection import clear_selected_tables, get_db, get_remote_status
+from suchindex import ist_index_tabelle
 from i18n import _
 
 
@@ -25,7 +26,8 @@ def _get_table_names():
         """)
     else:
         cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-    tables = [row[0] for row in cur.fetchall()]
+    # Suchindex wird über die Trigger der Quelltabellen mitgeleert
+    tables = [row[0] for row in cur.fetchall() if not ist_index_tabelle(row[0])]
     cur.close()
     return tables
 
@@ -5,14 +5,17 @@ Professionelles Design passend zur Anwendung
 """
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame,
-    QGridLayout, QScrollArea, QSizePolicy, QSpacerItem, QGraphicsDropShadowEffect
+    QGridLayout, QScrollArea, QSizePolicy, QSpacerItem, QGraphicsDropShadowEffect,
+    QApplication
 )
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QColor, QPalette, QLinearGradient, QPainter, QBrush
 from db_connection import get_db
+import dashboard_data
 from gui.modern_widgets import COLORS, FONT_SIZES, SPACING, BORDER_RADIUS
 from i18n import _
 import datetime
+import threading
 
 
 def _to_bool(val):
@@ -265,6 +268,58 @@ class AlertCard(QFrame):
                 self.items_layout.addWidget(more_label)
 
 
+class DashboardWorker(QThread):
+    """
+    Lädt den Dashboard-Snapshot im Hintergrund. run() bleibt in einer
+    Schleife, damit der Thread seine (SQLite-)Verbindung behält; Anfragen,
+    die während einer Aktualisierung eintreffen, werden zu einer einzigen
+    zusammengefasst. Übersprungen wird, wenn sich die Datenbank seit dem
+    letzten Snapshot nicht geändert hat (dashboard_data.data_version).
+    """
+    snapshot_ready = pyqtSignal(object)   # dashboard_data.DashboardSnapshot
+    unchanged = pyqtSignal()
+
+    def __init__(self, reifen: bool, artikel: bool, parent=None):
+        super().__init__(parent)
+        self.reifen = reifen
+        self.artikel = artikel
+        self._version = None
+        self._cond = threading.Condition()
+        self._pending = None      # None oder force-Flag der nächsten Runde
+        self._stop = False
+
+    def request(self, force=False):
+        with self._cond:
+            self._pending = bool(force or self._pending)
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stop:
+                    self._cond.wait()
+                if self._stop:
+                    return
+                force, self._pending = self._pending, None
+            try:
+                version, snap = dashboard_data.load_snapshot(
+                    reifen=self.reifen, artikel=self.artikel,
+                    last_version=None if force else self._version,
+                )
+                self._version = version
+                if snap is None:
+                    self.unchanged.emit()
+                else:
+                    self.snapshot_ready.emit(snap)
+            except Exception as e:
+                print(f"Dashboard refresh error: {e}")
+
+
 class DashboardTab(QWidget):
     """Das Dashboard mit Übersicht über alle wichtigen Kennzahlen."""
     
@@ -275,6 +330,26 @@ class DashboardTab(QWidget):
         self.active_modules = get_active_modules()
         
         self.init_ui()
+
+        # Kennzahlen werden im Worker-Thread geladen, nie im GUI-Thread
+        self._worker = DashboardWorker(
+            reifen=self.card_reifen is not None or self.alert_reifen is not None,
+            artikel=self.card_artikel is not None or self.alert_bestand is not None,
+        )
+        self._worker.snapshot_ready.connect(self._apply_snapshot)
+        self._worker.unchanged.connect(self._update_timestamp)
+        self._worker.start()
+        worker = self._worker
+        def _worker_beenden(*_args):
+            try:
+                worker.stop()
+                worker.wait(3000)
+            except RuntimeError:
+                pass        # beim Beenden schon von Qt gelöscht
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_worker_beenden)
+        self.destroyed.connect(_worker_beenden)
         
         # Auto-Refresh alle 60 Sekunden
         self.refresh_timer = QTimer(self)
@@ -450,250 +525,59 @@ class DashboardTab(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         layout.addWidget(scroll)
     
-    def refresh_data(self):
-        """Lädt alle Dashboard-Daten neu."""
-        try:
-            conn = get_db()
-            cur = conn.cursor()
-            
-            # Kunden zählen (neue Kunden diesen Monat)
-            try:
-                heute = datetime.date.today()
-                monat_start = heute.replace(day=1).isoformat()
-                # Versuche erst mit created_at, falls vorhanden
-                try:
-                    cur.execute(f"SELECT COUNT(*) FROM kunden WHERE created_at >= '{monat_start}'")
-                    count = cur.fetchone()[0]
-                except:
-                    # Fallback: alle Kunden zählen
-                    cur.execute("SELECT COUNT(*) FROM kunden")
-                    count = cur.fetchone()[0]
-                self.card_kunden.set_value(str(count))
-                self.card_kunden.set_subtext(_("↑ {} diese Woche").format(count))
-            except:
-                self.card_kunden.set_value("—")
-            
-            # Offene Rechnungen
-            try:
-                cur.execute("SELECT COUNT(*) FROM rechnungen WHERE LOWER(COALESCE(abschluss, '')) != 'bezahlt'")
-                count = cur.fetchone()[0]
-                self.card_offen.set_value(str(count))
-                # Summe der offenen Rechnungen berechnen
-                try:
-                    cur.execute("""
-                        SELECT COALESCE(SUM(
-                            CAST(REPLACE(REPLACE(positionen, 'CHF ', ''), '''', '') AS DECIMAL(10,2))
-                        ), 0) FROM rechnungen WHERE LOWER(COALESCE(abschluss, '')) != 'bezahlt'
-                    """)
-                    summe = cur.fetchone()[0] or 0
-                    self.card_offen.set_subtext(f"Total CHF {summe:,.0f}".replace(",", "'"))
-                except:
-                    pass
-            except:
-                self.card_offen.set_value("—")
-            
-            # Umsatz diesen Monat (aus Buchhaltung)
-            try:
-                heute = datetime.date.today()
-                monat_start = heute.replace(day=1).isoformat()
-                cur.execute("""
-                    SELECT COALESCE(SUM(betrag), 0) FROM buchhaltung 
-                    WHERE typ = 'Einnahme' AND datum >= %s
-                """.replace("%s", "?") if hasattr(conn, 'is_sqlite') and conn.is_sqlite else """
-                    SELECT COALESCE(SUM(betrag), 0) FROM buchhaltung 
-                    WHERE typ = 'Einnahme' AND datum >= %s
-                """, (monat_start,))
-                umsatz = cur.fetchone()[0] or 0
-                self.card_umsatz.set_value(f"CHF {umsatz:,.2f}".replace(",", "'"))
-            except:
-                self.card_umsatz.set_value("—")
-            
-            # Lieferanten zählen
-            try:
-                cur.execute("SELECT COUNT(*) FROM lieferanten")
-                count = cur.fetchone()[0]
-                self.card_lieferanten.set_value(str(count))
-            except:
-                self.card_lieferanten.set_value("—")
-            
-            # Termine heute
-            try:
-                heute = datetime.date.today().isoformat()
-                cur.execute("""
-                    SELECT COUNT(*) FROM auftraege 
-                    WHERE DATE(start_zeit) = %s
-                """.replace("%s", "?") if hasattr(conn, 'is_sqlite') and conn.is_sqlite else """
-                    SELECT COUNT(*) FROM auftraege 
-                    WHERE DATE(start_zeit) = %s
-                """, (heute,))
-                count = cur.fetchone()[0]
-                self.card_termine.set_value(str(count))
-            except:
-                self.card_termine.set_value("—")
-            
-            # Lagerwarnungen zählen (Artikel unter Mindestbestand)
-            lagerwarnung_count = 0
-            try:
-                # Materiallager
-                try:
-                    cur.execute("SELECT COUNT(*) FROM materiallager WHERE bestand <= min_bestand")
-                    lagerwarnung_count += cur.fetchone()[0] or 0
-                except:
-                    pass
-                # Artikellager
-                try:
-                    cur.execute("SELECT COUNT(*) FROM artikellager WHERE bestand <= min_bestand")
-                    lagerwarnung_count += cur.fetchone()[0] or 0
-                except:
-                    pass
-                self.card_lagerwarnungen.set_value(str(lagerwarnung_count))
-                if lagerwarnung_count > 0:
-                    self.card_lagerwarnungen.set_subtext(_("Artikel nachbestellen"))
-            except:
-                self.card_lagerwarnungen.set_value("—")
-            
-            # Reifen zählen - nur wenn Modul aktiv
-            if self.card_reifen is not None:
-                try:
-                    cur.execute("SELECT COUNT(*) FROM reifenlager WHERE ausgelagert_am IS NULL OR ausgelagert_am = ''")
-                    count = cur.fetchone()[0]
-                    self.card_reifen.set_value(str(count))
-                except:
-                    self.card_reifen.set_value("—")
-            
-            # Artikel zählen - nur wenn Modul aktiv
-            if self.card_artikel is not None:
-                try:
-                    cur.execute("SELECT COALESCE(SUM(bestand), 0) FROM artikellager")
-                    count = cur.fetchone()[0] or 0
-                    self.card_artikel.set_value(str(int(count)))
-                except:
-                    self.card_artikel.set_value("—")
-            
-            # === Warnungen laden ===
-            
-            # Überfällige Rechnungen (immer)
-            try:
-                cur.execute("""
-                    SELECT rechnung_nr, kunde, datum, zahlungskonditionen, abschluss 
-                    FROM rechnungen 
-                    WHERE LOWER(COALESCE(abschluss, '')) != 'bezahlt'
-                    ORDER BY datum DESC
-                """)
-                rows = cur.fetchall()
-                items = []
-                heute = datetime.date.today()
-                for r in rows:
-                    rechnung_nr, kunde, datum, zahlungskonditionen, abschluss = r[0], r[1], r[2], r[3], r[4]
-                    status_man = (abschluss or "").strip().lower()
-                    
-                    # Manuell auf überfällig gesetzt
-                    if status_man == "überfällig":
-                        items.append(f"{rechnung_nr} - {kunde}")
-                        continue
-                    
-                    # Bereits bezahlt -> überspringen
-                    if status_man == "bezahlt":
-                        continue
-                    
-                    # Automatische Berechnung: Datum + Zahlungsziel
-                    rechnungsdatum = None
-                    datum_str = str(datum) if datum else ""
-                    for fmt in ("%Y-%m-%d", "%d.%m.%Y", "%d.%m.%y"):
-                        try:
-                            rechnungsdatum = datetime.datetime.strptime(datum_str, fmt).date()
-                            break
-                        except:
-                            pass
-                    if not rechnungsdatum:
-                        continue
-                    
-                    # Zahlungsziel aus zahlungskonditionen extrahieren (Standard: 10 Tage)
-                    ziel_tage = 10
-                    if isinstance(zahlungskonditionen, str) and zahlungskonditionen.strip():
-                        import re
-                        m = re.search(r"(\d+)", zahlungskonditionen)
-                        if m:
-                            try:
-                                ziel_tage = int(m.group(1))
-                            except:
-                                pass
-                    
-                    faellig_am = rechnungsdatum + datetime.timedelta(days=ziel_tage)
-                    if heute > faellig_am:
-                        items.append(f"{rechnung_nr} - {kunde}")
-                    
-                    if len(items) >= 10:
-                        break
-                
-                self.alert_rechnungen.set_items(items)
-            except:
-                self.alert_rechnungen.set_items([])
-            
-            # Alte Reifen (DOT > 5 Jahre) - nur wenn Modul aktiv
-            if self.alert_reifen is not None:
-                try:
-                    aktuelles_jahr = datetime.date.today().year
-                    alte_reifen = []
-                    cur.execute("SELECT dimension, dot, kunde_anzeige FROM reifenlager WHERE ausgelagert_am IS NULL OR ausgelagert_am = ''")
-                    for row in cur.fetchall():
-                        try:
-                            dot = str(row[1]).strip() if row[1] else ""
-                            if len(dot) >= 4:
-                                jahr = int(dot[-2:])
-                                jahr = 2000 + jahr if jahr < 50 else 1900 + jahr
-                                if aktuelles_jahr - jahr >= 5:
-                                    alte_reifen.append(f"{row[0]} ({row[2]})")
-                        except:
-                            pass
-                    self.alert_reifen.set_items(alte_reifen)
-                except:
-                    self.alert_reifen.set_items([])
-            
-            # Niedriger Lagerbestand (< 5) - nur wenn Modul aktiv
-            if self.alert_bestand is not None:
-                try:
-                    cur.execute("""
-                        SELECT bezeichnung, bestand FROM artikellager 
-                        WHERE bestand < 5 
-                        ORDER BY bestand
-                        LIMIT 10
-                    """)
-                    rows = cur.fetchall()
-                    items = [f"{r[0]} (Bestand: {r[1]})" for r in rows]
-                    self.alert_bestand.set_items(items)
-                except:
-                    self.alert_bestand.set_items([])
-            
-            # Heutige Termine (immer)
-            try:
-                heute = datetime.date.today().isoformat()
-                cur.execute("""
-                    SELECT titel, start_zeit FROM auftraege 
-                    WHERE DATE(start_zeit) = %s
-                    ORDER BY start_zeit
-                    LIMIT 10
-                """.replace("%s", "?") if hasattr(conn, 'is_sqlite') and conn.is_sqlite else """
-                    SELECT titel, start_zeit FROM auftraege 
-                    WHERE DATE(start_zeit) = %s
-                    ORDER BY start_zeit
-                    LIMIT 10
-                """, (heute,))
-                rows = cur.fetchall()
-                items = []
-                for r in rows:
-                    zeit = str(r[1])[11:16] if r[1] and len(str(r[1])) > 11 else ""
-                    items.append(f"{zeit} - {r[0]}" if zeit else r[0])
-                self.alert_termine.set_items(items)
-            except:
-                self.alert_termine.set_items([])
-            
-            conn.close()
-            
-        except Exception as e:
-            print(f"Dashboard refresh error: {e}")
-        
-        # Zeitstempel aktualisieren
+    def refresh_data(self, force=False):
+        """
+        Stösst eine Aktualisierung im Hintergrund an (Timer, showEvent, ...).
+        force=True lädt auch dann, wenn sich die Daten nicht geändert haben.
+        """
+        self._worker.request(force)
+
+    def _apply_snapshot(self, snap):
+        """Überträgt einen DashboardSnapshot in Karten und Warnlisten."""
+        def anzahl(card, wert):
+            card.set_value("—" if wert is None else str(wert))
+
+        anzahl(self.card_kunden, snap.kunden)
+        if snap.kunden is not None:
+            self.card_kunden.set_subtext(_("↑ {} diese Woche").format(snap.kunden))
+
+        anzahl(self.card_offen, snap.offene_rechnungen)
+        if snap.offene_summe is not None:
+            subtext = f"Total CHF {snap.offene_summe:,.0f}".replace(",", "'")
+            if snap.faellig_woche:
+                subtext += " · " + _("{} diese Woche fällig").format(snap.faellig_woche)
+            self.card_offen.set_subtext(subtext)
+
+        if snap.umsatz_monat is None:
+            self.card_umsatz.set_value("—")
+        else:
+            self.card_umsatz.set_value(f"CHF {snap.umsatz_monat:,.2f}".replace(",", "'"))
+
+        anzahl(self.card_lieferanten, snap.lieferanten)
+        anzahl(self.card_termine, snap.termine_heute)
+
+        anzahl(self.card_lagerwarnungen, snap.lagerwarnungen)
+        if snap.lagerwarnungen:
+            self.card_lagerwarnungen.set_subtext(_("Artikel nachbestellen"))
+
+        # Reifen/Artikel nur wenn Modul aktiv
+        if self.card_reifen is not None:
+            anzahl(self.card_reifen, snap.reifen_eingelagert)
+        if self.card_artikel is not None:
+            anzahl(self.card_artikel, snap.artikel_bestand)
+
+        # === Warnungen ===
+        self.alert_rechnungen.set_items(snap.ueberfaellige_rechnungen)
+        if self.alert_reifen is not None:
+            self.alert_reifen.set_items(snap.alte_reifen)
+        if self.alert_bestand is not None:
+            self.alert_bestand.set_items(snap.niedriger_bestand)
+        self.alert_termine.set_items(snap.termine)
+
+        self._update_timestamp()
+
+    def _update_timestamp(self):
+        # Zeitstempel aktualisieren (auch wenn sich nichts geändert hat)
         jetzt = datetime.datetime.now().strftime("%d.%m.%Y %H:%M:%S")
         self.last_update_label.setText(_("Letzte Aktualisierung: {}").format(jetzt))
     
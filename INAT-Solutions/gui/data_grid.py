@@ -0,0 +1,553 @@
+# -*- coding: utf-8 -*-
+"""
+Virtualisierte Tabellen für die Listen-Tabs.
+
+SqlTableModel (QAbstractTableModel) lädt Zeilen seitenweise per fetchMore
+mit Keyset-Pagination (WHERE sortwert >= letzter Wert ... LIMIT n statt
+OFFSET). Sortierung und Textfilter laufen als ORDER BY / WHERE in SQL, Texte
+werden erst in data() für die sichtbaren Zellen formatiert. DataGrid ist die
+passende QTableView mit Auswahl-Helfern und entprelltem Filter, DataList die
+QListView-Variante für Karten-Listen, deren Einträge ein Delegate zeichnet.
+
+Beispiel:
+
+    model = SqlTableModel(
+        "artikellager",
+        [GridColumn("artikel_id", _("ID"), hidden=True, nullable=False),
+         GridColumn("bezeichnung", _("Bezeichnung"), width=260)],
+        key="artikel_id", order_by="bezeichnung",
+    )
+    self.grid = DataGrid(model)
+"""
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QTableView, QListView, QAbstractItemView, QHeaderView, QMessageBox
+
+from db_connection import get_db
+from i18n import _
+import suchindex
+
+PAGE_SIZE = 200
+FILTER_DELAY_MS = 250
+
+
+class GridColumn:
+    """
+    Spalte eines SqlTableModel.
+
+    key       Name im Datensatz (record()) und Default für expr
+    expr      SQL-Ausdruck in der SELECT-Liste
+    fmt       value -> Anzeigetext (Default: str, None -> "")
+    numeric   Zahl: rechtsbündig, NULL sortiert als 0
+    nullable  False für NOT-NULL-Spalten (z.B. Schlüssel): Sortierung ohne COALESCE
+    sort_expr eigener Ausdruck für ORDER BY / Keyset (z.B. CAST für Datumsspalten)
+    """
+
+    def __init__(self, key, title, expr=None, width=None, hidden=False, numeric=False,
+                 fmt=None, searchable=True, stretch=False, align=None, nullable=True,
+                 sort_expr=None):
+        self.key = key
+        self.title = title
+        self.expr = expr or key
+        self.width = width
+        self.hidden = hidden
+        self.numeric = numeric
+        self.fmt = fmt
+        self.searchable = searchable
+        self.stretch = stretch
+        self.align = align
+        if sort_expr is None:
+            if not nullable:
+                sort_expr = self.expr
+            else:
+                leer = "0" if numeric else "''"
+                sort_expr = f"COALESCE({self.expr}, {leer})"
+        self.sort_expr = sort_expr
+
+    def text(self, value) -> str:
+        if self.fmt is not None:
+            try:
+                return self.fmt(value)
+            except Exception:
+                pass
+        return "" if value is None else str(value)
+
+    def alignment(self):
+        if self.align is not None:
+            return self.align
+        return (Qt.AlignRight if self.numeric else Qt.AlignLeft) | Qt.AlignVCenter
+
+
+def _like_pattern(text: str) -> str:
+    text = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{text}%"
+
+
+class SqlTableModel(QAbstractTableModel):
+    """
+    Nur-Lese-Modell über eine Tabelle bzw. einen JOIN.
+
+    source      FROM-Teil, z.B. "materiallager m LEFT JOIN lieferanten l ON ..."
+    key         eindeutiger Schlüsselausdruck (Tiebreaker der Sortierung, row_key())
+    order_by    Spalten-key der Default-Sortierung
+    where       feste Zusatzbedingung (mit params)
+    background  optional: record -> QColor/QBrush für die ganze Zeile
+    suchindex   optional: Quelltabelle im Suchindex (suchindex.QUELLEN); der
+                Textfilter sucht dann per Index statt ILIKE über alle Spalten
+
+    Schlägt das Laden fehl, bleiben die bisherigen Zeilen, Sortierung und
+    Filter stehen und ladefehler(text) wird ausgelöst.
+    """
+
+    ladefehler = pyqtSignal(str)
+
+    def __init__(self, source, columns, key, order_by=None, descending=False,
+                 where=None, params=(), page_size=PAGE_SIZE, background=None, suchindex=None,
+                 parent=None):
+        super().__init__(parent)
+        self._source = source
+        self._columns = list(columns)
+        self._key = key
+        self._where = where
+        self._params = tuple(params or ())
+        self._page_size = page_size
+        self._background = background
+        self._suchindex = suchindex
+        self._filter = ""
+        self._sort_col = self._column_index(order_by) if order_by else None
+        self._descending = descending
+        self._rows = []             # (key, sortwert, *spalten)
+        self._brushes = {}          # Zeile -> Brush (lazy)
+        self._has_more = True
+        self._loaded = False
+
+    # ---------- Konfiguration ----------
+    def columns(self):
+        return self._columns
+
+    def _column_index(self, key):
+        for i, c in enumerate(self._columns):
+            if c.key == key:
+                return i
+        raise KeyError(key)
+
+    def set_filter(self, text: str) -> None:
+        text = (text or "").strip()
+        if text == self._filter and self._loaded:
+            return
+        alt = self._filter
+        self._filter = text
+        self._reload(lambda: setattr(self, "_filter", alt))
+
+    def filter_text(self) -> str:
+        return self._filter
+
+    def set_where(self, where, params=()) -> None:
+        alt = (self._where, self._params)
+        self._where = where
+        self._params = tuple(params or ())
+
+        def zurueck():
+            self._where, self._params = alt
+        self._reload(zurueck)
+
+    # ---------- SQL ----------
+    def _sort_expr(self):
+        if self._sort_col is None:
+            return self._key
+        return self._columns[self._sort_col].sort_expr
+
+    def _conditions(self, conn=None):
+        conds, params = [], []
+        if self._where:
+            conds.append(f"({self._where})")
+            params.extend(self._params)
+        treffer = None
+        if self._filter and self._suchindex and conn is not None:
+            treffer = suchindex.bedingung(conn, self._suchindex, self._filter, self._key)
+        if treffer is not None:
+            conds.append(f"({treffer[0]})")
+            params.extend(treffer[1])
+        elif self._filter:
+            searchable = [c for c in self._columns if c.searchable]
+            if searchable:
+                pattern = _like_pattern(self._filter)
+                conds.append("(" + " OR ".join(
+                    f"CAST({c.expr} AS TEXT) ILIKE %s ESCAPE '\\'" for c in searchable
+                ) + ")")
+                params.extend([pattern] * len(searchable))
+        return conds, params
+
+    def _order(self):
+        direction = "DESC" if self._descending else "ASC"
+        sort = self._sort_expr()
+        if sort == self._key:
+            return f"ORDER BY {sort} {direction}"
+        return f"ORDER BY {sort} {direction}, {self._key} {direction}"
+
+    def _query(self, after=None, limit=None, conn=None):
+        sort = self._sort_expr()
+        conds, params = self._conditions(conn)
+        if after is not None:
+            last_key, last_sort = after
+            op = "<" if self._descending else ">"
+            if sort == self._key:
+                conds.append(f"{self._key} {op} %s")
+                params.append(last_key)
+            else:
+                # erster Term (>= bzw. <=) erlaubt einen Index-Range-Scan statt Full-Scan
+                conds.append(f"{sort} {op}= %s AND ({sort} {op} %s OR {self._key} {op} %s)")
+                params.extend([last_sort, last_sort, last_key])
+        cols = ", ".join(c.expr for c in self._columns)
+        sql = f"SELECT {self._key}, {sort}, {cols} FROM {self._source}"
+        if conds:
+            sql += " WHERE " + " AND ".join(conds)
+        sql += " " + self._order()
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return sql, params
+
+    def _fetch_page(self, after=None):
+        with get_db() as conn:
+            sql, params = self._query(after, self._page_size, conn)
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                rows = [tuple(r) for r in cur.fetchall()]
+        self._has_more = len(rows) >= self._page_size
+        return rows
+
+    # ---------- Laden ----------
+    def reload(self) -> bool:
+        """Erste Seite neu laden. False bei SQL-Fehler (bisherige Zeilen bleiben)."""
+        return self._reload()
+
+    def _reload(self, zurueck=None) -> bool:
+        # zurueck() stellt bei einem Fehler Filter/Sortierung wieder her, bevor
+        # ladefehler ausgelöst wird (die View liest dann den gültigen Zustand)
+        try:
+            rows = self._fetch_page()
+        except Exception as e:
+            print(f"[DBG] SqlTableModel.reload error ({self._source}): {e}", flush=True)
+            if zurueck is not None:
+                zurueck()
+            if not self._loaded:
+                self._loaded = True
+                self._has_more = False
+            self.ladefehler.emit(str(e))
+            return False
+        self.beginResetModel()
+        self._rows = rows
+        self._brushes = {}
+        self._loaded = True
+        self.endResetModel()
+        return True
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._loaded and self._has_more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._has_more:
+            return
+        last = self._rows[-1] if self._rows else None
+        try:
+            rows = self._fetch_page((last[0], last[1]) if last else None)
+        except Exception as e:
+            self._has_more = False
+            print(f"[DBG] SqlTableModel.fetchMore error ({self._source}): {e}", flush=True)
+            self.ladefehler.emit(str(e))
+            return
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def iter_records(self, batch=500):
+        """Alle Zeilen (aktueller Filter/Sortierung) als dicts, z.B. für Export."""
+        with get_db() as conn:
+            sql, params = self._query(conn=conn)
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                while True:
+                    chunk = cur.fetchmany(batch)
+                    if not chunk:
+                        break
+                    for r in chunk:
+                        yield self._record(tuple(r))
+
+    def aggregate(self, select_sql: str):
+        """SELECT <select_sql> über source mit aktuellem Filter, liefert eine Zeile."""
+        with get_db() as conn:
+            conds, params = self._conditions(conn)
+            sql = f"SELECT {select_sql} FROM {self._source}"
+            if conds:
+                sql += " WHERE " + " AND ".join(conds)
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                row = cur.fetchone()
+        return tuple(row) if row is not None else None
+
+    # ---------- Qt-Modell ----------
+    def index(self, row, column, parent=QModelIndex()):
+        # Ersetzt hasIndex() (rowCount + columnCount): QListView ruft index()
+        # beim Layout für jede geladene Zeile auf
+        if parent.isValid() or not (0 <= row < len(self._rows) and 0 <= column < len(self._columns)):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and 0 <= section < len(self._columns):
+            if role == Qt.DisplayRole:
+                return self._columns[section].title
+            if role == Qt.TextAlignmentRole:
+                return int(Qt.AlignLeft | Qt.AlignVCenter)
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if row >= len(self._rows):
+            return None
+        if role == Qt.DisplayRole or role == Qt.ToolTipRole:
+            return self._columns[col].text(self._rows[row][col + 2])
+        if role == Qt.TextAlignmentRole:
+            return int(self._columns[col].alignment())
+        if role == Qt.BackgroundRole and self._background is not None:
+            if row not in self._brushes:
+                try:
+                    self._brushes[row] = self._background(self._record(self._rows[row]))
+                except Exception:
+                    self._brushes[row] = None
+            return self._brushes[row]
+        if role == Qt.UserRole:
+            return self._rows[row][0]
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        descending = order == Qt.DescendingOrder
+        if column < 0 or column >= len(self._columns):
+            return
+        if self._loaded and column == self._sort_col and descending == self._descending:
+            return
+        alt = (self._sort_col, self._descending)
+        self._sort_col = column
+        self._descending = descending
+
+        def zurueck():
+            self._sort_col, self._descending = alt
+        self._reload(zurueck)
+
+    def sort_state(self):
+        return self._sort_col, self._descending
+
+    # ---------- Zugriff ----------
+    def _record(self, raw) -> dict:
+        rec = {c.key: raw[i + 2] for i, c in enumerate(self._columns)}
+        rec["_key"] = raw[0]
+        return rec
+
+    def row_key(self, row):
+        if 0 <= row < len(self._rows):
+            return self._rows[row][0]
+        return None
+
+    def record(self, row):
+        if 0 <= row < len(self._rows):
+            return self._record(self._rows[row])
+        return None
+
+    def row_of_key(self, key):
+        for i, r in enumerate(self._rows):
+            if r[0] == key:
+                return i
+        return -1
+
+
+def _zeige_ladefehler(view, text):
+    """Ladefehler des Modells anzeigen statt still eine leere Liste zu zeigen."""
+    try:
+        QMessageBox.warning(view, _("Fehler"), _("Daten konnten nicht geladen werden:\n{0}").format(text))
+    except Exception:
+        pass
+
+
+class DataGrid(QTableView):
+    """QTableView für SqlTableModel: Zeilenauswahl, Spaltenbreiten, Sortierung per Header."""
+
+    def __init__(self, model: SqlTableModel, parent=None, single_selection=False):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SingleSelection if single_selection
+                              else QAbstractItemView.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setWordWrap(False)
+        vh = self.verticalHeader()
+        vh.setVisible(False)
+        vh.setSectionResizeMode(QHeaderView.Fixed)
+        header = self.horizontalHeader()
+        header.setHighlightSections(False)
+        header.setSectionsClickable(True)
+        for i, col in enumerate(model.columns()):
+            if col.width:
+                self.setColumnWidth(i, col.width)
+            if col.hidden:
+                self.setColumnHidden(i, True)
+            if col.stretch:
+                header.setSectionResizeMode(i, QHeaderView.Stretch)
+        sort_col, descending = model.sort_state()
+        if sort_col is not None:
+            header.setSortIndicator(sort_col, Qt.DescendingOrder if descending else Qt.AscendingOrder)
+        else:
+            header.setSortIndicator(-1, Qt.AscendingOrder)
+        header.setSortIndicatorShown(True)
+        header.sortIndicatorChanged.connect(model.sort)
+        model.ladefehler.connect(self._on_ladefehler)
+
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(FILTER_DELAY_MS)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        self._pending_filter = ""
+
+    def _on_ladefehler(self, text):
+        # Sortierpfeil auf die weiterhin gültige Sortierung zurücksetzen
+        header = self.horizontalHeader()
+        sort_col, descending = self.model().sort_state()
+        header.blockSignals(True)
+        header.setSortIndicator(-1 if sort_col is None else sort_col,
+                                Qt.DescendingOrder if descending else Qt.AscendingOrder)
+        header.blockSignals(False)
+        _zeige_ladefehler(self, text)
+
+    # ---------- Laden / Filter ----------
+    def reload(self, keep_selection=True):
+        key = self.current_key() if keep_selection else None
+        if self.model().reload() and key is not None:
+            self.select_key(key)
+
+    def set_filter_text(self, text):
+        """Entprellt: Filter-SQL erst nach FILTER_DELAY_MS ohne weitere Eingabe."""
+        self._pending_filter = text
+        self._filter_timer.start()
+
+    def _apply_filter(self):
+        self.model().set_filter(self._pending_filter)
+
+    # ---------- Auswahl ----------
+    def current_key(self):
+        idx = self.currentIndex()
+        return self.model().row_key(idx.row()) if idx.isValid() else None
+
+    def current_record(self):
+        idx = self.currentIndex()
+        return self.model().record(idx.row()) if idx.isValid() else None
+
+    def selected_keys(self):
+        model = self.model()
+        rows = sorted({i.row() for i in self.selectionModel().selectedRows()})
+        return [k for k in (model.row_key(r) for r in rows) if k is not None]
+
+    def select_key(self, key) -> bool:
+        row = self.model().row_of_key(key)
+        if row < 0:
+            return False
+        self.selectRow(row)
+        return True
+
+    def zeige_key(self, key) -> bool:
+        """Wie select_key, lädt aber weitere Seiten nach, bis die Zeile da ist, und scrollt hin."""
+        model = self.model()
+        while model.row_of_key(key) < 0 and model.canFetchMore():
+            model.fetchMore()
+        if not self.select_key(key):
+            return False
+        self.scrollTo(model.index(model.row_of_key(key), 0), QAbstractItemView.PositionAtCenter)
+        return True
+
+
+class DataList(QListView):
+    """QListView für SqlTableModel: ein Eintrag pro Datensatz, gezeichnet vom Delegate.
+
+    Der Delegate holt sich den Datensatz über model().record(row). Nach reload()
+    bleiben Auswahl und Scrollposition erhalten (die bisher geladenen Seiten
+    werden bei Bedarf nachgeladen).
+    """
+
+    def __init__(self, model: SqlTableModel, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # Alle Einträge gleich hoch: Qt misst nicht jede Zeile einzeln aus
+        self.setUniformItemSizes(True)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)  # Hover-Zustand für den Delegate
+        model.ladefehler.connect(lambda text: _zeige_ladefehler(self, text))
+
+        self._filter_timer = QTimer(self)
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(FILTER_DELAY_MS)
+        self._filter_timer.timeout.connect(self._apply_filter)
+        self._pending_filter = ""
+
+    # ---------- Laden / Filter ----------
+    def reload(self, keep_selection=True):
+        model = self.model()
+        key = self.current_key() if keep_selection else None
+        geladen = model.rowCount()
+        scroll = self.verticalScrollBar().value()
+        if not model.reload() or key is None:
+            return
+        while model.row_of_key(key) < 0 and model.rowCount() < geladen and model.canFetchMore():
+            model.fetchMore()
+        self.verticalScrollBar().setValue(scroll)
+        if self.select_key(key):
+            self.scrollTo(self.currentIndex(), QAbstractItemView.EnsureVisible)
+
+    def set_filter_text(self, text):
+        """Entprellt: Filter-SQL erst nach FILTER_DELAY_MS ohne weitere Eingabe."""
+        self._pending_filter = text
+        self._filter_timer.start()
+
+    def _apply_filter(self):
+        key = self.current_key()
+        self.model().set_filter(self._pending_filter)
+        if key is not None:
+            self.select_key(key)
+
+    # ---------- Auswahl ----------
+    def current_key(self):
+        idx = self.currentIndex()
+        return self.model().row_key(idx.row()) if idx.isValid() else None
+
+    def current_record(self):
+        idx = self.currentIndex()
+        return self.model().record(idx.row()) if idx.isValid() else None
+
+    def select_key(self, key) -> bool:
+        row = self.model().row_of_key(key)
+        if row < 0:
+            return False
+        self.setCurrentIndex(self.model().index(row, 0))
+        return True
+
+    def zeige_key(self, key) -> bool:
+        """Wie select_key, lädt aber weitere Seiten nach, bis der Eintrag da ist, und scrollt hin."""
+        model = self.model()
+        while model.row_of_key(key) < 0 and model.canFetchMore():
+            model.fetchMore()
+        if not self.select_key(key):
+            return False
+        self.scrollTo(self.currentIndex(), QAbstractItemView.PositionAtCenter)
+        return True
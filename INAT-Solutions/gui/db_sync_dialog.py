@@ -10,6 +10,7 @@ from .base_dialog import BaseDialog
 from .dialog_styles import GROUPBOX_STYLE
 from i18n import _
 from paths import local_db_path
+from suchindex import ist_index_tabelle
 try:
     import psycopg2
     import psycopg2.extras
@@ -359,6 +360,17 @@ def _sync_local_to_remote_pg(local_db_path: str, remote_dsn: str, tables=None):
 
             inserted = _pg_insert_many_with_colmap(pg, t, send_candidates, colmap, pk_remote)
             report[t] = {"local_total": len(local_rows), "to_send": len(send_candidates), "inserted": inserted}
+        # Zeilen wurden mit expliziten IDs eingefügt -> Sequenzen nachziehen
+        try:
+            import schema_migrations
+            with pg.cursor() as cur:
+                schema_migrations.sync_pg_sequences(cur)
+            pg.commit()
+        except Exception:
+            try:
+                pg.rollback()
+            except Exception:
+                pass
     finally:
         try:
             pg.close()
@@ -462,7 +474,7 @@ def create_remote_schema_from_local(remote_dsn: str, tables: list | None = None,
     try:
         if not tables:
             cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
-            tables = [r[0] for r in cur.fetchall()]
+            tables = [r[0] for r in cur.fetchall() if not ist_index_tabelle(r[0])]
         pg = psycopg2.connect(dsn=remote_dsn)
         report = {"created": [], "skipped": [], "errors": {}}
         try:
@@ -521,7 +533,8 @@ def _all_sqlite_tables(local_db: str | Path) -> list:
     con = sqlite3.connect(local_db)
     try:
         cur = con.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
-        return [r[0] for r in cur.fetchall()]
+        # Suchindex (FTS5) nicht übertragen, die Trigger der Ziel-DB bauen ihn selbst
+        return [r[0] for r in cur.fetchall() if not ist_index_tabelle(r[0])]
     finally:
         con.close()
 
@@ -1,11 +1,11 @@
 ﻿# -*- coding: utf-8 -*-
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-    QTableWidgetItem, QDialog, QMessageBox, QToolButton,
-    QFrame, QPushButton, QLineEdit, QAbstractItemView
+    QWidget, QVBoxLayout, QHBoxLayout, QDialog, QMessageBox, QToolButton,
+    QFrame, QPushButton, QLineEdit
 )
 from PyQt5.QtCore import Qt
 from db_connection import get_db
+from gui.data_grid import DataGrid, GridColumn, SqlTableModel
 from i18n import _
 from gui.modern_widgets import (
     COLORS, FONT_SIZES, SPACING, BORDER_RADIUS,
@@ -16,9 +16,7 @@ from gui.modern_widgets import (
 class DienstleistungenTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._all_rows = []
         self.init_ui()
-        self._ensure_table()
         self.lade_dienstleistungen()
 
     def init_ui(self):
@@ -84,20 +82,22 @@ class DienstleistungenTab(QWidget):
         table_layout = QVBoxLayout(table_card)
         table_layout.setContentsMargins(0, 0, 0, 0)
 
-        self.table = QTableWidget()
+        self.model = SqlTableModel(
+            "dienstleistungen",
+            [
+                GridColumn("dienstleistung_id", _("ID"), hidden=True, nullable=False, searchable=False),
+                GridColumn("name", _("Name"), width=200),
+                GridColumn("beschreibung", _("Beschreibung"), width=300),
+                GridColumn("preis", _("Preis"), width=100, numeric=True),
+                GridColumn("einheit", _("Einheit"), width=100),
+                GridColumn("waehrung", _("Währung"), width=80),
+                GridColumn("bemerkung", _("Bemerkung"), width=200),
+            ],
+            key="dienstleistung_id", order_by="name",
+            suchindex="dienstleistungen",
+        )
+        self.table = DataGrid(self.model)
         self.table.setStyleSheet(get_table_stylesheet())
-        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.table.setSelectionMode(QTableWidget.ExtendedSelection)
-        self.table.verticalHeader().setVisible(False)
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([_("ID"), _("Name"), _("Beschreibung"), _("Preis"), _("Einheit"), _("Währung"), _("Bemerkung")])
-        self.table.setColumnHidden(0, True)
-        self.table.setColumnWidth(1, 200)
-        self.table.setColumnWidth(2, 300)
-        self.table.setColumnWidth(3, 100)
-        self.table.setColumnWidth(4, 100)
-        self.table.setColumnWidth(5, 80)
-        self.table.setColumnWidth(6, 200)
         table_layout.addWidget(self.table)
 
         content_layout.addWidget(table_card, stretch=1)
@@ -109,75 +109,14 @@ class DienstleistungenTab(QWidget):
         self.btn_loeschen.clicked.connect(self.dienstleistung_loeschen)
 
     def _filter_table(self):
-        query = self.search_input.text().strip().lower()
-        for row in range(self.table.rowCount()):
-            match = False
-            for col in range(1, self.table.columnCount()):
-                item = self.table.item(row, col)
-                if item and query in item.text().lower():
-                    match = True
-                    break
-            self.table.setRowHidden(row, not match if query else False)
-
-    def _ensure_table(self):
-        conn = get_db()
-        is_sqlite = getattr(conn, "is_sqlite", False) or getattr(conn, "is_sqlite_conn", False)
-        if is_sqlite:
-            sql = """
-            CREATE TABLE IF NOT EXISTS dienstleistungen (
-                dienstleistung_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                beschreibung TEXT,
-                preis NUMERIC,
-                einheit TEXT,
-                waehrung TEXT,
-                bemerkung TEXT
-            )
-            """
-        else:
-            sql = """
-            CREATE TABLE IF NOT EXISTS dienstleistungen (
-                dienstleistung_id BIGSERIAL PRIMARY KEY,
-                name TEXT,
-                beschreibung TEXT,
-                preis NUMERIC,
-                einheit TEXT,
-                waehrung TEXT,
-                bemerkung TEXT
-            )
-            """
-        try:
-            with conn.cursor() as cur:
-                cur.execute(sql)
-            conn.commit()
-        except Exception:
-            try:
-                conn.rollback()
-            except Exception:
-                pass
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
+        # Suche als WHERE ... ILIKE in SQL (entprellt), nicht mehr per setRowHidden
+        self.table.set_filter_text(self.search_input.text().strip())
 
     def lade_dienstleistungen(self):
         try:
-            conn = get_db()
-            cur = conn.cursor()
-            cur.execute("SELECT dienstleistung_id, name, beschreibung, preis, einheit, waehrung, bemerkung FROM dienstleistungen ORDER BY name")
-            rows = cur.fetchall()
-            conn.close()
+            self.table.reload()
         except Exception as e:
             QMessageBox.warning(self, _("Fehler"), _("Fehler beim Laden: {}").format(e))
-            return
-
-        self.table.setRowCount(len(rows))
-        for r_idx, row in enumerate(rows):
-            for c_idx, val in enumerate(row):
-                txt = "" if val is None else str(val)
-                item = QTableWidgetItem(txt)
-                self.table.setItem(r_idx, c_idx, item)
 
     def dienstleistung_hinzufuegen(self):
         from gui.dienstleistungen_dialog import DienstleistungenDialog
@@ -198,10 +137,9 @@ class DienstleistungenTab(QWidget):
                 QMessageBox.warning(self, _("Fehler"), _("Fehler beim Speichern: {}").format(e))
 
     def dienstleistung_bearbeiten(self):
-        z = self.table.currentRow()
-        if z < 0:
+        dienstleistung_id = self.table.current_key()
+        if dienstleistung_id is None:
             return
-        dienstleistung_id = int(self.table.item(z, 0).text())
         try:
             conn = get_db()
             cur = conn.cursor()
@@ -242,15 +180,7 @@ class DienstleistungenTab(QWidget):
 
     def dienstleistung_loeschen(self):
         # bulk delete support
-        sel = self.table.selectionModel().selectedRows()
-        if not sel:
-            return
-        ids = []
-        for idx in sel:
-            try:
-                ids.append(int(self.table.item(idx.row(), 0).text()))
-            except Exception:
-                pass
+        ids = [int(k) for k in self.table.selected_keys()]
         if not ids:
             return
         resp = QMessageBox.question(self, _("Löschen bestätigen"), _("Soll(en) die ausgewählten {0} Dienstleistung(en) wirklich gelöscht werden?").format(len(ids)), QMessageBox.Yes | QMessageBox.No)
@@ -1,6 +1,7 @@
 ﻿# -*- coding: utf-8 -*-
 import os, json, csv, importlib
 import datetime
+import datum_iso
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFrame, QLabel,
     QLineEdit, QSizePolicy, QFileDialog, QScrollArea, QMessageBox, QDialog, QComboBox, QApplication
@@ -11,9 +12,8 @@ from db_connection import get_db, get_remote_status, clear_business_database, ge
 from i18n import _
 from gui.clear_database_dialog import ClearDatabaseDialog
 from gui.kategorien_dialog import KategorienDialog
-from gui.backup_dialog import BackupRestoreDialog, create_auto_backup
+from gui.backup_dialog import BackupRestoreDialog
 
-from gui.rechnung_layout_dialog import RechnungLayoutDialog
 from paths import data_dir, resource_path
 from gui.device_login_dialog import DeviceLoginDialog  # <-- NEUER IMPORT
 from gui.themed_input_dialog import get_item as themed_get_item
@@ -163,6 +163,10 @@ class EinstellungenTab(QWidget):
         self.clear_db_button = QPushButton(_("Datenbank löschen"))
         self.clear_db_button.clicked.connect(self._on_clear_database)
         lay_db.addWidget(self.clear_db_button)
+
+        btn_profiler = QPushButton(_("Query-Profiler…"))
+        btn_profiler.clicked.connect(self._open_query_profiler)
+        lay_db.addWidget(btn_profiler)
         
         lay_db.addStretch()
         grid.addWidget(group_db, 0, 0)
@@ -416,6 +420,10 @@ class EinstellungenTab(QWidget):
         dlg = ClearDatabaseDialog(self)
         dlg.exec_()
 
+    def _open_query_profiler(self):
+        from gui.query_profiler_dialog import QueryProfilerDialog
+        QueryProfilerDialog(self).exec_()
+
     def _open_qr_dialog(self):
         try:
             from gui.qr_daten_dialog import QRDatenDialog  # passe den Pfad an, falls abweichend
@@ -484,8 +492,9 @@ class EinstellungenTab(QWidget):
                 widget = self
                 while widget and not hasattr(widget, 'lager_tab'):
                     widget = widget.parent()
-                if widget and hasattr(widget, 'lager_tab'):
-                    lager_tab = widget.lager_tab
+                # Lager-Seite wird erst beim ersten Aufruf gebaut (MainWindow.seite)
+                lager_tab = getattr(widget, 'lager_tab', None) if widget else None
+                if lager_tab is not None:
                     if hasattr(lager_tab, 'tabs') and lager_tab.tabs:
                         lager_tab.tabs.clear()
                     lager_tab._load_aktive_lager()
@@ -507,10 +516,10 @@ class EinstellungenTab(QWidget):
             years = []
             try:
                 cur.execute("""
-                    SELECT DISTINCT substr(COALESCE(buchhaltung.datum, ''), 1, 4) AS y
+                    SELECT DISTINCT SUBSTR(CAST(buchhaltung.datum AS TEXT), 1, 4) AS y
                     FROM invoices
-                    LEFT JOIN buchhaltung ON invoices.buchung_id = buchhaltung.id
-                    WHERE substr(COALESCE(buchhaltung.datum, ''), 1, 4) <> ''
+                    JOIN buchhaltung ON invoices.buchung_id = buchhaltung.id
+                    WHERE buchhaltung.datum IS NOT NULL
                     ORDER BY y DESC
                 """)
                 years = [r[0] for r in cur.fetchall() if r[0]]
@@ -614,33 +623,20 @@ class EinstellungenTab(QWidget):
         if not folder:
             return
 
-        # Query: hole Rechnungen für das ausgewählte Jahr (versuche Postgres-Variante, fallback auf SQLite)
+        # Query: hole Rechnungen für das ausgewählte Jahr (Datumsbereich, beide Backends)
         conn = None
         try:
             conn = get_db()
             cur = conn.cursor()
-            # Postgres variant (uses EXTRACT for created_at)
-            q_pg = """
+            von, bis = datum_iso.jahr_bereich(year)
+            cur.execute("""
                 SELECT invoices.buchung_id, invoices.filename, invoices.content
                 FROM invoices
                 LEFT JOIN buchhaltung ON invoices.buchung_id = buchhaltung.id
-                WHERE substr(COALESCE(buchhaltung.datum, ''),1,4) = %s
-                   OR EXTRACT(YEAR FROM invoices.created_at)::text = %s
+                WHERE (buchhaltung.datum >= %s AND buchhaltung.datum < %s)
+                   OR (invoices.created_at >= %s AND invoices.created_at < %s)
                 ORDER BY invoices.buchung_id
-            """
-            try:
-                cur.execute(q_pg, (year, year))
-            except Exception:
-                # SQLite variant (uses strftime)
-                q_sqlite = """
-                    SELECT invoices.buchung_id, invoices.filename, invoices.content
-                    FROM invoices
-                    LEFT JOIN buchhaltung ON invoices.buchung_id = buchhaltung.id
-                    WHERE substr(COALESCE(buchhaltung.datum, ''),1,4) = ?
-                       OR strftime('%Y', invoices.created_at) = ?
-                    ORDER BY invoices.buchung_id
-                """
-                cur.execute(q_sqlite, (year, year))
+            """, (von, bis, von, bis))
 
             rows = cur.fetchall()
             count = 0
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Globales Suchfeld der Titelleiste mit Trefferliste über alle Module.
+
+- Entprellt: gesucht wird erst SUCH_VERZOEGERUNG_MS nach dem letzten Tastendruck.
+- Im Hintergrund: die Suche läuft als Job im zentralen LoadScheduler unter
+  einem festen key; eine neue Eingabe ersetzt dort die alte (wartend ->
+  entfernt, laufend -> bricht vor der nächsten Kategorie ab).
+- Gestreamt: globale_suche.suche() meldet jede Kategorie einzeln, die Liste
+  zeigt sie sofort; Meldungen überholter Suchen werden verworfen (Nummer).
+
+Ein Klick bzw. Enter auf einen Treffer sendet treffer_gewaehlt(Treffer);
+MainWindow wechselt dann zur passenden Seite.
+"""
+import itertools
+
+from PyQt5.QtCore import Qt, QObject, QTimer, QEvent, QPoint, pyqtSignal
+from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtWidgets import (
+    QWidget, QHBoxLayout, QVBoxLayout, QLineEdit, QFrame, QListWidget, QListWidgetItem,
+    QGraphicsDropShadowEffect
+)
+
+import globale_suche
+from gui.load_scheduler import scheduler, PRIO_SICHTBAR
+from i18n import _
+
+SUCH_VERZOEGERUNG_MS = 250
+JOB_KEY = "globale_suche"
+LISTE_BREITE = 460
+
+_nummern = itertools.count(1)
+
+
+class _Meldungen(QObject):
+    """Lebt im GUI-Thread; Signale aus dem Pool-Thread kommen daher per Queued Connection."""
+    kategorie_fertig = pyqtSignal(int, str, list)     # nummer, kategorie, treffer
+    fertig = pyqtSignal(int)
+
+
+class GlobaleSuche(QWidget):
+    """Suchfeld + schwebende Trefferliste (Kind des Hauptfensters)."""
+
+    treffer_gewaehlt = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.eingabe = QLineEdit()
+        self.eingabe.setPlaceholderText(_("🔍 Kunden, Rechnungen, Reifen, Aufträge … suchen"))
+        self.eingabe.setClearButtonEnabled(True)
+        self.eingabe.setMinimumWidth(320)
+        self.eingabe.setStyleSheet("""
+            QLineEdit {
+                background-color: #f5f7fa;
+                border: 1px solid #e2e8f0;
+                border-radius: 8px;
+                padding: 8px 12px;
+                font-size: 14px;
+                color: #1f2937;
+            }
+            QLineEdit:focus { border: 1px solid #4a6fa5; background-color: #ffffff; }
+        """)
+        layout.addWidget(self.eingabe)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SUCH_VERZOEGERUNG_MS)
+        self._timer.timeout.connect(self._starte_suche)
+
+        self._meldungen = _Meldungen(self)
+        self._meldungen.kategorie_fertig.connect(self._kategorie_fertig)
+        self._meldungen.fertig.connect(self._fertig)
+
+        self._nummer = 0            # aktuelle Suche; Meldungen anderer Nummern sind überholt
+        self._text = ""
+        self._ergebnisse = {}       # kategorie -> [Treffer]
+        self._laeuft = False
+        self._liste = None
+
+        self.eingabe.textChanged.connect(self._text_geaendert)
+        self.eingabe.returnPressed.connect(self._erster_treffer)
+        self.eingabe.installEventFilter(self)
+
+    # ---------- Eingabe ----------
+
+    def _text_geaendert(self, text):
+        self._timer.start()
+        if not globale_suche.suchbar(text):
+            self._timer.stop()
+            self._nummer = next(_nummern)
+            self._text = ""
+            self._laeuft = False
+            scheduler().cancel(JOB_KEY)
+            self._verstecken()
+
+    def _starte_suche(self):
+        text = self.eingabe.text().strip()
+        if not globale_suche.suchbar(text) or (text == self._text and self._laeuft):
+            return
+        nummer = self._nummer = next(_nummern)
+        self._text = text
+        self._ergebnisse = {}
+        self._laeuft = True
+        meldungen = self._meldungen
+
+        def _run(job, text=text, nummer=nummer):
+            def melde(kategorie, treffer):
+                if not job.abgebrochen():
+                    meldungen.kategorie_fertig.emit(nummer, kategorie, treffer)
+            try:
+                globale_suche.suche(text, melde, abgebrochen=job.abgebrochen)
+            finally:
+                meldungen.fertig.emit(nummer)
+
+        # gleicher key, andere signatur -> die vorige Suche wird abgebrochen
+        scheduler().submit(JOB_KEY, _run, PRIO_SICHTBAR, signatur=(text, nummer))
+        self._zeigen()
+
+    # ---------- Ergebnisse ----------
+
+    def _kategorie_fertig(self, nummer, kategorie, treffer):
+        if nummer != self._nummer:
+            return
+        self._ergebnisse[kategorie] = treffer
+        self._fuellen()
+
+    def _fertig(self, nummer):
+        if nummer != self._nummer:
+            return
+        self._laeuft = False
+        self._fuellen()
+
+    def _fuellen(self):
+        liste = self._liste_widget()
+        aktuell = liste.currentItem()
+        gewaehlt = aktuell.data(Qt.UserRole) if aktuell is not None else None
+        liste.clear()
+        kopf_font = QFont()
+        kopf_font.setBold(True)
+        kopf_font.setPointSize(8)
+        for kat in globale_suche.KATEGORIEN:
+            treffer = self._ergebnisse.get(kat.name)
+            if not treffer:
+                continue
+            kopf = QListWidgetItem(_(kat.titel).upper())
+            kopf.setFlags(Qt.NoItemFlags)
+            kopf.setFont(kopf_font)
+            kopf.setForeground(QColor("#6b7280"))
+            liste.addItem(kopf)
+            for t in treffer:
+                item = QListWidgetItem(f"{t.titel}\n{t.untertitel}" if t.untertitel else t.titel)
+                item.setData(Qt.UserRole, t)
+                liste.addItem(item)
+                if gewaehlt is not None and (t.kategorie, t.schluessel) == (gewaehlt.kategorie, gewaehlt.schluessel):
+                    liste.setCurrentItem(item)
+        if liste.count() == 0:
+            info = QListWidgetItem(_("Suche läuft …") if self._laeuft else _("Keine Treffer"))
+            info.setFlags(Qt.NoItemFlags)
+            info.setForeground(QColor("#6b7280"))
+            liste.addItem(info)
+        self._zeigen()
+
+    # ---------- Trefferliste ----------
+
+    def _liste_widget(self) -> QListWidget:
+        if self._liste is None:
+            rahmen = QFrame(self.window())
+            rahmen.setObjectName("globaleSucheListe")
+            rahmen.setStyleSheet("""
+                #globaleSucheListe { background-color: #ffffff; border: 1px solid #e2e8f0; border-radius: 8px; }
+                QListWidget { border: none; background: transparent; font-size: 13px; outline: none; }
+                QListWidget::item { padding: 6px 10px; color: #1f2937; }
+                QListWidget::item:selected { background-color: #e8eef7; color: #1f2937; border-radius: 6px; }
+            """)
+            schatten = QGraphicsDropShadowEffect(rahmen)
+            schatten.setBlurRadius(24)
+            schatten.setOffset(0, 4)
+            schatten.setColor(QColor(0, 0, 0, 50))
+            rahmen.setGraphicsEffect(schatten)
+            box = QVBoxLayout(rahmen)
+            box.setContentsMargins(6, 6, 6, 6)
+            self._liste = QListWidget(rahmen)
+            self._liste.setFocusPolicy(Qt.NoFocus)     # Tippen bleibt im Suchfeld
+            self._liste.itemClicked.connect(self._gewaehlt)
+            box.addWidget(self._liste)
+            self._rahmen = rahmen
+            rahmen.hide()
+        return self._liste
+
+    def _zeigen(self):
+        liste = self._liste_widget()
+        fenster = self.window()
+        pos = self.eingabe.mapTo(fenster, QPoint(0, self.eingabe.height() + 4))
+        breite = max(self.eingabe.width(), LISTE_BREITE)
+        x = min(pos.x(), max(0, fenster.width() - breite - 8))
+        zeilen = sum(liste.sizeHintForRow(i) for i in range(liste.count()))
+        hoehe = min(zeilen + 16, int(fenster.height() * 0.7))
+        self._rahmen.setGeometry(x, pos.y(), breite, max(hoehe, 48))
+        self._rahmen.show()
+        self._rahmen.raise_()
+
+    def _verstecken(self):
+        if self._liste is not None:
+            self._rahmen.hide()
+
+    def _bewegen(self, schritt: int):
+        liste = self._liste_widget()
+        zeile = liste.currentRow()
+        for _i in range(liste.count()):
+            zeile = (zeile + schritt) % liste.count()
+            if liste.item(zeile).flags() & Qt.ItemIsEnabled:
+                liste.setCurrentRow(zeile)
+                return
+
+    def _erster_treffer(self):
+        if self._liste is None or not self._rahmen.isVisible():
+            return
+        item = self._liste.currentItem()
+        if item is None or item.data(Qt.UserRole) is None:
+            for i in range(self._liste.count()):
+                if self._liste.item(i).data(Qt.UserRole) is not None:
+                    item = self._liste.item(i)
+                    break
+        if item is not None and item.data(Qt.UserRole) is not None:
+            self._gewaehlt(item)
+
+    def _gewaehlt(self, item):
+        treffer = item.data(Qt.UserRole)
+        if treffer is None:
+            return
+        self._verstecken()
+        self.treffer_gewaehlt.emit(treffer)
+
+    def eventFilter(self, obj, event):
+        if obj is self.eingabe:
+            if event.type() == QEvent.KeyPress:
+                if event.key() == Qt.Key_Down:
+                    self._bewegen(1)
+                    return True
+                if event.key() == Qt.Key_Up:
+                    self._bewegen(-1)
+                    return True
+                if event.key() == Qt.Key_Escape:
+                    self._verstecken()
+                    return True
+            elif event.type() == QEvent.FocusOut:
+                # Klick in die Liste nimmt dem Suchfeld den Fokus nicht (NoFocus)
+                QTimer.singleShot(150, self._fokus_verloren)
+            elif event.type() == QEvent.FocusIn and self._ergebnisse and self.eingabe.text().strip():
+                self._zeigen()
+        return super().eventFilter(obj, event)
+
+    def _fokus_verloren(self):
+        if not self.eingabe.hasFocus():
+            self._verstecken()
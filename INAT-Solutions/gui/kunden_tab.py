@@ -1,23 +1,24 @@
 ﻿# -*- coding: utf-8 -*-
 """
 Kunden-Tab mit modernem Layout
-- Liste links mit Kunden als Karten
+- Liste links mit Kunden als Karten (DataList, seitenweise geladen,
+  Karten zeichnet KundenDelegate)
 - Details rechts
 - Moderne Toolbar
 """
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QFrame, QScrollArea, QSizePolicy, QDialog, QMessageBox,
-    QSplitter, QLineEdit, QStackedWidget
+    QFrame, QDialog, QMessageBox, QStyledItemDelegate, QStyle
 )
-from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, pyqtSignal, QRectF, QSize
+from PyQt5.QtGui import QFont, QColor, QPen, QFontMetrics, QPainter
 from db_connection import get_db
+from gui.data_grid import DataList, GridColumn, SqlTableModel
 from gui.kunden_dialog import KundenDialog
 from gui.modern_widgets import (
-    ModernCard, ModernToolbar, ListItem, AvatarLabel, 
-    StatusBadge, COLORS, FONT_SIZES, SPACING, BORDER_RADIUS,
-    get_button_primary_stylesheet, get_button_secondary_stylesheet, get_input_stylesheet
+    ModernToolbar, AvatarLabel, avatar_initialen, avatar_farbe,
+    COLORS, FONT_SIZES, SPACING, BORDER_RADIUS,
+    get_button_primary_stylesheet
 )
 from i18n import _
 
@@ -311,6 +312,90 @@ class KundeDetailPanel(QFrame):
         self.detail_container.hide()
 
 
+class KundenDelegate(QStyledItemDelegate):
+    """
+    Zeichnet einen Kunden als Karte (Avatar mit Initialen, Name, PLZ/Ort) -
+    gleiches Aussehen wie das frühere ListItem, aber ohne Widget pro Kunde.
+    """
+
+    HOEHE = 68      # Karte: 44px Avatar + 2x 12px Rand
+    ABSTAND = 8     # Abstand zwischen den Karten
+    AVATAR = 44
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._fonts = None
+
+    def _schriften(self, basis):
+        if self._fonts is None:
+            titel = QFont(basis)
+            titel.setPixelSize(14)
+            titel.setWeight(QFont.DemiBold)
+            untertitel = QFont(basis)
+            untertitel.setPixelSize(12)
+            avatar = QFont(basis)
+            avatar.setPixelSize(int(self.AVATAR * 0.4))
+            avatar.setWeight(QFont.DemiBold)
+            self._fonts = (titel, untertitel, avatar)
+        return self._fonts
+
+    @staticmethod
+    def texte(kunde: dict):
+        """(Anzeigename, Untertitel) eines Kunden-Datensatzes."""
+        name = kunde.get("name") or kunde.get("firma") or _("Unbekannt")
+        plz, stadt = kunde.get("plz") or "", kunde.get("stadt") or ""
+        return name, f"{plz} {stadt}".strip()
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.HOEHE + self.ABSTAND)
+
+    def paint(self, painter, option, index):
+        kunde = index.model().record(index.row())
+        if kunde is None:
+            return
+        name, untertitel = self.texte(kunde)
+        titel_font, untertitel_font, avatar_font = self._schriften(option.font)
+        aktiv = option.state & (QStyle.State_Selected | QStyle.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Karte
+        karte = QRectF(option.rect).adjusted(0.5, 0.5, -0.5, -self.ABSTAND - 0.5)
+        painter.setPen(QPen(QColor(COLORS['primary'] if aktiv else COLORS['border_light']), 1))
+        painter.setBrush(QColor(COLORS['surface_hover'] if aktiv else COLORS['surface']))
+        painter.drawRoundedRect(karte, 10, 10)
+
+        # Avatar
+        avatar = QRectF(karte.left() + 16, karte.center().y() - self.AVATAR / 2,
+                        self.AVATAR, self.AVATAR)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(avatar_farbe(name)))
+        painter.drawEllipse(avatar)
+        painter.setFont(avatar_font)
+        painter.setPen(QColor("white"))
+        painter.drawText(avatar, Qt.AlignCenter, avatar_initialen(name))
+
+        # Titel und Untertitel
+        x = avatar.right() + 16
+        breite = max(0.0, karte.right() - 16 - x)
+        titel_fm = QFontMetrics(titel_font)
+        untertitel_fm = QFontMetrics(untertitel_font)
+        hoehe = titel_fm.height() + (2 + untertitel_fm.height() if untertitel else 0)
+        y = karte.center().y() - hoehe / 2
+        painter.setFont(titel_font)
+        painter.setPen(QColor(COLORS['text_primary']))
+        painter.drawText(QRectF(x, y, breite, titel_fm.height()), Qt.AlignLeft | Qt.AlignVCenter,
+                         titel_fm.elidedText(name, Qt.ElideRight, int(breite)))
+        if untertitel:
+            painter.setFont(untertitel_font)
+            painter.setPen(QColor(COLORS['text_secondary']))
+            painter.drawText(QRectF(x, y + titel_fm.height() + 2, breite, untertitel_fm.height()),
+                             Qt.AlignLeft | Qt.AlignVCenter,
+                             untertitel_fm.elidedText(untertitel, Qt.ElideRight, int(breite)))
+        painter.restore()
+
+
 class KundenTab(QWidget):
     """Kunden-Tab mit Sidebar-Liste und Detail-Ansicht."""
     
@@ -318,12 +403,10 @@ class KundenTab(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._kunden = []
-        self._list_items = []
         self._selected_kunde = None
         
         self._setup_ui()
-        self._ensure_table()
+        self.lade_kunden()
     
     def _setup_ui(self):
         main_layout = QVBoxLayout(self)
@@ -382,28 +465,39 @@ class KundenTab(QWidget):
         """)
         list_layout.addWidget(self.count_label)
         
-        # Scrollbare Liste
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll.setStyleSheet("""
-            QScrollArea {
+        # Virtualisierte Liste: nur sichtbare Karten werden gezeichnet,
+        # weitere Seiten lädt das Modell beim Scrollen nach
+        self.model = SqlTableModel(
+            "kunden",
+            [
+                GridColumn("kundennr", _("Nr."), nullable=False, searchable=False),
+                GridColumn("anrede", _("Anrede")),
+                GridColumn("name", _("Name")),
+                GridColumn("firma", _("Firma")),
+                GridColumn("plz", _("PLZ")),
+                GridColumn("strasse", _("Strasse")),
+                GridColumn("stadt", _("Ort")),
+                GridColumn("email", _("E-Mail")),
+                GridColumn("bemerkung", _("Bemerkung")),
+            ],
+            key="kundennr", order_by="name",
+            suchindex="kunden",
+            # QListView legt nach jedem fetchMore alle geladenen Zeilen neu an,
+            # grössere Seiten = weniger Durchläufe beim Scrollen
+            page_size=500,
+        )
+        self.model.modelReset.connect(self._update_count)
+        self.list_view = DataList(self.model)
+        self.list_view.setItemDelegate(KundenDelegate(self.list_view))
+        self.list_view.setStyleSheet("""
+            QListView {
                 border: none;
                 background: transparent;
-            }
-            QScrollArea > QWidget > QWidget {
-                background: transparent;
+                outline: none;
             }
         """)
-        
-        self.list_widget = QWidget()
-        self.list_layout = QVBoxLayout(self.list_widget)
-        self.list_layout.setContentsMargins(0, 0, 0, 0)
-        self.list_layout.setSpacing(8)
-        self.list_layout.addStretch()
-        
-        scroll.setWidget(self.list_widget)
-        list_layout.addWidget(scroll)
+        self.list_view.selectionModel().currentChanged.connect(self._on_current_changed)
+        list_layout.addWidget(self.list_view)
         
         content_layout.addWidget(list_container)
         
@@ -414,144 +508,61 @@ class KundenTab(QWidget):
         
         main_layout.addWidget(content, stretch=1)
     
-    def _ensure_table(self):
-        """Stellt sicher dass die Tabelle existiert."""
-        try:
-            conn = get_db()
-            is_sqlite = getattr(conn, "is_sqlite", False)
-            cur = conn.cursor()
-            
-            if is_sqlite:
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS kunden (
-                        kundennr INTEGER PRIMARY KEY AUTOINCREMENT,
-                        anrede TEXT,
-                        name TEXT,
-                        firma TEXT,
-                        plz TEXT,
-                        strasse TEXT,
-                        stadt TEXT,
-                        email TEXT,
-                        bemerkung TEXT
-                    )
-                """)
-            else:
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS kunden (
-                        kundennr BIGSERIAL PRIMARY KEY,
-                        anrede TEXT,
-                        name TEXT,
-                        firma TEXT,
-                        plz TEXT,
-                        strasse TEXT,
-                        stadt TEXT,
-                        email TEXT,
-                        bemerkung TEXT
-                    )
-                """)
-            
-            conn.commit()
-            cur.close()
-            conn.close()
-        except Exception as e:
-            print(f"[DBG] _ensure_table error: {e}")
-    
     def lade_kunden(self):
-        """Lädt alle Kunden aus der Datenbank."""
+        """Lädt die erste Seite neu (Auswahl und Scrollposition bleiben erhalten)."""
         try:
-            conn = get_db()
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT kundennr, anrede, name, firma, plz, strasse, stadt, email, bemerkung 
-                FROM kunden ORDER BY name ASC
-            """)
-            rows = cur.fetchall()
-            cur.close()
-            conn.close()
-            
-            self._kunden = []
-            for row in rows:
-                if isinstance(row, dict):
-                    self._kunden.append(row)
-                else:
-                    self._kunden.append({
-                        "kundennr": row[0],
-                        "anrede": row[1],
-                        "name": row[2],
-                        "firma": row[3],
-                        "plz": row[4],
-                        "strasse": row[5],
-                        "stadt": row[6],
-                        "email": row[7],
-                        "bemerkung": row[8]
-                    })
-            
-            self._update_list()
-            
+            self.list_view.reload()
         except Exception as e:
             print(f"[DBG] lade_kunden error: {e}")
     
-    def _update_list(self):
-        """Aktualisiert die Kunden-Liste."""
-        # Alte Items entfernen
-        for item in self._list_items:
-            item.deleteLater()
-        self._list_items.clear()
-        
-        # Neue Items erstellen
-        for kunde in self._kunden:
-            item = ListItem()
-            name = kunde.get("name", "")
-            firma = kunde.get("firma", "")
-            stadt = kunde.get("stadt", "")
-            plz = kunde.get("plz", "")
-            
-            display_name = name or firma or _("Unbekannt")
-            subtitle = f"{plz} {stadt}".strip() if plz or stadt else ""
-            
-            item.set_content(
-                avatar_name=display_name,
-                title=display_name,
-                subtitle=subtitle
-            )
-            
-            item.clicked.connect(lambda k=kunde: self._on_kunde_selected(k))
-            
-            # Vor dem Stretch einfügen
-            self.list_layout.insertWidget(self.list_layout.count() - 1, item)
-            self._list_items.append(item)
-        
-        self.count_label.setText(f"{len(self._kunden)} " + _("Kunden"))
+    def _update_count(self):
+        """Anzahl der Kunden (mit aktuellem Filter) per COUNT(*) statt aller Zeilen."""
+        try:
+            row = self.model.aggregate("COUNT(*)")
+            anzahl = int(row[0]) if row else 0
+        except Exception as e:
+            print(f"[DBG] Kunden zählen fehlgeschlagen: {e}")
+            anzahl = self.model.rowCount()
+        self.count_label.setText(f"{anzahl} " + _("Kunden"))
     
     def _filter_list(self, search_text: str):
-        """Filtert die Liste nach Suchbegriff."""
-        search = search_text.lower().strip()
-        
-        for i, item in enumerate(self._list_items):
-            if i >= len(self._kunden):
-                continue
-            
-            kunde = self._kunden[i]
-            name = (kunde.get("name", "") or "").lower()
-            firma = (kunde.get("firma", "") or "").lower()
-            stadt = (kunde.get("stadt", "") or "").lower()
-            email = (kunde.get("email", "") or "").lower()
-            
-            matches = (
-                search in name or
-                search in firma or
-                search in stadt or
-                search in email or
-                not search
-            )
-            
-            item.setVisible(matches)
+        """Filtert die Liste nach Suchbegriff (SQL über den Suchindex, entprellt)."""
+        self.list_view.set_filter_text(search_text.strip())
+    
+    def _on_current_changed(self, current, previous):
+        kunde = self.model.record(current.row()) if current.isValid() else None
+        if kunde is not None:
+            kunde.pop("_key", None)
+            self._on_kunde_selected(kunde)
     
     def _on_kunde_selected(self, kunde: dict):
         """Wird aufgerufen wenn ein Kunde ausgewählt wird."""
         self._selected_kunde = kunde
         self.detail_panel.show_kunde(kunde)
     
+    def zeige_treffer(self, treffer):
+        """Treffer der globalen Suche in der Liste auswählen (sonst nur im Detailbereich zeigen)."""
+        if self.list_view.zeige_key(treffer.schluessel):
+            return
+        # Durch den Listenfilter ausgeblendet: Details direkt aus der DB
+        try:
+            conn = get_db()
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT kundennr, anrede, name, firma, plz, strasse, stadt, email, bemerkung
+                FROM kunden WHERE kundennr = %s
+            """, (treffer.schluessel,))
+            row = cur.fetchone()
+            cur.close()
+            conn.close()
+        except Exception as e:
+            print(f"[DBG] zeige_treffer kunden error: {e}")
+            return
+        if row is None:
+            return
+        keys = ["kundennr", "anrede", "name", "firma", "plz", "strasse", "stadt", "email", "bemerkung"]
+        self._on_kunde_selected(row if isinstance(row, dict) else dict(zip(keys, row)))
+
     def _on_edit_kunde(self, kunde: dict):
         """Öffnet den Bearbeiten-Dialog."""
         dlg = KundenDialog(self, kunde=kunde)
@@ -663,12 +674,3 @@ class KundenTab(QWidget):
         except Exception as e:
             print(f"[DBG] kunde_loeschen error: {e}")
             QMessageBox.warning(self, _("Fehler"), str(e))
-    
-    # Kompatibilität mit altem Tab
-    def append_rows(self, rows):
-        """Für TabLoader-Kompatibilität."""
-        pass
-    
-    def load_finished(self):
-        """Für TabLoader-Kompatibilität."""
-        self.lade_kunden()
@@ -1,4 +1,4 @@
-﻿from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTabWidget, QLabel, QDialog, QFrame, QHBoxLayout, QPushButton
+﻿from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTabWidget, QLabel, QDialog, QFrame, QHBoxLayout, QPushButton, QMessageBox
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from gui.artikellager_tab import ArtikellagerTab
@@ -173,6 +173,16 @@ class LagerTab(QWidget):
             container_layout.addWidget(self.tabs)
             self.layout.addWidget(container)
 
+    def zeige_treffer(self, treffer):
+        """Treffer der globalen Suche (Reifenlager) im Unter-Tab auswählen."""
+        tab = getattr(self, "reifenlager_tab", None) if treffer.kategorie == "reifenlager" else None
+        tabs = getattr(self, "tabs", None)
+        if tab is None or tabs is None or tabs.indexOf(tab) < 0:
+            QMessageBox.information(self, _("Lager"), _("Das Reifenlager ist nicht aktiviert."))
+            return
+        tabs.setCurrentWidget(tab)
+        tab.table.zeige_key(treffer.schluessel)
+
     def _open_einstellungen(self):
         dlg = LagerEinstellungenDialog(self)
         if dlg.exec_() == QDialog.Accepted:
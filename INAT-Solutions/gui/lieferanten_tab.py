@@ -1,14 +1,13 @@
 ﻿from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-    QTableWidgetItem, QDialog, QMessageBox, QLineEdit, QLabel, QPushButton, QSizePolicy,
-    QFrame, QAbstractItemView, QHeaderView
+    QWidget, QVBoxLayout, QHBoxLayout, QDialog, QMessageBox, QLineEdit, QLabel, QPushButton, QSizePolicy,
+    QFrame
 )
 from db_connection import get_db, dict_cursor_factory
-import sqlite3
 import webbrowser
 from PyQt5.QtWidgets import QToolButton
 from PyQt5.QtCore import Qt, pyqtSignal
 from i18n import _
+from gui.data_grid import DataGrid, GridColumn, SqlTableModel
 from gui.modern_widgets import (
     COLORS, FONT_SIZES, SPACING, BORDER_RADIUS,
     get_table_stylesheet, get_button_primary_stylesheet,
@@ -20,8 +19,8 @@ class LieferantenTab(QWidget):
 
     def __init__(self):
         super().__init__()
-        self._all_rows = []
         self.init_ui()
+        self.lade_lieferanten()
 
     def init_ui(self):
         main_layout = QVBoxLayout(self)
@@ -84,12 +83,23 @@ class LieferantenTab(QWidget):
         table_layout = QVBoxLayout(table_card)
         table_layout.setContentsMargins(0, 0, 0, 0)
 
-        self.table = QTableWidget()
+        self.model = SqlTableModel(
+            "lieferanten",
+            [
+                GridColumn("id", _("ID"), width=60, hidden=True, nullable=False, searchable=False),
+                GridColumn("name", _("Name"), width=180),
+                GridColumn("adresse", _("Adresse"), width=200),
+                GridColumn("kontaktperson", _("Kontaktperson"), width=150),
+                GridColumn("email", _("E-Mail"), width=180),
+                GridColumn("telefon", _("Telefon"), width=120),
+                GridColumn("portal_link", _("Portal-Link"), width=200),
+                GridColumn("notizen", _("Notizen"), width=200),
+            ],
+            key="id", order_by="name",
+            suchindex="lieferanten",
+        )
+        self.table = DataGrid(self.model)
         self.table.setStyleSheet(get_table_stylesheet())
-        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.table.setSelectionMode(QTableWidget.ExtendedSelection)
-        self.table.setSortingEnabled(True)
-        self.table.verticalHeader().setVisible(False)
         table_layout.addWidget(self.table)
 
         content_layout.addWidget(table_card, stretch=1)
@@ -103,128 +113,22 @@ class LieferantenTab(QWidget):
         self.search_input.textChanged.connect(self._filter_table)
 
     def lade_lieferanten(self):
-        conn = get_db()
         try:
-            try:
-                cur = conn.cursor(cursor_factory=dict_cursor_factory(conn))
-            except Exception:
-                cur = conn.cursor()
-
-            cur.execute("SELECT * FROM lieferanten")
-            rows = cur.fetchall()
-            desc = getattr(cur, "description", None)
-            col_names = [d[0].lower() for d in desc] if desc else []
-
+            self.table.reload()
         except Exception as e:
             print(_("Fehler beim Laden der Lieferanten (DB):"), e)
-            rows = []
-            col_names = []
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
-
-        id_candidates = ("id", "lieferant_id")
-        daten = []
-        for r in rows:
-            if isinstance(r, dict) or hasattr(r, "keys"):
-                try:
-                    rd = dict(r)
-                except Exception:
-                    rd = {k: getattr(r, k) for k in getattr(r, "keys", lambda: [])()}
-                rd_lower = {k.lower(): v for k, v in rd.items()}
-                id_val = None
-                for cand in id_candidates:
-                    if cand in rd_lower and rd_lower[cand] is not None:
-                        id_val = rd_lower[cand]
-                        break
-                daten.append((
-                    id_val,
-                    rd_lower.get("name"),
-                    rd_lower.get("adresse"),
-                    rd_lower.get("kontaktperson"),
-                    rd_lower.get("email"),
-                    rd_lower.get("telefon"),
-                    rd_lower.get("portal_link"),
-                    rd_lower.get("notizen")
-                ))
-                continue
-
-            try:
-                seq = list(r)
-            except Exception:
-                seq = []
-            if col_names and len(col_names) == len(seq):
-                m = dict(zip(col_names, seq))
-                m = {k.lower(): v for k, v in m.items()}
-                id_val = None
-                for cand in id_candidates:
-                    if cand in m and m[cand] is not None:
-                        id_val = m[cand]
-                        break
-                daten.append((
-                    id_val,
-                    m.get("name"),
-                    m.get("adresse"),
-                    m.get("kontaktperson"),
-                    m.get("email"),
-                    m.get("telefon"),
-                    m.get("portal_link"),
-                    m.get("notizen")
-                ))
-            else:
-                while len(seq) < 8:
-                    seq.append(None)
-                daten.append((seq[0], seq[1], seq[2], seq[3], seq[4], seq[5], seq[6], seq[7]))
-
-        self._all_rows = daten
-        self._filter_table()
 
     def _filter_table(self):
-        """Filtert die Tabelle basierend auf dem Suchtext."""
-        rows = list(self._all_rows)
-        query = self.search_input.text().strip().lower()
+        """Filtert die Tabelle basierend auf dem Suchtext (SQL, entprellt)."""
+        self.table.set_filter_text(self.search_input.text().strip())
 
-        filtered = []
-        for row in rows:
-            if query:
-                # Suche in allen Feldern
-                haystacks = [str(val or "") for val in row[1:]]
-                if not any(query in h.lower() for h in haystacks):
-                    continue
-            filtered.append(row)
-
-        self._populate_table(filtered)
-
-    def _populate_table(self, daten):
-        self.table.setSortingEnabled(False)
-        self.table.setRowCount(len(daten))
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels([_("ID"), _("Name"), _("Adresse"), _("Kontaktperson"), _("E-Mail"), _("Telefon"), _("Portal-Link"), _("Notizen")])
-        self.table.setColumnHidden(0, True)
-        self.table.setColumnWidth(0, 60)
-        self.table.setColumnWidth(1, 180)
-        self.table.setColumnWidth(2, 200)
-        self.table.setColumnWidth(3, 150)
-        self.table.setColumnWidth(4, 180)
-        self.table.setColumnWidth(5, 120)
-        self.table.setColumnWidth(6, 200)
-        self.table.setColumnWidth(7, 200)
-
-        for ri, row in enumerate(daten):
-            for ci, val in enumerate(row):
-                txt = "" if val is None else str(val)
-                item = QTableWidgetItem(txt)
-                if ci == 0:
-                    try:
-                        item.setData(Qt.UserRole, int(val) if val is not None and str(val).strip() != "" else None)
-                        item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                    except Exception:
-                        item.setData(Qt.UserRole, None)
-                item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                self.table.setItem(ri, ci, item)
-        self.table.setSortingEnabled(True)
+    def zeige_treffer(self, treffer):
+        """Treffer der globalen Suche auswählen (Suchfeld leeren, damit die Zeile sichtbar ist)."""
+        if self.search_input.text():
+            self.search_input.clear()
+            self.table._filter_timer.stop()
+            self.table.model().set_filter("")
+        self.table.zeige_key(treffer.schluessel)
 
     def lieferant_hinzufuegen(self):
         from gui.lieferanten_dialog import LieferantenDialog
@@ -244,19 +148,11 @@ class LieferantenTab(QWidget):
 
     def lieferant_bearbeiten(self):
         from gui.lieferanten_dialog import LieferantenDialog
-        zeile = self.table.currentRow()
-        if zeile < 0:
+        rec = self.table.current_record()
+        if not rec:
             return
-        lieferant = {
-            "id": int(self.table.item(zeile, 0).text()) if self.table.item(zeile, 0) else 0,
-            "name": self.table.item(zeile, 1).text() if self.table.item(zeile, 1) else "",
-            "adresse": self.table.item(zeile, 2).text() if self.table.item(zeile, 2) else "",
-            "kontaktperson": self.table.item(zeile, 3).text() if self.table.item(zeile, 3) else "",
-            "email": self.table.item(zeile, 4).text() if self.table.item(zeile, 4) else "",
-            "telefon": self.table.item(zeile, 5).text() if self.table.item(zeile, 5) else "",
-            "portal_link": self.table.item(zeile, 6).text() if self.table.item(zeile, 6) else "",
-            "notizen": self.table.item(zeile, 7).text() if self.table.item(zeile, 7) else ""
-        }
+        lieferant = {k: ("" if v is None else str(v)) for k, v in rec.items() if k != "_key"}
+        lieferant["id"] = int(rec["id"])
         dialog = LieferantenDialog(self, lieferant=lieferant)
         if dialog.exec_() == QDialog.Accepted:
             daten = dialog.get_daten()
@@ -265,7 +161,7 @@ class LieferantenTab(QWidget):
             cursor.execute("""
                 UPDATE lieferanten
                 SET name= %s, adresse= %s, kontaktperson= %s, email= %s, telefon= %s, portal_link= %s, notizen= %s
-                WHERE lieferantnr= %s
+                WHERE id= %s
             """, (daten["name"], daten["adresse"], daten["kontaktperson"], daten["email"], daten["telefon"], daten["portal_link"], daten["notizen"], lieferant["id"]))
             conn.commit()
             conn.close()
@@ -273,26 +169,9 @@ class LieferantenTab(QWidget):
             self.lieferant_aktualisiert.emit()
 
     def lieferant_loeschen(self):
-        sel = self.table.selectionModel().selectedRows()
-        if not sel:
+        if not self.table.selectionModel().selectedRows():
             return
-        ids = []
-        for idx in sel:
-            try:
-                it = self.table.item(idx.row(), 0)
-                if it is None:
-                    continue
-                id_val = it.data(Qt.UserRole)
-                if id_val is None:
-                    txt = it.text().strip()
-                    try:
-                        id_val = int(txt) if txt != "" else None
-                    except Exception:
-                        id_val = None
-                if id_val is not None:
-                    ids.append(int(id_val))
-            except Exception:
-                pass
+        ids = [int(k) for k in self.table.selected_keys()]
         if not ids:
             QMessageBox.warning(self, _("Keine Auswahl"), _("Keine gültigen IDs in Auswahl gefunden."))
             return
@@ -323,43 +202,15 @@ class LieferantenTab(QWidget):
         self.lieferant_aktualisiert.emit()
 
     def portal_link_oeffnen(self):
-        zeile = self.table.currentRow()
-        if zeile < 0:
+        rec = self.table.current_record()
+        if not rec:
             return
-        link_item = self.table.item(zeile, 6)  # Portal-Link ist Spalte 6
-        link = link_item.text() if link_item else ""
+        link = (rec.get("portal_link") or "").strip()
         if link:
             webbrowser.open(link)
         else:
             QMessageBox.information(self, _("Kein Link"), _("Kein Link hinterlegt."))
 
     def get_row_id(self, row_index) -> int | None:
-        try:
-            item = self.table.item(row_index, 0)
-            if item:
-                data = item.data(Qt.UserRole)
-                if isinstance(data, int):
-                    return data
-                return int(item.text()) if item.text().strip() else None
-        except Exception:
-            pass
-        return None
-
-    def append_rows(self, rows):
-        try:
-            normalized = []
-            for row_data in rows:
-                row = list(row_data)
-                while len(row) < 8:
-                    row.append("")
-                normalized.append(tuple(row[:8]))
-            self._all_rows = list(normalized) + self._all_rows
-            self._filter_table()
-        except Exception as e:
-            print(f"[DBG] LieferantenTab.append_rows error: {e}", flush=True)
-
-    def load_finished(self):
-        self.table.resizeColumnsToContents()
-
-
-
+        key = self.model.row_key(row_index)
+        return int(key) if key is not None else None
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Zentraler Scheduler für Hintergrund-Ladevorgänge (QThreadPool).
+
+Statt je Loader einen eigenen QThread zu starten, reichen die Tabs ihre
+Ladejobs hier ein (submit / submit_loader):
+
+- Priorität: höhere Werte laufen zuerst. Der sichtbare Tab bekommt
+  PRIO_SICHTBAR; priorisiere() hebt einen noch wartenden Job beim
+  Tab-Wechsel an.
+- Deduplizierung: ein Job mit gleichem key und gleicher Signatur (z.B. SQL
+  und Parameter), der noch wartet oder läuft, wird nicht erneut gestartet.
+- Abbruch: ein neuer Job mit gleichem key und anderer Signatur ersetzt den
+  alten. Wartende Jobs werden aus der Queue genommen, laufende merken es an
+  job.abgebrochen() (TabLoader prüft das zwischen den Chunks).
+- Nebenläufigkeit: höchstens so viele Jobs wie der Verbindungspool
+  Verbindungen hat, minus eine für den GUI-Thread.
+- Messwerte: stats() liefert Queue-Tiefe, laufende Jobs und Warte-/Laufzeiten
+  der letzten Jobs; job_fertig meldet jeden Job einzeln.
+"""
+import itertools
+import threading
+import time
+from collections import deque
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+PRIO_HINTERGRUND = 0
+PRIO_NORMAL = 10
+PRIO_SICHTBAR = 20
+
+STATS_FENSTER = 100         # letzte Jobs für Warte-/Laufzeit-Statistik
+
+_job_ids = itertools.count(1)
+
+
+class LoadJob(QRunnable):
+    """Ein eingereichter Ladevorgang. fn(job) läuft in einem Pool-Thread."""
+
+    def __init__(self, scheduler, key: str, fn, priority: int, signatur):
+        super().__init__()
+        # Der Scheduler hält die Referenz, Qt darf das Objekt nicht löschen
+        self.setAutoDelete(False)
+        self.id = next(_job_ids)
+        self.key = key
+        self.fn = fn
+        self.priority = priority
+        self.signatur = signatur
+        self.eingereiht = time.monotonic()
+        self.gestartet = None
+        self.beendet = None
+        self.loader = None
+        self._scheduler = scheduler
+        self._abbruch = threading.Event()
+
+    def abbrechen(self) -> None:
+        self._abbruch.set()
+
+    def abgebrochen(self) -> bool:
+        return self._abbruch.is_set()
+
+    @property
+    def wartezeit_ms(self):
+        if self.gestartet is None:
+            return None
+        return (self.gestartet - self.eingereiht) * 1000.0
+
+    @property
+    def laufzeit_ms(self):
+        if self.gestartet is None or self.beendet is None:
+            return None
+        return (self.beendet - self.gestartet) * 1000.0
+
+    def run(self):
+        self.gestartet = time.monotonic()
+        self._scheduler._gestartet(self)
+        try:
+            if not self.abgebrochen():
+                self.fn(self)
+        except Exception as e:
+            print(f"[DBG] LoadJob {self.key} fehlgeschlagen: {e}", flush=True)
+        finally:
+            self.beendet = time.monotonic()
+            self._scheduler._beendet(self)
+
+
+class LoadScheduler(QObject):
+    """Siehe Modul-Docstring. Eine Instanz pro Prozess über scheduler()."""
+
+    # key, wartezeit_ms, laufzeit_ms, abgebrochen
+    job_fertig = pyqtSignal(str, float, float, bool)
+
+    def __init__(self, max_threads: int = None, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads or _standard_threads())
+        self._lock = threading.Lock()
+        self._wartend = {}          # key -> LoadJob (noch in der Queue)
+        self._laufend = {}          # job.id -> LoadJob
+        self._latenzen = deque(maxlen=STATS_FENSTER)    # (wartezeit_ms, laufzeit_ms)
+        self._zaehler = {"eingereicht": 0, "dedupliziert": 0, "abgebrochen": 0, "fertig": 0}
+
+    # ---------- Einreichen ----------
+
+    def submit(self, key: str, fn, priority: int = PRIO_NORMAL, signatur=None) -> LoadJob:
+        """
+        fn(job) im Pool ausführen. signatur beschreibt die Anfrage (hashbar);
+        gleiche key+signatur wartend oder laufend -> bestehender Job wird
+        zurückgegeben, andere signatur -> bestehende Jobs mit key werden
+        abgebrochen.
+        """
+        with self._lock:
+            for job in self._jobs_zu(key):
+                if job.signatur == signatur and not job.abgebrochen():
+                    self._zaehler["dedupliziert"] += 1
+                    if key in self._wartend and job.priority < priority:
+                        self._neu_einreihen(job, priority)
+                    return job
+            for job in self._jobs_zu(key):
+                self._abbrechen(job)
+            job = LoadJob(self, key, fn, priority, signatur)
+            self._wartend[key] = job
+            self._zaehler["eingereicht"] += 1
+        self._pool.start(job, priority)
+        return job
+
+    def submit_loader(self, loader, priority: int = PRIO_NORMAL) -> LoadJob:
+        """
+        TabLoader einreichen. Das Objekt bleibt im GUI-Thread, seine Signale
+        kommen daher per Queued Connection dort an.
+        """
+        try:
+            sql, params = loader._compile()
+            signatur = (sql, tuple(params))
+        except Exception:
+            signatur = ("loader", id(loader))
+
+        def _run(job, loader=loader):
+            loader.abgebrochen = job.abgebrochen
+            loader.run()
+
+        job = self.submit(loader.key, _run, priority, signatur)
+        # Loader am Job halten (der Aufrufer hält den Job, bis die Signale verarbeitet sind)
+        if job.loader is None:
+            job.loader = loader
+        return job
+
+    def priorisiere(self, key: str, priority: int = PRIO_SICHTBAR) -> bool:
+        """Wartenden Job zu key vorziehen. False, wenn keiner (mehr) wartet."""
+        with self._lock:
+            job = self._wartend.get(key)
+            if job is None or job.priority >= priority:
+                return False
+            return self._neu_einreihen(job, priority)
+
+    def cancel(self, key: str) -> int:
+        """Alle wartenden und laufenden Jobs zu key abbrechen. Liefert die Anzahl."""
+        with self._lock:
+            jobs = self._jobs_zu(key)
+            for job in jobs:
+                self._abbrechen(job)
+        return len(jobs)
+
+    def cancel_all(self) -> None:
+        with self._lock:
+            for job in list(self._wartend.values()) + list(self._laufend.values()):
+                self._abbrechen(job)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    # ---------- Messwerte ----------
+
+    def queue_depth(self) -> int:
+        with self._lock:
+            return len(self._wartend)
+
+    def stats(self) -> dict:
+        with self._lock:
+            latenzen = list(self._latenzen)
+            out = dict(self._zaehler)
+            out["wartend"] = len(self._wartend)
+            out["laufend"] = len(self._laufend)
+        out["max_threads"] = self._pool.maxThreadCount()
+        if latenzen:
+            warte = sorted(w for w, _l in latenzen)
+            lauf = sorted(l for _w, l in latenzen)
+            out["wartezeit_ms_p50"] = warte[len(warte) // 2]
+            out["wartezeit_ms_max"] = warte[-1]
+            out["laufzeit_ms_p50"] = lauf[len(lauf) // 2]
+            out["laufzeit_ms_max"] = lauf[-1]
+        return out
+
+    # ---------- intern (mit self._lock) ----------
+
+    def _jobs_zu(self, key: str) -> list:
+        jobs = [j for j in self._laufend.values() if j.key == key]
+        if key in self._wartend:
+            jobs.append(self._wartend[key])
+        return jobs
+
+    def _neu_einreihen(self, job, priority: int) -> bool:
+        if not self._pool.tryTake(job):
+            return False        # läuft schon
+        job.priority = priority
+        self._pool.start(job, priority)
+        return True
+
+    def _abbrechen(self, job) -> None:
+        job.abbrechen()
+        self._zaehler["abgebrochen"] += 1
+        if self._wartend.get(job.key) is job and self._pool.tryTake(job):
+            del self._wartend[job.key]
+
+    # ---------- Rückmeldungen aus den Pool-Threads ----------
+
+    def _gestartet(self, job) -> None:
+        with self._lock:
+            if self._wartend.get(job.key) is job:
+                del self._wartend[job.key]
+            self._laufend[job.id] = job
+
+    def _beendet(self, job) -> None:
+        warte, lauf = job.wartezeit_ms or 0.0, job.laufzeit_ms or 0.0
+        with self._lock:
+            self._laufend.pop(job.id, None)
+            self._latenzen.append((warte, lauf))
+            self._zaehler["fertig"] += 1
+            tiefe = len(self._wartend)
+        print(f"[DBG] load {job.key}: {warte:.0f} ms gewartet, {lauf:.0f} ms geladen"
+              f"{' (abgebrochen)' if job.abgebrochen() else ''}, Queue {tiefe}", flush=True)
+        self.job_fertig.emit(job.key, warte, lauf, job.abgebrochen())
+
+
+def _standard_threads() -> int:
+    """Poolgröße aus db_connection minus eine Verbindung für den GUI-Thread."""
+    try:
+        from db_connection import _pool_settings
+        groesse = _pool_settings()[0]
+    except Exception:
+        groesse = 2
+    return max(1, groesse - 1)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def scheduler() -> LoadScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LoadScheduler()
+    return _scheduler
@@ -9,19 +9,16 @@ from PyQt5.QtWidgets import (
     QGraphicsDropShadowEffect
 )
 from db_connection import get_db, dict_cursor_factory
+import rechnung_status
+import datum_iso
 from PyQt5.QtGui import QFont, QIcon, QPainter, QPixmap, QColor
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QThread, QTimer, QPoint, QEvent, QSize
-from PyQt5.QtWinExtras import QtWin
-
-from gui.dashboard_tab import DashboardTab
-from gui.kunden_tab import KundenTab
-from gui.rechnungen_tab import RechnungenTab
-from gui.buchhaltung_tab import BuchhaltungTab
-from gui.einstellungen_tab import EinstellungenTab
-from gui.lieferanten_tab import LieferantenTab
-from gui.lager_tab import LagerTab
-from gui.auftragskalender_tab import AuftragskalenderTab
+from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QTimer, QPoint, QEvent, QSize
+
 from gui.widgets import WindowButtons
+from gui.globale_suche import GlobaleSuche
+from gui.load_scheduler import scheduler, PRIO_SICHTBAR
+
+import importlib
 
 from version import __version__
 from i18n import _
@@ -31,6 +28,32 @@ import sys
 import os
 
 
+# Seiten in Sidebar-Reihenfolge: (Attribut, Modul, Klasse). Die Module und
+# ihre Abhängigkeiten (reportlab, pandas, ms_graph, ...) werden erst beim
+# ersten Aufruf der Seite importiert und die Seite dann gebaut.
+SEITEN = [
+    ("dashboard_tab", "gui.dashboard_tab", "DashboardTab"),
+    ("rechnungen_tab", "gui.rechnungen_tab", "RechnungenTab"),
+    ("kunden_tab", "gui.kunden_tab", "KundenTab"),
+    ("auftragskalender_tab", "gui.auftragskalender_tab", "AuftragskalenderTab"),
+    ("lager_tab", "gui.lager_tab", "LagerTab"),
+    ("buchhaltung_tab", "gui.buchhaltung_tab", "BuchhaltungTab"),
+    ("lieferanten_tab", "gui.lieferanten_tab", "LieferantenTab"),
+    ("einstellungen_tab", "gui.einstellungen_tab", "EinstellungenTab"),
+]
+
+# Signal-Verbindungen zwischen Seiten: (Quelle, Signal, Ziel, Slot). Verbunden
+# wird, sobald beide Seiten gebaut sind; eine später gebaute Seite lädt ihre
+# Daten ohnehin frisch.
+SEITEN_SIGNALE = [
+    ("kunden_tab", "kunde_aktualisiert", "rechnungen_tab", "aktualisiere_kunden_liste"),
+    ("kunden_tab", "kunde_aktualisiert", "auftragskalender_tab", "update_customer_data"),
+    ("lieferanten_tab", "lieferant_aktualisiert", "lager_tab", "aktualisiere_lieferanten_liste"),
+    ("einstellungen_tab", "kategorien_geaendert", "buchhaltung_tab", "aktualisiere_kategorien"),
+    ("rechnungen_tab", "zahlung_erfasst", "buchhaltung_tab", "lade_eintraege"),
+]
+
+
 # Farben (App-Farbschema)
 COLORS = {
     "sidebar_bg": "#1e293b",        # Dunkle Sidebar
@@ -311,6 +334,11 @@ class CustomTitleBar(QWidget):
         
         layout.addStretch()
         
+        # Globale Suche über alle Module
+        self.suche = GlobaleSuche(self)
+        layout.addWidget(self.suche)
+        layout.addSpacing(16)
+        
         # Rechte Seite: Datum + Fenster-Buttons
         right_section = QHBoxLayout()
         right_section.setSpacing(16)
@@ -375,6 +403,7 @@ class MainWindow(QMainWindow):
         # Titelleiste
         self.title_bar = CustomTitleBar(self)
         self.window_buttons = self.title_bar.window_buttons
+        self.title_bar.suche.treffer_gewaehlt.connect(self.zeige_treffer)
         content_layout.addWidget(self.title_bar)
         
         # Stacked Widget für die verschiedenen Seiten
@@ -384,26 +413,12 @@ class MainWindow(QMainWindow):
         
         main_layout.addWidget(content_container, stretch=1)
         
-        # Tabs/Seiten erstellen
-        self.dashboard_tab = DashboardTab()
-        self.rechnungen_tab = RechnungenTab()
-        self.kunden_tab = KundenTab()
-        self.auftragskalender_tab = AuftragskalenderTab()
-        self.lager_tab = LagerTab()
-        self.buchhaltung_tab = BuchhaltungTab()
-        self.lieferanten_tab = LieferantenTab()
-        self.einstellungen_tab = EinstellungenTab(self)
-        
-        # Seiten zum StackedWidget hinzufügen (Reihenfolge wie in Sidebar)
-        self.pages.addWidget(self.dashboard_tab)      # 0
-        self.pages.addWidget(self.rechnungen_tab)     # 1
-        self.pages.addWidget(self.kunden_tab)         # 2
-        self.pages.addWidget(self.auftragskalender_tab)  # 3
-        self.pages.addWidget(self.lager_tab)          # 4
-        self.pages.addWidget(self.buchhaltung_tab)    # 5
-        self.pages.addWidget(self.lieferanten_tab)    # 6
-        self.pages.addWidget(self.einstellungen_tab)  # 7
-        
+        # Seiten: Platzhalter, gebaut wird erst beim ersten Aufruf (seite())
+        self._verbundene_signale = set()
+        for attr, _modul, _klasse in SEITEN:
+            setattr(self, attr, None)
+            self.pages.addWidget(QWidget())
+
         # Titel-Mapping
         self.page_titles = [
             _("Dashboard"),
@@ -415,11 +430,9 @@ class MainWindow(QMainWindow):
             _("Lieferanten"),
             _("Einstellungen"),
         ]
-        
-        # Signal-Verbindungen
-        self.kunden_tab.kunde_aktualisiert.connect(self.rechnungen_tab.aktualisiere_kunden_liste)
-        self.kunden_tab.kunde_aktualisiert.connect(self.auftragskalender_tab.update_customer_data)
-        self._connect_signals()
+
+        # Startseite sofort bauen
+        self.seite(0)
         
         # Statusleiste verstecken (Benutzer-Info ist jetzt in Sidebar)
         self.statusBar().hide()
@@ -435,31 +448,77 @@ class MainWindow(QMainWindow):
         
         QTimer.singleShot(0, self.finish_init)
     
+    # Seitenindex -> Key des TabLoaders (gui.load_scheduler)
+    LOADER_KEYS = {1: "rechnungen"}
+    # Kategorie der globalen Suche -> Seitenindex
+    SUCH_SEITEN = {"rechnungen": 1, "kunden": 2, "auftraege": 3, "reifenlager": 4, "lieferanten": 6}
+
     def switch_to_page(self, index: int):
-        """Wechselt zur angegebenen Seite."""
+        """Wechselt zur angegebenen Seite (baut sie beim ersten Aufruf)."""
         if 0 <= index < self.pages.count():
+            self.seite(index)
             self.pages.setCurrentIndex(index)
             if index < len(self.page_titles):
                 self.title_bar.set_title(self.page_titles[index])
+            # Noch wartenden Loader der sichtbaren Seite vorziehen
+            key = self.LOADER_KEYS.get(index)
+            if key:
+                scheduler().priorisiere(key, PRIO_SICHTBAR)
+
+    def zeige_treffer(self, treffer):
+        """Treffer der globalen Suche: Seite öffnen, die Seite wählt den Datensatz (zeige_treffer)."""
+        index = self.SUCH_SEITEN.get(treffer.kategorie)
+        if index is None:
+            return
+        # Lieferanten haben keinen eigenen Sidebar-Eintrag
+        self.sidebar.set_active_index(index if index < 6 else -1)
+        self.switch_to_page(index)
+        widget = self.seite(index)
+        if hasattr(widget, "zeige_treffer"):
+            widget.zeige_treffer(treffer)
+
+    def seite(self, index: int):
+        """Widget der Seite index; importiert und baut sie beim ersten Aufruf."""
+        attr, modul, klasse = SEITEN[index]
+        widget = getattr(self, attr)
+        if widget is not None:
+            return widget
+
+        cls = getattr(importlib.import_module(modul), klasse)
+        widget = cls(self) if attr == "einstellungen_tab" else cls()
+        platzhalter = self.pages.widget(index)
+        aktuell = self.pages.currentIndex()
+        self.pages.insertWidget(index, widget)
+        self.pages.removeWidget(platzhalter)
+        platzhalter.deleteLater()
+        self.pages.setCurrentIndex(aktuell)
+        setattr(self, attr, widget)
+        print(f"[DBG] Seite {klasse} gebaut", flush=True)
+
+        self._connect_signals()
+        # Vor finish_init gebaute Seiten bekommen ihren Loader dort
+        if getattr(self, "_deferred_started", False):
+            self._starte_tab_loader(attr)
+        return widget
+
+    def _starte_loader(self, loader, priority: int = PRIO_SICHTBAR):
+        """TabLoader über den zentralen Scheduler starten."""
+        job = scheduler().submit_loader(loader, priority)
+        if not hasattr(self, "_tab_loader_jobs"):
+            self._tab_loader_jobs = []
+        # Loader/Job leben im GUI-Thread weiter, bis ihre Signale verarbeitet sind
+        self._tab_loader_jobs.append(job)
+        return job
     
     def _connect_signals(self):
-        """Zentrale Methode für Signal-Slot-Verbindungen."""
-        print(_("Richte zusätzliche Signal-Verbindungen ein..."))
-        
-        # Lieferanten → Lager
-        self.lieferanten_tab.lieferant_aktualisiert.connect(
-            self.lager_tab.aktualisiere_lieferanten_liste
-        )
-        
-        # Einstellungen → Buchhaltung (Kategorien)
-        self.einstellungen_tab.kategorien_geaendert.connect(
-            self.buchhaltung_tab.aktualisiere_kategorien
-        )
-        
-        # Rechnungen → Buchhaltung (Zahlung erfasst)
-        self.rechnungen_tab.zahlung_erfasst.connect(
-            self.buchhaltung_tab.lade_eintraege
-        )
+        """Verbindet SEITEN_SIGNALE, deren Quelle und Ziel schon gebaut sind."""
+        for eintrag in SEITEN_SIGNALE:
+            quelle_attr, signal, ziel_attr, slot = eintrag
+            quelle, ziel = getattr(self, quelle_attr), getattr(self, ziel_attr)
+            if eintrag in self._verbundene_signale or quelle is None or ziel is None:
+                continue
+            getattr(quelle, signal).connect(getattr(ziel, slot))
+            self._verbundene_signale.add(eintrag)
     
     def nativeEvent(self, eventType, message):
         """Native Windows-Events für Fenster-Verschiebung und -Größenänderung."""
@@ -510,10 +569,9 @@ class MainWindow(QMainWindow):
                 
                 # Im Content-Bereich: Titelleiste
                 if x >= sidebar_width and y < self.title_bar_height:
-                    # Prüfen ob über Fenster-Buttons
-                    if hasattr(self, 'window_buttons'):
-                        buttons_pos = self.window_buttons.mapFromGlobal(global_pos)
-                        if self.window_buttons.rect().contains(buttons_pos):
+                    # Prüfen ob über Fenster-Buttons oder Suchfeld
+                    for widget in (getattr(self, 'window_buttons', None), self.title_bar.suche):
+                        if widget is not None and widget.rect().contains(widget.mapFromGlobal(global_pos)):
                             return retval, result  # Qt übernimmt
                     return True, 2  # HTCAPTION
         
@@ -530,52 +588,28 @@ class MainWindow(QMainWindow):
             return
         self._deferred_started = True
 
-        try:
-            from gui.tab_loader import TabLoader
-        except Exception as e:
-            print(f"[DBG] cannot import TabLoader: {e}", flush=True)
-            return
-
-        try:
-            loader = TabLoader(key="buchhaltung", table="buchhaltung", chunk_size=200)
-            t = QThread()
-            loader.moveToThread(t)
-
-            # route chunks to the real tab (must have append_rows / load_from_cache)
-            if hasattr(self, "buchhaltung_tab") and self.buchhaltung_tab is not None:
-                loader.chunk_ready.connect(lambda k, chunk, w=self.buchhaltung_tab: w.append_rows(chunk))
-                # notify tab when loader finished so it can show "Keine Einträge" if empty
-                try:
-                    loader.finished.connect(lambda k, w=self.buchhaltung_tab: w.load_finished())
-                except Exception:
-                    pass
-
-            # optional: total rows -> update progress (implement _on_loader_total if present)
-            if hasattr(self, "_on_loader_total"):
-                loader.total_rows.connect(self._on_loader_total)
+        # Loader für die bereits gebauten Seiten; weitere startet seite()
+        for attr, _modul, _klasse in SEITEN:
+            if getattr(self, attr) is not None:
+                self._starte_tab_loader(attr)
 
-            # debug prints / error routing
-            loader.finished.connect(lambda k: print(f"[DBG] buchhaltung loader finished: {k}", flush=True))
-            loader.error.connect(lambda k, msg: print(f"[DBG] loader error {k}: {msg}", flush=True))
+    def _starte_tab_loader(self, attr: str):
+        """Hintergrund-Loader einer frisch gebauten Seite starten (falls sie einen hat)."""
+        # Kunden, Buchhaltung und Lieferanten laden ihre erste Seite selbst (DataList/DataGrid)
+        if attr == "rechnungen_tab":
+            self._starte_rechnungen_loader()
 
-            t.started.connect(loader.run)
-            t.start()
-
-            # keep reference to prevent GC
-            if not hasattr(self, "_tab_loader_threads"):
-                self._tab_loader_threads = []
-            self._tab_loader_threads.append((t, loader))
-
-            print("[DBG] started buchhaltung TabLoader", flush=True)
-        except Exception as e:
-            print(f"[DBG] start buchhaltung loader failed: {e}", flush=True)
+    def _starte_rechnungen_loader(self):
+        from gui.tab_loader import TabLoader
+        from gui.rechnungen_tab import RechnungenTab
 
-        # start rechnungen loader (asynchronous like Buchhaltung) — STARTS ALWAYS
         try:
             # --- KORREKTUR: Dynamische Query für korrekte Sortierung ---
             with get_db() as conn:
                 is_sqlite = getattr(conn, "is_sqlite", False)
-            
+            # gespeicherten Status vor dem Laden auf heute bringen
+            rechnung_status.rollover_taeglich()
+
             if is_sqlite:
                 # SQLite: CAST zu INTEGER für numerische Sortierung
                 order_clause = "ORDER BY CAST(rechnung_nr AS INTEGER) DESC, id DESC"
@@ -583,21 +617,18 @@ class MainWindow(QMainWindow):
                 # PostgreSQL: CAST zu BIGINT für numerische Sortierung
                 order_clause = "ORDER BY CAST(NULLIF(regexp_replace(rechnung_nr, '\\D', '', 'g'), '') AS BIGINT) DESC NULLS LAST, id DESC"
 
-            rechnungen_query = f"""
-                SELECT id, rechnung_nr, kunde, firma, adresse, datum, mwst, zahlungskonditionen, positionen, uid, abschluss, COALESCE(abschluss_text,'') 
-                FROM rechnungen 
-                {order_clause}
-            """
-
+            # Nur das laufende Jahr: Bereich auf dem ISO-Datum (Index idx_rechnungen_datum),
+            # Spalten in der Reihenfolge, die RechnungenTab.append_rows erwartet
+            import datetime
+            von, bis = datum_iso.jahr_bereich(datetime.date.today().year)
             loader_r = TabLoader(
                 key="rechnungen",
                 table="rechnungen",
-                query=rechnungen_query,
+                columns=RechnungenTab.LOADER_COLUMNS,
+                filters=[("datum", ">=", von), ("datum", "<", bis)],
+                order_by=order_clause.replace("ORDER BY ", "", 1),
                 chunk_size=200
             )
-            t_r = QThread()
-            loader_r.moveToThread(t_r)
-
             if hasattr(self, "rechnungen_tab") and self.rechnungen_tab is not None:
                 loader_r.chunk_ready.connect(lambda k, chunk, w=self.rechnungen_tab: w.append_rows(chunk))
                 try:
@@ -610,82 +641,12 @@ class MainWindow(QMainWindow):
             loader_r.finished.connect(lambda k: print(f"[DBG] rechnungen loader finished: {k}", flush=True))
             loader_r.error.connect(lambda k, msg: print(f"[DBG] rechnungen loader error {k}: {msg}", flush=True))
 
-            t_r.started.connect(loader_r.run)
-            t_r.start()
-
-            if not hasattr(self, "_tab_loader_threads"):
-                self._tab_loader_threads = []
-            self._tab_loader_threads.append((t_r, loader_r))
+            self._starte_loader(loader_r)
 
             print("[DBG] started rechnungen TabLoader", flush=True)
         except Exception as e:
             print(f"[DBG] start rechnungen loader failed: {e}", flush=True)
 
-        # start kunden loader (asynchronous)
-        try:
-            loader_k = TabLoader(
-                key="kunden",
-                table="kunden",
-                # --- KORREKTUR: Alphabetische Sortierung nach Namen hinzufügen ---
-                query="SELECT * FROM kunden ORDER BY name ASC",
-                chunk_size=200
-            )
-            t_k = QThread()
-            loader_k.moveToThread(t_k)
-
-            if hasattr(self, "kunden_tab") and self.kunden_tab is not None:
-                loader_k.chunk_ready.connect(lambda k, chunk, w=self.kunden_tab: w.append_rows(chunk))
-                try:
-                    loader_k.finished.connect(lambda k, w=self.kunden_tab: w.load_finished())
-                except Exception:
-                    pass
-
-            loader_k.total_rows.connect(lambda k, total: print(f"[DBG] kunden total={total}", flush=True))
-            loader_k.finished.connect(lambda k: print(f"[DBG] kunden loader finished: {k}", flush=True))
-            loader_k.error.connect(lambda k, msg: print(f"[DBG] kunden loader error {k}: {msg}", flush=True))
-
-            t_k.started.connect(loader_k.run)
-            t_k.start()
-
-            if not hasattr(self, "_tab_loader_threads"):
-                self._tab_loader_threads = []
-            self._tab_loader_threads.append((t_k, loader_k))
-            print("[DBG] started kunden TabLoader", flush=True)
-        except Exception as e:
-            print(f"[DBG] start kunden loader failed: {e}", flush=True)
-
-        # start lieferanten loader
-        try:
-            loader_l = TabLoader(
-                key="lieferanten",
-                table="lieferanten",
-                query="SELECT id, lieferantnr, name, portal_link, login, passwort FROM lieferanten ORDER BY name",
-                chunk_size=100
-            )
-            t_l = QThread()
-            loader_l.moveToThread(t_l)
-
-            if hasattr(self, "lieferanten_tab") and self.lieferanten_tab is not None:
-                loader_l.chunk_ready.connect(lambda k, chunk, w=self.lieferanten_tab: w.append_rows(chunk))
-                try:
-                    loader_l.finished.connect(lambda k, w=self.lieferanten_tab: w.load_finished())
-                except Exception:
-                    pass
-
-            loader_l.total_rows.connect(lambda k, total: print(f"[DBG] lieferanten total={total}", flush=True))
-            loader_l.finished.connect(lambda k: print(f"[DBG] lieferanten loader finished: {k}", flush=True))
-            loader_l.error.connect(lambda k, msg: print(f"[DBG] lieferanten loader error {k}: {msg}", flush=True))
-
-            t_l.started.connect(loader_l.run)
-            t_l.start()
-
-            if not hasattr(self, "_tab_loader_threads"):
-                self._tab_loader_threads = []
-            self._tab_loader_threads.append((t_l, loader_l))
-            print("[DBG] started lieferanten TabLoader", flush=True)
-        except Exception as e:
-            print(f"[DBG] start lieferanten loader failed: {e}", flush=True)
-
     def center_window(self):
         """Zentriert das Fenster auf dem Bildschirm."""
         qr = self.frameGeometry()
@@ -1,10 +1,10 @@
 ﻿# -*- coding: utf-8 -*-
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-    QTableWidgetItem, QDialog, QMessageBox, QToolButton
+    QWidget, QVBoxLayout, QHBoxLayout, QDialog, QMessageBox, QToolButton
 )
 from db_connection import get_db, dict_cursor_factory
 from gui.materiallager_dialog import MateriallagerDialog
+from gui.data_grid import DataGrid, GridColumn, SqlTableModel
 from i18n import _
 
 
@@ -22,11 +22,25 @@ class MateriallagerTab(QWidget):
 
     def setup_ui(self):
         main_layout = QHBoxLayout(self)
-        self.table = QTableWidget()
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        # klassisches Verhalten: Shift/Ctrl für Mehrfachauswahl
-        self.table.setSelectionMode(QTableWidget.ExtendedSelection)
-        self.table.verticalHeader().setVisible(False)
+        self.model = SqlTableModel(
+            "materiallager m LEFT JOIN lieferanten l ON m.lieferantnr = l.id",
+            [
+                GridColumn("material_id", _("ID"), expr="m.material_id", hidden=True, nullable=False),
+                GridColumn("materialnummer", _("Materialnr."), expr="m.materialnummer", width=140),
+                GridColumn("bezeichnung", _("Bezeichnung"), expr="m.bezeichnung", width=260),
+                GridColumn("menge", _("Menge"), expr="m.menge", width=90, numeric=True),
+                GridColumn("einheit", _("Einheit"), expr="m.einheit", width=80),
+                GridColumn("lagerort", _("Lagerort"), expr="m.lagerort", width=120),
+                GridColumn("lieferant_name", _("Lieferant"), expr="l.name", width=120),
+                GridColumn("preis", _("Preis"), expr="m.preis", width=100, numeric=True),
+                GridColumn("waehrung", _("Währung"), expr="COALESCE(m.waehrung, 'EUR')", width=80),
+                GridColumn("bemerkung", _("Bemerkung"), expr="m.bemerkung", width=180),
+            ],
+            key="m.material_id", order_by="bezeichnung",
+            suchindex="materiallager",
+        )
+        # klassisches Verhalten: Shift/Ctrl für Mehrfachauswahl (DataGrid-Default)
+        self.table = DataGrid(self.model)
 
  
         btn_layout = QVBoxLayout()
@@ -48,66 +62,7 @@ class MateriallagerTab(QWidget):
         btn_loeschen.clicked.connect(self.material_loeschen)
 
     def lade_material(self):
-        try:
-            with get_db() as con:
-                with con.cursor(cursor_factory=dict_cursor_factory(con)) as cur:
-                    cur.execute("""
-                        SELECT m.material_id, m.materialnummer, m.bezeichnung, COALESCE(m.menge,0) AS menge,
-                               COALESCE(m.einheit,'') AS einheit, COALESCE(m.lagerort,'') AS lagerort,
-                               COALESCE(l.name, '') AS lieferant_name, COALESCE(m.preis,0) AS preis,
-                               COALESCE(m.waehrung,'EUR') AS waehrung, COALESCE(m.bemerkung,'') AS bemerkung
-                        FROM public.materiallager m
-                        LEFT JOIN public.lieferanten l ON m.lieferantnr = l.id
-                        ORDER BY m.bezeichnung
-                    """)
-                    rows = cur.fetchall()
-        except Exception:
-            conn = get_db()
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT m.material_id, m.materialnummer, m.bezeichnung, COALESCE(m.menge,0) AS menge,
-                       COALESCE(m.einheit,'') AS einheit, COALESCE(m.lagerort,'') AS lagerort,
-                       COALESCE(l.name, '') AS lieferant_name, COALESCE(m.preis,0) AS preis,
-                       COALESCE(m.waehrung,'EUR') AS waehrung, COALESCE(m.bemerkung,'') AS bemerkung
-                FROM materiallager m
-                LEFT JOIN lieferanten l ON m.lieferantnr = l.id
-                ORDER BY m.bezeichnung
-            """)
-            rows = cur.fetchall()
-            conn.close()
-
-        print("Rows:", rows)
-        # Normalisiere Reihen (dict oder sequence)
-        daten = []
-        cols = ["material_id", "materialnummer", "bezeichnung", "menge", "einheit", "lagerort", "lieferant_name", "preis", "waehrung", "bemerkung"]
-        for r in rows:
-            if isinstance(r, dict):
-                daten.append(tuple(r.get(c) for c in cols))
-            else:
-                try:
-                    daten.append(tuple(r))
-                except Exception:
-                    # fallback: konvertiere iterierbar zu tuple
-                    daten.append(tuple(list(r)))
-
-        self.table.setRowCount(len(daten))
-        self.table.setColumnCount(10)
-        self.table.setHorizontalHeaderLabels([_("ID"), _("Materialnr."), _("Bezeichnung"), _("Menge"), _("Einheit"), _("Lagerort"), _("Lieferant"), _("Preis"), _("Währung"), _("Bemerkung")])
-        self.table.setColumnHidden(0, True)  # ID-Spalte verstecken
-        self.table.setColumnWidth(1, 140)
-        self.table.setColumnWidth(2, 260)
-        self.table.setColumnWidth(3, 90)
-        self.table.setColumnWidth(4, 80)
-        self.table.setColumnWidth(5, 120)
-        self.table.setColumnWidth(6, 120)  # angepasst für "Lieferant"
-        self.table.setColumnWidth(7, 100)  # Preis
-        self.table.setColumnWidth(8, 80)   # Währung
-        self.table.setColumnWidth(9, 180)  # Bemerkung
-
-        for r_idx, row in enumerate(daten):
-            for c_idx, val in enumerate(row):
-                txt = "" if val is None else str(val)
-                self.table.setItem(r_idx, c_idx, QTableWidgetItem(txt))
+        self.table.reload()
 
     def material_hinzufuegen(self):
         dlg = MateriallagerDialog(self, material=None)
@@ -133,10 +88,9 @@ class MateriallagerTab(QWidget):
             self.lade_material()
 
     def material_bearbeiten(self):
-        z = self.table.currentRow()
-        if z < 0:
+        material_id = self.table.current_key()
+        if material_id is None:
             return
-        material_id = int(self.table.item(z, 0).text())
         # Lade die vollständigen Daten aus DB (inkl. lieferantnr), nicht aus der Tabelle
         try:
             with get_db() as con:
@@ -203,15 +157,7 @@ class MateriallagerTab(QWidget):
             self.lade_material()
 
     def material_loeschen(self):
-        sel = self.table.selectionModel().selectedRows()
-        if not sel:
-            return
-        ids = []
-        for idx in sel:
-            try:
-                ids.append(int(self.table.item(idx.row(), 0).text()))
-            except Exception:
-                pass
+        ids = [int(k) for k in self.table.selected_keys()]
         if not ids:
             return
         material_id = None
@@ -122,7 +122,7 @@ BORDER_RADIUS = {
 def get_table_stylesheet():
     """Einheitliches Tabellen-Stylesheet."""
     return f"""
-        QTableWidget {{
+        QTableView {{
             background-color: {COLORS['surface']};
             border: none;
             border-radius: {BORDER_RADIUS['lg']}px;
@@ -130,19 +130,19 @@ def get_table_stylesheet():
             font-size: {FONT_SIZES['table_cell']}px;
             outline: none;
         }}
-        QTableWidget::item {{
+        QTableView::item {{
             padding: 14px 12px;
             border-bottom: 1px solid {COLORS['border_light']};
             color: {COLORS['text_primary']};
         }}
-        QTableWidget::item:hover {{
+        QTableView::item:hover {{
             background-color: {COLORS['hover']};
         }}
-        QTableWidget::item:selected {{
+        QTableView::item:selected {{
             background-color: {COLORS['selection']};
             color: {COLORS['selection_text']};
         }}
-        QTableWidget::item:focus {{
+        QTableView::item:focus {{
             outline: none;
         }}
         QHeaderView::section {{
@@ -614,13 +614,31 @@ class StatusBadge(QLabel):
 # ============================================================================
 # AVATAR / INITIALEN
 # ============================================================================
+AVATAR_FARBEN = [
+    "#4a6fa5", "#10b981", "#f59e0b", "#ef4444",
+    "#8b5cf6", "#ec4899", "#06b6d4", "#84cc16"
+]
+
+
+def avatar_initialen(name: str) -> str:
+    """Initialen für Avatare: erstes und letztes Wort, sonst die ersten zwei Zeichen."""
+    parts = (name or "").strip().split()
+    if len(parts) >= 2:
+        return (parts[0][0] + parts[-1][0]).upper()
+    if parts:
+        return parts[0][:2].upper()
+    return "?"
+
+
+def avatar_farbe(name: str) -> str:
+    """Stabile Avatar-Farbe aus dem Namen."""
+    return AVATAR_FARBEN[sum(ord(c) for c in (name or "")) % len(AVATAR_FARBEN)]
+
+
 class AvatarLabel(QLabel):
     """Runder Avatar mit Initialen."""
     
-    COLORS = [
-        "#4a6fa5", "#10b981", "#f59e0b", "#ef4444", 
-        "#8b5cf6", "#ec4899", "#06b6d4", "#84cc16"
-    ]
+    COLORS = AVATAR_FARBEN
     
     def __init__(self, name: str, size: int = 40, parent=None):
         super().__init__(parent)
@@ -629,18 +647,8 @@ class AvatarLabel(QLabel):
         self.set_name(name)
     
     def set_name(self, name: str):
-        # Initialen extrahieren
-        parts = name.strip().split()
-        if len(parts) >= 2:
-            initials = (parts[0][0] + parts[-1][0]).upper()
-        elif parts:
-            initials = parts[0][:2].upper()
-        else:
-            initials = "?"
-        
-        # Farbe basierend auf Namen
-        color_index = sum(ord(c) for c in name) % len(self.COLORS)
-        color = self.COLORS[color_index]
+        initials = avatar_initialen(name)
+        color = avatar_farbe(name)
         
         self.setText(initials)
         size = self.width()
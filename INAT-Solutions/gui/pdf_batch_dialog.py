@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+PDF-Stapel-Export - mehrere Rechnungen auf einmal als PDF (Ordner oder ZIP)
+"""
+import os
+import threading
+
+from PyQt5.QtWidgets import (
+    QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QRadioButton, QButtonGroup,
+    QDateEdit, QComboBox, QLineEdit, QFileDialog, QMessageBox, QProgressBar, QGroupBox
+)
+from PyQt5.QtCore import Qt, QDate, QThread, pyqtSignal
+from gui.base_dialog import BaseDialog
+from gui.dialog_styles import GROUPBOX_STYLE
+from gui.popup_calendar import PopupCalendarWidget
+import rechnung_batch
+import rechnung_status
+import datum_iso
+from i18n import _
+
+
+class PdfBatchWorker(QThread):
+    """Lädt die Rechnungen und rendert sie über rechnung_batch (Prozesspool)."""
+    progress = pyqtSignal(int, int, str)
+    finished = pyqtSignal(dict)
+
+    def __init__(self, filter_args, ziel):
+        super().__init__()
+        self.filter_args = filter_args
+        self.ziel = ziel
+        self._abbruch = threading.Event()
+
+    def abbrechen(self):
+        self._abbruch.set()
+
+    def run(self):
+        try:
+            rechnungen = rechnung_batch.lade_rechnungen(**self.filter_args)
+            if not rechnungen:
+                self.finished.emit({"ziel": self.ziel, "ok": 0, "fehler": [], "abgebrochen": False,
+                                    "dauer_s": 0.0, "leer": True})
+                return
+            self.progress.emit(0, len(rechnungen), "")
+            ergebnis = rechnung_batch.exportiere(
+                rechnungen, self.ziel,
+                fortschritt=lambda fertig, gesamt, name: self.progress.emit(fertig, gesamt, name),
+                abgebrochen=self._abbruch.is_set,
+            )
+            self.finished.emit(ergebnis)
+        except Exception as e:
+            self.finished.emit({"ziel": self.ziel, "ok": 0, "fehler": [("", str(e))],
+                                "abgebrochen": False, "dauer_s": 0.0})
+
+
+class PdfBatchDialog(BaseDialog):
+    """Auswahl (Markierung, Zeitraum, Status) und Ziel für den PDF-Stapel-Export."""
+
+    def __init__(self, ausgewaehlte_ids=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(_("PDF-Export (mehrere Rechnungen)"))
+        self.resize(560, 420)
+        self.ausgewaehlte_ids = list(ausgewaehlte_ids or [])
+        self.worker = None
+
+        layout = self.content_layout
+        layout.setSpacing(15)
+
+        # === Welche Rechnungen ===
+        auswahl_group = QGroupBox(_("Rechnungen"))
+        auswahl_group.setStyleSheet(GROUPBOX_STYLE)
+        auswahl_layout = QGridLayout(auswahl_group)
+
+        self.rb_auswahl = QRadioButton(_("Markierte Rechnungen ({})").format(len(self.ausgewaehlte_ids)))
+        self.rb_filter = QRadioButton(_("Zeitraum / Status"))
+        self._modus = QButtonGroup(self)
+        self._modus.addButton(self.rb_auswahl)
+        self._modus.addButton(self.rb_filter)
+        self.rb_auswahl.setEnabled(bool(self.ausgewaehlte_ids))
+        (self.rb_auswahl if self.ausgewaehlte_ids else self.rb_filter).setChecked(True)
+        auswahl_layout.addWidget(self.rb_auswahl, 0, 0, 1, 4)
+        auswahl_layout.addWidget(self.rb_filter, 1, 0, 1, 4)
+
+        heute = QDate.currentDate()
+        self.de_von = self._datum_feld(QDate(heute.year(), 1, 1))
+        self.de_bis = self._datum_feld(heute)
+        auswahl_layout.addWidget(QLabel(_("Von:")), 2, 0)
+        auswahl_layout.addWidget(self.de_von, 2, 1)
+        auswahl_layout.addWidget(QLabel(_("Bis:")), 2, 2)
+        auswahl_layout.addWidget(self.de_bis, 2, 3)
+
+        self.cb_status = QComboBox()
+        self.cb_status.addItem(_("Alle"), None)
+        for status in rechnung_status.STATUS_WERTE:
+            self.cb_status.addItem(_(status), status)
+        auswahl_layout.addWidget(QLabel(_("Status:")), 3, 0)
+        auswahl_layout.addWidget(self.cb_status, 3, 1)
+
+        self.rb_auswahl.toggled.connect(self._modus_geaendert)
+        self._modus_geaendert()
+        layout.addWidget(auswahl_group)
+
+        # === Ziel ===
+        ziel_group = QGroupBox(_("Ziel"))
+        ziel_group.setStyleSheet(GROUPBOX_STYLE)
+        ziel_layout = QVBoxLayout(ziel_group)
+        art_row = QHBoxLayout()
+        self.rb_ordner = QRadioButton(_("Ordner"))
+        self.rb_zip = QRadioButton(_("ZIP-Datei"))
+        self._ziel_art = QButtonGroup(self)
+        self._ziel_art.addButton(self.rb_ordner)
+        self._ziel_art.addButton(self.rb_zip)
+        self.rb_ordner.setChecked(True)
+        art_row.addWidget(self.rb_ordner)
+        art_row.addWidget(self.rb_zip)
+        art_row.addStretch()
+        ziel_layout.addLayout(art_row)
+
+        pfad_row = QHBoxLayout()
+        self.le_ziel = QLineEdit()
+        pfad_row.addWidget(self.le_ziel, 1)
+        self.btn_durchsuchen = QPushButton(_("Ändern..."))
+        self.btn_durchsuchen.clicked.connect(self._ziel_waehlen)
+        pfad_row.addWidget(self.btn_durchsuchen)
+        ziel_layout.addLayout(pfad_row)
+        layout.addWidget(ziel_group)
+
+        # === Fortschrittsanzeige ===
+        self.progress_label = QLabel()
+        self.progress_label.setVisible(False)
+        layout.addWidget(self.progress_label)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        btn_row = QHBoxLayout()
+        btn_row.addStretch()
+        self.btn_start = QPushButton(_("Exportieren"))
+        self.btn_start.clicked.connect(self._starten)
+        btn_row.addWidget(self.btn_start)
+        self.btn_abbrechen = QPushButton(_("Schließen"))
+        self.btn_abbrechen.clicked.connect(self.reject)
+        btn_row.addWidget(self.btn_abbrechen)
+        layout.addLayout(btn_row)
+
+    def _datum_feld(self, datum):
+        feld = QDateEdit(calendarPopup=True)
+        feld.setDisplayFormat("yyyy-MM-dd")
+        feld.setDate(datum)
+        try:
+            cal = PopupCalendarWidget(self)
+            cal.setVerticalHeaderFormat(cal.NoVerticalHeader)
+            cal.setGridVisible(True)
+            feld.setCalendarWidget(cal)
+        except Exception:
+            pass
+        return feld
+
+    def _modus_geaendert(self):
+        filter_aktiv = not self.rb_auswahl.isChecked()
+        for w in (self.de_von, self.de_bis, self.cb_status):
+            w.setEnabled(filter_aktiv)
+
+    def _ziel_waehlen(self):
+        if self.rb_zip.isChecked():
+            pfad, _filter = QFileDialog.getSaveFileName(self, _("ZIP speichern"), "Rechnungen.zip",
+                                                        "ZIP-Dateien (*.zip)")
+            if pfad and not pfad.lower().endswith(".zip"):
+                pfad += ".zip"
+        else:
+            pfad = QFileDialog.getExistingDirectory(self, _("Zielordner wählen"), self.le_ziel.text())
+        if pfad:
+            self.le_ziel.setText(pfad)
+
+    def filter_args(self) -> dict:
+        if self.rb_auswahl.isChecked():
+            return {"ids": self.ausgewaehlte_ids}
+        von, bis = datum_iso.tag_bereich(self.de_von.date().toString("yyyy-MM-dd"),
+                                         self.de_bis.date().toString("yyyy-MM-dd"))
+        return {"von": von, "bis": bis, "status": self.cb_status.currentData()}
+
+    def _starten(self):
+        ziel = self.le_ziel.text().strip()
+        if not ziel:
+            QMessageBox.warning(self, _("Kein Ziel"), _("Bitte zuerst einen Ordner oder eine ZIP-Datei wählen."))
+            return
+        if self.rb_zip.isChecked() and not ziel.lower().endswith(".zip"):
+            ziel += ".zip"
+        elif self.rb_ordner.isChecked() and ziel.lower().endswith(".zip"):
+            ziel = os.path.splitext(ziel)[0]
+
+        self.btn_start.setEnabled(False)
+        self.btn_abbrechen.setText(_("Abbrechen"))
+        self.progress_label.setText(_("Rechnungen werden geladen..."))
+        self.progress_label.setVisible(True)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setVisible(True)
+
+        self.worker = PdfBatchWorker(self.filter_args(), ziel)
+        self.worker.progress.connect(self._on_progress)
+        self.worker.finished.connect(self._on_finished)
+        self.worker.start()
+
+    def _on_progress(self, fertig, gesamt, name):
+        self.progress_bar.setRange(0, gesamt)
+        self.progress_bar.setValue(fertig)
+        if name:
+            self.progress_label.setText(_("{} von {}: {}").format(fertig, gesamt, name))
+        else:
+            self.progress_label.setText(_("{} Rechnungen werden exportiert...").format(gesamt))
+
+    def _on_finished(self, ergebnis):
+        self.worker = None
+        self.btn_start.setEnabled(True)
+        self.btn_abbrechen.setText(_("Schließen"))
+        self.progress_bar.setVisible(False)
+        self.progress_label.setVisible(False)
+
+        if ergebnis.get("leer"):
+            QMessageBox.information(self, _("PDF-Export"), _("Keine Rechnungen für diese Auswahl gefunden."))
+            return
+        if ergebnis["abgebrochen"]:
+            QMessageBox.information(self, _("PDF-Export"),
+                                    _("Export abgebrochen ({} PDFs erstellt).").format(ergebnis["ok"]))
+            return
+        if ergebnis["fehler"]:
+            details = "\n".join(f"{nr}: {text}" for nr, text in ergebnis["fehler"][:10])
+            QMessageBox.warning(self, _("PDF-Export"),
+                                _("{} PDFs erstellt, {} fehlgeschlagen:\n{}").format(
+                                    ergebnis["ok"], len(ergebnis["fehler"]), details))
+            return
+        QMessageBox.information(self, _("PDF-Export"),
+                                _("{} PDFs in {:.1f} s gespeichert unter:\n{}").format(
+                                    ergebnis["ok"], ergebnis["dauer_s"], ergebnis["ziel"]))
+        self.accept()
+
+    def reject(self):
+        # laufenden Export abbrechen statt den Dialog zu schließen
+        if self.worker is not None:
+            self.worker.abbrechen()
+            self.progress_label.setText(_("Wird abgebrochen..."))
+            return
+        super().reject()
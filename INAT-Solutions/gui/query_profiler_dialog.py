@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Entwickler-Dialog: Auswertung des Query-Profilers (query_profiler).
+"""
+import os
+from PyQt5.QtWidgets import (
+    QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTabWidget, QTableWidget,
+    QTableWidgetItem, QAbstractItemView, QHeaderView, QMessageBox, QWidget
+)
+from PyQt5.QtCore import Qt
+
+from .base_dialog import BaseDialog
+from .dialog_styles import INFO_LABEL_STYLE
+import query_profiler
+from db_connection import pool_stats, sql_cache_stats
+from i18n import _
+
+
+def _num_item(value):
+    item = QTableWidgetItem()
+    # numerisch sortierbar
+    item.setData(Qt.DisplayRole, value)
+    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+    return item
+
+
+def _make_table(headers):
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.setSelectionBehavior(QAbstractItemView.SelectRows)
+    table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    table.verticalHeader().setVisible(False)
+    table.setSortingEnabled(True)
+    table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+    return table
+
+
+class QueryProfilerDialog(BaseDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(_("Query-Profiler"))
+        self.resize(1100, 650)
+
+        layout = self.content_layout
+        layout.setSpacing(12)
+
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet(INFO_LABEL_STYLE)
+        layout.addWidget(self.summary_label)
+
+        self.tabs = QTabWidget()
+        self.tbl_statements = _make_table([
+            _("Statement"), _("Aufrufe"), _("Gesamt ms"), _("p50 ms"), _("p95 ms"),
+            _("Max ms"), _("Zeilen"), _("Aufrufer"),
+        ])
+        self.tbl_callers = _make_table([_("Aufrufer"), _("Aufrufe"), _("Gesamt ms")])
+        self.tbl_slow = _make_table([_("Statement"), _("Dauer ms"), _("Aufrufer"), _("Zeit")])
+        self.tbl_slow.itemSelectionChanged.connect(self._show_slow_stack)
+        self.slow_stack = QLabel()
+        self.slow_stack.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.slow_stack.setStyleSheet("font-family: Consolas, monospace; font-size: 11px;")
+        self.slow_stack.setWordWrap(True)
+
+        slow_page = QWidget()
+        slow_lay = QVBoxLayout(slow_page)
+        slow_lay.setContentsMargins(0, 0, 0, 0)
+        slow_lay.addWidget(self.tbl_slow, 3)
+        slow_lay.addWidget(self.slow_stack, 1)
+
+        self.tabs.addTab(self.tbl_statements, _("Statements"))
+        self.tabs.addTab(self.tbl_callers, _("Aufrufer"))
+        self.tabs.addTab(slow_page, _("Langsame Abfragen"))
+        layout.addWidget(self.tabs, 1)
+
+        btn_refresh = QPushButton(_("Aktualisieren"))
+        btn_reset = QPushButton(_("Zurücksetzen"))
+        btn_json = QPushButton(_("Export JSON"))
+        btn_csv = QPushButton(_("Export CSV"))
+        btn_close = QPushButton(_("Schließen"))
+        btn_refresh.clicked.connect(self.refresh)
+        btn_reset.clicked.connect(self._on_reset)
+        btn_json.clicked.connect(lambda: self._export(query_profiler.export_json))
+        btn_csv.clicked.connect(lambda: self._export(query_profiler.export_csv))
+        btn_close.clicked.connect(self.accept)
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(btn_refresh)
+        buttons.addWidget(btn_reset)
+        buttons.addStretch(1)
+        buttons.addWidget(btn_json)
+        buttons.addWidget(btn_csv)
+        buttons.addWidget(btn_close)
+        layout.addLayout(buttons)
+
+        self._slow = []
+        self.refresh()
+
+    def refresh(self):
+        snap = query_profiler.snapshot()
+        pool = pool_stats()
+        cache = sql_cache_stats()
+        total_calls = sum(s["calls"] for s in snap["statements"])
+        total_ms = sum(s["total_ms"] for s in snap["statements"])
+        state = _("aktiv") if query_profiler.enabled else _("deaktiviert")
+        self.summary_label.setText(
+            _("Profiler {state} seit {since}: {calls} Abfragen, {ms:.0f} ms gesamt | "
+              "Pool: {checkouts} Checkouts, {waits} Wartefälle, {reconnects} Reconnects | "
+              "SQL-Cache: {hits} Treffer / {misses} Fehlgriffe").format(
+                state=state, since=snap["since"], calls=total_calls, ms=total_ms,
+                checkouts=pool.get("checkouts", 0), waits=pool.get("waits", 0),
+                reconnects=pool.get("reconnects", 0),
+                hits=cache.get("hits", 0), misses=cache.get("misses", 0),
+            )
+        )
+
+        t = self.tbl_statements
+        t.setSortingEnabled(False)
+        t.setRowCount(len(snap["statements"]))
+        for row, s in enumerate(snap["statements"]):
+            item = QTableWidgetItem(s["fingerprint"])
+            item.setToolTip(s["fingerprint"])
+            t.setItem(row, 0, item)
+            t.setItem(row, 1, _num_item(s["calls"]))
+            t.setItem(row, 2, _num_item(s["total_ms"]))
+            t.setItem(row, 3, _num_item(s["p50_ms"]))
+            t.setItem(row, 4, _num_item(s["p95_ms"]))
+            t.setItem(row, 5, _num_item(s["max_ms"]))
+            t.setItem(row, 6, _num_item(s["rows"]))
+            callers = ", ".join(f"{k} ({v})" for k, v in s["callers"].items())
+            item = QTableWidgetItem(callers)
+            item.setToolTip(callers.replace(", ", "\n"))
+            t.setItem(row, 7, item)
+        t.setSortingEnabled(True)
+
+        t = self.tbl_callers
+        t.setSortingEnabled(False)
+        t.setRowCount(len(snap["callers"]))
+        for row, c in enumerate(snap["callers"]):
+            t.setItem(row, 0, QTableWidgetItem(c["caller"]))
+            t.setItem(row, 1, _num_item(c["calls"]))
+            t.setItem(row, 2, _num_item(c["total_ms"]))
+        t.setSortingEnabled(True)
+
+        self._slow = list(reversed(snap["slow"]))
+        t = self.tbl_slow
+        t.setSortingEnabled(False)
+        t.setRowCount(len(self._slow))
+        for row, s in enumerate(self._slow):
+            item = QTableWidgetItem(s["sql"])
+            item.setData(Qt.UserRole, row)
+            t.setItem(row, 0, item)
+            t.setItem(row, 1, _num_item(s["ms"]))
+            t.setItem(row, 2, QTableWidgetItem(s["caller"]))
+            t.setItem(row, 3, QTableWidgetItem(s["ts"]))
+        t.setSortingEnabled(True)
+        self.slow_stack.clear()
+
+    def _show_slow_stack(self):
+        items = self.tbl_slow.selectedItems()
+        if not items:
+            self.slow_stack.clear()
+            return
+        idx = self.tbl_slow.item(items[0].row(), 0).data(Qt.UserRole)
+        if idx is not None and 0 <= idx < len(self._slow):
+            self.slow_stack.setText(self._slow[idx]["stack"])
+
+    def _on_reset(self):
+        query_profiler.reset()
+        self.refresh()
+
+    def _export(self, fn):
+        try:
+            path = fn()
+        except Exception as e:
+            QMessageBox.critical(self, _("Fehler"), _("Export fehlgeschlagen:\n{e}").format(e=e))
+            return
+        QMessageBox.information(self, _("Export"), _("Gespeichert unter:\n{path}").format(path=os.path.normpath(path)))
@@ -10,7 +10,7 @@ from PyQt5.QtGui import QIcon
 from .base_dialog import BaseDialog
 from .dialog_styles import GROUPBOX_STYLE
 from db_connection import get_db, get_config_value
-from reportlab.lib.utils import ImageReader
+import settings_cache
 from io import BytesIO
 import json
 import os, sys
@@ -59,27 +59,16 @@ def _resource_path(p: str) -> str:
     return p if os.path.isabs(p) else os.path.join(_app_base_dir(), p)
 
 def _fetch_logo_blob():
-    con = get_db()
-    with con.cursor() as cur:
-        cur.execute("SELECT logo FROM rechnung_layout WHERE id=%s LIMIT 1", [1])
-        row = cur.fetchone()
-        if not row:
-            return None
-        try:
-            v = row["logo"] if isinstance(row, dict) else row[0]
-        except Exception:
-            try:
-                v = row["logo"]
-            except Exception:
-                v = None
-        if isinstance(v, memoryview):
-            v = v.tobytes()
-        return v if isinstance(v, (bytes, bytearray)) and len(v) > 0 else None
+    v = settings_cache.get("rechnung_layout", "logo")
+    if isinstance(v, memoryview):
+        v = v.tobytes()
+    return v if isinstance(v, (bytes, bytearray)) and len(v) > 0 else None
 
 def _draw_header_with_logo(self, canvas, layout_cfg: dict):
     blob = _fetch_logo_blob()
     if not blob:
         return
+    from reportlab.lib.utils import ImageReader
     img = ImageReader(BytesIO(blob))
     x = float(layout_cfg.get("logo_x", 40))
     y = float(layout_cfg.get("logo_y", 760))
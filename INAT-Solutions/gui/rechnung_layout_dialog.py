@@ -10,6 +10,7 @@ from .base_dialog import BaseDialog
 from .dialog_styles import GROUPBOX_STYLE
 from .rechnung_styles import RECHNUNG_STYLES, get_stil, get_alle_stile
 from db_connection import get_db
+import settings_cache
 import os, mimetypes, sqlite3, io, tempfile
 from i18n import _
 
@@ -21,258 +22,6 @@ from reportlab.lib import colors
 from reportlab.platypus import Table, TableStyle
 from reportlab.lib.utils import ImageReader
 
-def _ensure_table(con):
-    """Erstellt die Tabelle rechnung_layout, falls nötig (SQLite/PG)."""
-    try:
-        with con.cursor() as cur:
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS rechnung_layout (
-                    id INTEGER PRIMARY KEY,
-                    kopfzeile   TEXT,
-                    einleitung  TEXT,
-                    fusszeile   TEXT,
-                    logo        BLOB,
-                    logo_mime   TEXT,
-                    logo_skala  REAL
-                )
-            """)
-        con.commit()
-        return
-    except Exception:
-        con.rollback()
-    # PostgreSQL-Fallback
-    with con.cursor() as cur:
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS rechnung_layout (
-                id INTEGER PRIMARY KEY,
-                kopfzeile   TEXT,
-                einleitung  TEXT,
-                fusszeile   TEXT,
-                logo        BYTEA,
-                logo_mime   TEXT,
-                logo_skala  REAL
-            )
-        """)
-    con.commit()
-
-def _ensure_logo_columns(con):
-    """Stellt sicher, dass die Spalten logo und logo_mime existieren (SQLite/PG)."""
-    try:
-        with con.cursor() as cur:
-            cols = set()
-            for r in cur.execute("PRAGMA table_info(rechnung_layout)"):
-                name = r[1] if isinstance(r, tuple) else r["name"]
-                cols.add(str(name).lower())
-            if "logo" not in cols:
-                cur.execute("ALTER TABLE rechnung_layout ADD COLUMN logo BLOB")
-            if "logo_mime" not in cols:
-                cur.execute("ALTER TABLE rechnung_layout ADD COLUMN logo_mime TEXT")
-        con.commit()
-        return
-    except Exception:
-        con.rollback()
-    # PostgreSQL-Fallback
-    with con.cursor() as cur:
-        cur.execute("ALTER TABLE rechnung_layout ADD COLUMN IF NOT EXISTS logo bytea")
-        cur.execute("ALTER TABLE rechnung_layout ADD COLUMN IF NOT EXISTS logo_mime text")
-    con.commit()
-
-def _ensure_rechnung_layout_table_exists(conn):
-    """Stellt sicher, dass Tabelle 'rechnung_layout' und benötigte Spalten existieren."""
-    try:
-        # Connection may be a sqlite3.Connection or a ConnectionWrapper from get_db().
-        is_sqlite = getattr(conn, "is_sqlite", False) or getattr(conn, "is_sqlite_conn", False) or "sqlite" in getattr(conn.__class__, "__module__", "")
-    except Exception:
-        is_sqlite = False
-
-    cur = conn.cursor()
-    try:
-        if is_sqlite:
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS rechnung_layout (
-                id TEXT PRIMARY KEY,
-                kopfzeile TEXT,
-                einleitung TEXT,
-                fusszeile TEXT,
-                logo BLOB,
-                logo_mime TEXT,
-                logo_skala REAL
-            )
-            """)
-            conn.commit()
-            # prüfe vorhandene Spalten
-            cur.execute("PRAGMA table_info(rechnung_layout)")
-            existing = {r[1] for r in cur.fetchall()}
-            needed = {
-                "kopfzeile": "TEXT",
-                "einleitung": "TEXT",
-                "fusszeile": "TEXT",
-                "logo": "BLOB",
-                "logo_mime": "TEXT",
-                "logo_skala": "REAL",
-            }
-            for col, typ in needed.items():
-                if col not in existing:
-                    try:
-                        cur.execute(f"ALTER TABLE rechnung_layout ADD COLUMN {col} {typ}")
-                    except Exception:
-                        pass
-            conn.commit()
-        else:
-            # Postgres / andere DBs
-            cur.execute("""
-            CREATE TABLE IF NOT EXISTS rechnung_layout (
-                id TEXT PRIMARY KEY,
-                kopfzeile TEXT,
-                einleitung TEXT,
-                fusszeile TEXT,
-                logo BYTEA,
-                logo_mime TEXT,
-                logo_skala REAL
-            )
-            """)
-            conn.commit()
-            # versuche IF NOT EXISTS Varianten, fallback auf einfache ALTER
-            alter_stmts = [
-                "ALTER TABLE rechnung_layout ADD COLUMN IF NOT EXISTS kopfzeile TEXT",
-                "ALTER TABLE rechnung_layout ADD COLUMN IF NOT EXISTS einleitung TEXT",
-                "ALTER TABLE rechnung_layout ADD COLUMN IF NOT EXISTS fusszeile TEXT",
-                "ALTER TABLE rechnung_layout ADD COLUMN IF NOT EXISTS logo BYTEA",
-                "ALTER TABLE rechnung_layout ADD COLUMN IF NOT EXISTS logo_mime TEXT",
-                "ALTER TABLE rechnung_layout ADD COLUMN IF NOT EXISTS logo_skala REAL",
-            ]
-            for s in alter_stmts:
-                try:
-                    cur.execute(s)
-                except Exception:
-                    try:
-                        # Fallback ohne IF NOT EXISTS
-                        simple = s.replace("ALTER TABLE rechnung_layout ADD COLUMN IF NOT EXISTS ", "ALTER TABLE rechnung_layout ADD COLUMN ")
-                        cur.execute(simple)
-                    except Exception:
-                        pass
-            conn.commit()
-    finally:
-        try:
-            cur.close()
-        except Exception:
-            pass
-
-def _ensure_default_row(con):
-    """Sorgt dafür, dass eine Default-Zeile existiert. Robust gegen unterschiedlichen id-Typen."""
-    try:
-        _ensure_rechnung_layout_table_exists(con)
-    except Exception:
-        pass
-
-    try:
-        is_sqlite = getattr(con, "is_sqlite", False) or getattr(con, "is_sqlite_conn", False) or "sqlite" in getattr(con.__class__, "__module__", "")
-    except Exception:
-        is_sqlite = False
-
-    cur = con.cursor()
-    try:
-        # Default-Werte
-        defaults = ("", "", "", None, None, 100.0)
-
-        if is_sqlite:
-            # Bestimme Typ der id-Spalte, damit wir keinen datatype mismatch erzeugen
-            try:
-                cur.execute("PRAGMA table_info(rechnung_layout)")
-                info = cur.fetchall()
-                id_type = None
-                for r in info:
-                    # r[1]=name, r[2]=type
-                    if r[1].lower() == "id":
-                        id_type = (r[2] or "").lower()
-                        break
-                id_is_integer = id_type is not None and ("int" in id_type)
-            except Exception:
-                id_is_integer = False
-
-            # Wähle einen id-Wert passend zum Typ
-            id_val = 1 if id_is_integer else "default"
-
-            # INSERT OR IGNORE (fügt nur ein, wenn noch kein Eintrag mit dieser id existiert)
-            try:
-                cur.execute(
-                    "INSERT OR IGNORE INTO rechnung_layout (id, kopfzeile, einleitung, fusszeile, logo, logo_mime, logo_skala) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                    (id_val, *defaults)
-                )
-            except Exception:
-                # Fallback: ohne id (falls id AUTOINCREMENT INTEGER PK und INSERT OR IGNORE scheitert)
-                try:
-                    cur.execute(
-                        "INSERT OR IGNORE INTO rechnung_layout (kopfzeile, einleitung, fusszeile, logo, logo_mime, logo_skala) VALUES (?, ?, ?, ?, ?, ?)",
-                        defaults
-                    )
-                except Exception:
-                    pass
-
-            # Aktualisiere fehlende Felder (nur wenn Spalten NULL sind)
-            try:
-                cur.execute(
-                    """
-                    UPDATE rechnung_layout
-                    SET
-                      kopfzeile = COALESCE(kopfzeile, ?),
-                      einleitung = COALESCE(einleitung, ?),
-                      fusszeile = COALESCE(fusszeile, ?),
-                      logo = COALESCE(logo, ?),
-                      logo_mime = COALESCE(logo_mime, ?),
-                      logo_skala = COALESCE(logo_skala, ?)
-                    WHERE id = ?
-                    """,
-                    (*defaults, id_val)
-                )
-            except Exception:
-                # Falls WHERE id = ? nicht passt (z.B. es wurde ohne id eingefügt), versuche ein generelles UPDATE für NULL-Werte
-                try:
-                    cur.execute(
-                        """
-                        UPDATE rechnung_layout
-                        SET
-                          kopfzeile = COALESCE(kopfzeile, ?),
-                          einleitung = COALESCE(einleitung, ?),
-                          fusszeile = COALESCE(fusszeile, ?),
-                          logo = COALESCE(logo, ?),
-                          logo_mime = COALESCE(logo_mime, ?),
-                          logo_skala = COALESCE(logo_skala, ?)
-                        """,
-                        defaults
-                    )
-                except Exception:
-                    pass
-
-        else:
-            # Nicht-SQLite (z.B. Postgres) — benutzte Platzhalter %s und ON CONFLICT
-            sql = """
-            INSERT INTO rechnung_layout (id, kopfzeile, einleitung, fusszeile, logo, logo_mime, logo_skala)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT(id) DO UPDATE SET
-                kopfzeile = COALESCE(rechnung_layout.kopfzeile, EXCLUDED.kopfzeile),
-                einleitung = COALESCE(rechnung_layout.einleitung, EXCLUDED.einleitung),
-                fusszeile = COALESCE(rechnung_layout.fusszeile, EXCLUDED.fusszeile),
-                logo = COALESCE(rechnung_layout.logo, EXCLUDED.logo),
-                logo_mime = COALESCE(rechnung_layout.logo_mime, EXCLUDED.logo_mime),
-                logo_skala = COALESCE(rechnung_layout.logo_skala, EXCLUDED.logo_skala)
-            """
-            try:
-                cur.execute(sql, ("default", *defaults))
-            except Exception:
-                # Fallback: falls id-Spalte numerisch ist, verwende 1
-                try:
-                    cur.execute(sql, (1, *defaults))
-                except Exception:
-                    pass
-
-        con.commit()
-    finally:
-        try:
-            cur.close()
-        except Exception:
-            pass
-
 def _row_to_dict(cur, row):
     if row is None:
         return {}
@@ -505,16 +254,7 @@ class RechnungLayoutDialog(BaseDialog):
         self.btn_speichern.clicked.connect(self.speichern)
         self.btn_abbrechen.clicked.connect(self.reject)
 
-        # DB vorbereiten und laden
-        con = get_db()
-        try:
-            _ensure_table(con)
-            _ensure_logo_columns(con)
-            _ensure_default_row(con)
-        finally:
-            try: con.close()
-            except Exception: pass
-
+        # Tabelle/Spalten legt schema_migrations an; fehlende Zeile -> Defaults
         self.lade_layout()
         
         # Initiale Vorschau-Aktualisierung
@@ -1596,7 +1336,6 @@ class RechnungLayoutDialog(BaseDialog):
     def lade_layout(self):
         """Lädt Layout-Daten aus DB (backend-agnostisch)."""
         import json, os, base64
-        from db_connection import get_db
 
         defaults = {
             "logo_skala": 100,
@@ -1613,87 +1352,52 @@ class RechnungLayoutDialog(BaseDialog):
             "stil": "classic"  # NEU: Default-Stil
         }
 
+        # neueste Zeile aus dem Einstellungs-Cache
+        dbrow = settings_cache.layout_row()
         layout = {}
-        with get_db() as conn:
-            with conn.cursor() as cur:
-                # backend-agnostische Abfrage: ORDER BY id DESC (funktioniert in SQLite und Postgres)
-                # Versuche mit stil-Spalte, fallback ohne
+        # First prefer a single 'layout' JSON field
+        raw_layout = dbrow.get("layout")
+        if raw_layout:
+            if isinstance(raw_layout, str):
                 try:
-                    cur.execute("SELECT id, name, layout, kopfzeile, einleitung, fusszeile, logo, logo_mime, logo_skala, stil FROM rechnung_layout ORDER BY id DESC LIMIT 1")
-                    row = cur.fetchone()
+                    layout = json.loads(raw_layout)
                 except Exception:
+                    layout = {}
+            elif isinstance(raw_layout, (dict, list)):
+                layout = raw_layout if isinstance(raw_layout, dict) else {}
+            else:
+                layout = {}
+        else:
+            # fallback: assemble layout from separate columns (from RechnungLayoutDialog)
+            layout = {}
+            if dbrow.get("kopfzeile"):
+                layout["kopfzeile"] = dbrow.get("kopfzeile")
+            if dbrow.get("einleitung"):
+                layout["einleitung"] = dbrow.get("einleitung")
+            if dbrow.get("fusszeile"):
+                # fusszeile may be JSON string or plain text
+                f = dbrow.get("fusszeile")
+                if isinstance(f, str):
                     try:
-                        conn.rollback()
-                    except Exception:
-                        pass
-                    try:
-                        cur.execute("SELECT id, name, layout, kopfzeile, einleitung, fusszeile, logo, logo_mime, logo_skala FROM rechnung_layout ORDER BY id DESC LIMIT 1")
-                        row = cur.fetchone()
+                        layout["fusszeile"] = json.loads(f)
                     except Exception:
-                        row = None
-
-                # normalize row -> dict
-                if not row:
-                    dbrow = {}
-                else:
-                    if isinstance(row, dict):
-                        dbrow = row
-                    elif hasattr(row, "keys"):
-                        try:
-                            dbrow = dict(row)
-                        except Exception:
-                            dbrow = {}
-                    else:
-                        desc = getattr(cur, "description", None)
-                        if desc:
-                            cols = [d[0] for d in desc]
-                            dbrow = dict(zip(cols, row))
-                        else:
-                            dbrow = {}
-
-                # First prefer a single 'layout' JSON field
-                raw_layout = dbrow.get("layout")
-                if raw_layout:
-                    if isinstance(raw_layout, str):
-                        try:
-                            layout = json.loads(raw_layout)
-                        except Exception:
-                            layout = {}
-                    elif isinstance(raw_layout, (dict, list)):
-                        layout = raw_layout if isinstance(raw_layout, dict) else {}
-                    else:
-                        layout = {}
+                        layout["fusszeile"] = {"text": f}
+                elif isinstance(f, dict):
+                    layout["fusszeile"] = f
                 else:
-                    # fallback: assemble layout from separate columns (from RechnungLayoutDialog)
-                    layout = {}
-                    if dbrow.get("kopfzeile"):
-                        layout["kopfzeile"] = dbrow.get("kopfzeile")
-                    if dbrow.get("einleitung"):
-                        layout["einleitung"] = dbrow.get("einleitung")
-                    if dbrow.get("fusszeile"):
-                        # fusszeile may be JSON string or plain text
-                        f = dbrow.get("fusszeile")
-                        if isinstance(f, str):
-                            try:
-                                layout["fusszeile"] = json.loads(f)
-                            except Exception:
-                                layout["fusszeile"] = {"text": f}
-                        elif isinstance(f, dict):
-                            layout["fusszeile"] = f
-                        else:
-                            layout["fusszeile"] = {"text": str(f)}
-                    # logo as bytes
-                    logo_db = dbrow.get("logo")
-                    if isinstance(logo_db, (bytes, bytearray, memoryview)):
-                        layout["logo_bytes"] = bytes(logo_db)
-                    if dbrow.get("logo_skala") is not None:
-                        try:
-                            layout["logo_skala"] = float(dbrow.get("logo_skala"))
-                        except Exception:
-                            layout["logo_skala"] = defaults["logo_skala"]
-                    # Stil laden
-                    if dbrow.get("stil"):
-                        layout["stil"] = dbrow.get("stil")
+                    layout["fusszeile"] = {"text": str(f)}
+            # logo as bytes
+            logo_db = dbrow.get("logo")
+            if isinstance(logo_db, (bytes, bytearray, memoryview)):
+                layout["logo_bytes"] = bytes(logo_db)
+            if dbrow.get("logo_skala") is not None:
+                try:
+                    layout["logo_skala"] = float(dbrow.get("logo_skala"))
+                except Exception:
+                    layout["logo_skala"] = defaults["logo_skala"]
+            # Stil laden
+            if dbrow.get("stil"):
+                layout["stil"] = dbrow.get("stil")
 
         # merge defaults + loaded layout and normalize
         if not isinstance(layout, dict):
@@ -1761,16 +1465,6 @@ class RechnungLayoutDialog(BaseDialog):
         con = get_db()
         try:
             with con.cursor() as cur:
-                # Stelle sicher, dass stil-Spalte existiert
-                try:
-                    cur.execute("ALTER TABLE rechnung_layout ADD COLUMN IF NOT EXISTS stil TEXT DEFAULT 'classic'")
-                    con.commit()
-                except Exception:
-                    try:
-                        con.rollback()
-                    except Exception:
-                        pass
-
                 # Simpler, deterministic approach:
                 # remove existing layout rows and insert a single fresh row so readers always find the latest data
                 try:
@@ -1812,6 +1506,13 @@ class RechnungLayoutDialog(BaseDialog):
         finally:
             try: con.close()
             except Exception: pass
+            settings_cache.invalidate()
+            # gerenderte Rechnungen mit dem alten Layout verwerfen
+            try:
+                import pdf_cache
+                pdf_cache.leeren()
+            except Exception:
+                pass
 
         QMessageBox.information(self, _("Gespeichert"), _("Rechnungslayout wurde gespeichert."))
         self.accept()
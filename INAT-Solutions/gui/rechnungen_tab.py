@@ -1,29 +1,24 @@
 # -*- coding: utf-8 -*-
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QToolButton, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QToolButton, QTableView,
     QMessageBox, QDialog, QFileDialog, QLabel, QHeaderView, QAbstractItemView, QFrame,
     QLineEdit, QPushButton, QSizePolicy
 )
 from PyQt5.QtGui import QBrush, QColor, QFont, QIcon
 from PyQt5.QtCore import Qt, QDate, pyqtSignal, QSize
-from reportlab.lib.utils import ImageReader
 import re
 import io
-from db_connection import get_db, dict_cursor_factory, get_rechnung_layout
+from db_connection import get_db, dict_cursor_factory, get_config_value
+import settings_cache
+from rechnung_positionen import berechne_summen, parse_positionen, speichere_positionen, loesche_positionen
+import rechnung_status
+import datum_iso
 import json, os, subprocess, tempfile
 from gui.rechnung_dialog import RechnungDialog
-from gui.rechnung_layout_dialog import RechnungLayoutDialog
 from gui.zahlung_erfassen_dialog import ZahlungErfassenDialog
-from gui.rechnung_styles import get_stil, RECHNUNG_STYLES
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+# reportlab/svglib und die Layout-Dialoge werden erst beim PDF-Erzeugen importiert
 from invoice_assets import get_invoice_logo_imagereader
 from settings_store import get_json, import_json_if_missing
-from reportlab.lib.units import mm
-from reportlab.lib import colors
-from reportlab.platypus import Table, TableStyle
-from svglib.svglib import svg2rlg
-from reportlab.graphics import renderPDF
 from decimal import Decimal
 from datetime import datetime, timedelta
 from gui.themed_input_dialog import get_item as themed_get_item
@@ -31,8 +26,11 @@ from gui.popup_calendar import PopupCalendarWidget
 from gui.modern_widgets import (
     COLORS, FONT_SIZES, SPACING, BORDER_RADIUS,
     get_table_stylesheet, get_button_primary_stylesheet, 
-    get_button_secondary_stylesheet, get_input_stylesheet,
-    get_toolbar_button_stylesheet, create_gray_icon
+    get_button_secondary_stylesheet, get_input_stylesheet
+)
+from gui.rechnungen_table import (
+    RechnungenModel, StatusBadgeDelegate, ActionButtonsDelegate,
+    COL_ID, COL_STATUS, COL_AKTIONEN
 )
 from i18n import _
 
@@ -40,18 +38,27 @@ from i18n import _
 PASTELL_GRUEN  = QColor(230, 255, 230)   # bezahlt
 PASTELL_ROT    = QColor(255, 230, 230)   # überfällig
 PASTELL_ORANGE = QColor(255, 245, 230)   # offen
+STATUS_FARBEN = {
+    rechnung_status.STATUS_BEZAHLT: PASTELL_GRUEN,
+    rechnung_status.STATUS_UEBERFAELLIG: PASTELL_ROT,
+    rechnung_status.STATUS_OFFEN: PASTELL_ORANGE,
+}
 
 class RechnungenTab(QWidget):
     # Signal das emittiert wird wenn eine Zahlung erfasst wurde
     zahlung_erfasst = pyqtSignal()
 
+    # Spalten des Hintergrund-Loaders (main_window) in der Reihenfolge von append_rows
+    LOADER_COLUMNS = ["id", "rechnung_nr", "kunde", "firma", "adresse", "datum", "mwst",
+                      "zahlungskonditionen", "positionen", "uid", "abschluss", "abschluss_text", "brutto",
+                      "faellig_am", "status"]
+
     def __init__(self, parent=None):
         super().__init__(parent)
         # Default-MWST (Schutz falls importierte Daten keine mwst liefern)
         self.mwst = 0.0
         self._known_invoice_ids = set()
 
-        self.initialisiere_datenbank()
         self.init_ui()
         self.lade_rechnungen()
 
@@ -86,6 +93,12 @@ class RechnungenTab(QWidget):
         self.btn_neu.setCursor(Qt.PointingHandCursor)
         self.btn_neu.clicked.connect(self.neue_rechnung)
         toolbar.addWidget(self.btn_neu)
+
+        self.btn_pdf_stapel = QPushButton(_("PDF-Export..."))
+        self.btn_pdf_stapel.setStyleSheet(get_button_secondary_stylesheet())
+        self.btn_pdf_stapel.setCursor(Qt.PointingHandCursor)
+        self.btn_pdf_stapel.clicked.connect(self.exportiere_pdf_stapel)
+        toolbar.addWidget(self.btn_pdf_stapel)
         
         # Suchfeld - volle Breite
         self.suchfeld = QLineEdit()
@@ -97,10 +110,17 @@ class RechnungenTab(QWidget):
         container_layout.addLayout(toolbar)
 
         # Tabelle
-        self.table = QTableWidget()
-        self.table.setSelectionMode(QTableWidget.ExtendedSelection)
+        # Status-Badge und Aktions-Buttons zeichnen Delegates, keine Widgets pro Zeile
+        self.model = RechnungenModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.table.setMouseTracking(True)  # Für Hover-Effekte
         self.table.setStyleSheet(get_table_stylesheet())
+        self.table.setItemDelegateForColumn(COL_STATUS, StatusBadgeDelegate(self.table))
+        self._aktionen_delegate = ActionButtonsDelegate(self.table)
+        self._aktionen_delegate.action_triggered.connect(self._on_aktion)
+        self.table.setItemDelegateForColumn(COL_AKTIONEN, self._aktionen_delegate)
         self._setup_table()
         self.table.doubleClicked.connect(self._on_double_click)
         container_layout.addWidget(self.table)
@@ -131,8 +151,14 @@ class RechnungenTab(QWidget):
     
     def _on_double_click(self, index):
         """Doppelklick öffnet Rechnung zum Bearbeiten."""
+        if index.column() == COL_AKTIONEN:
+            return  # Doppelklick auf die Aktions-Buttons
         self.bearbeite_rechnung()
 
+    def _aktuelle_zeile(self) -> int:
+        index = self.table.currentIndex()
+        return index.row() if index.isValid() else -1
+
     def aktualisiere_kunden_liste(self):
         """Vom Kunden-Tab getriggert: Kunden-Cache + Tabelle neu laden."""
         self.kunden_liste = self._lade_kundennamen()
@@ -142,87 +168,8 @@ class RechnungenTab(QWidget):
 
 # ---------------- DB / Settings ----------------
 
-    def initialisiere_datenbank(self):
-        with get_db() as conn:
-            # robust: check wrapper flags instead of isinstance on the wrapper object
-            is_sqlite = getattr(conn, "is_sqlite", None)
-            if is_sqlite is None:
-                is_sqlite = getattr(conn, "is_sqlite_conn", False)
-            with conn.cursor() as cursor:
-                if is_sqlite:
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS kunden (
-                            kundennr INTEGER PRIMARY KEY AUTOINCREMENT,
-                            name     TEXT,
-                            firma    TEXT,
-                            plz      TEXT,
-                            strasse  TEXT,
-                            stadt    TEXT,
-                            email    TEXT,
-                            anrede   TEXT
-                        )
-                    """)
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS rechnungen (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            rechnung_nr TEXT,
-                            kunde TEXT,
-                            firma TEXT,
-                            adresse TEXT,
-                            datum TEXT,
-                            mwst REAL,
-                            zahlungskonditionen TEXT,
-                            positionen TEXT,
-                            uid TEXT,
-                            abschluss TEXT,
-                            abschluss_text TEXT
-                        )
-                    """)
-                else:
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS kunden (
-                            kundennr BIGSERIAL PRIMARY KEY,
-                            name     TEXT,
-                            firma    TEXT,
-                            plz      TEXT,
-                            strasse  TEXT,
-                            stadt    TEXT,
-                            email    TEXT,
-                            anrede   TEXT
-                        )
-                    """)
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS rechnungen (
-                            id BIGSERIAL PRIMARY KEY,
-                            rechnung_nr TEXT,
-                            kunde TEXT,
-                            firma TEXT,
-                            adresse TEXT,
-                            datum TEXT,
-                            mwst REAL,
-                            zahlungskonditionen TEXT,
-                            positionen TEXT,
-                            uid TEXT,
-                            abschluss TEXT,
-                            abschluss_text TEXT
-                        )
-                    """)
-                    # NEU: Synchronisiere die ID-Sequenzen mit den maximal vorhandenen Werten.
-                    # Dies behebt den UniqueViolation-Fehler.
-                    try:
-                        # KORREKTUR: Der dritte Parameter muss 'true' sein, damit der n�chste Wert MAX(id) + 1 ist.
-                        # Korrigiert die Z�hlung f�r die 'rechnungen'-Tabelle
-                        cursor.execute("SELECT setval('rechnungen_id_seq', COALESCE((SELECT MAX(id) FROM rechnungen), 1), true)")
-                        # Korrigiert vorsorglich auch die 'kunden'-Tabelle
-                        cursor.execute("SELECT setval('kunden_kundennr_seq', COALESCE((SELECT MAX(kundennr) FROM kunden), 1), true)")
-
-                    except Exception as e:
-                        # Fehler ignorieren, falls die Tabelle/Sequenz noch nicht existiert, was beim allerersten Start normal ist.
-                        print(f"Info: Konnte Sequenz nicht synchronisieren (normal beim ersten Start): {e}")
-
-            conn.commit()
-
     def oeffne_rechnungslayout_dialog(self):
+        from gui.rechnung_layout_dialog import RechnungLayoutDialog
         dialog = RechnungLayoutDialog(self)
         if dialog.exec_() == QDialog.Accepted:
             self._lade_rechnungslayout()
@@ -230,21 +177,14 @@ class RechnungenTab(QWidget):
     def _lade_einstellungen(self):
         # MWST aus DB laden (config-Tabelle)
         try:
-            con = get_db()
-            with con.cursor() as cur:
-                cur.execute("SELECT value FROM config WHERE key = %s LIMIT 1", ["mwst_default"])
-                row = cur.fetchone()
-                if row:
-                    mwst = float(row["value"] if isinstance(row, dict) else row[0])
-                else:
-                    mwst = 0.0  # Fallback
+            value = get_config_value("mwst_default")
+            mwst = float(value) if value is not None else 0.0  # Fallback
         except Exception:
             mwst = 0.0  # Fallback bei Fehler
         self.mwst_voreinstellung = mwst
 
     def _lade_rechnungslayout(self):
         import json, os, base64
-        from db_connection import get_db
 
         defaults = {
             "logo_skala": 100,
@@ -261,87 +201,52 @@ class RechnungenTab(QWidget):
             "stil": "classic"  # NEU: Default-Stil
         }
 
+        # neueste Zeile aus dem Einstellungs-Cache (kein DB-Zugriff pro Export)
+        dbrow = settings_cache.layout_row()
         layout = {}
-        with get_db() as conn:
-            with conn.cursor() as cur:
-                # select a broad set of possible columns (works for both schemas)
-                # Versuche mit stil-Spalte, fallback ohne
+        # First prefer a single 'layout' JSON field
+        raw_layout = dbrow.get("layout")
+        if raw_layout:
+            if isinstance(raw_layout, str):
                 try:
-                    cur.execute("SELECT id, name, layout, kopfzeile, einleitung, fusszeile, logo, logo_mime, logo_skala, stil FROM rechnung_layout ORDER BY id LIMIT 1")
-                    row = cur.fetchone()
+                    layout = json.loads(raw_layout)
                 except Exception:
+                    layout = {}
+            elif isinstance(raw_layout, (dict, list)):
+                layout = raw_layout if isinstance(raw_layout, dict) else {}
+            else:
+                layout = {}
+        else:
+            # fallback: assemble layout from separate columns (from RechnungLayoutDialog)
+            layout = {}
+            if dbrow.get("kopfzeile"):
+                layout["kopfzeile"] = dbrow.get("kopfzeile")
+            if dbrow.get("einleitung"):
+                layout["einleitung"] = dbrow.get("einleitung")
+            if dbrow.get("fusszeile"):
+                # fusszeile may be JSON string or plain text
+                f = dbrow.get("fusszeile")
+                if isinstance(f, str):
                     try:
-                        conn.rollback()
-                    except Exception:
-                        pass
-                    try:
-                        cur.execute("SELECT id, name, layout, kopfzeile, einleitung, fusszeile, logo, logo_mime, logo_skala FROM rechnung_layout ORDER BY id LIMIT 1")
-                        row = cur.fetchone()
+                        layout["fusszeile"] = json.loads(f)
                     except Exception:
-                        row = None
-
-                # normalize row -> dict
-                if not row:
-                    dbrow = {}
-                else:
-                    if isinstance(row, dict):
-                        dbrow = row
-                    elif hasattr(row, "keys"):
-                        try:
-                            dbrow = dict(row)
-                        except Exception:
-                            dbrow = {}
-                    else:
-                        desc = getattr(cur, "description", None)
-                        if desc:
-                            cols = [d[0] for d in desc]
-                            dbrow = dict(zip(cols, row))
-                        else:
-                            dbrow = {}
-
-                # First prefer a single 'layout' JSON field
-                raw_layout = dbrow.get("layout")
-                if raw_layout:
-                    if isinstance(raw_layout, str):
-                        try:
-                            layout = json.loads(raw_layout)
-                        except Exception:
-                            layout = {}
-                    elif isinstance(raw_layout, (dict, list)):
-                        layout = raw_layout if isinstance(raw_layout, dict) else {}
-                    else:
-                        layout = {}
+                        layout["fusszeile"] = {"text": f}
+                elif isinstance(f, dict):
+                    layout["fusszeile"] = f
                 else:
-                    # fallback: assemble layout from separate columns (from RechnungLayoutDialog)
-                    layout = {}
-                    if dbrow.get("kopfzeile"):
-                        layout["kopfzeile"] = dbrow.get("kopfzeile")
-                    if dbrow.get("einleitung"):
-                        layout["einleitung"] = dbrow.get("einleitung")
-                    if dbrow.get("fusszeile"):
-                        # fusszeile may be JSON string or plain text
-                        f = dbrow.get("fusszeile")
-                        if isinstance(f, str):
-                            try:
-                                layout["fusszeile"] = json.loads(f)
-                            except Exception:
-                                layout["fusszeile"] = {"text": f}
-                        elif isinstance(f, dict):
-                            layout["fusszeile"] = f
-                        else:
-                            layout["fusszeile"] = {"text": str(f)}
-                    # logo as bytes
-                    logo_db = dbrow.get("logo")
-                    if isinstance(logo_db, (bytes, bytearray, memoryview)):
-                        layout["logo_bytes"] = bytes(logo_db)
-                    if dbrow.get("logo_skala") is not None:
-                        try:
-                            layout["logo_skala"] = float(dbrow.get("logo_skala"))
-                        except Exception:
-                            layout["logo_skala"] = defaults["logo_skala"]
-                    # Stil laden
-                    if dbrow.get("stil"):
-                        layout["stil"] = dbrow.get("stil")
+                    layout["fusszeile"] = {"text": str(f)}
+            # logo as bytes
+            logo_db = dbrow.get("logo")
+            if isinstance(logo_db, (bytes, bytearray, memoryview)):
+                layout["logo_bytes"] = bytes(logo_db)
+            if dbrow.get("logo_skala") is not None:
+                try:
+                    layout["logo_skala"] = float(dbrow.get("logo_skala"))
+                except Exception:
+                    layout["logo_skala"] = defaults["logo_skala"]
+            # Stil laden
+            if dbrow.get("stil"):
+                layout["stil"] = dbrow.get("stil")
 
         # merge defaults + loaded layout and normalize
         if not isinstance(layout, dict):
@@ -393,17 +298,16 @@ class RechnungenTab(QWidget):
 
     def filter_tabelle(self, text):
         """Filtert die Tabelle basierend auf dem Suchtext."""
-        for row in range(self.table.rowCount()):
-            match = any(text.lower() in self.table.item(row, col).text().lower()
-                        for col in range(self.table.columnCount())
-                        if self.table.item(row, col))
+        text = text.lower()
+        model = self.model
+        for row in range(model.rowCount()):
+            match = not text or any(text in model.text(row, col).lower()
+                                    for col in range(model.columnCount()))
             self.table.setRowHidden(row, not match)
 
     def _setup_table(self):
         # 7 Spalten wie auf der Website: ID, Nummer, Kunde, Datum, Betrag, Status, Aktionen
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([_("ID"), _("Nummer"), _("Kunde"), _("Datum"), _("Betrag"), _("Status"), _("Aktionen")])
-        self.table.setColumnHidden(0, True)
+        self.table.setColumnHidden(COL_ID, True)
         
         # Schriftgröße 20% kleiner (von 15px auf 12px)
         table_font = self.table.font()
@@ -421,6 +325,9 @@ class RechnungenTab(QWidget):
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)    # Status
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)    # Aktionen
         
+        # Breite nur aus den ersten Zeilen messen statt aus allen Rechnungen
+        header.setResizeContentsPrecision(200)
+
         # Damit die Spalten nicht zu zusammengequetscht wirken, geben wir etwas Mindestbreite
         header.setMinimumSectionSize(120)
         
@@ -428,160 +335,63 @@ class RechnungenTab(QWidget):
         
         # Zeilenh�he deutlich erh�ht (User-Wunsch: "zu wenig hoch")
         self.table.verticalHeader().setDefaultSectionSize(75)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setShowGrid(False)
         self.table.verticalHeader().setVisible(False)
     
-    def _create_status_badge(self, status_text):
-        """Erstellt Status-Badge wie auf der Website."""
-        label = QLabel(status_text.capitalize())
-        label.setAlignment(Qt.AlignCenter)
-        
-        badge_size = FONT_SIZES['badge']
-        badge_radius = BORDER_RADIUS['lg']
-        
-        if status_text == "bezahlt":
-            label.setStyleSheet(f"""
-                background-color: {COLORS['success_light']};
-                color: {COLORS['success_text']};
-                border-radius: {badge_radius}px;
-                padding: 6px 14px;
-                font-size: {badge_size}px;
-                font-weight: 600;
-            """)
-        elif status_text == "überfällig":
-            label.setStyleSheet(f"""
-                background-color: {COLORS['danger_light']};
-                color: {COLORS['danger_text']};
-                border-radius: {badge_radius}px;
-                padding: 6px 14px;
-                font-size: {badge_size}px;
-                font-weight: 600;
-            """)
-        else:  # offen
-            label.setStyleSheet(f"""
-                background-color: {COLORS['warning_light']};
-                color: {COLORS['warning_text']};
-                border-radius: {badge_radius}px;
-                padding: 6px 14px;
-                font-size: {badge_size}px;
-                font-weight: 600;
-            """)
-        
-        container = QWidget()
-        container.setStyleSheet("background: transparent;")
-        layout = QHBoxLayout(container)
-        layout.setContentsMargins(SPACING['xs'], 0, 0, 0)
-        layout.addWidget(label)
-        layout.addStretch()
-        return container
-    
-    def _create_action_buttons(self, rechnung_id):
-        """Erstellt Aktions-Buttons (Vorschau, Download, Zahlung, L�schen) wie auf der Website."""
-        widget = QWidget()
-        widget.setStyleSheet("background: transparent;")
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(4, 0, 0, 0)
-        layout.setSpacing(8)
-        
-        icons_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "icons")
-        
-        # Zentrale Button- und Icon-Styles verwenden
-        btn_style = get_toolbar_button_stylesheet()
-        icon_size = FONT_SIZES['icon_medium']
-        btn_size = FONT_SIZES['btn_medium']
-        
-        # Vorschau-Button (Auge)
-        btn_view = QToolButton()
-        btn_view.setIcon(create_gray_icon(os.path.join(icons_path, "preview.svg")))
-        btn_view.setIconSize(QSize(icon_size, icon_size))
-        btn_view.setFixedSize(btn_size, btn_size)
-        btn_view.setStyleSheet(btn_style)
-        btn_view.setCursor(Qt.PointingHandCursor)
-        btn_view.setToolTip(_("Vorschau"))
-        btn_view.clicked.connect(lambda checked, rid=rechnung_id: self._vorschau_by_id(rid))
-        layout.addWidget(btn_view)
-        
-        # Download-Button
-        btn_dl = QToolButton()
-        btn_dl.setIcon(create_gray_icon(os.path.join(icons_path, "download.svg")))
-        btn_dl.setIconSize(QSize(icon_size, icon_size))
-        btn_dl.setFixedSize(btn_size, btn_size)
-        btn_dl.setStyleSheet(btn_style)
-        btn_dl.setCursor(Qt.PointingHandCursor)
-        btn_dl.setToolTip(_("PDF exportieren"))
-        btn_dl.clicked.connect(lambda checked, rid=rechnung_id: self._export_by_id(rid))
-        layout.addWidget(btn_dl)
-        
-        # Zahlung erfassen Button
-        btn_pay = QToolButton()
-        btn_pay.setIcon(create_gray_icon(os.path.join(icons_path, "payment.svg")))
-        btn_pay.setIconSize(QSize(icon_size, icon_size))
-        btn_pay.setFixedSize(btn_size, btn_size)
-        btn_pay.setStyleSheet(btn_style)
-        btn_pay.setCursor(Qt.PointingHandCursor)
-        btn_pay.setToolTip(_("Zahlung erfassen"))
-        btn_pay.clicked.connect(lambda checked, rid=rechnung_id: self._zahlung_by_id(rid))
-        layout.addWidget(btn_pay)
-        
-        # Löschen Button
-        btn_del = QToolButton()
-        btn_del.setIcon(create_gray_icon(os.path.join(icons_path, "delete.svg")))
-        btn_del.setIconSize(QSize(icon_size, icon_size))
-        btn_del.setFixedSize(btn_size, btn_size)
-        btn_del.setStyleSheet(btn_style)
-        btn_del.setCursor(Qt.PointingHandCursor)
-        btn_del.setToolTip(_("Löschen"))
-        btn_del.clicked.connect(lambda checked, rid=rechnung_id: self._delete_by_id(rid))
-        layout.addWidget(btn_del)
-        
-        layout.addStretch()
-        return widget
-    
+    def _on_aktion(self, aktion, rechnung_id):
+        """Klick auf einen der gezeichneten Aktions-Buttons."""
+        {
+            "vorschau": self._vorschau_by_id,
+            "export": self._export_by_id,
+            "zahlung": self._zahlung_by_id,
+            "loeschen": self._delete_by_id,
+        }[aktion](rechnung_id)
+
+    def _waehle_rechnung(self, rechnung_id):
+        row = self.model.row_of_id(rechnung_id)
+        if row >= 0:
+            self.table.selectRow(row)
+
+    def zeige_treffer(self, treffer):
+        """Treffer der globalen Suche in der Liste auswählen."""
+        row = self.model.row_of_id(treffer.schluessel)
+        if row < 0:
+            # Liste evtl. noch nicht geladen oder veraltet (Rechnung neu erfasst)
+            self.lade_rechnungen()
+            row = self.model.row_of_id(treffer.schluessel)
+        if row < 0:
+            QMessageBox.information(
+                self, _("Rechnung"),
+                _("Rechnung {0} wurde in der Liste nicht gefunden.").format(treffer.titel))
+            return
+        self.table.setRowHidden(row, False)
+        self.table.selectRow(row)
+        self.table.scrollTo(self.model.index(row, 0), QAbstractItemView.PositionAtCenter)
+
     def _vorschau_by_id(self, rechnung_id):
-        """Zeigt Vorschau f�r Rechnung."""
-        for row in range(self.table.rowCount()):
-            if self.table.item(row, 0) and int(self.table.item(row, 0).text()) == rechnung_id:
-                self.table.selectRow(row)
-                break
+        """Zeigt Vorschau für Rechnung."""
+        self._waehle_rechnung(rechnung_id)
         self.vorschau_ausgewaehlte_rechnung()
     
     def _export_by_id(self, rechnung_id):
         """Exportiert Rechnung als PDF."""
-        for row in range(self.table.rowCount()):
-            if self.table.item(row, 0) and int(self.table.item(row, 0).text()) == rechnung_id:
-                self.table.selectRow(row)
-                break
+        self._waehle_rechnung(rechnung_id)
         self.exportiere_ausgewaehlte_rechnung()
     
     def _zahlung_by_id(self, rechnung_id):
-        """Erfasst Zahlung f�r Rechnung."""
-        for row in range(self.table.rowCount()):
-            if self.table.item(row, 0) and int(self.table.item(row, 0).text()) == rechnung_id:
-                self.table.selectRow(row)
-                break
+        """Erfasst Zahlung für Rechnung."""
+        self._waehle_rechnung(rechnung_id)
         self._zahlung_erfassen()
     
     def _delete_by_id(self, rechnung_id):
-        """L�scht Rechnung."""
-        for row in range(self.table.rowCount()):
-            if self.table.item(row, 0) and int(self.table.item(row, 0).text()) == rechnung_id:
-                self.table.selectRow(row)
-                break
+        """Löscht Rechnung."""
+        self._waehle_rechnung(rechnung_id)
         self.loesche_rechnung()
 
-    def _setze_zeilenfarbe(self, row_idx, farbe: QColor):
-        """F�rbt die komplette Tabellenzeile ein."""
-        brush = QBrush(farbe)
-        for c in range(self.table.columnCount()):
-            it = self.table.item(row_idx, c)
-            if it is None:
-                it = QTableWidgetItem("")
-                self.table.setItem(row_idx, c, it)
-            it.setBackground(brush)
-
     def lade_rechnungen(self):
         # --- Suchfeld zurücksetzen, da die Daten neu geladen werden ---
         # Mark manual loading to avoid race with background TabLoader
@@ -590,12 +400,16 @@ class RechnungenTab(QWidget):
         self.suchfeld.clear()
         self.suchfeld.blockSignals(False)
 
+        # offen -> überfällig für heute nachziehen (einmal pro Tag)
+        rechnung_status.rollover_taeglich()
+
         with get_db() as conn:
             is_sqlite = getattr(conn, "is_sqlite", False)
             with conn.cursor() as cursor:
                 
                 query = """
-                    SELECT id, rechnung_nr, kunde, firma, adresse, datum, mwst, zahlungskonditionen, positionen, uid, abschluss, COALESCE(abschluss_text,'')
+                    SELECT id, rechnung_nr, kunde, firma, adresse, datum, mwst, zahlungskonditionen, positionen, uid, abschluss, COALESCE(abschluss_text,''), brutto,
+                           faellig_am, status
                     FROM rechnungen
                 """
 
@@ -610,85 +424,18 @@ class RechnungenTab(QWidget):
                 cursor.execute(f"{query} {order_clause}")
                 daten = cursor.fetchall()
 
-        # Blockiere Signale während des Ladens, um ungewollte Speicherungen zu verhindern
-        self.table.blockSignals(True)
-        self.rechnungen = []
+        rechnungen = []
         self._known_invoice_ids = set()
-        self.table.setRowCount(0) # Tabelle leeren
-
-        for (id_, nr, kunde, firma, adresse, datum, mwst, zahlungskonditionen, positionen_json, uid, abschluss, abschluss_text) in daten:
-            status_text, farbe = self._berechne_status(str(datum or ""), zahlungskonditionen or "", abschluss or "")
-
-            try:
-                positionen = json.loads(positionen_json) if positionen_json else []
-            except Exception:
-                positionen = []
-            
-            # --- NEU: Gesamtsumme berechnen ---
-            gesamtbetrag_netto = sum(float(pos.get("menge", 0)) * float(pos.get("einzelpreis", 0)) for pos in positionen)
-            mwst_prozent = float(mwst or 0)
-            mwst_betrag = gesamtbetrag_netto * mwst_prozent / 100.0
-            gesamtbetrag_brutto = gesamtbetrag_netto + mwst_betrag
 
+        for (id_, nr, kunde, firma, adresse, datum, mwst, zahlungskonditionen, positionen_json, uid, abschluss, abschluss_text, brutto,
+             faellig_am, status_text) in daten:
+            # Status gespeichert (rechnung_status); berechnen nur für Zeilen ohne status
+            if not status_text:
+                status_text, _farbe = self._berechne_status(str(datum or ""), zahlungskonditionen or "", abschluss or "")
 
-            # Zeile hinzufügen
-            row_position = self.table.rowCount()
-            self.table.insertRow(row_position)
-
-            # ID (versteckt)
-            self.table.setItem(row_position, 0, QTableWidgetItem(str(id_)))
-            
-            cell_font_size = FONT_SIZES['table_cell']
-            
-            # Nummer - blau und fett wie auf Website
-            item_nr = QTableWidgetItem(nr or "")
-            item_nr.setForeground(QColor(COLORS['primary']))
-            font_nr = QFont()
-            font_nr.setPointSize(cell_font_size)
-            font_nr.setWeight(QFont.DemiBold)
-            item_nr.setFont(font_nr)
-            self.table.setItem(row_position, 1, item_nr)
-            
-            # Kunde
-            item_kunde = QTableWidgetItem(kunde or "")
-            item_kunde.setForeground(QColor(COLORS['text_primary']))
-            font_kunde = QFont()
-            font_kunde.setPointSize(cell_font_size)
-            item_kunde.setFont(font_kunde)
-            self.table.setItem(row_position, 2, item_kunde)
-            
-            # Datum formatiert
-            datum_str = str(datum or "")
-            try:
-                if "-" in datum_str:
-                    from datetime import datetime as dt
-                    d = dt.strptime(datum_str, "%Y-%m-%d")
-                    datum_str = d.strftime("%d.%m.%Y")
-            except:
-                pass
-            item_datum = QTableWidgetItem(datum_str)
-            item_datum.setForeground(QColor(COLORS['text_secondary']))
-            font_datum = QFont()
-            font_datum.setPointSize(cell_font_size)
-            item_datum.setFont(font_datum)
-            self.table.setItem(row_position, 3, item_datum)
-            
-            # Betrag
-            item_betrag = QTableWidgetItem(f"CHF {gesamtbetrag_brutto:,.2f}".replace(",", "'"))
-            font_betrag = QFont()
-            font_betrag.setPointSize(cell_font_size)
-            font_betrag.setWeight(QFont.DemiBold)
-            item_betrag.setFont(font_betrag)
-            item_betrag.setForeground(QColor(COLORS['text_primary']))
-            self.table.setItem(row_position, 4, item_betrag)
-            
-            # Status-Badge als Widget
-            status_widget = self._create_status_badge(status_text)
-            self.table.setCellWidget(row_position, 5, status_widget)
-            
-            # Aktionen-Buttons als Widget
-            action_widget = self._create_action_buttons(id_)
-            self.table.setCellWidget(row_position, 6, action_widget)
+            # Gesamtsumme aus rechnungen.brutto; JSON nur für Zeilen ohne gespeicherte Summe
+            if brutto is None:
+                brutto = berechne_summen(parse_positionen(positionen_json), mwst)[2]
 
             if id_ is not None:
                 try:
@@ -696,7 +443,7 @@ class RechnungenTab(QWidget):
                 except Exception:
                     pass
 
-            self.rechnungen.append({
+            rechnungen.append({
                 "id": id_,
                 "rechnung_nr": nr or "",
                 "kunde": kunde or "",
@@ -705,15 +452,18 @@ class RechnungenTab(QWidget):
                 "datum": datum or "",
                 "mwst": mwst,
                 "zahlungskonditionen": zahlungskonditionen or "",
-                "positionen": positionen,
+                "positionen": positionen_json,
                 "uid": uid or "",
                 "abschluss": abschluss or "",
                 "abschluss_text": abschluss_text or "",
+                "faellig_am": str(faellig_am or ""),
                 "status": status_text,
+                "brutto": float(brutto),
             })
-        
-        # Signale wieder freigeben
-        self.table.blockSignals(False)
+
+        # Modell teilt die Liste mit self.rechnungen (lade_rechnung_nach_id etc.)
+        self.model.set_rechnungen(rechnungen)
+        self.rechnungen = self.model.rechnungen()
         # Manual load finished - allow background loader to append again
         self._manual_loading = False
 
@@ -723,53 +473,23 @@ class RechnungenTab(QWidget):
 
     def _berechne_status(self, datum_str, zahlungskonditionen, abschluss):
         """
-        Gibt (status_text, farbe_qcolor) zurück.
+        Gibt (status_text, farbe_qcolor) zurück (Regeln: rechnung_status).
         - 'abschluss' (bezahlt/offen/überfällig) = manuell -> Vorrang
         - sonst Automatik: Datum + Zahlungsziel (Standard 10 Tage)
+        Nur noch für Zeilen ohne gespeicherten status nötig.
         """
-        status_man = (abschluss or "").strip().lower()
-        if status_man in ("bezahlt", "offen", "überfällig"):
-            if status_man == "bezahlt":
-                return "bezahlt", PASTELL_GRUEN
-            elif status_man == "überfällig":
-                return "überfällig", PASTELL_ROT
-            else:
-                return "offen", PASTELL_ORANGE
-
-        # Automatik
-        rechnungsdatum = None
-        for fmt in ("%Y-%m-%d", "%d.%m.%Y", "%d.%m.%y"):
-            try:
-                rechnungsdatum = datetime.strptime(datum_str, fmt).date()
-                break
-            except Exception:
-                pass
-        if not rechnungsdatum:
-            rechnungsdatum = datetime.today().date()
-
-        ziel_tage = 10
-        if isinstance(zahlungskonditionen, str) and zahlungskonditionen.strip():
-            import re as _re
-            m = _re.search(r"(\d+)", zahlungskonditionen)
-            if m:
-                try:
-                    ziel_tage = int(m.group(1))
-                except Exception:
-                    pass
-
-        faellig_am = rechnungsdatum + timedelta(days=ziel_tage)
-        heute = datetime.today().date()
-        if heute > faellig_am:
-            return "überfällig", PASTELL_ROT
-        return "offen", PASTELL_ORANGE
+        faellig_am = rechnung_status.berechne_faellig_am(datum_str, zahlungskonditionen)
+        status = rechnung_status.berechne_status(abschluss, faellig_am)
+        return status, STATUS_FARBEN[status]
 
     def _status_aendern(self):
         """Status per Button; manuelle Auswahl �berschreibt Automatik (in DB)."""
-        zeile = self.table.currentRow()
+        zeile = self._aktuelle_zeile()
         if zeile < 0:
             QMessageBox.warning(self, _("Keine Auswahl"), _("Bitte zuerst eine Rechnung ausw�hlen."))
             return
-        rechnung_id = int(self.table.item(zeile, 0).text())
+        rechnung = self.model.rechnung(zeile)
+        rechnung_id = rechnung["id"]
 
         status, ok = themed_get_item(
             self, _("Rechnungsstatus wählen"), _("Status:"),
@@ -780,41 +500,27 @@ class RechnungenTab(QWidget):
 
         with get_db() as conn:
             with conn.cursor() as cursor:
-                cursor.execute("UPDATE rechnungen SET abschluss=%s WHERE id=%s", (status, rechnung_id))
+                cursor.execute("UPDATE rechnungen SET abschluss=%s, status=%s WHERE id=%s", (status, status, rechnung_id))
             conn.commit()
 
         # UI aktualisieren
-        datum = self.table.item(zeile, 3).text()
-        zahlk = None
-        for r in self.rechnungen:
-            if r["id"] == rechnung_id:
-                zahlk = r.get("zahlungskonditionen", "")
-                r["abschluss"] = status
-                break
-
-        status_text, farbe = self._berechne_status(datum, zahlk or "", status)
-        self.table.setItem(zeile, 5, QTableWidgetItem(status_text))
-        self._setze_zeilenfarbe(zeile, farbe)
+        rechnung["abschluss"] = status
+        status_text, _farbe = self._berechne_status(str(rechnung.get("datum") or ""), rechnung.get("zahlungskonditionen") or "", status)
+        self.model.set_status(zeile, status_text)
         QMessageBox.information(self, _("Rechnung"), _("Status ge�ndert zu: {}").format(status_text))
 
     def _zahlung_erfassen(self):
         """Zahlung f�r eine Rechnung erfassen und als Buchhaltungseintrag buchen."""
-        zeile = self.table.currentRow()
+        zeile = self._aktuelle_zeile()
         if zeile < 0:
             QMessageBox.warning(self, _("Keine Auswahl"), _("Bitte zuerst eine Rechnung ausw�hlen."))
             return
 
-        rechnung_id = int(self.table.item(zeile, 0).text())
-        rechnung_nr = self.table.item(zeile, 1).text()
-        kunde = self.table.item(zeile, 2).text()
-        betrag_text = self.table.item(zeile, 4).text()
-
-        # Betrag parsen (z.B. "1'234.56 CHF" ? 1234.56)
-        betrag_clean = betrag_text.replace("'", "").replace(" CHF", "").replace(",", ".").strip()
-        try:
-            betrag = float(betrag_clean)
-        except ValueError:
-            betrag = 0.0
+        rechnung = self.model.rechnung(zeile)
+        rechnung_id = rechnung["id"]
+        rechnung_nr = rechnung.get("rechnung_nr") or ""
+        kunde = rechnung.get("kunde") or ""
+        betrag = float(rechnung.get("brutto") or 0)
 
         dialog = ZahlungErfassenDialog(rechnung_nr, kunde, betrag, parent=self)
         if dialog.exec_() == QDialog.Accepted:
@@ -832,7 +538,7 @@ class RechnungenTab(QWidget):
                         VALUES (%s, %s, %s, %s, %s, %s)
                     """, (
                         next_id,
-                        daten["datum"],
+                        datum_iso.datum(daten["datum"]),
                         "Einnahme",
                         daten["kategorie"],
                         daten["beschreibung"],
@@ -840,22 +546,17 @@ class RechnungenTab(QWidget):
                     ))
 
                     # Rechnung als bezahlt markieren
-                    cursor.execute("UPDATE rechnungen SET abschluss=%s WHERE id=%s", ("bezahlt", rechnung_id))
+                    cursor.execute(
+                        "UPDATE rechnungen SET abschluss=%s, status=%s WHERE id=%s",
+                        ("bezahlt", rechnung_status.STATUS_BEZAHLT, rechnung_id),
+                    )
 
                 conn.commit()
 
             # UI aktualisieren
-            datum = self.table.item(zeile, 3).text()
-            zahlk = None
-            for r in self.rechnungen:
-                if r["id"] == rechnung_id:
-                    zahlk = r.get("zahlungskonditionen", "")
-                    r["abschluss"] = "bezahlt"
-                    break
-
-            status_text, farbe = self._berechne_status(datum, zahlk or "", "bezahlt")
-            self.table.setItem(zeile, 5, QTableWidgetItem(status_text))
-            self._setze_zeilenfarbe(zeile, farbe)
+            rechnung["abschluss"] = "bezahlt"
+            status_text, _farbe = self._berechne_status(str(rechnung.get("datum") or ""), rechnung.get("zahlungskonditionen") or "", "bezahlt")
+            self.model.set_status(self.model.row_of_id(rechnung_id), status_text)
 
             QMessageBox.information(
                 self, _("Zahlung erfasst"),
@@ -929,11 +630,11 @@ class RechnungenTab(QWidget):
             self.lade_rechnungen()
 
     def bearbeite_rechnung(self):
-        zeile = self.table.currentRow()
+        zeile = self._aktuelle_zeile()
         if zeile < 0:
             QMessageBox.warning(self, _("Keine Auswahl"), _("Bitte zuerst eine Rechnung ausw�hlen."))
             return
-        rechnung_id = int(self.table.item(zeile, 0).text())
+        rechnung_id = self.model.rechnung_id(zeile)
         rechnung = self.lade_rechnung_nach_id(rechnung_id)
         if not rechnung:
             QMessageBox.warning(self, _("Fehler"), _("Rechnung nicht gefunden."))
@@ -956,7 +657,7 @@ class RechnungenTab(QWidget):
         ids = []
         for idx in sel:
             try:
-                ids.append(int(self.table.item(idx.row(), 0).text()))
+                ids.append(int(self.model.rechnung_id(idx.row())))
             except Exception:
                 pass
 
@@ -974,6 +675,7 @@ class RechnungenTab(QWidget):
                     try:
                         placeholders = ','.join(['%s'] * len(ids))
                         cursor.execute(f"DELETE FROM rechnungen WHERE id IN ({placeholders})", tuple(ids))
+                        loesche_positionen(cursor, ids)
                     except Exception:
                         placeholders = ','.join(['?'] * len(ids))
                         cursor.execute(f"DELETE FROM rechnungen WHERE id IN ({placeholders})", tuple(ids))
@@ -985,95 +687,95 @@ class RechnungenTab(QWidget):
                     for rid in ids:
                         try:
                             cursor.execute("DELETE FROM rechnungen WHERE id = %s", (rid,))
+                            loesche_positionen(cursor, [rid])
                         except Exception:
                             cursor.execute("DELETE FROM rechnungen WHERE id = ?", (rid,))
                 conn.commit()
         self.lade_rechnungen()
 
     def speichere_rechnung(self, rechnung, rechnung_id=None):
-        """Rechnung in DB speichern (neu oder update)"""
-        positionen_json = json.dumps(rechnung.get("positionen", []), ensure_ascii=False)
-        if rechnung_id is not None:
-            with get_db() as conn:
-                with conn.cursor() as cursor:
+        """Rechnung in DB speichern (neu oder update), inkl. Positionen und Summen"""
+        positionen = rechnung.get("positionen", [])
+        positionen_json = json.dumps(positionen, ensure_ascii=False)
+        netto, mwst_betrag, brutto = berechne_summen(positionen, rechnung.get("mwst", 0))
+        datum = datum_iso.datum(rechnung.get("datum"))  # ValueError bei unlesbarem Datum
+        faellig_am, status = rechnung_status.werte(
+            datum, rechnung.get("zahlungskonditionen", ""), rechnung.get("abschluss", "")
+        )
+        werte = (
+            rechnung.get("rechnung_nr", ""),
+            rechnung.get("kunde", ""),
+            rechnung.get("firma", ""),
+            rechnung.get("adresse", ""),
+            datum,
+            rechnung.get("mwst", 0),
+            rechnung.get("zahlungskonditionen", ""),
+            positionen_json,
+            rechnung.get("uid", ""),
+            rechnung.get("abschluss", ""),
+            rechnung.get("abschluss_text", ""),
+            netto,
+            mwst_betrag,
+            brutto,
+            faellig_am,
+            status,
+        )
+        with get_db() as conn:
+            is_sqlite = getattr(conn, "is_sqlite", False)
+            with conn.cursor() as cursor:
+                if rechnung_id is not None:
                     cursor.execute("""
                         UPDATE rechnungen SET
                             rechnung_nr = %s, kunde = %s, firma = %s, adresse = %s, datum = %s,
-                            mwst = %s, zahlungskonditionen = %s, positionen = %s, uid = %s, abschluss = %s, abschluss_text=%s
+                            mwst = %s, zahlungskonditionen = %s, positionen = %s, uid = %s, abschluss = %s, abschluss_text=%s,
+                            netto = %s, mwst_betrag = %s, brutto = %s, faellig_am = %s, status = %s
                         WHERE id = %s
-                    """, (
-                        rechnung.get("rechnung_nr", ""),
-                        rechnung.get("kunde", ""),
-                        rechnung.get("firma", ""),
-                        rechnung.get("adresse", ""),
-                        rechnung.get("datum", ""),
-                        rechnung.get("mwst", 0),
-                        rechnung.get("zahlungskonditionen", ""),
-                        positionen_json,
-                        rechnung.get("uid", ""),
-                        rechnung.get("abschluss", ""),
-                        rechnung.get("abschluss_text", ""),
-                        rechnung_id
-                    ))
-                conn.commit()
-        else:
-            with get_db() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute("""
+                    """, werte + (rechnung_id,))
+                else:
+                    sql = """
                         INSERT INTO rechnungen (
                             rechnung_nr, kunde, firma, adresse, datum,
-                            mwst, zahlungskonditionen, positionen, uid, abschluss, abschluss_text
-                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                        rechnung.get("rechnung_nr", ""),
-                        rechnung.get("kunde", ""),
-                        rechnung.get("firma", ""),
-                        rechnung.get("adresse", ""),
-                        rechnung.get("datum", ""),
-                        rechnung.get("mwst", 0),
-                        rechnung.get("zahlungskonditionen", ""),
-                        positionen_json,
-                        rechnung.get("uid", ""),
-                        rechnung.get("abschluss", ""),
-                        rechnung.get("abschluss_text", ""),
-                    ))
-                conn.commit()
+                            mwst, zahlungskonditionen, positionen, uid, abschluss, abschluss_text,
+                            netto, mwst_betrag, brutto, faellig_am, status
+                        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """
+                    if is_sqlite:
+                        cursor.execute(sql, werte)
+                        rechnung_id = cursor.lastrowid
+                    else:
+                        cursor.execute(sql + " RETURNING id", werte)
+                        rechnung_id = cursor.fetchone()[0]
+                speichere_positionen(cursor, rechnung_id, positionen, rechnung.get("mwst", 0))
+            conn.commit()
+        return rechnung_id
 
     # ---------------- Helpers ----------------
 
     def lade_rechnung_nach_id(self, rechnung_id):
         for rechnung in self.rechnungen:
             if rechnung["id"] == rechnung_id:
+                # Positionen werden erst hier aus dem JSON gelesen (Liste braucht nur brutto)
+                if not isinstance(rechnung.get("positionen"), list):
+                    rechnung["positionen"] = parse_positionen(rechnung.get("positionen"))
                 return rechnung
         return None
 
     # ---------------- PDF Export / Vorschau ----------------
 
     def exportiere_ausgewaehlte_rechnung(self):
-        zeile = self.table.currentRow()
+        zeile = self._aktuelle_zeile()
         if zeile < 0:
             QMessageBox.warning(self, _("Keine Auswahl"), _("Bitte zuerst eine Rechnung ausw�hlen."))
             return
-        rechnung_id = int(self.table.item(zeile, 0).text())
+        rechnung_id = self.model.rechnung_id(zeile)
         rechnung = self.lade_rechnung_nach_id(rechnung_id)
         if not rechnung:
             QMessageBox.warning(self, _("Fehler"), _("Rechnung nicht gefunden."))
             return
 
         # Vorschlag: Rechnung_{nummer}-{kunde}.pdf (Kundenname bereinigt)
-        def _make_filename(r):
-            nr = r.get('rechnung_nr', '')
-            kunde = r.get('kunde') or r.get('firma') or ''
-            # Entferne f�r Dateinamen problematische Zeichen und ersetze Leerzeichen durch Unterstrich
-            kunde_clean = re.sub(r'[<>:"/\\|\?\*\n\r\t]', '', str(kunde)).strip()
-            # Ersetze mehrere Whitespace-Zeichen durch ein einzelnes Leerzeichen
-            kunde_clean = re.sub(r'\s+', ' ', kunde_clean)
-            base = f"Rechnung_{nr}"
-            if kunde_clean:
-                base = f"{base}-{kunde_clean}"
-            return f"{base}.pdf"
-
-        pfad, _filter = QFileDialog.getSaveFileName(self, "PDF speichern", _make_filename(rechnung), "PDF-Dateien (*.pdf)")
+        from rechnung_batch import dateiname
+        pfad, _filter = QFileDialog.getSaveFileName(self, "PDF speichern", dateiname(rechnung), "PDF-Dateien (*.pdf)")
         if pfad:
             try:
                 self._exportiere_pdf(rechnung, pfad, logo_skala=self.layout_config.get("logo_skala", 100))
@@ -1081,13 +783,26 @@ class RechnungenTab(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, _("Fehler"), _("Fehler beim PDF Export:\n{}").format(str(e)))
 
+    def exportiere_pdf_stapel(self):
+        """Mehrere Rechnungen (Markierung, Zeitraum, Status) als PDF-Ordner oder ZIP."""
+        from gui.pdf_batch_dialog import PdfBatchDialog
+        ids = []
+        try:
+            for index in self.table.selectionModel().selectedRows():
+                rechnung_id = self.model.rechnung_id(index.row())
+                if rechnung_id is not None:
+                    ids.append(rechnung_id)
+        except Exception:
+            pass
+        PdfBatchDialog(ids, self).exec_()
+
     def vorschau_ausgewaehlte_rechnung(self):
-        zeile = self.table.currentRow()
+        zeile = self._aktuelle_zeile()
         if zeile < 0:
             QMessageBox.warning(self, _("Keine Auswahl"), _("Bitte zuerst eine Rechnung ausw�hlen."))
             return
 
-        rechnung_id = int(self.table.item(zeile, 0).text())
+        rechnung_id = self.model.rechnung_id(zeile)
         rechnung = self.lade_rechnung_nach_id(rechnung_id)
         if not rechnung:
             QMessageBox.warning(self, _("Fehler"), _("Rechnung nicht gefunden."))
@@ -1110,6 +825,8 @@ class RechnungenTab(QWidget):
 
     def _zeichne_kopf_design(self, c, width, height, stil, design_typ):
         """Zeichnet dekorative Kopfbereich-Elemente basierend auf dem Stil."""
+        from reportlab.lib import colors
+        from reportlab.lib.units import mm
         kopf_farbe = stil.get("kopf_farbe", stil.get("akzent_farbe", colors.Color(0.2, 0.2, 0.2)))
         kopf_farbe2 = stil.get("kopf_farbe2", kopf_farbe)
         kopf_akzent = stil.get("kopf_akzent", stil.get("akzent_farbe2", kopf_farbe))
@@ -1252,12 +969,40 @@ class RechnungenTab(QWidget):
             path.close()
             c.drawPath(path, fill=True, stroke=False)
 
-    def _exportiere_pdf(self, rechnung, dateipfad, logo_skala=1.0):
+    def _exportiere_pdf(self, rechnung, dateipfad, logo_skala=1.0, layout_laden=True):
+        import pdf_cache
+
         # Layout frisch laden, damit Vorschau das aktuelle Logo nutzt
+        # (der Stapel-Export lädt es einmal pro Worker, layout_laden=False)
+        if layout_laden:
+            try:
+                self._lade_rechnungslayout()
+            except Exception:
+                pass
+        # Gleiche Rechnung mit gleichem Layout/QR-Daten -> PDF aus dem Cache
         try:
-            self._lade_rechnungslayout()
-        except Exception:
-            pass
+            key = pdf_cache.schluessel(rechnung, self.layout_config,
+                                       logo_skala=logo_skala, mwst=self.mwst)
+        except Exception as e:
+            print(f"[DBG] pdf_cache: kein Schlüssel: {e}", flush=True)
+            key = None
+        if key and pdf_cache.kopiere(key, dateipfad):
+            return
+        vollstaendig = self._rendere_pdf(rechnung, dateipfad, logo_skala)
+        # PDF ohne QR-Zahlteil nicht cachen, sonst bleibt es auch nach der Behebung
+        if key and vollstaendig:
+            pdf_cache.ablegen(key, dateipfad)
+
+    def _rendere_pdf(self, rechnung, dateipfad, logo_skala=1.0) -> bool:
+        """Rendert die Rechnung nach dateipfad. False, wenn der QR-Zahlteil fehlt."""
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+        from reportlab.lib.utils import ImageReader
+        from reportlab.pdfgen import canvas
+        from reportlab.platypus import Table, TableStyle
+        from gui.rechnung_styles import get_stil
+
         c = canvas.Canvas(dateipfad, pagesize=A4)
         width, height = A4
         
@@ -1580,13 +1325,14 @@ class RechnungenTab(QWidget):
 
         # QR-Code Seite
         c.showPage()
-        self.zeichne_swiss_qr(c, rechnung, gesamtbetrag_brutto)
+        qr_ok = self.zeichne_swiss_qr(c, rechnung, gesamtbetrag_brutto)
 
         c.showPage()
         c.save()
+        return qr_ok
 
-    def zeichne_swiss_qr(self, canvas_obj, rechnung, betrag):
-        """Generiert einen Swiss QR-Code und platziert ihn im PDF (via qrbill)."""
+    def zeichne_swiss_qr(self, canvas_obj, rechnung, betrag) -> bool:
+        """Generiert einen Swiss QR-Code und platziert ihn im PDF (via qrbill). False, wenn er fehlt."""
         try:
             qr_data = _get_qr_daten()
             creditor = qr_data.get("creditor") or {
@@ -1633,7 +1379,7 @@ class RechnungenTab(QWidget):
             except Exception:
                 # Falls QMessageBox in diesem Kontext Probleme macht, nur Log
                 print("qrbill fehlt:", e)
-            return
+            return False
         amount = Decimal(str(betrag)) if betrag is not None else Decimal("0")
 
         my_bill = QRBill(
@@ -1645,57 +1391,35 @@ class RechnungenTab(QWidget):
             language='de'
         )
 
-        # SVG generieren und ins PDF einfügen (Textmodus für svgwrite)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".svg", mode="w", encoding="utf-8") as tmp_svg:
+        # Zahlteil direkt auf den Canvas (qr_zahlteil), ohne SVG-Umweg über eine Temp-Datei
+        import qr_zahlteil
+        from reportlab.lib.units import mm
+
+        try:
+            payload = my_bill.qr_data()
+        except Exception as e:
             try:
-                my_bill.as_svg(tmp_svg)
-            except Exception as e:
-                try:
-                    QMessageBox.warning(self, _("Fehler"), _("Fehler beim Erstellen des QR-Code SVG: {}").format(str(e)))
-                except Exception:
-                    print(_("Fehler beim Erstellen des QR-Code SVG:"), e)
-                return
-            tmp_svg_path = tmp_svg.name
+                QMessageBox.warning(self, _("Fehler"), _("Fehler beim Erstellen des QR-Code SVG: {}").format(str(e)))
+            except Exception:
+                print(_("Fehler beim Erstellen des QR-Code SVG:"), e)
+            return False
 
-        drawing = svg2rlg(tmp_svg_path)
-        x = 20 * mm
-        y = -5 * mm
-        w = 180 * mm
-        h = 90 * mm
+        # gleiche Platzierung wie bisher: 210 x 105 mm auf 180 x 90 mm verkleinert
         canvas_obj.saveState()
-        canvas_obj.translate(x, y)
-        canvas_obj.scale(w / drawing.width, h / drawing.height)
-        renderPDF.draw(drawing, canvas_obj, 0, 0)
+        canvas_obj.translate(20 * mm, -5 * mm)
+        canvas_obj.scale(180 / qr_zahlteil.BREITE, 90 / qr_zahlteil.HOEHE)
+        qr_zahlteil.zeichne(canvas_obj, payload, iban, creditor, currency, amount, debtor)
         canvas_obj.restoreState()
-
-        try:
-            os.remove(tmp_svg_path)
-        except Exception:
-            pass
+        return True
 
      # ---------------- Async UI helpers (moved inside class) ----------------
     def get_row_id(self, row_index) -> int | None:
         """Return numeric ID for given row or None if not found."""
+        rechnung_id = self.model.rechnung_id(row_index)
         try:
-            if row_index < 0 or row_index >= self.table.rowCount():
-                return None
-            it = self.table.item(row_index, 0)
-            if it is not None:
-                d = it.data(Qt.UserRole)
-                if isinstance(d, int):
-                    return d
-                txt = (it.text() or "").strip()
-                if txt.lstrip("-").isdigit():
-                    return int(txt)
-            for c in range(self.table.columnCount()):
-                it = self.table.item(row_index, c)
-                if it:
-                    txt = (it.text() or "").strip()
-                    if txt.lstrip("-").isdigit():
-                        return int(txt)
+            return int(rechnung_id) if rechnung_id is not None else None
         except Exception:
-            pass
-        return None
+            return None
 
     def append_rows(self, rows):
         """Append a chunk of rows (dicts or sequences) into the Rechnungen table (newest first)."""
@@ -1711,121 +1435,58 @@ class RechnungenTab(QWidget):
             except Exception:
                 pass
 
-            expected_cols = ["id", "rechnung_nr", "kunde", "firma", "adresse", "datum", "mwst",
-                             "zahlungskonditionen", "positionen", "uid", "abschluss", "abschluss_text"]
-
-            if self.table.columnCount() == 0:
-                try:
-                    self._setup_table()
-                    header = self.table.horizontalHeader()
-                    header.setSectionResizeMode(2, QHeaderView.Stretch)
-                except Exception:
-                    pass
-
-            try:
-                self.table.setSortingEnabled(False)
-                self.table.setUpdatesEnabled(False)
-            except Exception:
-                pass
+            expected_cols = self.LOADER_COLUMNS
 
+            neue = []
             # insert newest-first: loader expected to deliver ORDER BY datum DESC
             for r in reversed(rows):
                 if isinstance(r, dict):
                     values = [r.get(c, "") for c in expected_cols]
                 else:
                     seq = list(r)
-                    if len(seq) >= len(expected_cols):
-                        values = seq[:len(expected_cols)]
-                    else:
-                        while len(seq) < len(expected_cols):
-                            seq.append("")
-                        values = seq[:len(expected_cols)]
+                    while len(seq) < len(expected_cols):
+                        seq.append("")
+                    values = seq[:len(expected_cols)]
 
-                id_val = values[0]
                 try:
-                    numeric_id = int(id_val)
+                    numeric_id = int(values[0])
                 except Exception:
                     numeric_id = None
-                if numeric_id is not None and numeric_id in getattr(self, "_known_invoice_ids", set()):
+                if numeric_id is not None and numeric_id in self._known_invoice_ids:
                     continue
 
-                # insert a new top row
-                try:
-                    self.table.insertRow(0)
-                    insert_index = 0
-                except Exception:
-                    start = self.table.rowCount()
-                    self.table.setRowCount(start + 1)
-                    insert_index = start
-
-                id_text = "" if id_val is None else str(id_val)
-                item_id = QTableWidgetItem(id_text)
-                try:
-                    if isinstance(id_val, int) or (isinstance(id_val, str) and id_text.lstrip("-").isdigit()):
-                        item_id.setData(Qt.UserRole, int(id_text))
-                except Exception:
-                    pass
-                self.table.setItem(insert_index, 0, item_id)
-
-                # --- KORREKTUR: Spalten korrekt bef�llen ---
-                try:
-                    # Spalten 1-3: Rechnungs-Nr, Kunde, Datum
-                    self.table.setItem(insert_index, 1, QTableWidgetItem(str(values[1] or "")))
-                    self.table.setItem(insert_index, 2, QTableWidgetItem(str(values[2] or "")))
-                    self.table.setItem(insert_index, 3, QTableWidgetItem(str(values[5] or "")))
-
-                    # Spalte 4: Gesamtsumme berechnen
-                    positionen = json.loads(values[8]) if isinstance(values[8], str) and values[8] else (values[8] if isinstance(values[8], list) else [])
-                    mwst_prozent = float(values[6] or 0)
-                    gesamtbetrag_netto = sum(float(pos.get("menge", 0)) * float(pos.get("einzelpreis", 0)) for pos in positionen)
-                    mwst_betrag = gesamtbetrag_netto * mwst_prozent / 100.0
-                    gesamtbetrag_brutto = gesamtbetrag_netto + mwst_betrag
-                    # --- KORREKTUR: Item erstellen und zentrieren ---
-                    item_summe = QTableWidgetItem(f"{gesamtbetrag_brutto:.2f} CHF")
-                    item_summe.setTextAlignment(Qt.AlignCenter)
-                    self.table.setItem(insert_index, 4, item_summe)
-
-                    # Spalte 5: Status und Farbe
-                    status_text, farbe = self._berechne_status(str(values[5] or ""), values[7] or "", values[10] or "")
-                    self.table.setItem(insert_index, 5, QTableWidgetItem(status_text))
-                    self._setze_zeilenfarbe(insert_index, farbe)
-                except Exception:
-                    pass
-
-                # --- ENTFERNT: Alter, fehlerhafter Codeblock ---
-
-                # keep internal cache consistent (prepend)
                 try:
-                    rec = {
+                    brutto = values[12]
+                    if brutto in (None, ""):
+                        brutto = berechne_summen(parse_positionen(values[8]), values[6])[2]
+                    status_text = values[14]
+                    if not status_text:
+                        status_text, _farbe = self._berechne_status(str(values[5] or ""), values[7] or "", values[10] or "")
+                    neue.append({
                         "id": values[0],
-                        "rechnung_nr": values[1],
-                        "kunde": values[2],
-                        "firma": values[3],
-                        "adresse": values[4],
-                        "datum": values[5],
+                        "rechnung_nr": values[1] or "",
+                        "kunde": values[2] or "",
+                        "firma": values[3] or "",
+                        "adresse": values[4] or "",
+                        "datum": values[5] or "",
                         "mwst": values[6],
-                        "zahlungskonditionen": values[7],
-                        "positionen": json.loads(values[8]) if isinstance(values[8], str) and values[8] else (values[8] if isinstance(values[8], list) else []),
-                        "uid": values[9],
-                        "abschluss": values[10],
-                        "abschluss_text": values[11] if len(values) > 11 else ""
-                    }
-                except Exception:
-                    rec = {}
-                try:
-                    self.rechnungen.insert(0, rec)
+                        "zahlungskonditionen": values[7] or "",
+                        "positionen": values[8],
+                        "uid": values[9] or "",
+                        "abschluss": values[10] or "",
+                        "abschluss_text": values[11] or "",
+                        "faellig_am": str(values[13] or ""),
+                        "status": status_text,
+                        "brutto": float(brutto),
+                    })
                 except Exception:
-                    self.rechnungen = [rec] + getattr(self, "rechnungen", [])
+                    continue
+                if numeric_id is not None:
+                    self._known_invoice_ids.add(numeric_id)
 
-            # restore updates and one resize
-                    if numeric_id is not None:
-                        self._known_invoice_ids.add(numeric_id)
-            try:
-                self.table.setUpdatesEnabled(True)
-                self.table.setSortingEnabled(True)
-                self.table.resizeColumnsToContents()
-            except Exception:
-                pass
+            # reversed() oben: die neueste Rechnung steht danach ganz oben
+            self.model.prepend(reversed(neue))
+            self.rechnungen = self.model.rechnungen()
 
         except Exception as e:
             print(f"[DBG] RechnungenTab.append_rows error: {e}", flush=True)
@@ -1833,7 +1494,7 @@ class RechnungenTab(QWidget):
     def load_finished(self):
         """Called when loader finished. Show 'Keine Rechnungen' if empty."""
         try:
-            if self.table.rowCount() == 0:
+            if self.model.rowCount() == 0:
                 try:
                     if hasattr(self, "_loading_label") and self._loading_label:
                         self._loading_label.setText(_("Keine Rechnungen"))
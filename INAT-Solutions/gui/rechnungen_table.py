@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""
+Modell und Delegates für die Rechnungsliste.
+
+Statt pro Zeile zwei QWidgets (Status-Badge, Aktions-Buttons mit vier
+QToolButtons) in die Tabelle zu setzen, hält RechnungenModel nur die Daten;
+StatusBadgeDelegate und ActionButtonsDelegate zeichnen Badge und Buttons beim
+Paint der sichtbaren Zeilen und werten Maus-Hover/-Klicks selbst aus.
+Fonts, Farben und Icons werden einmal erzeugt und für alle Zeilen geteilt.
+"""
+import os
+from datetime import datetime
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, QRect, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QFontMetrics
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem, QStyle, QApplication, QToolTip
+
+from gui.modern_widgets import COLORS, FONT_SIZES, SPACING, BORDER_RADIUS, create_gray_icon
+from i18n import _
+
+COL_ID, COL_NUMMER, COL_KUNDE, COL_DATUM, COL_BETRAG, COL_STATUS, COL_AKTIONEN = range(7)
+
+# (Aktion, Icon-Datei, Tooltip) in Anzeigereihenfolge
+AKTIONEN = (
+    ("vorschau", "preview.svg", "Vorschau"),
+    ("export", "download.svg", "PDF exportieren"),
+    ("zahlung", "payment.svg", "Zahlung erfassen"),
+    ("loeschen", "delete.svg", "Löschen"),
+)
+
+_ICONS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "icons")
+
+
+def format_datum(datum) -> str:
+    """'YYYY-MM-DD' -> 'DD.MM.YYYY', andere Werte unverändert."""
+    text = str(datum or "")
+    if "-" in text:
+        try:
+            return datetime.strptime(text, "%Y-%m-%d").strftime("%d.%m.%Y")
+        except Exception:
+            pass
+    return text
+
+
+def format_betrag(betrag) -> str:
+    return f"CHF {float(betrag or 0):,.2f}".replace(",", "'")
+
+
+class RechnungenModel(QAbstractTableModel):
+    """
+    Rechnungen als Liste von dicts (Schlüssel wie RechnungenTab.rechnungen,
+    zusätzlich "brutto" und "status"). Texte werden erst in data() formatiert.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._headers = [_("ID"), _("Nummer"), _("Kunde"), _("Datum"), _("Betrag"), _("Status"), _("Aktionen")]
+        font = QFont()
+        font.setPointSize(FONT_SIZES['table_cell'])
+        bold = QFont(font)
+        bold.setWeight(QFont.DemiBold)
+        self._fonts = {COL_NUMMER: bold, COL_BETRAG: bold}
+        self._font = font
+        self._farben = {
+            COL_NUMMER: QColor(COLORS['primary']),
+            COL_KUNDE: QColor(COLORS['text_primary']),
+            COL_DATUM: QColor(COLORS['text_secondary']),
+            COL_BETRAG: QColor(COLORS['text_primary']),
+        }
+
+    # ---------- Daten ----------
+    def set_rechnungen(self, rows) -> None:
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def prepend(self, rows) -> None:
+        rows = list(rows)
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+        self._rows[0:0] = rows
+        self.endInsertRows()
+
+    def rechnungen(self):
+        return self._rows
+
+    def rechnung(self, row):
+        if 0 <= row < len(self._rows):
+            return self._rows[row]
+        return None
+
+    def rechnung_id(self, row):
+        rec = self.rechnung(row)
+        return rec.get("id") if rec else None
+
+    def row_of_id(self, rechnung_id) -> int:
+        for i, rec in enumerate(self._rows):
+            if rec.get("id") == rechnung_id:
+                return i
+        return -1
+
+    def set_status(self, row, status_text) -> None:
+        rec = self.rechnung(row)
+        if rec is None:
+            return
+        rec["status"] = status_text
+        idx = self.index(row, COL_STATUS)
+        self.dataChanged.emit(idx, idx)
+
+    def text(self, row, col) -> str:
+        rec = self._rows[row]
+        if col == COL_ID:
+            return str(rec.get("id", ""))
+        if col == COL_NUMMER:
+            return rec.get("rechnung_nr") or ""
+        if col == COL_KUNDE:
+            return rec.get("kunde") or ""
+        if col == COL_DATUM:
+            return format_datum(rec.get("datum"))
+        if col == COL_BETRAG:
+            return format_betrag(rec.get("brutto"))
+        if col == COL_STATUS:
+            return (rec.get("status") or "").capitalize()
+        return ""
+
+    # ---------- Qt-Modell ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and 0 <= section < len(self._headers):
+            return self._headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        col = index.column()
+        if role == Qt.DisplayRole:
+            return self.text(index.row(), col)
+        if role == Qt.ForegroundRole:
+            return self._farben.get(col)
+        if role == Qt.FontRole:
+            return self._fonts.get(col, self._font)
+        if role == Qt.UserRole:
+            return self._rows[index.row()].get("id")
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column < 0 or column == COL_AKTIONEN:
+            return
+        if column == COL_NUMMER:
+            def key(rec):
+                digits = "".join(ch for ch in str(rec.get("rechnung_nr") or "") if ch.isdigit())
+                return int(digits) if digits else -1
+        elif column == COL_DATUM:
+            key = lambda rec: str(rec.get("datum") or "")
+        elif column == COL_BETRAG:
+            key = lambda rec: float(rec.get("brutto") or 0)
+        elif column == COL_ID:
+            key = lambda rec: int(rec.get("id") or 0)
+        elif column == COL_KUNDE:
+            key = lambda rec: (rec.get("kunde") or "").lower()
+        else:
+            key = lambda rec: rec.get("status") or ""
+        self.layoutAboutToBeChanged.emit()
+        self._rows.sort(key=key, reverse=order == Qt.DescendingOrder)
+        self.layoutChanged.emit()
+
+
+class StatusBadgeDelegate(QStyledItemDelegate):
+    """Zeichnet den Status als farbige Pille (wie das frühere QLabel-Badge)."""
+
+    _STILE = {
+        "bezahlt": ("success_light", "success_text"),
+        "überfällig": ("danger_light", "danger_text"),
+        "offen": ("warning_light", "warning_text"),
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._farben = {
+            status: (QColor(COLORS[bg]), QColor(COLORS[fg]))
+            for status, (bg, fg) in self._STILE.items()
+        }
+        self._font = None
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        text = opt.text
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+        if not text:
+            return
+
+        if self._font is None:
+            self._font = QFont(option.font)
+            self._font.setPixelSize(FONT_SIZES['badge'])
+            self._font.setWeight(QFont.DemiBold)
+        fm = QFontMetrics(self._font)
+        bg, fg = self._farben.get(text.lower(), self._farben["offen"])
+        breite = fm.horizontalAdvance(text) + 28     # padding 14px links/rechts
+        hoehe = fm.height() + 12                    # padding 6px oben/unten
+        rect = QRect(option.rect.left() + SPACING['xs'],
+                     option.rect.center().y() - hoehe // 2 + 1,
+                     min(breite, option.rect.width() - SPACING['xs']), hoehe)
+
+        painter.save()
+        painter.setRenderHint(painter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(bg)
+        radius = min(BORDER_RADIUS['lg'], hoehe / 2)
+        painter.drawRoundedRect(rect, radius, radius)
+        painter.setFont(self._font)
+        painter.setPen(fg)
+        painter.drawText(rect, Qt.AlignCenter, text)
+        painter.restore()
+
+
+class ActionButtonsDelegate(QStyledItemDelegate):
+    """
+    Zeichnet die Aktions-Buttons einer Zeile und löst bei Klick
+    action_triggered(aktion, rechnung_id) aus. Hover/Pressed-Zustand und
+    Hand-Cursor wie bei den früheren QToolButtons (get_toolbar_button_stylesheet).
+    """
+
+    action_triggered = pyqtSignal(str, object)
+
+    def __init__(self, view, column=COL_AKTIONEN):
+        super().__init__(view)
+        self._view = view
+        self._column = column
+        self._icons = None
+        self._hover = None       # (row, button)
+        self._pressed = None     # (row, button)
+        self._hover_farbe = QColor(COLORS['hover'])
+        self._pressed_farbe = QColor(COLORS['selection'])
+        view.setMouseTracking(True)
+        view.viewport().installEventFilter(self)
+
+    def _icon(self, i):
+        if self._icons is None:
+            self._icons = [create_gray_icon(os.path.join(_ICONS_PATH, datei)) for _a, datei, _t in AKTIONEN]
+        return self._icons[i]
+
+    def _button_rects(self, cell: QRect):
+        size = FONT_SIZES['btn_medium']
+        x = cell.left() + 4
+        y = cell.center().y() - size // 2 + 1
+        rects = []
+        for _i in AKTIONEN:
+            rects.append(QRect(x, y, size, size))
+            x += size + 8
+        return rects
+
+    def _button_at(self, cell: QRect, pos):
+        for i, rect in enumerate(self._button_rects(cell)):
+            if rect.contains(pos):
+                return i
+        return None
+
+    def _update_cell(self, state):
+        if state is not None:
+            self._view.viewport().update(self._view.visualRect(self._view.model().index(state[0], self._column)))
+
+    def _set_hover(self, state):
+        if state == self._hover:
+            return
+        alt, self._hover = self._hover, state
+        self._update_cell(alt)
+        self._update_cell(state)
+        if state is None:
+            self._view.viewport().unsetCursor()
+        else:
+            self._view.viewport().setCursor(Qt.PointingHandCursor)
+
+    def eventFilter(self, obj, event):
+        typ = event.type()
+        if typ == QEvent.MouseMove:
+            index = self._view.indexAt(event.pos())
+            state = None
+            if index.isValid() and index.column() == self._column:
+                btn = self._button_at(self._view.visualRect(index), event.pos())
+                if btn is not None:
+                    state = (index.row(), btn)
+            self._set_hover(state)
+        elif typ == QEvent.Leave:
+            self._set_hover(None)
+        return False
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+
+        icon_size = FONT_SIZES['icon_medium']
+        painter.save()
+        painter.setRenderHint(painter.Antialiasing)
+        for i, rect in enumerate(self._button_rects(option.rect)):
+            state = (index.row(), i)
+            if state == self._pressed or state == self._hover:
+                painter.setPen(Qt.NoPen)
+                painter.setBrush(self._pressed_farbe if state == self._pressed else self._hover_farbe)
+                painter.drawRoundedRect(rect, BORDER_RADIUS['sm'], BORDER_RADIUS['sm'])
+            icon_rect = QRect(0, 0, icon_size, icon_size)
+            icon_rect.moveCenter(rect.center())
+            self._icon(i).paint(painter, icon_rect)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        typ = event.type()
+        if typ not in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease, QEvent.MouseButtonDblClick):
+            return False
+        if event.button() != Qt.LeftButton:
+            return False
+        btn = self._button_at(option.rect, event.pos())
+        if typ == QEvent.MouseButtonPress:
+            self._pressed = (index.row(), btn) if btn is not None else None
+            self._update_cell(self._pressed)
+            return btn is not None
+        if typ == QEvent.MouseButtonRelease:
+            pressed, self._pressed = self._pressed, None
+            self._update_cell(pressed)
+            if btn is not None and pressed == (index.row(), btn):
+                self.action_triggered.emit(AKTIONEN[btn][0], index.data(Qt.UserRole))
+            return btn is not None
+        # Doppelklick auf einen Button nicht als "Rechnung bearbeiten" werten
+        return btn is not None
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QEvent.ToolTip:
+            btn = self._button_at(option.rect, event.pos())
+            if btn is not None:
+                QToolTip.showText(event.globalPos(), _(AKTIONEN[btn][2]), view)
+                return True
+            QToolTip.hideText()
+            return True
+        return super().helpEvent(event, view, option, index)
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        breite = 4 + len(AKTIONEN) * (FONT_SIZES['btn_medium'] + 8)
+        size.setWidth(max(size.width(), breite))
+        size.setHeight(max(size.height(), FONT_SIZES['btn_medium']))
+        return size
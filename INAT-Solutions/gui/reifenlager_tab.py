@@ -1,25 +1,44 @@
 ﻿from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
-    QTableWidgetItem, QDialog, QMessageBox
+    QWidget, QVBoxLayout, QHBoxLayout, QDialog, QMessageBox
 )
 from db_connection import get_db, dict_cursor_factory
-import sqlite3
+import datum_iso
 import datetime
 from PyQt5.QtGui import QColor
-from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QLabel, QHBoxLayout
-from PyQt5.QtGui import QPixmap, QPainter, QColor
 from PyQt5.QtWidgets import QToolButton
+from gui.data_grid import DataGrid, GridColumn, SqlTableModel
 from i18n import _
 
 
 class ReifenlagerTab(QWidget):
     def __init__(self):
         super().__init__()
-        self.table = QTableWidget()
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        # klassisches Verhalten: Shift/Ctrl für Mehrfachauswahl
-        self.table.setSelectionMode(QTableWidget.ExtendedSelection)
+        self.model = SqlTableModel(
+            "reifenlager",
+            [
+                GridColumn("reifen_id", _("ID"), width=40, hidden=True, nullable=False),
+                GridColumn("kundennr", _("Kundennr"), width=80, numeric=True),
+                GridColumn("kunde_anzeige", _("Kunde"), width=250),
+                GridColumn("fahrzeug", _("Fahrzeug"), width=130),
+                GridColumn("dimension", _("Dimension"), width=90),
+                GridColumn("typ", _("Typ"), width=80),
+                GridColumn("dot", _("DOT"), width=80),
+                GridColumn("lagerort", _("Lagerort"), width=120),
+                GridColumn("eingelagert_am", _("Eingelagert"), width=125,
+                           sort_expr="COALESCE(CAST(eingelagert_am AS TEXT), '')"),
+                GridColumn("ausgelagert_am", _("Ausgelagert"), width=125,
+                           sort_expr="COALESCE(CAST(ausgelagert_am AS TEXT), '')"),
+                GridColumn("preis", _("Preis"), width=100, numeric=True),
+                GridColumn("waehrung", _("Währung"), width=80),
+                GridColumn("bemerkung", _("Bemerkung"), width=170),
+            ],
+            key="reifen_id", order_by="dimension",
+            suchindex="reifenlager",
+            background=lambda rec: self._berechne_dot_farbe(rec.get("dot")),
+        )
+        # klassisches Verhalten: Shift/Ctrl für Mehrfachauswahl (DataGrid-Default)
+        self.table = DataGrid(self.model)
 
         self.lade_reifen()
 
@@ -67,134 +86,8 @@ class ReifenlagerTab(QWidget):
     
 
     def lade_reifen(self):
-        conn = get_db()
-        cursor = conn.cursor(cursor_factory=dict_cursor_factory(conn))
-        # create table with DB-appropriate id type (auto-incrementing primary key)
-        try:
-            is_sqlite = getattr(conn, "is_sqlite", False) or getattr(conn, "is_sqlite_conn", False)
-        except Exception:
-            is_sqlite = False
-        if is_sqlite:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS reifenlager (
-                    reifen_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    kundennr INTEGER,
-                    kunde_anzeige TEXT,
-                    fahrzeug TEXT,
-                    dimension TEXT,
-                    typ TEXT,
-                    dot TEXT,
-                    lagerort TEXT,
-                    eingelagert_am TEXT,
-                    ausgelagert_am TEXT,
-                    preis REAL,
-                    waehrung TEXT DEFAULT 'CHF',
-                    bemerkung TEXT
-                )
-            """)
-        else:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS reifenlager (
-                    reifen_id BIGSERIAL PRIMARY KEY,
-                    kundennr INTEGER,
-                    kunde_anzeige TEXT,
-                    fahrzeug TEXT,
-                    dimension TEXT,
-                    typ TEXT,
-                    dot TEXT,
-                    lagerort TEXT,
-                    eingelagert_am TEXT,
-                    ausgelagert_am TEXT,
-                    preis NUMERIC(10,2),
-                    waehrung TEXT DEFAULT 'CHF',
-                    bemerkung TEXT
-                )
-            """)
-        # Explizite Spalten in der gewünschten Reihenfolge (13 Spalten für die Tabelle)
-        cursor.execute("""
-            SELECT reifen_id, kundennr, kunde_anzeige, fahrzeug, dimension, typ, dot, lagerort, eingelagert_am, ausgelagert_am, preis, waehrung, bemerkung
-            FROM reifenlager ORDER BY dimension
-        """)
-        daten = cursor.fetchall()
-
-        self.table.setRowCount(len(daten))
-        self.table.setColumnCount(13)
-        self.table.setHorizontalHeaderLabels([_("ID"), _("Kundennr"), _("Kunde"), _("Fahrzeug"), _("Dimension"), _("Typ"), _("DOT"), _("Lagerort"), _("Eingelagert"), _("Ausgelagert"), _("Preis"), _("Währung"), _("Bemerkung")])
-        self.table.setColumnHidden(0, True)  # ID-Spalte verstecken
-        
-        for row_idx, row in enumerate(daten):
-            # Reihe als dict oder Sequence behandeln und Werte in festgelegter Reihenfolge holen
-            if isinstance(row, dict):
-                vals = [
-                    row.get("reifen_id"),
-                    row.get("kundennr"),
-                    row.get("kunde_anzeige"),
-                    row.get("fahrzeug"),
-                    row.get("dimension"),
-                    row.get("typ"),
-                    row.get("dot"),
-                    row.get("lagerort"),
-                    row.get("eingelagert_am"),
-                    row.get("ausgelagert_am"),
-                    row.get("preis"),
-                    row.get("waehrung"),
-                    row.get("bemerkung"),
-                ]
-            else:
-                # Sequence / sqlite3.Row
-                vals = [row[i] for i in range(13)]
-
-            # --- DOT-Logik für Farbe ---
-            dot_jahr = None
-            dot_wert = "" if vals[6] is None else str(vals[6]).strip()  # DOT ist Index 6
-            # DOT als Jahr oder als KW/Jahr
-            if len(dot_wert) == 4 and dot_wert.isdigit():
-                if dot_wert.startswith("19") or dot_wert.startswith("20"):
-                    dot_jahr = int(dot_wert)
-                else:
-                    # falls Format wie "KW/YY" erwartet wird, hier ggf. anpassen
-                    try:
-                        dot_jahr = 2000 + int(dot_wert[2:])
-                    except Exception:
-                        dot_jahr = None
-
-            zeilenfarbe = QColor(230, 255, 230)  # #e6ffe6 green
-            if dot_jahr:
-                aktuelles_jahr = datetime.datetime.now().year
-                alter = aktuelles_jahr - dot_jahr
-                if alter >= 6:
-                    zeilenfarbe = QColor(255, 230, 230)  # #ffe6e6 red
-                elif alter >= 5:
-                    zeilenfarbe = QColor(255, 230, 179)  # #ffe6b3 orange
-
-            for col_idx, value in enumerate(vals):
-                txt = "" if value is None else str(value)
-                item = QTableWidgetItem(txt)
-                item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
-                item.setBackground(zeilenfarbe)
-                self.table.setItem(row_idx, col_idx, item)
-
-                
-        #Alle Spaltenbreiten 
-        self.table.setColumnWidth(0, 40)    # ID
-        self.table.setColumnWidth(1, 80)    # Kundennr
-        self.table.setColumnWidth(2, 250)   # Kunde
-        self.table.setColumnWidth(3, 130)   # Fahrzeug
-        self.table.setColumnWidth(4, 90)   # Dimension
-        self.table.setColumnWidth(5, 80)   # Typ
-        self.table.setColumnWidth(6, 80)    # DOT
-        self.table.setColumnWidth(7, 120)   # Lagerort
-        self.table.setColumnWidth(8, 125)   # Eingelagert am
-        self.table.setColumnWidth(9, 125)   # Ausgelagert am
-        self.table.setColumnWidth(10, 100)  # Preis
-        self.table.setColumnWidth(11, 80)   # Währung
-        self.table.setColumnWidth(12, 170)   # Bemerkung        
-        # keine Zeilennummern (vertical header) anzeigen
-        try:
-            self.table.verticalHeader().setVisible(False)
-        except Exception:
-            pass
-        conn.close()
+        # Farbe je Zeile (DOT-Alter) liefert _berechne_dot_farbe erst beim Anzeigen
+        self.table.reload()
 
     def reifen_hinzufuegen(self):
         from gui.reifenlager_dialog import ReifenlagerDialog
@@ -210,7 +103,7 @@ class ReifenlagerTab(QWidget):
             """, (
                 daten["kundennr"], daten["kunde_anzeige"], daten["fahrzeug"], daten["dimension"],
                 daten["typ"], daten["dot"], daten["lagerort"],
-                daten["eingelagert_am"], daten["ausgelagert_am"], daten["bemerkung"],
+                datum_iso.datum(daten["eingelagert_am"]), datum_iso.datum(daten["ausgelagert_am"]), daten["bemerkung"],
                 daten["preis"], daten["waehrung"]
             ))
             conn.commit()
@@ -219,25 +112,12 @@ class ReifenlagerTab(QWidget):
 
     def reifen_bearbeiten(self):
         from gui.reifenlager_dialog import ReifenlagerDialog
-        zeile = self.table.currentRow()
-        if zeile < 0:
+        rec = self.table.current_record()
+        if not rec:
             return
-        # Spaltenreihenfolge: ID(0), Kundennr(1), Kunde(2), Fahrzeug(3), Dimension(4), Typ(5), DOT(6), Lagerort(7), Eingelagert(8), Ausgelagert(9), Preis(10), Währung(11), Bemerkung(12)
-        reifen = {
-            "reifen_id": int(self.table.item(zeile, 0).text()),
-            "kundennr": self.table.item(zeile, 1).text(),
-            "kunde_anzeige": self.table.item(zeile, 2).text(),
-            "fahrzeug": self.table.item(zeile, 3).text(),
-            "dimension": self.table.item(zeile, 4).text(),
-            "typ": self.table.item(zeile, 5).text(),
-            "dot": self.table.item(zeile, 6).text(),
-            "lagerort": self.table.item(zeile, 7).text(),
-            "eingelagert_am": self.table.item(zeile, 8).text(),
-            "ausgelagert_am": self.table.item(zeile, 9).text(),
-            "preis": self.table.item(zeile, 10).text(),
-            "waehrung": self.table.item(zeile, 11).text(),
-            "bemerkung": self.table.item(zeile, 12).text()
-        }
+        # Der Dialog erwartet Texte wie bisher aus den Tabellenzellen
+        reifen = {k: ("" if v is None else str(v)) for k, v in rec.items() if k != "_key"}
+        reifen["reifen_id"] = int(rec["reifen_id"])
         dialog = ReifenlagerDialog(self, reifen=reifen)
         if dialog.exec_() == QDialog.Accepted:
             daten = dialog.get_daten()
@@ -250,22 +130,14 @@ class ReifenlagerTab(QWidget):
             """, (
                 daten["kundennr"], daten["kunde_anzeige"], daten["fahrzeug"], daten["dimension"],
                 daten["typ"], daten["dot"], daten["lagerort"],
-                daten["eingelagert_am"], daten["ausgelagert_am"], daten["bemerkung"], daten["preis"], daten["waehrung"], reifen["reifen_id"]
+                datum_iso.datum(daten["eingelagert_am"]), datum_iso.datum(daten["ausgelagert_am"]), daten["bemerkung"], daten["preis"], daten["waehrung"], reifen["reifen_id"]
             ))
             conn.commit()
             conn.close()
             self.lade_reifen()
 
     def reifen_loeschen(self):
-        sel = self.table.selectionModel().selectedRows()
-        if not sel:
-            return
-        ids = []
-        for idx in sel:
-            try:
-                ids.append(int(self.table.item(idx.row(), 0).text()))
-            except Exception:
-                pass
+        ids = [int(k) for k in self.table.selected_keys()]
         if not ids:
             return
         try:
@@ -313,30 +185,3 @@ class ReifenlagerTab(QWidget):
             elif alter >= 5:
                 return QColor(255, 230, 179)  # orange
         return QColor(230, 255, 230)  # grün
-
-    def append_rows(self, rows):
-        try:
-            self.table.setSortingEnabled(False)
-            for row_data in reversed(rows):
-                if isinstance(row_data, dict):
-                    vals = [row_data.get(c) for c in ["reifen_id", "kundennr", "kunde_anzeige", "fahrzeug", "dimension", "typ", "dot", "lagerort", "eingelagert_am", "ausgelagert_am", "preis", "waehrung", "bemerkung"]]
-                else:
-                    vals = list(row_data)
-                
-                farbe = self._berechne_dot_farbe(vals[6] if len(vals) > 6 else None)  # DOT ist Index 6
-                
-                row_position = 0
-                self.table.insertRow(row_position)
-                for col_idx, value in enumerate(vals):
-                    item = QTableWidgetItem(str(value or ''))
-                    item.setBackground(farbe)
-                    self.table.setItem(row_position, col_idx, item)
-            self.table.setSortingEnabled(True)
-        except Exception as e:
-            print(f"[DBG] ReifenlagerTab.append_rows error: {e}", flush=True)
-
-    def load_finished(self):
-        pass
-
-
-
@@ -4,6 +4,7 @@ from PyQt5 import QtWidgets, QtCore
 from .base_dialog import BaseDialog
 from db_connection import get_db, dict_cursor_factory
 import sqlite3
+import suchindex
 from i18n import _
 
 INVENTORY_TABLE = "artikellager"  # fester Tabellenname
@@ -78,9 +79,18 @@ class SelectInventoryItemDialog(BaseDialog):
         except Exception:
             con.rollback()
 
+        # Suchindex: Wortanfänge, Umlaute gefaltet, nach Relevanz sortiert
+        rang = suchindex.rang_join(con, INVENTORY_TABLE, search_text, f"{INVENTORY_TABLE}.artikel_id") \
+            if search_text else None
+
         with con.cursor(cursor_factory=dict_cursor_factory(con)) as cur:
             where, args = [], []
-            if search_text:
+            join_sql, order_sql = "", "bezeichnung ASC"
+            if rang is not None:
+                join_sql, join_args, rang_sql = rang
+                args += join_args
+                order_sql = f"{rang_sql}, bezeichnung ASC"
+            elif search_text:
                 like = f"%{search_text}%"
                 where.append("(LOWER(bezeichnung) LIKE LOWER(%s) OR LOWER(artikelnummer) LIKE LOWER(%s))")
                 args += [like, like]
@@ -98,8 +108,9 @@ class SelectInventoryItemDialog(BaseDialog):
                     COALESCE(lagerort,'')      AS lagerort,
                     0.0                        AS preis
                 FROM {INVENTORY_TABLE}
+                {join_sql}
                 {where_sql}
-                ORDER BY bezeichnung ASC
+                ORDER BY {order_sql}
                 LIMIT 200
             """
             # SQLite nutzt "?"-Platzhalter; PostgreSQL "%s"
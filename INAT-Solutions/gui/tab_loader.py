@@ -1,52 +1,91 @@
 from PyQt5.QtCore import QObject, pyqtSignal
+import itertools
+import re
 import traceback
-from datetime import datetime
+
+# Operatoren für filters=[(spalte, op, wert), ...]; Werte werden immer gebunden
+_OPS = {"=", "!=", "<", "<=", ">", ">=", "LIKE", "IN", "BETWEEN", "IS NULL", "IS NOT NULL"}
+_cursor_ids = itertools.count(1)
+
 
 class TabLoader(QObject):
+    """
+    Lädt eine Tabelle im Hintergrund und liefert sie in Chunks.
+
+    Entweder query (fertiges SQL + params) oder strukturiert:
+        table, columns=["id", "datum", ...], filters=[("datum", ">=", "2025-01-01")],
+        order_by=["datum DESC", "id DESC"], limit=500
+    Spalten- und Sortierausdrücke sind SQL aus dem Code (wie GridColumn.expr),
+    Filterwerte und limit werden als Parameter gebunden.
+
+    Signale: columns_ready(key, spalten) einmal vor dem ersten Chunk, dann
+    chunk_ready(key, [tuple, ...]) mit Zeilen in dieser Spaltenreihenfolge.
+    Unter PostgreSQL liest ein serverseitiger Cursor (db_connection.stream_cursor),
+    damit nie mehr als ein Chunk im Speicher liegt.
+
+    Gestartet wird über gui.load_scheduler (submit_loader); der Scheduler setzt
+    abgebrochen, geprüft wird zwischen den Chunks. Ein abgebrochener Loader
+    sendet kein finished.
+    """
+    columns_ready = pyqtSignal(str, list)
     chunk_ready = pyqtSignal(str, list)
     finished = pyqtSignal(str)
     error = pyqtSignal(str, str)
     total_rows = pyqtSignal(str, int)
 
-    def __init__(self, key: str, table: str = "", query: str = "", params: list = None, chunk_size: int = 100):
+    def __init__(self, key: str, table: str = "", query: str = "", params: list = None, chunk_size: int = 100,
+                 columns=None, filters=None, order_by=None, limit: int = None):
         super().__init__()
         self.key = key
         self.table = table
         self.query = query
         self.params = params or []
         self.chunk_size = chunk_size
+        self.columns = list(columns or [])
+        self.filters = list(filters or [])
+        self.order_by = [order_by] if isinstance(order_by, str) else list(order_by or [])
+        self.limit = limit
+        self.abgebrochen = lambda: False
 
-    def _parse_year_from_value(self, val):
-        """Try some common date formats and return year as int or None."""
-        if val is None:
-            return None
-        # direct datetime / date
-        try:
-            if hasattr(val, "year"):
-                return int(val.year)
-        except Exception:
-            pass
-        s = str(val).strip()
-        if not s:
-            return None
-        # common ISO-like prefix YYYY or YYYY-MM-DD...
-        if len(s) >= 4 and s[:4].isdigit():
-            try:
-                return int(s[:4])
-            except Exception:
-                pass
-        # try several strptime patterns
-        fmts = ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d.%m.%Y", "%d.%m.%Y %H:%M:%S", "%d/%m/%Y")
-        for f in fmts:
-            try:
-                return datetime.strptime(s, f).year
-            except Exception:
-                continue
-        return None
+    def _compile(self):
+        """(sql, params) aus table/columns/filters/order_by/limit."""
+        if self.query:
+            return self.query, list(self.params)
+        params = []
+        where = []
+        for spalte, op, *wert in self.filters:
+            op = op.upper()
+            if op not in _OPS:
+                raise ValueError(f"TabLoader: unbekannter Operator {op!r}")
+            if op in ("IS NULL", "IS NOT NULL"):
+                where.append(f"{spalte} {op}")
+            elif op == "IN":
+                werte = list(wert[0])
+                if not werte:
+                    where.append("1 = 0")
+                    continue
+                where.append(f"{spalte} IN ({', '.join(['%s'] * len(werte))})")
+                params.extend(werte)
+            elif op == "BETWEEN":
+                von, bis = wert[0]
+                where.append(f"{spalte} BETWEEN %s AND %s")
+                params.extend([von, bis])
+            else:
+                where.append(f"{spalte} {op} %s")
+                params.append(wert[0])
+        sql = f"SELECT {', '.join(self.columns) or '*'} FROM {self.table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if self.order_by:
+            sql += " ORDER BY " + ", ".join(self.order_by)
+        if self.limit is not None:
+            sql += " LIMIT %s"
+            params.append(int(self.limit))
+        return sql, params
 
     def run(self):
         try:
-            from db_connection import get_db
+            from db_connection import get_db, stream_cursor
         except Exception as e:
             self.error.emit(self.key, f"import get_db failed: {e}")
             return
@@ -54,80 +93,27 @@ class TabLoader(QObject):
         conn = None
         cur = None
         try:
+            sql, params = self._compile()
             conn = get_db()
-            cur = conn.cursor()
-
-            if self.query:
-                sql = self.query
-            else:
-                sql = f"SELECT * FROM {self.table}"
-
-            # Detect if SQLite and adapt placeholders. Use ConnectionWrapper flag
-            # if available, otherwise fallback to heuristic on the class module name.
-            is_sqlite = getattr(conn, "is_sqlite", False) or getattr(conn, "is_sqlite_conn", False)
-            try:
-                if not is_sqlite:
-                    import sqlite3
-                    if isinstance(conn, sqlite3.Connection):
-                        is_sqlite = True
-                    elif "sqlite" in getattr(conn.__class__, "__module__", "").lower():
-                        is_sqlite = True
-            except Exception:
-                pass
-
-            # Execute with parameters if provided
-            if self.params:
-                # For SQLite, replace %s with ?
-                if is_sqlite:
-                    sql = sql.replace("%s", "?")
-                cur.execute(sql, tuple(self.params))
-            else:
-                cur.execute(sql)
+            name = "tabloader_" + re.sub(r"\W", "_", self.key) + f"_{next(_cursor_ids)}"
+            cur = stream_cursor(conn, name, itersize=max(self.chunk_size, 1))
+            cur.execute(sql, tuple(params))
 
-            cols = [d[0] for d in (getattr(cur, "description", None) or [])]
-
-            current_year = datetime.now().year
+            header = None
             while True:
+                if self.abgebrochen():
+                    print(f"[DBG] TabLoader {self.key} abgebrochen", flush=True)
+                    return
                 rows = cur.fetchmany(self.chunk_size)
+                if header is None:
+                    # benannte Cursor kennen description erst nach dem ersten fetch
+                    header = [d[0] for d in (getattr(cur, "description", None) or [])]
+                    self.columns_ready.emit(self.key, header)
                 if not rows:
                     break
-                out = []
-                for r in rows:
-                    if cols:
-                        try:
-                            row_dict = {cols[i]: r[i] for i in range(len(cols))}
-                            # If loading buchhaltung only emit rows for the current year
-                            if self.key == "buchhaltung":
-                                year = self._parse_year_from_value(row_dict.get("datum") or row_dict.get("Datum") or row_dict.get("date"))
-                                if year is None:
-                                    # try parsing second column if present
-                                    try:
-                                        year = self._parse_year_from_value(r[1])
-                                    except Exception:
-                                        year = None
-                                if year != current_year:
-                                    continue
-                            elif self.key == "rechnungen":
-                                year = self._parse_year_from_value(row_dict.get("datum"))
-                                if year != current_year:
-                                    continue
-                            out.append(row_dict)
-                        except Exception:
-                            out.append({i: v for i, v in enumerate(r)})
-                    else:
-                        try:
-                            out.append({i: v for i, v in enumerate(r)})
-                        except Exception:
-                            out.append({})
-                try:
-                    self.chunk_ready.emit(self.key, out)
-                except Exception:
-                    pass
+                self.chunk_ready.emit(self.key, [tuple(r) for r in rows])
 
-            try:
-                self.finished.emit(self.key)
-            except Exception:
-                pass
+            self.finished.emit(self.key)
         except Exception as e:
             tb = traceback.format_exc()
             try:
@@ -140,12 +126,10 @@ class TabLoader(QObject):
                     cur.close()
             except Exception:
                 pass
-            try:
-                # if get_db returns pooled connection, adapt accordingly in your db_connection
-                if conn is not None:
-                    try:
-                        conn.close()
-                    except Exception:
-                        pass
-            except Exception:
-                pass
\ No newline at end of file
+            if conn is not None:
+                try:
+                    # nur gelesen: Transaktion (und serverseitigen Cursor) beenden
+                    conn.rollback()
+                    conn.close()
+                except Exception:
+                    pass
@@ -9,12 +9,12 @@ def create_button_bar(*buttons):
         layout.addWidget(btn)
     return layout
 
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import mm
 import re
 
 def exportiere_rechnung_pdf(rechnung):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.units import mm
     """
     Rechnung dict Beispiel:
     {
@@ -238,6 +238,21 @@ def apply_schema(app_url, schema_path=None):
         except Exception:
             # nicht kritisch — protokolliert wird bereits oben
             pass
+        # Danach die versionierten Migrationen der App (schema_migrations)
+        try:
+            import schema_migrations
+            from db_connection import ConnectionWrapper
+            mig_conn = ConnectionWrapper(psycopg2.connect(app_url), is_sqlite=False)
+            try:
+                schema_migrations.migrate(mig_conn)
+            finally:
+                mig_conn.close()
+        except Exception as e:
+            try:
+                with open(os.path.join(os.path.dirname(__file__), "error.log"), "a", encoding="utf-8") as ef:
+                    ef.write(f"[init_db] Schema-Migrationen fehlgeschlagen: {e}\n")
+            except Exception:
+                pass
     finally:
         try:
             cur.close()
@@ -1,5 +1,11 @@
 ﻿import os
 import sys
+import multiprocessing
+if __name__ == "__main__":
+    # Worker-Prozesse des PDF-Stapel-Exports in der PyInstaller-Exe
+    multiprocessing.freeze_support()
+import startup_timeline  # zuerst: Nullpunkt der Start-Zeitleiste
+startup_timeline.beginn("module_imports")
 import sqlite3
 import traceback
 import logging
@@ -21,6 +27,7 @@ from migration import ensure_database
 from paths import logs_dir, data_dir, users_db_path, local_db_path, resource_path
 from i18n import _
 from version import __version__
+startup_timeline.ende("module_imports")
 
 CONFIG_PATH = str(data_dir() / "config.json")
 LOGIN_DB_PATH = str(users_db_path())
@@ -86,13 +93,15 @@ def run():
     app = QApplication(sys.argv)
 
     # ensure compiled Qt resources are initialized (no harm if missing)
-    try:
-        import resources_rc  # optional, nur vorhanden wenn qrc kompiliert wurde
-    except Exception:
-        resources_rc = None
+    with startup_timeline.phase("resources_rc"):
+        try:
+            import resources_rc  # optional, nur vorhanden wenn qrc kompiliert wurde
+        except Exception:
+            resources_rc = None
 
     # Stylesheet anwenden (sucht icons im Bundle/_internal/usw.)
-    apply_stylesheet(app, "style.qss")
+    with startup_timeline.phase("stylesheet"):
+        apply_stylesheet(app, "style.qss")
 
     import threading
 
@@ -103,62 +112,43 @@ def run():
         return 1
 
     # Login-DB initialisieren
-    init_login_db(LOGIN_DB_PATH)
+    with startup_timeline.phase("login_db"):
+        init_login_db(LOGIN_DB_PATH)
 
-    from db_connection import get_db, ensure_database_and_tables  # ensure_database_and_tables will run in background
+    from db_connection import ensure_database_and_tables
     import threading
 
-    def ensure_minimal_login_schema():
-        """Create only the minimal tables required for login quickly."""
-        conn = None
-        try:
-            conn = get_db()
-            cur = conn.cursor()
-            cur.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY,
-                    username TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    role TEXT DEFAULT 'user'
-                )
-            """)
-            conn.commit()
-        except Exception as e:
-            print(f"[FAST-SCHEMA] ensure_minimal_login_schema failed: {e}", flush=True)
-        finally:
-            try:
-                if conn:
-                    cur.close()
-                    conn.close()
-            except Exception:
-                pass
-
-    # run minimal schema synchronously so login can proceed immediately
-    ensure_minimal_login_schema()
-
-    # Run the full schema/migrations in background (non-blocking).
+    # Schema-Migrationen im Hintergrund, während Login/Benutzeranlage laufen.
+    # Ist die DB aktuell, ist das ein einzelnes SELECT auf schema_migrations.
     def _bg_full_schema():
         try:
-            ensure_database_and_tables()
+            with startup_timeline.phase("schema (Hintergrund)"):
+                ensure_database_and_tables()
             print("[BG] ensure_database_and_tables finished", flush=True)
         except Exception as e:
             print(f"[BG] ensure_database_and_tables failed: {e}", flush=True)
 
-    threading.Thread(target=_bg_full_schema, daemon=True).start()
+    schema_thread = threading.Thread(target=_bg_full_schema, daemon=True, name="schema")
+    schema_thread.start()
 
     # Benutzer sicherstellen
-    while not benutzer_existieren(LOGIN_DB_PATH):
+    with startup_timeline.phase("benutzer_check"):
+        benutzer_da = benutzer_existieren(LOGIN_DB_PATH)
+    if not benutzer_da:
+        startup_timeline.beginn("benutzer_anlegen", interaktiv=True)
+    while not benutzer_da:
         QMessageBox.information(None, _("Benutzer anlegen"), _("Es sind noch keine Benutzer vorhanden. Bitte jetzt anlegen."))
         dlg = BenutzerVerwaltenDialog(LOGIN_DB_PATH)
         dlg.exec_()
         # Nach dem Dialog prüfe erneut, ob Benutzer existieren
         # Wenn ja, verlasse die Schleife; wenn nicht, zeige den Dialog erneut
-        if benutzer_existieren(LOGIN_DB_PATH):
-            break
+        benutzer_da = benutzer_existieren(LOGIN_DB_PATH)
+    startup_timeline.ende("benutzer_anlegen")
 
     # Danach sofort Login-Dialog
-    login = LoginDialog(LOGIN_DB_PATH)
-    rc = login.exec_()
+    with startup_timeline.phase("login_dialog", interaktiv=True):
+        login = LoginDialog(LOGIN_DB_PATH)
+        rc = login.exec_()
     if rc != QDialog.Accepted and not getattr(login, "login_ok", False):
         return 0
 
@@ -172,39 +162,53 @@ def run():
     # except Exception as e:
     #     print(f"[LICENSE] Prüfung fehlgeschlagen: {e}", flush=True)
 
+    # Backup und Tabs setzen das aktuelle Schema voraus (keine DDL mehr beim Laden)
+    with startup_timeline.phase("schema_warten"):
+        schema_thread.join()
+
     # Auto-Backup erstellen (falls aktiviert)
-    try:
-        from gui.backup_dialog import create_auto_backup
-        create_auto_backup()
-    except Exception as e:
-        print(f"[BACKUP] Auto-backup check failed: {e}", flush=True)
+    with startup_timeline.phase("auto_backup"):
+        try:
+            from gui.backup_dialog import create_auto_backup
+            create_auto_backup()
+        except Exception as e:
+            print(f"[BACKUP] Auto-backup check failed: {e}", flush=True)
 
-    from gui.main_window import MainWindow
+    with startup_timeline.phase("main_window_import"):
+        from gui.main_window import MainWindow
 
     # Release Notes anzeigen wenn Update durchgeführt wurde
-    try:
-        from release_notes import show_release_notes_if_needed
-        show_release_notes_if_needed()
-    except Exception as e:
-        print(f"[RELEASE-NOTES] Anzeige fehlgeschlagen: {e}", flush=True)
+    with startup_timeline.phase("release_notes"):
+        try:
+            from release_notes import show_release_notes_if_needed
+            show_release_notes_if_needed()
+        except Exception as e:
+            print(f"[RELEASE-NOTES] Anzeige fehlgeschlagen: {e}", flush=True)
 
     # Splash anzeigen
     splash = None
-    try:
-        from logo_splash import LogoSplash
-        # Korrigiere den Pfad, um das PNG-Logo für den Splash-Screen zu verwenden
-        splash = LogoSplash(logo_path="INAT SOLUTIONS.png")
-    except Exception:
-        splash = None
+    with startup_timeline.phase("splash_laden"):
+        try:
+            from logo_splash import LogoSplash
+            # Korrigiere den Pfad, um das PNG-Logo für den Splash-Screen zu verwenden
+            splash = LogoSplash(logo_path="INAT SOLUTIONS.png")
+        except Exception:
+            splash = None
 
     def open_main():
         nonlocal splash
-        mw = MainWindow(benutzername=user, login_db_path=LOGIN_DB_PATH)
+        startup_timeline.ende("splash")
+        with startup_timeline.phase("main_window"):
+            mw = MainWindow(benutzername=user, login_db_path=LOGIN_DB_PATH)
+        # erster Paint beendet die Zeitleiste und schreibt sie nach logs/
+        startup_timeline.erster_paint(mw)
         
         # --- ÄNDERUNG: Explizit "normal" anzeigen, nicht maximiert ---
-        mw.showNormal()
+        with startup_timeline.phase("show"):
+            mw.showNormal()
 
-        bootstrap_updater(mw)
+        with startup_timeline.phase("updater"):
+            bootstrap_updater(mw)
         
         app._main_window = mw
         if splash is not None:
@@ -212,6 +216,7 @@ def run():
             splash = None
  
  
+    startup_timeline.beginn("splash")
     if splash is not None and hasattr(splash, "finished"):
         splash.finished.connect(open_main)
         splash.show() # WICHTIG: Starte den Splash-Screen und die Animation
@@ -220,6 +225,16 @@ def run():
         from PyQt5.QtCore import QTimer
         QTimer.singleShot(100, open_main)
 
+    # Laufende Hintergrund-Ladejobs beim Beenden abbrechen (zwischen zwei Chunks)
+    def _stop_loads():
+        try:
+            from gui.load_scheduler import scheduler
+            scheduler().cancel_all()
+            scheduler().wait_for_done(3000)
+        except Exception:
+            pass
+    app.aboutToQuit.connect(_stop_loads)
+
     app._splash = splash
     return app.exec_()
 
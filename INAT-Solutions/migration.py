@@ -8,6 +8,8 @@ from pathlib import Path
 from typing import Dict, Any
 
 from paths import data_dir  # schreibt in %ProgramData%\INAT Solutions\data
+import datum_iso
+from suchindex import ist_index_tabelle
 
 # App-DB Pfad (beschreibbar für normale Nutzer)
 DB_DIR = data_dir()
@@ -23,62 +25,16 @@ DATE_PATTERNS = [
     "%Y-%m-%d %H:%M:%S", "%d.%m.%Y %H:%M:%S"
 ]
 NUMERIC_LIKE = re.compile(r"^-?[\d\.]+(,\d+)?$")
+# Bekannte Datumsspalten: kanonisch wie in der App (DATE/TIMESTAMP unter PostgreSQL)
+DATUM_SPALTEN = {(t, c): typ for t, _k, c, typ, _p in datum_iso.SPALTEN}
 
-# -------------------- App-DB (SQLite) --------------------
-
-def _connect() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys=ON;")
-    conn.execute("PRAGMA journal_mode=WAL;")
-    return conn
-
-def _init_schema(conn: sqlite3.Connection) -> None:
-    # Basis-Schema; hier deine Tabellen ergänzen
-    conn.executescript("""
-    CREATE TABLE IF NOT EXISTS schema_version (
-      id INTEGER PRIMARY KEY CHECK (id=1),
-      version INTEGER NOT NULL
-    );
-    INSERT OR IGNORE INTO schema_version (id, version) VALUES (1, 1);
-    """)
-    conn.commit()
-
-def _apply_app_migrations(conn: sqlite3.Connection) -> None:
-    # Platz für spätere Migrationen (CREATE/ALTER/INDEX ...)
-    # Beispiel:
-    # conn.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, name TEXT NOT NULL);")
-    migrations = [
-        {
-            "version": 9,
-            "description": "Auftragskalender-Tabelle hinzufügen",
-            "sql": """
-                CREATE TABLE IF NOT EXISTS auftraege (
-                    id BIGSERIAL PRIMARY KEY,
-                    titel VARCHAR(255) NOT NULL,
-                    beschreibung TEXT,
-                    start_zeit TIMESTAMPTZ NOT NULL,
-                    end_zeit TIMESTAMPTZ NOT NULL,
-                    ort VARCHAR(255),
-                    kunden_id INTEGER,
-                    rechnung_id INTEGER,
-                    outlook_event_id VARCHAR(255) UNIQUE,
-                    created_at TIMESTAMPTZ DEFAULT now()
-                );
-            """
-        }
-    ]
-    for m in migrations:
-        conn.executescript(m["sql"])
-        print(f"Migration angewendet: {m['description']} (Version {m['version']})")
-    conn.commit()
+# -------------------- App-DB --------------------
 
 def ensure_database() -> None:
+    """Business-DB auf den neuesten Schemastand bringen (siehe schema_migrations)."""
+    import schema_migrations
     DB_DIR.mkdir(parents=True, exist_ok=True)
-    is_new = not DB_PATH.exists()
-    with _connect() as conn:
-        if is_new:
-            _init_schema(conn)
-        _apply_app_migrations(conn)
+    schema_migrations.migrate()
 
 def migration_ausfuehren(sqlite_path: str | None = None, pg_url: str | None = None) -> None:
     """
@@ -110,7 +66,7 @@ def read_config() -> Dict[str, Any]:
 def list_sqlite_tables(conn: sqlite3.Connection) -> list[str]:
     cur = conn.cursor()
     cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name;")
-    return [r[0] for r in cur.fetchall()]
+    return [r[0] for r in cur.fetchall() if not ist_index_tabelle(r[0])]
 
 def sqlite_columns(conn: sqlite3.Connection, table: str) -> list[str]:
     cur = conn.cursor()
@@ -122,6 +78,12 @@ def normalize_value(table: str, col: str, val):
         return None
     if isinstance(val, str):
         s = val.strip()
+        typ = DATUM_SPALTEN.get((table.lower(), col.lower()))
+        if typ:
+            try:
+                return datum_iso.kanonisch(s, typ)
+            except ValueError:
+                return None
         if col.lower() in DATE_COL_HINTS or re.match(r"^\d{1,2}\.\d{1,2}\.\d{2,4}", s) or re.match(r"^\d{4}-\d{2}-\d{2}", s):
             for fmt in DATE_PATTERNS:
                 try:
@@ -1,8 +1,8 @@
 import os
 import json
 import time
-import requests
-import msal
+
+# requests und msal erst beim ersten Outlook-Zugriff importieren (Programmstart)
 
 # --- Feste Konfiguration ---
 # Ersetze diesen Wert mit deiner Multi-Tenant Client ID aus dem Azure Portal
@@ -24,6 +24,7 @@ def _ensure_cache_dir():
     os.makedirs(CACHE_DIR, exist_ok=True)
 
 def _load_token_cache():
+    import msal
     _ensure_cache_dir()
     cache = msal.SerializableTokenCache()
     if os.path.exists(CACHE_PATH):
@@ -33,7 +34,7 @@ def _load_token_cache():
             pass
     return cache
 
-def _persist_cache(cache: msal.SerializableTokenCache):
+def _persist_cache(cache: "msal.SerializableTokenCache"):
     if cache.has_state_changed:
         with open(CACHE_PATH, "w", encoding="utf-8") as f:
             f.write(cache.serialize())
@@ -42,6 +43,7 @@ def _build_app():
     if not CLIENT_ID or "DEINE-MULTI-TENANT-CLIENT-ID" in CLIENT_ID:
         raise RuntimeError("Microsoft Graph ist nicht konfiguriert. Der Entwickler muss die CLIENT_ID in ms_graph.py hinterlegen.")
     
+    import msal
     cache = _load_token_cache()
     app = msal.PublicClientApplication(client_id=CLIENT_ID, authority=AUTHORITY, token_cache=cache)
     return app, cache
@@ -106,6 +108,7 @@ def create_event(subject: str, start_dt_utc, end_dt_utc, location: str = "", bod
     Legt ein Termin im Outlook-Kalender des angemeldeten Benutzers an.
     start_dt_utc / end_dt_utc: datetime mit tzinfo=UTC
     """
+    import requests
     access_token = get_access_token()
     headers = {
         "Authorization": f"Bearer {access_token}",
@@ -135,6 +138,7 @@ def create_event(subject: str, start_dt_utc, end_dt_utc, location: str = "", bod
 
 def update_event(event_id, subject, start_dt_utc, end_dt_utc, location, body_html):
     """Aktualisiert einen bestehenden Termin im Outlook-Kalender."""
+    import requests
     access_token = get_access_token()
     headers = {
         'Authorization': 'Bearer ' + access_token,
@@ -170,6 +174,7 @@ def update_event(event_id, subject, start_dt_utc, end_dt_utc, location, body_htm
 
 def delete_event(event_id):
     """Löscht einen Termin aus dem Outlook-Kalender."""
+    import requests
     access_token = get_access_token()
     headers = {'Authorization': 'Bearer ' + access_token}
     
@@ -21,6 +21,11 @@ def updates_dir() -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
+def cache_dir() -> Path:
+    p = program_data() / "cache"
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
 def users_db_path() -> Path:
     return data_dir() / "users.db"
 
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Festplatten-Cache für gerenderte Rechnungs-PDFs.
+
+Der Schlüssel ist ein SHA-256 über alles, was das PDF bestimmt: die
+Rechnungsdaten (inkl. Positionen), das geladene Rechnungslayout (Texte,
+Schrift, Farben, Stil, Logo-Bytes), die QR-Daten, das Rechnungslogo aus
+app_settings und die Programmversion. Ändert sich davon etwas, entsteht ein
+neuer Schlüssel; alte Einträge verschwinden über die LRU-Verdrängung.
+RechnungLayoutDialog.speichern() leert den Cache zusätzlich sofort.
+
+Ablage unter paths.cache_dir()/rechnungen_pdf, Größe begrenzt über
+config "pdf_cache_mb" (Standard DEFAULT_MAX_MB, 0 = Cache aus). Die
+Zugriffszeit steckt im mtime der Datei (wird bei Treffern erneuert).
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+RENDER_VERSION = 2          # erhöhen, wenn sich _exportiere_pdf sichtbar ändert
+DEFAULT_MAX_MB = 200
+UNTERORDNER = "rechnungen_pdf"
+
+_lock = threading.Lock()
+_stats = {"treffer": 0, "fehlschlaege": 0, "abgelegt": 0, "verdraengt": 0}
+
+
+def cache_verzeichnis() -> str:
+    from paths import cache_dir
+    p = cache_dir() / UNTERORDNER
+    p.mkdir(parents=True, exist_ok=True)
+    return str(p)
+
+
+def max_bytes() -> int:
+    try:
+        from db_connection import get_config_value
+        mb = float(get_config_value("pdf_cache_mb", DEFAULT_MAX_MB))
+    except Exception:
+        mb = DEFAULT_MAX_MB
+    return int(max(mb, 0) * 1024 * 1024)
+
+
+def _json_default(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "sha256:" + hashlib.sha256(bytes(value)).hexdigest()
+    if isinstance(value, (set, frozenset)):
+        return sorted(map(str, value))
+    return str(value)
+
+
+def schluessel(rechnung: dict, layout: dict, **weitere) -> str:
+    """
+    Cache-Schlüssel für eine Rechnung. layout ist die fertig geladene
+    Layout-Konfiguration; weitere Einflüsse (logo_skala, MwSt-Fallback, ...)
+    als Keyword-Argumente.
+    """
+    try:
+        from version import __version__
+    except Exception:
+        __version__ = "?"
+    try:
+        from db_connection import get_qr_daten
+        qr_daten = get_qr_daten()
+    except Exception:
+        qr_daten = None
+    try:
+        from settings_store import get_blob
+        logo = get_blob("invoice_logo")
+    except Exception:
+        logo = None
+    inhalt = {
+        "render": RENDER_VERSION,
+        "version": __version__,
+        "rechnung": rechnung,
+        "layout": layout,
+        "qr_daten": qr_daten,
+        "logo": logo,
+        "weitere": weitere,
+    }
+    text = json.dumps(inhalt, sort_keys=True, default=_json_default, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _pfad(key: str) -> str:
+    return os.path.join(cache_verzeichnis(), key + ".pdf")
+
+
+def kopiere(key: str, ziel: str) -> bool:
+    """Gecachtes PDF nach ziel kopieren. False, wenn nicht im Cache."""
+    if max_bytes() <= 0:
+        return False
+    quelle = _pfad(key)
+    try:
+        shutil.copyfile(quelle, ziel)
+        os.utime(quelle, None)
+    except OSError:
+        with _lock:
+            _stats["fehlschlaege"] += 1
+        return False
+    with _lock:
+        _stats["treffer"] += 1
+    return True
+
+
+def ablegen(key: str, quelle: str) -> None:
+    """Fertiges PDF quelle unter key ablegen und danach auf max_bytes() kürzen."""
+    grenze = max_bytes()
+    if grenze <= 0:
+        return
+    ziel = _pfad(key)
+    tmp = f"{ziel}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        shutil.copyfile(quelle, tmp)
+        os.replace(tmp, ziel)
+    except OSError as e:
+        print(f"[DBG] pdf_cache: Ablegen fehlgeschlagen: {e}", flush=True)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return
+    with _lock:
+        _stats["abgelegt"] += 1
+    _verdraengen(grenze)
+
+
+def _eintraege() -> list:
+    """(mtime, groesse, pfad) aller Cache-Dateien."""
+    out = []
+    try:
+        with os.scandir(cache_verzeichnis()) as it:
+            for e in it:
+                if e.is_file() and e.name.endswith(".pdf"):
+                    st = e.stat()
+                    out.append((st.st_mtime, st.st_size, e.path))
+    except OSError:
+        pass
+    return out
+
+
+def _verdraengen(grenze: int) -> None:
+    """Am längsten nicht benutzte Einträge löschen, bis der Cache unter grenze liegt."""
+    eintraege = sorted(_eintraege())
+    gesamt = sum(g for _m, g, _p in eintraege)
+    for _mtime, groesse, pfad in eintraege:
+        if gesamt <= grenze:
+            break
+        try:
+            os.remove(pfad)
+            gesamt -= groesse
+            with _lock:
+                _stats["verdraengt"] += 1
+        except OSError:
+            pass
+
+
+def leeren() -> int:
+    """Alle Einträge löschen (z.B. nach Layout-Änderung). Liefert die Anzahl."""
+    anzahl = 0
+    for _mtime, _groesse, pfad in _eintraege():
+        try:
+            os.remove(pfad)
+            anzahl += 1
+        except OSError:
+            pass
+    return anzahl
+
+
+def stats() -> dict:
+    eintraege = _eintraege()
+    with _lock:
+        s = dict(_stats)
+    s["eintraege"] = len(eintraege)
+    s["bytes"] = sum(g for _m, g, _p in eintraege)
+    s["max_bytes"] = max_bytes()
+    return s
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+Swiss-QR-Zahlteil direkt auf einen reportlab-Canvas zeichnen.
+
+Bisher: qrbill.QRBill.as_svg() -> temporäre SVG-Datei -> svglib.svg2rlg ->
+renderPDF.draw, d.h. Datei-I/O und XML-Parsen für jede Rechnung. Hier wird
+nur noch der Payload von qrbill übernommen (QRBill.qr_data(), inkl. dessen
+Validierung); die QR-Matrix kommt aus dem qrcode-Paket (Abhängigkeit von
+qrbill) und wird als ein Pfad gezeichnet, Schweizerkreuz und Texte
+(Empfangsschein, Zahlteil) mit Canvas-Befehlen.
+
+Die Textblöcke "Konto / Zahlbar an" hängen nur von (iban, creditor,
+currency) ab und werden gecacht, ebenso "Zahlbar durch" je Zahler.
+
+Koordinaten in mm im Zahlteil-Format 210 x 105 mm (Ursprung unten links),
+Aufteilung nach den Swiss Implementation Guidelines QR-Rechnung.
+"""
+from functools import lru_cache
+
+BREITE = 210.0
+HOEHE = 105.0
+EMPFANG_BREITE = 62.0
+QR_GROESSE = 46.0
+KREUZ_GROESSE = 7.0
+
+SCHRIFT = "Helvetica"
+SCHRIFT_FETT = "Helvetica-Bold"
+
+TEXTE = {
+    "empfangsschein": "Empfangsschein",
+    "zahlteil": "Zahlteil",
+    "konto": "Konto / Zahlbar an",
+    "referenz": "Referenz",
+    "zusatz": "Zusätzliche Informationen",
+    "zahlbar_durch": "Zahlbar durch",
+    "zahlbar_durch_leer": "Zahlbar durch (Name/Adresse)",
+    "waehrung": "Währung",
+    "betrag": "Betrag",
+    "annahmestelle": "Annahmestelle",
+    "abtrennen": "Vor der Einzahlung abzutrennen",
+}
+
+
+# -------------------- Textblöcke (gecacht) --------------------
+
+def _adresse_zeilen(partei: tuple) -> list:
+    """partei: sortierte (key, value)-Paare eines qrbill-Adress-dicts."""
+    d = dict(partei)
+    strasse = " ".join(str(d.get(k) or "").strip() for k in ("street", "house_num")).strip()
+    ort = " ".join(str(d.get(k) or "").strip() for k in ("pcode", "city")).strip()
+    land = str(d.get("country") or "CH").strip().upper()
+    if ort and land not in ("CH", "LI"):
+        ort = f"{land}-{ort}"
+    return [z for z in (str(d.get("name") or "").strip(), strasse, ort) if z]
+
+
+def iban_formatiert(iban: str) -> str:
+    iban = str(iban or "").replace(" ", "").upper()
+    return " ".join(iban[i:i + 4] for i in range(0, len(iban), 4))
+
+
+@lru_cache(maxsize=64)
+def konto_block(iban: str, creditor: tuple, currency: str) -> tuple:
+    """Zeilen für "Konto / Zahlbar an"; Schlüssel (iban, creditor, currency)."""
+    return tuple([iban_formatiert(iban)] + _adresse_zeilen(creditor))
+
+
+@lru_cache(maxsize=4096)
+def zahler_block(debtor: tuple) -> tuple:
+    return tuple(_adresse_zeilen(debtor))
+
+
+def partei_schluessel(partei) -> tuple:
+    """Adress-dict -> hashbarer Cache-Schlüssel."""
+    return tuple(sorted((str(k), str(v or "")) for k, v in (partei or {}).items()))
+
+
+def betrag_formatiert(betrag) -> str:
+    """1234.5 -> '1 234.50' (Tausender mit Leerzeichen wie auf der QR-Rechnung)."""
+    if betrag in (None, ""):
+        return ""
+    return f"{float(betrag):,.2f}".replace(",", " ")
+
+
+# -------------------- QR-Code --------------------
+
+@lru_cache(maxsize=256)
+def qr_matrix(payload: str) -> tuple:
+    """Modul-Matrix (Fehlerkorrektur M, ohne Rand) als Tupel von Zeilen."""
+    import qrcode
+    qr = qrcode.QRCode(version=None, error_correction=qrcode.constants.ERROR_CORRECT_M, border=0)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    return tuple(tuple(bool(m) for m in zeile) for zeile in qr.get_matrix())
+
+
+@lru_cache(maxsize=256)
+def matrix_pfad(payload: str) -> str:
+    """PDF-Pfad der dunklen Module (je Zeile zusammenhängende Läufe als 're'), gefüllt."""
+    ops = []
+    for r, zeile in enumerate(qr_matrix(payload)):
+        s = None
+        for k, dunkel in enumerate(zeile + (False,)):
+            if dunkel and s is None:
+                s = k
+            elif not dunkel and s is not None:
+                ops.append(f"{s} {r} {k - s} 1 re")
+                s = None
+    ops.append("f")
+    return "\n".join(ops)
+
+
+def zeichne_qr(c, payload: str, x: float, y: float, groesse: float) -> None:
+    """QR-Code mit Schweizerkreuz; x/y/groesse in Canvas-Einheiten (unten links)."""
+    modul = groesse / len(qr_matrix(payload))
+    # in Modul-Einheiten zeichnen (ganzzahlige Koordinaten, Zeile 0 oben) und
+    # die Rechtecke direkt als PDF-Operatoren schreiben: der Pfad-Umweg über
+    # canvas.beginPath formatiert jede Zahl einzeln und kostet ein Mehrfaches
+    c.saveState()
+    c.transform(modul, 0, 0, -modul, x, y + groesse)
+    c.setFillColorRGB(0, 0, 0)
+    c.addLiteral(matrix_pfad(payload))
+    c.restoreState()
+
+    c.saveState()
+    # Schweizerkreuz: schwarzes Quadrat mit weissem Rand und weissem Kreuz
+    kreuz = groesse * KREUZ_GROESSE / QR_GROESSE
+    rand = kreuz / 12
+    kx = x + (groesse - kreuz) / 2
+    ky = y + (groesse - kreuz) / 2
+    c.setFillColorRGB(1, 1, 1)
+    c.rect(kx - rand / 2, ky - rand / 2, kreuz + rand, kreuz + rand, stroke=0, fill=1)
+    c.setFillColorRGB(0, 0, 0)
+    c.rect(kx + rand / 2, ky + rand / 2, kreuz - rand, kreuz - rand, stroke=0, fill=1)
+    c.setFillColorRGB(1, 1, 1)
+    balken_b, balken_l = kreuz / 5.5, kreuz * 0.6
+    mx, my = x + groesse / 2, y + groesse / 2
+    c.rect(mx - balken_l / 2, my - balken_b / 2, balken_l, balken_b, stroke=0, fill=1)
+    c.rect(mx - balken_b / 2, my - balken_l / 2, balken_b, balken_l, stroke=0, fill=1)
+    c.restoreState()
+
+
+# -------------------- Zahlteil --------------------
+
+def _abschnitt(c, x, y, titel, zeilen, titel_pt, text_pt, mm):
+    """Überschrift + Zeilen ab Grundlinie y (mm); liefert das neue y."""
+    c.setFont(SCHRIFT_FETT, titel_pt)
+    c.drawString(x * mm, y * mm, titel)
+    zeilenabstand = (text_pt + 1) * 0.3528      # pt -> mm
+    c.setFont(SCHRIFT, text_pt)
+    for zeile in zeilen:
+        y -= zeilenabstand
+        c.drawString(x * mm, y * mm, zeile)
+    return y - zeilenabstand
+
+
+def _leeres_feld(c, x, y, b, h, mm):
+    """Eckmarken für ein leeres Feld (Betrag / Zahler handschriftlich)."""
+    ecke = 3
+    c.saveState()
+    c.setLineWidth(0.75)
+    for (ex, ey, dx, dy) in ((x, y + h, 1, -1), (x + b, y + h, -1, -1), (x, y, 1, 1), (x + b, y, -1, 1)):
+        c.line(ex * mm, ey * mm, (ex + dx * ecke) * mm, ey * mm)
+        c.line(ex * mm, ey * mm, ex * mm, (ey + dy * ecke) * mm)
+    c.restoreState()
+
+
+def zeichne(c, payload: str, iban: str, creditor: dict, currency: str = "CHF",
+            betrag=None, debtor: dict = None, referenz: str = "", mitteilung: str = "") -> None:
+    """
+    Zahlteil (Empfangsschein + Zahlteil, 210 x 105 mm) ab dem aktuellen
+    Ursprung des Canvas zeichnen. payload ist der fertige QR-Inhalt
+    (QRBill.qr_data()).
+    """
+    from reportlab.lib.units import mm
+
+    konto = konto_block(str(iban), partei_schluessel(creditor), str(currency))
+    zahler = zahler_block(partei_schluessel(debtor)) if debtor else ()
+    betrag_text = betrag_formatiert(betrag)
+
+    c.saveState()
+    c.setFillColorRGB(0, 0, 0)
+    c.setStrokeColorRGB(0, 0, 0)
+
+    # Trennlinien (gestrichelt)
+    c.saveState()
+    c.setLineWidth(0.2)
+    c.setDash(2, 2)
+    c.line(0, HOEHE * mm, BREITE * mm, HOEHE * mm)
+    c.line(EMPFANG_BREITE * mm, 0, EMPFANG_BREITE * mm, HOEHE * mm)
+    c.restoreState()
+    c.setFont(SCHRIFT, 6)
+    c.drawCentredString(BREITE / 2 * mm, (HOEHE + 1.5) * mm, TEXTE["abtrennen"])
+
+    # --- Empfangsschein (links, 62 mm) ---
+    c.setFont(SCHRIFT_FETT, 11)
+    c.drawString(5 * mm, (HOEHE - 9) * mm, TEXTE["empfangsschein"])
+    y = HOEHE - 16
+    y = _abschnitt(c, 5, y, TEXTE["konto"], konto, 6, 8, mm)
+    if referenz:
+        y = _abschnitt(c, 5, y, TEXTE["referenz"], [referenz], 6, 8, mm)
+    if zahler:
+        _abschnitt(c, 5, y, TEXTE["zahlbar_durch"], zahler, 6, 8, mm)
+    else:
+        _abschnitt(c, 5, y, TEXTE["zahlbar_durch_leer"], [], 6, 8, mm)
+        _leeres_feld(c, 5, y - 22, 52, 20, mm)
+    c.setFont(SCHRIFT_FETT, 6)
+    c.drawString(5 * mm, 37 * mm, TEXTE["waehrung"])
+    c.drawString(17 * mm, 37 * mm, TEXTE["betrag"])
+    c.setFont(SCHRIFT, 8)
+    c.drawString(5 * mm, 33 * mm, str(currency))
+    if betrag_text:
+        c.drawString(17 * mm, 33 * mm, betrag_text)
+    else:
+        _leeres_feld(c, 27, 27, 30, 10, mm)
+    c.setFont(SCHRIFT_FETT, 6)
+    c.drawRightString((EMPFANG_BREITE - 5) * mm, 18 * mm, TEXTE["annahmestelle"])
+
+    # --- Zahlteil (rechts) ---
+    c.setFont(SCHRIFT_FETT, 11)
+    c.drawString(67 * mm, (HOEHE - 9) * mm, TEXTE["zahlteil"])
+    zeichne_qr(c, payload, 67 * mm, 42 * mm, QR_GROESSE * mm)
+    c.setFont(SCHRIFT_FETT, 8)
+    c.drawString(67 * mm, 37 * mm, TEXTE["waehrung"])
+    c.drawString(80 * mm, 37 * mm, TEXTE["betrag"])
+    c.setFont(SCHRIFT, 10)
+    c.drawString(67 * mm, 32.5 * mm, str(currency))
+    if betrag_text:
+        c.drawString(80 * mm, 32.5 * mm, betrag_text)
+    else:
+        _leeres_feld(c, 80, 20, 40, 15, mm)
+
+    y = HOEHE - 9
+    y = _abschnitt(c, 118, y, TEXTE["konto"], konto, 8, 10, mm)
+    if referenz:
+        y = _abschnitt(c, 118, y, TEXTE["referenz"], [referenz], 8, 10, mm)
+    if mitteilung:
+        y = _abschnitt(c, 118, y, TEXTE["zusatz"], [mitteilung], 8, 10, mm)
+    if zahler:
+        _abschnitt(c, 118, y, TEXTE["zahlbar_durch"], zahler, 8, 10, mm)
+    else:
+        _abschnitt(c, 118, y, TEXTE["zahlbar_durch_leer"], [], 8, 10, mm)
+        _leeres_feld(c, 118, y - 27, 65, 25, mm)
+    c.restoreState()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+In-Process Query-Profiler für db_connection.CursorWrapper.
+
+Jedes execute/executemany wird unter einem Fingerprint (SQL ohne Literale,
+Platzhalter vereinheitlicht) gezählt: Aufrufe, Gesamt-/p50-/p95-/Max-Latenz,
+gelesene Zeilen und aufrufende Module/Tabs. Langsame Statements landen mit
+kurzem Stacktrace in einem Ringpuffer. Export als JSON/CSV nach paths.logs_dir().
+
+Der Overhead pro Statement liegt im Bereich weniger Mikrosekunden (gecachter
+Fingerprint, Frame-Walk ohne traceback), daher standardmäßig aktiv.
+Abschalten über config.json: "query_profiler": false.
+"""
+import csv
+import json
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+import paths
+
+SLOW_QUERY_MS = 100         # ab dieser Dauer: Sample mit Stacktrace im Ringpuffer
+SAMPLE_WINDOW = 256         # letzte Latenzen je Fingerprint für p50/p95
+SLOW_BUFFER_SIZE = 200
+MAX_CALLERS_PER_FP = 20
+
+enabled = True
+
+# Module, die beim Bestimmen des Aufrufers übersprungen werden
+_SKIP_MODULES = {"query_profiler", "db_connection", "gui.db_helpers", "settings_store", "settings_cache"}
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMBER = re.compile(r"(?<![A-Za-z_])-?\d+(?:\.\d+)?\b")
+_RE_PLACEHOLDER = re.compile(r"%\([^)]+\)s|%s|\?")
+_RE_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_WS = re.compile(r"\s+")
+
+_lock = threading.Lock()
+_stats = {}
+_callers = {}
+_slow = deque(maxlen=SLOW_BUFFER_SIZE)
+_started = time.time()
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    """Normalisiert ein Statement: Literale/Platzhalter -> ?, Whitespace zusammengefasst."""
+    fp = _RE_STRING.sub("?", sql)
+    fp = _RE_NUMBER.sub("?", fp)
+    fp = _RE_PLACEHOLDER.sub("?", fp)
+    fp = _RE_VALUE_LIST.sub("(?+)", fp)
+    fp = _RE_WS.sub(" ", fp).strip()
+    return fp
+
+
+def _caller(depth: int = 2) -> str:
+    try:
+        f = sys._getframe(depth)
+    except ValueError:
+        return "?"
+    while f is not None:
+        mod = f.f_globals.get("__name__", "?")
+        if mod not in _SKIP_MODULES:
+            code = f.f_code
+            return f"{mod}.{getattr(code, 'co_qualname', code.co_name)}"
+        f = f.f_back
+    return "?"
+
+
+class _FpStats:
+    __slots__ = ("calls", "total_ms", "max_ms", "rows", "samples", "callers")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=SAMPLE_WINDOW)
+        self.callers = {}
+
+
+def record(sql, duration_ms: float, many: bool = False):
+    """Erfasst ein ausgeführtes Statement. Gibt den Fingerprint zurück (für add_rows)."""
+    if not enabled:
+        return None
+    try:
+        fp = fingerprint(sql) if isinstance(sql, str) else str(sql)
+    except Exception:
+        return None
+    caller = _caller()
+    with _lock:
+        st = _stats.get(fp)
+        if st is None:
+            st = _stats[fp] = _FpStats()
+        st.calls += 1
+        st.total_ms += duration_ms
+        if duration_ms > st.max_ms:
+            st.max_ms = duration_ms
+        st.samples.append(duration_ms)
+        if caller in st.callers or len(st.callers) < MAX_CALLERS_PER_FP:
+            st.callers[caller] = st.callers.get(caller, 0) + 1
+        c = _callers.get(caller)
+        if c is None:
+            c = _callers[caller] = [0, 0.0]
+        c[0] += 1
+        c[1] += duration_ms
+    if duration_ms >= SLOW_QUERY_MS:
+        stack = traceback.format_list(traceback.extract_stack(limit=12)[:-2])[-6:]
+        with _lock:
+            _slow.append({
+                "ts": datetime.now().isoformat(timespec="seconds"),
+                "ms": round(duration_ms, 1),
+                "many": many,
+                "caller": caller,
+                "sql": str(sql)[:500],
+                "stack": "".join(stack),
+            })
+    return fp
+
+
+def add_rows(fp, n: int) -> None:
+    if fp is None or not n:
+        return
+    with _lock:
+        st = _stats.get(fp)
+        if st is not None:
+            st.rows += n
+
+
+def _percentile(sorted_vals, q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[idx]
+
+
+def snapshot() -> dict:
+    """Aktueller Stand als dict (statements nach Gesamtzeit sortiert)."""
+    with _lock:
+        items = [(fp, st.calls, st.total_ms, st.max_ms, st.rows, list(st.samples), dict(st.callers))
+                 for fp, st in _stats.items()]
+        callers = [(name, v[0], v[1]) for name, v in _callers.items()]
+        slow = list(_slow)
+    statements = []
+    for fp, calls, total, mx, rows, samples, by_caller in items:
+        samples.sort()
+        statements.append({
+            "fingerprint": fp,
+            "calls": calls,
+            "total_ms": round(total, 2),
+            "avg_ms": round(total / calls, 3) if calls else 0.0,
+            "p50_ms": round(_percentile(samples, 0.50), 3),
+            "p95_ms": round(_percentile(samples, 0.95), 3),
+            "max_ms": round(mx, 3),
+            "rows": rows,
+            "callers": dict(sorted(by_caller.items(), key=lambda kv: -kv[1])),
+        })
+    statements.sort(key=lambda s: -s["total_ms"])
+    return {
+        "since": datetime.fromtimestamp(_started).isoformat(timespec="seconds"),
+        "statements": statements,
+        "callers": [
+            {"caller": name, "calls": n, "total_ms": round(t, 2)}
+            for name, n, t in sorted(callers, key=lambda c: -c[1])
+        ],
+        "slow": slow,
+    }
+
+
+def reset() -> None:
+    global _started
+    with _lock:
+        _stats.clear()
+        _callers.clear()
+        _slow.clear()
+        _started = time.time()
+
+
+def _default_path(ext: str) -> str:
+    return str(paths.logs_dir() / f"query_profile_{datetime.now():%Y%m%d_%H%M%S}.{ext}")
+
+
+def export_json(path: str | None = None) -> str:
+    path = path or _default_path("json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2, ensure_ascii=False)
+    return path
+
+
+def export_csv(path: str | None = None) -> str:
+    path = path or _default_path("csv")
+    cols = ["fingerprint", "calls", "total_ms", "avg_ms", "p50_ms", "p95_ms", "max_ms", "rows", "callers"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f, delimiter=";")
+        w.writerow(cols)
+        for s in snapshot()["statements"]:
+            row = dict(s)
+            row["callers"] = ", ".join(f"{k} ({v})" for k, v in s["callers"].items())
+            w.writerow([row[c] for c in cols])
+    return path
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Stapel-Export von Rechnungs-PDFs (Auswahl, Zeitraum, Status).
+
+lade_rechnungen() holt die Rechnungen mit einer Abfrage (Bereich auf dem
+ISO-Datum, gespeicherter status, Ids), exportiere() rendert sie in einem
+Prozesspool:
+
+- jeder Worker lädt Rechnungslayout, Logo und QR-Daten einmal beim Start
+  (settings_cache im Worker) und rendert mit den Zeichenmethoden von
+  RechnungenTab, ohne Widget; gleiche Rechnungen kommen aus pdf_cache,
+- Ziel ist ein Ordner oder eine ZIP-Datei (Endung .zip); die ZIP wird als
+  .part geschrieben und erst am Ende umbenannt,
+- fortschritt(fertig, gesamt, text) meldet jede fertige Rechnung,
+  abgebrochen() wird zwischen den Ergebnissen geprüft; wartende Rechnungen
+  werden dann verworfen, laufende noch fertig gerendert.
+
+Ohne Oberfläche: tools/batch_export_pdf.py. Anzahl Prozesse über config
+"pdf_batch_prozesse" (Standard: CPU-Kerne - 1).
+"""
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from db_connection import get_db
+from rechnung_positionen import parse_positionen
+
+SPALTEN = ["id", "rechnung_nr", "kunde", "firma", "adresse", "datum", "mwst",
+           "zahlungskonditionen", "positionen", "uid", "abschluss", "abschluss_text", "brutto",
+           "faellig_am", "status"]
+
+POLL_SEKUNDEN = 0.2
+
+
+# -------------------- Auswahl --------------------
+
+def lade_rechnungen(ids=None, von=None, bis=None, status=None) -> list:
+    """
+    Rechnungen für den Export (Positionen schon geparst). von/bis sind
+    ISO-Daten, bis exklusiv (datum_iso.jahr_bereich / tag_bereich).
+    """
+    where, params = [], []
+    if ids is not None:
+        ids = [int(i) for i in ids]
+        if not ids:
+            return []
+        where.append(f"id IN ({', '.join(['%s'] * len(ids))})")
+        params.extend(ids)
+    if von:
+        where.append("datum >= %s")
+        params.append(von)
+    if bis:
+        where.append("datum < %s")
+        params.append(bis)
+    if status:
+        where.append("status = %s")
+        params.append(status)
+    sql = (f"SELECT {', '.join(SPALTEN)} FROM rechnungen"
+           + (f" WHERE {' AND '.join(where)}" if where else "")
+           + " ORDER BY datum, id")
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql, tuple(params))
+            zeilen = cur.fetchall()
+
+    rechnungen = []
+    for zeile in zeilen:
+        r = dict(zip(SPALTEN, zeile))
+        for feld in ("rechnung_nr", "kunde", "firma", "adresse", "datum", "zahlungskonditionen",
+                     "uid", "abschluss", "abschluss_text", "faellig_am"):
+            r[feld] = str(r[feld] or "")
+        r["positionen"] = parse_positionen(r["positionen"])
+        r["brutto"] = float(r["brutto"] or 0)
+        rechnungen.append(r)
+    return rechnungen
+
+
+def dateiname(rechnung: dict) -> str:
+    """Rechnung_{nummer}-{kunde}.pdf (Kundenname bereinigt)."""
+    nr = rechnung.get('rechnung_nr', '')
+    kunde = rechnung.get('kunde') or rechnung.get('firma') or ''
+    # Entferne für Dateinamen problematische Zeichen
+    kunde_clean = re.sub(r'[<>:"/\\|\?\*\n\r\t]', '', str(kunde)).strip()
+    # Ersetze mehrere Whitespace-Zeichen durch ein einzelnes Leerzeichen
+    kunde_clean = re.sub(r'\s+', ' ', kunde_clean)
+    base = f"Rechnung_{nr}"
+    if kunde_clean:
+        base = f"{base}-{kunde_clean}"
+    return f"{base}.pdf"
+
+
+def _eindeutig(name: str, vergeben: set, rechnung_id) -> str:
+    if name.lower() in vergeben:
+        stamm, endung = os.path.splitext(name)
+        name = f"{stamm}_{rechnung_id}{endung}"
+    vergeben.add(name.lower())
+    return name
+
+
+def standard_prozesse() -> int:
+    try:
+        from db_connection import get_config_value
+        wert = int(get_config_value("pdf_batch_prozesse", 0) or 0)
+        if wert > 0:
+            return wert
+    except Exception:
+        pass
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+# -------------------- Worker-Prozess --------------------
+
+_renderer = None
+
+
+def _worker_init():
+    """Einmal pro Worker: Layout/Logo/QR-Daten laden (settings_cache im Prozess)."""
+    global _renderer
+    from gui.rechnungen_tab import RechnungenTab
+
+    class _PdfRenderer:
+        """Die Zeichenmethoden von RechnungenTab ohne Widget."""
+        mwst = 0.0
+        _lade_rechnungslayout = RechnungenTab._lade_rechnungslayout
+        _exportiere_pdf = RechnungenTab._exportiere_pdf
+        _rendere_pdf = RechnungenTab._rendere_pdf
+        _zeichne_kopf_design = RechnungenTab._zeichne_kopf_design
+        zeichne_swiss_qr = RechnungenTab.zeichne_swiss_qr
+
+    renderer = _PdfRenderer()
+    try:
+        renderer._lade_rechnungslayout()
+    except Exception as e:
+        # _render versucht es erneut und meldet den Fehler je Rechnung
+        print(f"[DBG] PDF-Stapel: Layout nicht geladen: {e}", flush=True)
+        return
+    _renderer = renderer
+
+
+def _render(rechnung: dict, ziel: str):
+    """Im Worker: eine Rechnung nach ziel. Liefert (id, fehlertext oder None)."""
+    try:
+        if _renderer is None:
+            _worker_init()
+        _renderer._exportiere_pdf(rechnung, ziel,
+                                  logo_skala=_renderer.layout_config.get("logo_skala", 100),
+                                  layout_laden=False)
+        return rechnung.get("id"), None
+    except Exception as e:
+        try:
+            os.remove(ziel)
+        except OSError:
+            pass
+        return rechnung.get("id"), str(e)
+
+
+# -------------------- Export --------------------
+
+def exportiere(rechnungen: list, ziel: str, prozesse: int = None,
+               fortschritt=None, abgebrochen=None) -> dict:
+    """
+    Rechnungen nach ziel (Ordner oder *.zip) rendern. Liefert
+    {"ziel", "ok", "fehler": [(rechnung_nr, text)], "abgebrochen", "dauer_s"}.
+    """
+    t0 = time.perf_counter()
+    als_zip = ziel.lower().endswith(".zip")
+    if als_zip:
+        ordner = tempfile.mkdtemp(prefix="inat_pdf_batch_")
+        part = ziel + ".part"
+        archiv = zipfile.ZipFile(part, "w", zipfile.ZIP_DEFLATED)
+    else:
+        ordner = ziel
+        os.makedirs(ordner, exist_ok=True)
+        archiv = None
+
+    ergebnis = {"ziel": ziel, "ok": 0, "fehler": [], "abgebrochen": False, "dauer_s": 0.0}
+    gesamt = len(rechnungen)
+    vergeben = set()
+    aufgaben = []
+    for r in rechnungen:
+        name = _eindeutig(dateiname(r), vergeben, r.get("id"))
+        aufgaben.append((r, name))
+
+    prozesse = max(1, min(prozesse or standard_prozesse(), gesamt or 1))
+    # spawn auch unter Linux: kein fork eines Prozesses mit laufender Qt-Oberfläche
+    ctx = multiprocessing.get_context("spawn")
+    fertig = 0
+    vollstaendig = False
+    try:
+        with ProcessPoolExecutor(max_workers=prozesse, mp_context=ctx,
+                                 initializer=_worker_init) as pool:
+            offen = {}
+            for r, name in aufgaben:
+                fut = pool.submit(_render, r, os.path.join(ordner, name))
+                offen[fut] = (r, name)
+            while offen:
+                if not ergebnis["abgebrochen"] and abgebrochen is not None and abgebrochen():
+                    # wartende verwerfen, laufende noch einsammeln
+                    ergebnis["abgebrochen"] = True
+                    for fut in [f for f in offen if f.cancel()]:
+                        del offen[fut]
+                    continue
+                erledigt, _rest = wait(list(offen), timeout=POLL_SEKUNDEN, return_when=FIRST_COMPLETED)
+                for fut in erledigt:
+                    r, name = offen.pop(fut)
+                    try:
+                        _id, fehler = fut.result()
+                    except Exception as e:
+                        fehler = str(e)
+                    fertig += 1
+                    pfad = os.path.join(ordner, name)
+                    if fehler:
+                        ergebnis["fehler"].append((r.get("rechnung_nr"), fehler))
+                    else:
+                        ergebnis["ok"] += 1
+                        if archiv is not None:
+                            archiv.write(pfad, name)
+                            os.remove(pfad)
+                    if fortschritt is not None:
+                        fortschritt(fertig, gesamt, name)
+        vollstaendig = not ergebnis["abgebrochen"]
+    finally:
+        if archiv is not None:
+            archiv.close()
+            shutil.rmtree(ordner, ignore_errors=True)
+            if vollstaendig:
+                os.replace(part, ziel)
+            else:
+                try:
+                    os.remove(part)
+                except OSError:
+                    pass
+
+    ergebnis["dauer_s"] = round(time.perf_counter() - t0, 2)
+    print(f"[DBG] PDF-Stapel: {ergebnis['ok']}/{gesamt} in {ergebnis['dauer_s']} s "
+          f"({prozesse} Prozesse), {len(ergebnis['fehler'])} Fehler"
+          f"{' (abgebrochen)' if ergebnis['abgebrochen'] else ''}", flush=True)
+    return ergebnis
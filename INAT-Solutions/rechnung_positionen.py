@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Rechnungspositionen als Tabelle und gespeicherte Summen.
+
+rechnungen.positionen (JSON) bleibt die Quelle für Dialog und PDF. Zusätzlich
+werden beim Speichern
+- die Positionen normalisiert nach rechnung_positionen geschrieben und
+- netto / mwst_betrag / brutto auf der Rechnung abgelegt,
+damit Listen, Dashboard und Auswertungen Beträge per SQL (SUM/Index) lesen
+können, ohne jede Rechnung zu parsen.
+
+Tabelle und Spalten legt schema_migrations an (Migration 3, inkl. Backfill).
+Alle Funktionen erwarten einen Cursor aus get_db() (Platzhalter %s).
+"""
+import json
+
+POS_TABLE = "rechnung_positionen"
+BACKFILL_BATCH = 500
+
+_INSERT_SQL = (
+    f"INSERT INTO {POS_TABLE} (rechnung_id, position_index, bezeichnung, menge, preis, mwst, gesamt) "
+    "VALUES (%s, %s, %s, %s, %s, %s, %s)"
+)
+
+
+def _zahl(value) -> float:
+    if value in (None, ""):
+        return 0.0
+    try:
+        return float(str(value).replace("'", "").replace(",", "."))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_positionen(raw) -> list:
+    """rechnungen.positionen (JSON-Text oder Liste) -> Liste von Dicts."""
+    if isinstance(raw, list):
+        return raw
+    if not raw:
+        return []
+    if isinstance(raw, (bytes, bytearray, memoryview)):
+        raw = bytes(raw).decode("utf-8", "replace")
+    try:
+        data = json.loads(raw)
+    except Exception:
+        return []
+    return data if isinstance(data, list) else []
+
+
+def berechne_summen(positionen, mwst_prozent):
+    """
+    (netto, mwst_betrag, brutto) auf Rappen gerundet. Gleiche Rechnung wie
+    Tabelle und PDF-Export: Summe menge * einzelpreis, MWST auf das Netto.
+    """
+    netto = 0.0
+    for pos in positionen or []:
+        if isinstance(pos, dict):
+            netto += _zahl(pos.get("menge")) * _zahl(pos.get("einzelpreis", pos.get("preis")))
+    mwst_betrag = netto * _zahl(mwst_prozent) / 100.0
+    return round(netto, 2), round(mwst_betrag, 2), round(netto + mwst_betrag, 2)
+
+
+def _zeilen(rechnung_id, positionen, mwst_prozent):
+    mwst = _zahl(mwst_prozent)
+    zeilen = []
+    for idx, pos in enumerate(positionen or []):
+        if not isinstance(pos, dict):
+            continue
+        menge = _zahl(pos.get("menge"))
+        preis = _zahl(pos.get("einzelpreis", pos.get("preis")))
+        zeilen.append((
+            rechnung_id, idx,
+            pos.get("beschreibung") or pos.get("bezeichnung") or "",
+            menge, preis, mwst, round(menge * preis, 2),
+        ))
+    return zeilen
+
+
+def speichere_positionen(cur, rechnung_id, positionen, mwst_prozent) -> None:
+    """Ersetzt die Positionen einer Rechnung (innerhalb der Transaktion des Aufrufers)."""
+    cur.execute(f"DELETE FROM {POS_TABLE} WHERE rechnung_id = %s", (rechnung_id,))
+    zeilen = _zeilen(rechnung_id, positionen, mwst_prozent)
+    if zeilen:
+        cur.executemany(_INSERT_SQL, zeilen)
+
+
+def loesche_positionen(cur, rechnung_ids) -> None:
+    ids = list(rechnung_ids or [])
+    if ids:
+        placeholders = ",".join(["%s"] * len(ids))
+        cur.execute(f"DELETE FROM {POS_TABLE} WHERE rechnung_id IN ({placeholders})", tuple(ids))
+
+
+def backfill(cur, nur_fehlende: bool = True) -> int:
+    """
+    Füllt rechnung_positionen und netto/mwst_betrag/brutto aus dem JSON.
+    nur_fehlende=True bearbeitet nur Rechnungen ohne brutto (Altbestand,
+    Importe an speichere_rechnung vorbei). Liefert die Anzahl Rechnungen.
+    """
+    where = "WHERE brutto IS NULL" if nur_fehlende else ""
+    cur.execute(f"SELECT id, mwst, positionen FROM rechnungen {where} ORDER BY id")
+    rows = cur.fetchall()
+    for start in range(0, len(rows), BACKFILL_BATCH):
+        chunk = rows[start:start + BACKFILL_BATCH]
+        ids = [r[0] for r in chunk]
+        loesche_positionen(cur, ids)
+        summen = []
+        zeilen = []
+        for rid, mwst, raw in chunk:
+            positionen = parse_positionen(raw)
+            netto, mwst_betrag, brutto = berechne_summen(positionen, mwst)
+            summen.append((netto, mwst_betrag, brutto, rid))
+            zeilen.extend(_zeilen(rid, positionen, mwst))
+        if zeilen:
+            cur.executemany(_INSERT_SQL, zeilen)
+        cur.executemany(
+            "UPDATE rechnungen SET netto = %s, mwst_betrag = %s, brutto = %s WHERE id = %s",
+            summen,
+        )
+    return len(rows)
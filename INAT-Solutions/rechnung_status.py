@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Fälligkeit und Zahlungsstatus von Rechnungen als gespeicherte Spalten.
+
+Beim Speichern werden auf der Rechnung abgelegt:
+- faellig_am: Rechnungsdatum + Zahlungsziel (erste Zahl in
+  zahlungskonditionen, Standard 10 Tage), ISO-Datum; NULL wenn das
+  Rechnungsdatum nicht lesbar ist (solche Rechnungen bleiben "offen"),
+- status: 'offen' / 'bezahlt' / 'überfällig'. Ein manueller Status in
+  abschluss hat Vorrang vor der Automatik.
+
+Den Wechsel offen -> überfällig erledigt rollover() als ein UPDATE über den
+Index (status, faellig_am), einmal pro Tag und Prozess (rollover_taeglich).
+Listen, Dashboard und Auswertungen filtern danach nur noch auf status bzw.
+faellig_am, statt Datum und Konditionen jeder Rechnung in Python zu parsen.
+
+Spalten und Index legt schema_migrations an (Migration 6, inkl. Backfill).
+Alle Funktionen mit cur erwarten einen Cursor aus get_db() (Platzhalter %s).
+"""
+import datetime
+import re
+import threading
+
+STATUS_OFFEN = "offen"
+STATUS_BEZAHLT = "bezahlt"
+STATUS_UEBERFAELLIG = "überfällig"
+STATUS_WERTE = (STATUS_OFFEN, STATUS_BEZAHLT, STATUS_UEBERFAELLIG)
+
+STANDARD_ZIEL_TAGE = 10
+BACKFILL_BATCH = 500
+
+_DATUM_FORMATE = ("%Y-%m-%d", "%d.%m.%Y", "%d.%m.%y")
+
+# Manuell gesetztes 'offen' darf der Rollover nicht überschreiben
+_NICHT_MANUELL_OFFEN = "LOWER(TRIM(COALESCE(abschluss, ''))) != 'offen'"
+
+_rollover_lock = threading.Lock()
+_rollover_stand = {}        # (pool_generation, ziel) -> Datum des letzten Rollovers
+
+
+def parse_datum(wert):
+    """Rechnungsdatum (ISO, dd.mm.yyyy, dd.mm.yy oder date) -> date oder None."""
+    if isinstance(wert, datetime.datetime):
+        return wert.date()
+    if isinstance(wert, datetime.date):
+        return wert
+    text = str(wert or "").strip()[:10]
+    for fmt in _DATUM_FORMATE:
+        try:
+            return datetime.datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+    return None
+
+
+def ziel_tage(zahlungskonditionen) -> int:
+    m = re.search(r"(\d+)", str(zahlungskonditionen or ""))
+    return int(m.group(1)) if m else STANDARD_ZIEL_TAGE
+
+
+def berechne_faellig_am(datum, zahlungskonditionen):
+    """Fälligkeitsdatum (date) oder None, wenn das Rechnungsdatum unlesbar ist."""
+    rechnungsdatum = parse_datum(datum)
+    if rechnungsdatum is None:
+        return None
+    return rechnungsdatum + datetime.timedelta(days=ziel_tage(zahlungskonditionen))
+
+
+def berechne_status(abschluss, faellig_am, heute=None) -> str:
+    """
+    Status einer Rechnung: manueller abschluss (bezahlt/offen/überfällig) hat
+    Vorrang, sonst überfällig ab dem Tag nach faellig_am.
+    """
+    manuell = (abschluss or "").strip().lower()
+    if manuell in STATUS_WERTE:
+        return manuell
+    faellig = parse_datum(faellig_am)
+    heute = heute or datetime.date.today()
+    if faellig is not None and heute > faellig:
+        return STATUS_UEBERFAELLIG
+    return STATUS_OFFEN
+
+
+def werte(datum, zahlungskonditionen, abschluss, heute=None):
+    """(faellig_am als ISO-Text oder None, status) zum Speichern."""
+    faellig = berechne_faellig_am(datum, zahlungskonditionen)
+    return (faellig.isoformat() if faellig else None), berechne_status(abschluss, faellig, heute)
+
+
+def backfill(cur, nur_fehlende: bool = True) -> int:
+    """
+    Setzt faellig_am und status aus datum/zahlungskonditionen/abschluss.
+    nur_fehlende=True bearbeitet nur Rechnungen ohne status (Altbestand,
+    Importe an speichere_rechnung vorbei). Liefert die Anzahl Rechnungen.
+    """
+    where = "WHERE status IS NULL" if nur_fehlende else ""
+    cur.execute(f"SELECT id, datum, zahlungskonditionen, abschluss FROM rechnungen {where} ORDER BY id")
+    rows = cur.fetchall()
+    heute = datetime.date.today()
+    for start in range(0, len(rows), BACKFILL_BATCH):
+        chunk = rows[start:start + BACKFILL_BATCH]
+        cur.executemany(
+            "UPDATE rechnungen SET faellig_am = %s, status = %s WHERE id = %s",
+            [werte(datum, zk, abschluss, heute) + (rid,) for rid, datum, zk, abschluss in chunk],
+        )
+    return len(rows)
+
+
+def rollover(cur, heute=None) -> int:
+    """Offene Rechnungen mit faellig_am < heute auf 'überfällig' setzen. Liefert die Anzahl."""
+    heute = heute or datetime.date.today()
+    cur.execute(
+        "UPDATE rechnungen SET status = %s "
+        f"WHERE status = %s AND faellig_am < %s AND {_NICHT_MANUELL_OFFEN}",
+        (STATUS_UEBERFAELLIG, STATUS_OFFEN, heute.isoformat()),
+    )
+    return max(cur.rowcount or 0, 0)
+
+
+def rollover_taeglich() -> int:
+    """
+    rollover() höchstens einmal pro Tag und Datenbank in diesem Prozess
+    (danach ein Dictionary-Lookup). Vorher werden Rechnungen ohne brutto
+    bzw. status nachgetragen (z.B. aus tools/import_old_csvs), sonst zählen
+    sie in den Dashboard-Summen als 0. Fehler werden nur
+    protokolliert; die Listen zeigen dann bis zum nächsten Versuch den Stand
+    von gestern.
+    """
+    import db_connection
+    import rechnung_positionen
+    from db_connection import get_db
+
+    heute = datetime.date.today()
+    key = (db_connection.pool_generation(), db_connection.get_configured_url() or db_connection.get_local_db_path())
+    if _rollover_stand.get(key) == heute:
+        return 0
+    with _rollover_lock:
+        if _rollover_stand.get(key) == heute:
+            return 0
+        try:
+            with get_db() as conn:
+                with conn.cursor() as cur:
+                    rechnung_positionen.backfill(cur)
+                    backfill(cur)
+                    anzahl = rollover(cur, heute)
+                conn.commit()
+        except Exception as e:
+            print(f"[DBG] Rechnungsstatus-Rollover fehlgeschlagen: {e}", flush=True)
+            return 0
+        _rollover_stand[key] = heute
+    if anzahl:
+        print(f"[DBG] {anzahl} Rechnung(en) auf überfällig gesetzt", flush=True)
+    return anzahl
+
+
+def ueberfaellige(cur, limit=None) -> list:
+    """[(id, rechnung_nr, kunde, faellig_am, brutto)] aller überfälligen Rechnungen, älteste Fälligkeit zuerst."""
+    sql = (
+        "SELECT id, rechnung_nr, kunde, faellig_am, brutto FROM rechnungen "
+        "WHERE status = %s ORDER BY faellig_am, id"
+    )
+    params = [STATUS_UEBERFAELLIG]
+    if limit:
+        sql += " LIMIT %s"
+        params.append(int(limit))
+    cur.execute(sql, params)
+    return cur.fetchall()
+
+
+def faellig_zwischen(cur, von, bis, limit=None) -> list:
+    """[(id, rechnung_nr, kunde, faellig_am, brutto)] offener Rechnungen mit von <= faellig_am <= bis."""
+    sql = (
+        "SELECT id, rechnung_nr, kunde, faellig_am, brutto FROM rechnungen "
+        "WHERE status = %s AND faellig_am >= %s AND faellig_am <= %s ORDER BY faellig_am, id"
+    )
+    params = [STATUS_OFFEN, von.isoformat(), bis.isoformat()]
+    if limit:
+        sql += " LIMIT %s"
+        params.append(int(limit))
+    cur.execute(sql, params)
+    return cur.fetchall()
+
+
+def diese_woche(heute=None):
+    """(montag, sonntag) der aktuellen Kalenderwoche."""
+    heute = heute or datetime.date.today()
+    montag = heute - datetime.timedelta(days=heute.weekday())
+    return montag, montag + datetime.timedelta(days=6)
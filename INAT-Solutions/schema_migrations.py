@@ -0,0 +1,574 @@
+# -*- coding: utf-8 -*-
+"""
+Versionierte Schema-Migrationen für die Business-DB (SQLite und PostgreSQL).
+
+Alle DDL-Änderungen laufen über die hier registrierten, fortlaufend
+nummerierten Migrationen. Die angewendeten Versionen stehen in der Tabelle
+schema_migrations; beim Start genügt damit ein einzelnes
+SELECT MAX(version), um festzustellen, dass nichts zu tun ist.
+
+Neue Migration anlegen:
+
+    @migration(2, "Kurzbeschreibung")
+    def _m002_xyz(cur, is_sqlite):
+        cur.execute(...)
+
+Jede Migration läuft in einer eigenen Transaktion zusammen mit dem Eintrag
+in schema_migrations. Auf PostgreSQL serialisiert ein Advisory-Lock parallel
+startende Clients, auf SQLite BEGIN IMMEDIATE.
+"""
+import threading
+
+from db_connection import get_db, get_configured_url, get_local_db_path
+
+VERSION_TABLE = "schema_migrations"
+_PG_LOCK_KEY = 0x494E4154  # "INAT"
+
+MIGRATIONS = []             # (version, beschreibung, fn) aufsteigend sortiert
+
+_lock = threading.Lock()
+_current = set()            # Ziele (DSN/Pfad), die in diesem Prozess bereits geprüft sind
+
+
+def migration(version: int, description: str):
+    """Registriert fn(cur, is_sqlite) als Migration mit der angegebenen Nummer."""
+    def deco(fn):
+        if any(v == version for v, _d, _f in MIGRATIONS):
+            raise ValueError(f"Migration {version} doppelt registriert")
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return deco
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+# -------------------- Hilfen --------------------
+
+def _sqlite_type(typ: str) -> str:
+    """Übersetzt die (Postgres-)Typangaben aus BASE_SCHEMA für SQLite."""
+    if "PRIMARY KEY" in typ and "SERIAL" in typ:
+        return "INTEGER PRIMARY KEY AUTOINCREMENT"
+    return (typ.replace("BIGSERIAL", "INTEGER").replace("SERIAL", "INTEGER")
+               .replace("BYTEA", "BLOB").replace("JSONB", "TEXT")
+               .replace("TIMESTAMPTZ", "TEXT").replace("TIMESTAMP", "TEXT"))
+
+
+def _try(cur, sql, params=None) -> bool:
+    """
+    Best-effort-Statement innerhalb der laufenden Migration. Ein SAVEPOINT
+    verhindert, dass ein Fehler auf PostgreSQL die ganze Transaktion abbricht.
+    """
+    cur.execute("SAVEPOINT mig_try")
+    try:
+        cur.execute(sql, params)
+    except Exception:
+        cur.execute("ROLLBACK TO SAVEPOINT mig_try")
+        cur.execute("RELEASE SAVEPOINT mig_try")
+        return False
+    cur.execute("RELEASE SAVEPOINT mig_try")
+    return True
+
+
+def _columns(cur, table: str, is_sqlite: bool) -> set:
+    if is_sqlite:
+        cur.execute(f"PRAGMA table_info({table})")
+        return {str(r[1]).lower() for r in cur.fetchall()}
+    cur.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s",
+        (table,),
+    )
+    return {str(r[0]).lower() for r in cur.fetchall()}
+
+
+def create_tables(cur, is_sqlite: bool, schema: dict) -> None:
+    """CREATE TABLE IF NOT EXISTS und fehlende Spalten ergänzen (nur innerhalb von Migrationen)."""
+    for table, cols in schema.items():
+        if is_sqlite:
+            defs = [f"{name} {_sqlite_type(typ)}" for name, typ in cols]
+        else:
+            defs = [f"{name} {typ}" for name, typ in cols]
+        _try(cur, f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(defs)})")
+        existing = _columns(cur, table, is_sqlite)
+        for name, typ in cols:
+            if name.lower() in existing:
+                continue
+            t = _sqlite_type(typ) if is_sqlite else typ
+            _try(cur, f"ALTER TABLE {table} ADD COLUMN {name} {t}")
+
+
+def create_indexes(cur, indexes) -> None:
+    for name, table, cols in indexes:
+        _try(cur, f"CREATE INDEX IF NOT EXISTS {name} ON {table}({cols})")
+
+
+def sync_pg_sequences(cur, tables=None) -> None:
+    """
+    Setzt die Serial-Sequenzen auf MAX(id)+1. Nötig nach Importen mit
+    expliziten IDs (z.B. Sync lokal -> remote), sonst UniqueViolation.
+    """
+    for table, col in (tables or _SERIAL_COLUMNS):
+        # Ergebnis vor RELEASE SAVEPOINT holen (_try führt danach ein weiteres Statement aus)
+        cur.execute("SAVEPOINT mig_seq")
+        try:
+            cur.execute("SELECT pg_get_serial_sequence(%s, %s)", (table, col))
+            row = cur.fetchone()
+        except Exception:
+            cur.execute("ROLLBACK TO SAVEPOINT mig_seq")
+            row = None
+        cur.execute("RELEASE SAVEPOINT mig_seq")
+        seq = row[0] if row else None
+        if seq:
+            _try(cur, f"SELECT setval(%s, COALESCE((SELECT MAX({col}) FROM {table}), 0) + 1, false)", (seq,))
+
+
+# -------------------- Registrierte Migrationen --------------------
+
+# Stand vor Einführung der Migrationen: vereint ensure_app_schema und die
+# CREATE TABLEs, die bisher in Tabs, settings_store und im Layout-Dialog lagen.
+BASE_SCHEMA = {
+    "config": [
+        ("key", "TEXT PRIMARY KEY"),
+        ("value", "TEXT"),
+    ],
+    "app_settings": [
+        ("key", "TEXT PRIMARY KEY"),
+        ("value_bytes", "BYTEA"),
+        ("value_text", "TEXT"),
+        ("mime", "TEXT"),
+        ("updated_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ],
+    "users": [
+        ("id", "INTEGER PRIMARY KEY"),
+        ("username", "TEXT UNIQUE NOT NULL"),
+        ("password_hash", "TEXT NOT NULL"),
+        ("role", "TEXT DEFAULT 'user'"),
+    ],
+    "buchhaltung": [
+        ("id", "BIGSERIAL PRIMARY KEY"),
+        ("datum", "TIMESTAMP"),
+        ("typ", "TEXT"),
+        ("kategorie", "TEXT"),
+        ("betrag", "NUMERIC"),
+        ("beschreibung", "TEXT"),
+    ],
+    "auftraege": [
+        ("id", "BIGSERIAL PRIMARY KEY"),
+        ("titel", "TEXT NOT NULL"),
+        ("beschreibung", "TEXT"),
+        ("start_zeit", "TIMESTAMP NOT NULL"),
+        ("end_zeit", "TIMESTAMP NOT NULL"),
+        ("ort", "TEXT"),
+        ("kunden_id", "INTEGER"),
+        ("rechnung_id", "INTEGER"),
+        ("outlook_event_id", "TEXT UNIQUE"),
+        ("created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ],
+    "outlook_events": [
+        ("outlook_event_id", "TEXT PRIMARY KEY"),
+        ("auftrag_id", "INTEGER NOT NULL"),
+        ("last_sync", "TIMESTAMP"),
+    ],
+    "invoices": [
+        ("id", "BIGSERIAL PRIMARY KEY"),
+        ("buchung_id", "BIGINT"),
+        ("filename", "TEXT"),
+        ("content", "BYTEA"),
+        ("content_type", "TEXT"),
+        ("size", "INTEGER"),
+        ("created_at", "TIMESTAMP"),
+    ],
+    "lieferanten": [
+        ("id", "BIGSERIAL PRIMARY KEY"),
+        ("lieferantnr", "INTEGER"),
+        ("name", "TEXT"),
+        ("firma", "TEXT"),
+        ("strasse", "TEXT"),
+        ("plz", "TEXT"),
+        ("stadt", "TEXT"),
+        ("telefon", "TEXT"),
+        ("email", "TEXT"),
+        ("kommentare", "TEXT"),
+        ("portal_link", "TEXT"),
+        ("login", "TEXT"),
+        ("passwort", "TEXT"),
+    ],
+    "kunden": [
+        ("kundennr", "BIGSERIAL PRIMARY KEY"),
+        ("anrede", "TEXT"),
+        ("name", "TEXT"),
+        ("firma", "TEXT"),
+        ("strasse", "TEXT"),
+        ("plz", "TEXT"),
+        ("stadt", "TEXT"),
+        ("telefon", "TEXT"),
+        ("email", "TEXT"),
+        ("bemerkung", "TEXT"),
+    ],
+    "rechnungen": [
+        ("id", "BIGSERIAL PRIMARY KEY"),
+        ("rechnung_nr", "TEXT"),
+        ("kunde", "TEXT"),
+        ("firma", "TEXT"),
+        ("adresse", "TEXT"),
+        ("datum", "TEXT"),
+        ("mwst", "REAL"),
+        ("zahlungskonditionen", "TEXT"),
+        ("positionen", "TEXT"),
+        ("uid", "TEXT"),
+        ("abschluss", "TEXT"),
+        ("abschluss_text", "TEXT"),
+    ],
+    "materiallager": [
+        ("material_id", "BIGSERIAL PRIMARY KEY"),
+        ("materialnummer", "TEXT"),
+        ("bezeichnung", "TEXT"),
+        ("menge", "INTEGER"),
+        ("einheit", "TEXT"),
+        ("lagerort", "TEXT"),
+        ("lieferantnr", "INTEGER"),
+        ("preis", "NUMERIC"),
+        ("waehrung", "TEXT DEFAULT 'EUR'"),
+        ("bemerkung", "TEXT"),
+    ],
+    "reifenlager": [
+        ("reifen_id", "BIGSERIAL PRIMARY KEY"),
+        ("kundennr", "INTEGER"),
+        ("kunde_anzeige", "TEXT"),
+        ("fahrzeug", "TEXT"),
+        ("dimension", "TEXT"),
+        ("typ", "TEXT"),
+        ("dot", "TEXT"),
+        ("lagerort", "TEXT"),
+        ("eingelagert_am", "TEXT"),
+        ("ausgelagert_am", "TEXT"),
+        ("preis", "NUMERIC"),
+        ("waehrung", "TEXT DEFAULT 'EUR'"),
+        ("bemerkung", "TEXT"),
+    ],
+    "artikellager": [
+        ("artikel_id", "BIGSERIAL PRIMARY KEY"),
+        ("artikelnummer", "TEXT"),
+        ("bezeichnung", "TEXT"),
+        ("bestand", "INTEGER"),
+        ("lagerort", "TEXT"),
+        ("preis", "NUMERIC"),
+        ("waehrung", "TEXT DEFAULT 'EUR'"),
+    ],
+    "dienstleistungen": [
+        ("dienstleistung_id", "BIGSERIAL PRIMARY KEY"),
+        ("name", "TEXT"),
+        ("beschreibung", "TEXT"),
+        ("preis", "NUMERIC"),
+        ("einheit", "TEXT"),
+        ("waehrung", "TEXT DEFAULT 'EUR'"),
+        ("bemerkung", "TEXT"),
+    ],
+    "einstellungen": [
+        ("id", "BIGSERIAL PRIMARY KEY"),
+        ("data", "JSONB"),
+    ],
+    "qr_daten": [
+        ("id", "BIGSERIAL PRIMARY KEY"),
+        ("data", "JSONB"),
+    ],
+    "lager_einstellungen": [
+        ("id", "BIGSERIAL PRIMARY KEY"),
+        ("lager_typ", "TEXT UNIQUE"),
+        ("aktiv", "BOOLEAN DEFAULT FALSE"),
+    ],
+    "rechnung_layout": [
+        ("id", "BIGSERIAL PRIMARY KEY"),
+        ("name", "TEXT"),
+        ("layout", "TEXT"),
+        ("kopfzeile", "TEXT"),
+        ("einleitung", "TEXT"),
+        ("fusszeile", "TEXT"),
+        ("logo", "BYTEA"),
+        ("logo_mime", "TEXT"),
+        ("logo_skala", "NUMERIC"),
+        ("stil", "TEXT DEFAULT 'classic'"),
+    ],
+}
+
+BASE_INDEXES = [
+    ("idx_rechnungen_datum", "rechnungen", "datum"),
+    ("idx_rechnungen_kunde", "rechnungen", "kunde"),
+    ("idx_kunden_name", "kunden", "name"),
+    ("idx_artikellager_bezeichnung", "artikellager", "bezeichnung"),
+    ("idx_reifenlager_dimension", "reifenlager", "dimension"),
+    ("idx_buchhaltung_datum", "buchhaltung", "datum"),
+]
+
+_SERIAL_COLUMNS = [
+    (table, name)
+    for table, cols in BASE_SCHEMA.items()
+    for name, typ in cols
+    if "SERIAL" in typ
+]
+
+
+@migration(1, "Basisschema (Kern-Tabellen, fehlende Spalten, Indizes)")
+def _m001_base(cur, is_sqlite):
+    create_tables(cur, is_sqlite, BASE_SCHEMA)
+    if is_sqlite:
+        _try(cur, "UPDATE kunden SET kundennr = COALESCE(kundennr, rowid) WHERE kundennr IS NULL")
+    else:
+        # ältere Remote-DBs: kundennr ohne Serial-Default
+        _try(cur, "CREATE SEQUENCE IF NOT EXISTS kunden_kundennr_seq")
+        _try(cur, "ALTER TABLE kunden ALTER COLUMN kundennr SET DEFAULT nextval('kunden_kundennr_seq')")
+        _try(cur, "UPDATE kunden SET kundennr = nextval('kunden_kundennr_seq') WHERE kundennr IS NULL")
+        sync_pg_sequences(cur)
+    create_indexes(cur, BASE_INDEXES)
+
+
+@migration(2, "updated_at + Trigger für Einstellungs-Tabellen (Änderungserkennung)")
+def _m002_settings_updated_at(cur, is_sqlite):
+    # settings_cache erkennt Änderungen anderer Clients über MAX(updated_at);
+    # lokal (SQLite) genügt die Invalidierung durch die set_*-Helfer.
+    if is_sqlite:
+        return
+    cur.execute(
+        "CREATE OR REPLACE FUNCTION inat_touch_updated_at() RETURNS trigger AS $$ "
+        "BEGIN NEW.updated_at := CURRENT_TIMESTAMP; RETURN NEW; END; $$ LANGUAGE plpgsql"
+    )
+    for table in ("config", "einstellungen", "qr_daten", "rechnung_layout", "app_settings"):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+        cur.execute(f"DROP TRIGGER IF EXISTS trg_{table}_updated_at ON {table}")
+        cur.execute(
+            f"CREATE TRIGGER trg_{table}_updated_at BEFORE INSERT OR UPDATE ON {table} "
+            "FOR EACH ROW EXECUTE PROCEDURE inat_touch_updated_at()"
+        )
+
+
+@migration(3, "rechnung_positionen + gespeicherte Summen (netto/mwst_betrag/brutto) mit Backfill")
+def _m003_rechnung_positionen(cur, is_sqlite):
+    import rechnung_positionen
+    create_tables(cur, is_sqlite, {
+        "rechnung_positionen": [
+            ("id", "BIGSERIAL PRIMARY KEY"),
+            ("rechnung_id", "BIGINT"),
+            ("position_index", "INTEGER"),
+            ("bezeichnung", "TEXT"),
+            ("menge", "NUMERIC"),
+            ("preis", "NUMERIC"),
+            ("mwst", "NUMERIC"),
+            ("gesamt", "NUMERIC"),
+        ],
+        "rechnungen": [
+            ("netto", "NUMERIC"),
+            ("mwst_betrag", "NUMERIC"),
+            ("brutto", "NUMERIC"),
+        ],
+    })
+    create_indexes(cur, [
+        ("idx_rechnung_positionen_rechnung", "rechnung_positionen", "rechnung_id"),
+    ])
+    # Positionen aus tools/import_old_csvs werden dabei normalisiert ersetzt
+    rechnung_positionen.backfill(cur, nur_fehlende=False)
+
+
+@migration(4, "Listen-Tabs: Sortier-Indizes für DataGrid, Lieferanten-Maskenfelder")
+def _m004_grid_indexes(cur, is_sqlite):
+    # LieferantenTab/-Dialog arbeiten mit diesen Feldern, das Basisschema kannte sie nicht
+    create_tables(cur, is_sqlite, {
+        "lieferanten": [
+            ("adresse", "TEXT"),
+            ("kontaktperson", "TEXT"),
+            ("notizen", "TEXT"),
+        ],
+    })
+    # Ausdruck wie GridColumn.sort_expr + Schlüssel als Tiebreaker -> Keyset per Index
+    create_indexes(cur, [
+        ("idx_lieferanten_grid_name", "lieferanten", "(COALESCE(name, '')), id"),
+        ("idx_materiallager_grid_bez", "materiallager", "(COALESCE(bezeichnung, '')), material_id"),
+        ("idx_artikellager_grid_bez", "artikellager", "(COALESCE(bezeichnung, '')), artikel_id"),
+        ("idx_reifenlager_grid_dim", "reifenlager", "(COALESCE(dimension, '')), reifen_id"),
+        ("idx_dienstleistungen_grid_name", "dienstleistungen", "(COALESCE(name, '')), dienstleistung_id"),
+        ("idx_invoices_buchung", "invoices", "buchung_id"),
+    ])
+
+
+@migration(5, "dashboard_metrics: per Trigger gepflegte Dashboard-Kennzahlen")
+def _m005_dashboard_metrics(cur, is_sqlite):
+    import dashboard_metrics
+    dashboard_metrics.install(cur, is_sqlite)
+    dashboard_metrics.rebuild(cur, is_sqlite)
+
+
+@migration(6, "rechnungen.faellig_am/status gespeichert + Index (status, faellig_am) mit Backfill")
+def _m006_rechnung_status(cur, is_sqlite):
+    import rechnung_status
+    create_tables(cur, is_sqlite, {
+        "rechnungen": [
+            ("faellig_am", "DATE"),
+            ("status", "TEXT"),
+        ],
+    })
+    create_indexes(cur, [
+        ("idx_rechnungen_status_faellig", "rechnungen", "status, faellig_am"),
+    ])
+    rechnung_status.backfill(cur, nur_fehlende=False)
+
+
+@migration(7, "Datumsspalten kanonisch ISO (PostgreSQL: DATE/TIMESTAMP), Index auftraege.start_zeit")
+def _m007_iso_datum(cur, is_sqlite):
+    import dashboard_metrics
+    import datum_iso
+    # Rollup-Trigger hängen an datum/ausgelagert_am/start_zeit
+    dashboard_metrics.uninstall(cur, is_sqlite)
+    for spalte, (geaendert, unlesbar) in datum_iso.migriere(cur, is_sqlite).items():
+        if geaendert or unlesbar:
+            print(f"[SCHEMA] {spalte}: {geaendert} Werte umgeschrieben, {unlesbar} unlesbar", flush=True)
+    create_indexes(cur, [
+        ("idx_auftraege_start_zeit", "auftraege", "start_zeit"),
+    ])
+    dashboard_metrics.install(cur, is_sqlite)
+    dashboard_metrics.rebuild(cur, is_sqlite)
+
+
+@migration(8, "Volltext-Suchindex (SQLite FTS5 / PostgreSQL tsvector) für Kunden, Lieferanten, Lager, Dienstleistungen")
+def _m008_suchindex(cur, is_sqlite):
+    import suchindex
+    tabellen = ["kunden", "lieferanten", "artikellager", "materiallager", "reifenlager", "dienstleistungen"]
+    suchindex.install(cur, is_sqlite, tabellen)
+    for tabelle, zeilen in suchindex.rebuild(cur, is_sqlite, tabellen).items():
+        print(f"[SCHEMA] Suchindex {tabelle}: {zeilen} Zeilen", flush=True)
+
+
+@migration(9, "Suchindex für Rechnungen (inkl. Positionstexte) und Aufträge (globale Suche)")
+def _m009_suchindex_rechnungen(cur, is_sqlite):
+    import suchindex
+    tabellen = ["rechnungen", "auftraege"]
+    suchindex.install(cur, is_sqlite, tabellen)
+    for tabelle, zeilen in suchindex.rebuild(cur, is_sqlite, tabellen).items():
+        print(f"[SCHEMA] Suchindex {tabelle}: {zeilen} Zeilen", flush=True)
+
+
+@migration(10, "Kundenliste als DataList: Sortier-Index (Name, Kundennr)")
+def _m010_kunden_grid_index(cur, is_sqlite):
+    # wie Migration 4: Keyset-Seiten der Kundenliste per Index statt Sortieren
+    create_indexes(cur, [
+        ("idx_kunden_grid_name", "kunden", "(COALESCE(name, '')), kundennr"),
+    ])
+
+
+# -------------------- Ausführung --------------------
+
+def _target_key():
+    return get_configured_url() or get_local_db_path()
+
+
+def _read_version(conn) -> int:
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SELECT MAX(version) FROM {VERSION_TABLE}")
+            row = cur.fetchone()
+        return int(row[0] or 0) if row else 0
+    except Exception:
+        # Tabelle fehlt noch (frische oder Alt-DB)
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return 0
+
+
+def current_version(conn=None) -> int:
+    """Höchste angewendete Migration der DB (0 = noch keine)."""
+    if conn is not None:
+        return _read_version(conn)
+    conn = get_db()
+    try:
+        return _read_version(conn)
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _begin(cur, is_sqlite: bool) -> None:
+    if is_sqlite:
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+        except Exception:
+            pass  # bereits in einer Transaktion
+    else:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (_PG_LOCK_KEY,))
+
+
+def _apply_pending(conn, is_sqlite: bool) -> int:
+    with conn.cursor() as cur:
+        ts = "TEXT" if is_sqlite else "TIMESTAMP"
+        cur.execute(
+            f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+            f"version INTEGER PRIMARY KEY, description TEXT, applied_at {ts} DEFAULT CURRENT_TIMESTAMP)"
+        )
+    conn.commit()
+
+    version = _read_version(conn)
+    for number, description, fn in MIGRATIONS:
+        if number <= version:
+            continue
+        try:
+            with conn.cursor() as cur:
+                _begin(cur, is_sqlite)
+                # anderer Client kann inzwischen migriert haben
+                cur.execute(f"SELECT 1 FROM {VERSION_TABLE} WHERE version = %s", (number,))
+                if cur.fetchone() is None:
+                    fn(cur, is_sqlite)
+                    cur.execute(
+                        f"INSERT INTO {VERSION_TABLE} (version, description) VALUES (%s, %s)",
+                        (number, description),
+                    )
+                    print(f"[SCHEMA] Migration {number} angewendet: {description}", flush=True)
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        version = number
+    return version
+
+
+def migrate(conn=None) -> int:
+    """
+    Bringt die DB auf den neuesten Stand und gibt die Version zurück.
+    Ohne conn: get_db(); pro Ziel und Prozess wird nur einmal geprüft.
+    """
+    key = _target_key() if conn is None else None
+    if key is not None and key in _current:
+        return latest_version()
+    with _lock:
+        own = conn is None
+        if own:
+            conn = get_db()
+        try:
+            version = _read_version(conn)
+            if version < latest_version():
+                version = _apply_pending(conn, getattr(conn, "is_sqlite", False))
+        finally:
+            if own:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+    if key is not None:
+        _current.add(key)
+    return version
+
+
+def is_current(conn=None) -> bool:
+    return current_version(conn) >= latest_version()
+
+
+def invalidate() -> None:
+    """Vergisst die Prüfung dieses Prozesses (z.B. nach Restore einer älteren DB-Datei)."""
+    with _lock:
+        _current.clear()
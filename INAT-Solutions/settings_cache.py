@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Zentraler In-Memory-Cache für Einstellungen.
+
+Lädt config, einstellungen, qr_daten, rechnung_layout (neueste Zeile) und
+app_settings gemeinsam über eine einzige Verbindung und bedient danach alle
+Lesezugriffe aus dem Speicher. Invalidiert wird
+- lokal durch die set_*-Helfer (db_connection, settings_store) und invalidate(),
+- nach close_pool() (Wechsel SQLite/PostgreSQL, Restore),
+- auf PostgreSQL zusätzlich bei Änderungen anderer Clients: höchstens alle
+  REMOTE_CHECK_INTERVAL Sekunden wird ein Stempel aus MAX(updated_at)/COUNT(*)
+  der Einstellungs-Tabellen gelesen (Spalten/Trigger aus Migration 2).
+
+Intervall über config.json: "settings_remote_check": <Sekunden>, 0 = aus.
+"""
+import copy
+import json
+import threading
+import time
+
+import db_connection
+from db_connection import get_db
+
+NAMESPACES = ("config", "einstellungen", "qr_daten", "rechnung_layout", "app_settings")
+SETTINGS_TABLES = NAMESPACES
+REMOTE_CHECK_INTERVAL = 5.0
+
+_lock = threading.RLock()
+_data = None                # namespace -> dict
+_generation = None          # db_connection.pool_generation() beim Laden
+_is_sqlite = True
+_stamp = None               # Remote-Stempel (nur PostgreSQL)
+_last_check = 0.0
+_interval = REMOTE_CHECK_INTERVAL
+_stats = {"hits": 0, "misses": 0, "loads": 0, "invalidations": 0,
+          "remote_checks": 0, "remote_changes": 0}
+
+_STAMP_SQL = "SELECT " + ", ".join(
+    f"(SELECT MAX(updated_at) FROM {t}), (SELECT COUNT(*) FROM {t})" for t in SETTINGS_TABLES
+)
+
+
+def _remote_interval() -> float:
+    try:
+        return float(db_connection._read_config().get("settings_remote_check", REMOTE_CHECK_INTERVAL))
+    except Exception:
+        return REMOTE_CHECK_INTERVAL
+
+
+def _parse_json(value):
+    if value is None or isinstance(value, (dict, list)):
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        value = bytes(value).decode("utf-8", "replace")
+    try:
+        return json.loads(value)
+    except Exception:
+        return value
+
+
+def _row_dict(cur, row) -> dict:
+    if row is None:
+        return {}
+    if isinstance(row, dict):
+        return dict(row)
+    if hasattr(row, "keys"):
+        return {k: row[k] for k in row.keys()}
+    cols = [d[0] for d in (getattr(cur, "description", None) or [])]
+    return dict(zip(cols, row))
+
+
+def _select(conn, cur, sql):
+    try:
+        cur.execute(sql)
+        return cur.fetchall()
+    except Exception:
+        # Tabelle fehlt (Schema noch nicht migriert) -> leer
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return []
+
+
+def _read_stamp(conn, cur):
+    try:
+        cur.execute(_STAMP_SQL)
+        return tuple(cur.fetchone() or ())
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return None
+
+
+def _load() -> None:
+    """Alle Namespaces über eine Verbindung laden. Aufruf nur unter _lock."""
+    global _data, _generation, _is_sqlite, _stamp, _last_check, _interval
+    generation = db_connection.pool_generation()
+    data = {ns: {} for ns in NAMESPACES}
+    conn = get_db()
+    try:
+        is_sqlite = getattr(conn, "is_sqlite", False)
+        with conn.cursor() as cur:
+            for r in _select(conn, cur, "SELECT key, value FROM config"):
+                data["config"][r[0]] = r[1]
+            for ns in ("einstellungen", "qr_daten"):
+                for r in _select(conn, cur, f"SELECT id, data FROM {ns}"):
+                    data[ns][r[0]] = _parse_json(r[1])
+            rows = _select(conn, cur, "SELECT * FROM rechnung_layout ORDER BY id DESC LIMIT 1")
+            if rows:
+                row = _row_dict(cur, rows[0])
+                if isinstance(row.get("logo"), memoryview):
+                    row["logo"] = row["logo"].tobytes()
+                data["rechnung_layout"] = row
+            for r in _select(conn, cur, "SELECT key, value_text, value_bytes, mime FROM app_settings"):
+                blob = r[2].tobytes() if isinstance(r[2], memoryview) else r[2]
+                data["app_settings"][r[0]] = (r[1], blob, r[3])
+            stamp = None if is_sqlite else _read_stamp(conn, cur)
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+    _data = data
+    _generation = generation
+    _is_sqlite = is_sqlite
+    _stamp = stamp
+    _last_check = time.monotonic()
+    _interval = _remote_interval()
+    _stats["loads"] += 1
+
+
+def _remote_changed() -> bool:
+    """PostgreSQL: Stempel vergleichen (gedrosselt). Aufruf nur unter _lock."""
+    global _last_check
+    if _is_sqlite or _stamp is None:
+        return False
+    now = time.monotonic()
+    if _interval <= 0 or now - _last_check < _interval:
+        return False
+    _last_check = now
+    _stats["remote_checks"] += 1
+    conn = get_db()
+    try:
+        with conn.cursor() as cur:
+            stamp = _read_stamp(conn, cur)
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+    if stamp is not None and stamp != _stamp:
+        _stats["remote_changes"] += 1
+        return True
+    return False
+
+
+def _namespace(ns: str) -> dict:
+    if ns not in NAMESPACES:
+        raise KeyError(f"Unbekannter Namespace: {ns}")
+    with _lock:
+        if (_data is None or _generation != db_connection.pool_generation()
+                or _remote_changed()):
+            _stats["misses"] += 1
+            _load()
+        else:
+            _stats["hits"] += 1
+        return _data[ns]
+
+
+def _copy(value):
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+
+# -------------------- Lesen --------------------
+
+def get(ns: str, key, default=None):
+    """Einzelwert aus dem Cache. Für rechnung_layout ist key ein Spaltenname."""
+    value = _namespace(ns).get(key, default)
+    return _copy(value)
+
+
+def get_many(ns: str, keys=None) -> dict:
+    """Mehrere Werte eines Namespaces; keys=None liefert alle."""
+    values = _namespace(ns)
+    if keys is None:
+        return _copy(dict(values))
+    return {k: _copy(values.get(k)) for k in keys}
+
+
+def layout_row() -> dict:
+    """Neueste Zeile aus rechnung_layout (leer, wenn keine vorhanden)."""
+    return get_many("rechnung_layout")
+
+
+def get_text(key: str):
+    entry = _namespace("app_settings").get(key)
+    return entry[0] if entry else None
+
+
+def get_blob(key: str):
+    entry = _namespace("app_settings").get(key)
+    return (entry[1], entry[2]) if entry else (None, None)
+
+
+# -------------------- Schreiben / Invalidierung --------------------
+
+def invalidate() -> None:
+    """Verwirft den Cache; der nächste Lesezugriff lädt alle Namespaces neu."""
+    global _data
+    with _lock:
+        _data = None
+        _stats["invalidations"] += 1
+
+
+def set_many(ns: str, values: dict) -> None:
+    """Schreibt mehrere config-/app_settings-Werte in einer Transaktion."""
+    if not values:
+        return
+    if ns not in ("config", "app_settings"):
+        raise KeyError(f"set_many unterstützt nur config/app_settings, nicht {ns}")
+    conn = get_db()
+    try:
+        with conn.cursor() as cur:
+            if ns == "config":
+                sql = ("INSERT INTO config (key, value) VALUES (%s, %s) "
+                       "ON CONFLICT (key) DO UPDATE SET value = excluded.value")
+                cur.executemany(sql, [(k, v) for k, v in values.items()])
+            else:
+                sql = ("INSERT INTO app_settings (key, value_text, updated_at) "
+                       "VALUES (%s, %s, CURRENT_TIMESTAMP) "
+                       "ON CONFLICT (key) DO UPDATE SET value_text = excluded.value_text, "
+                       "updated_at = CURRENT_TIMESTAMP")
+                cur.executemany(sql, [(k, v) for k, v in values.items()])
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        invalidate()
+
+
+def refresh() -> None:
+    """Sofort neu laden (z.B. nach Import)."""
+    with _lock:
+        _load()
+
+
+def stats() -> dict:
+    with _lock:
+        s = dict(_stats)
+        s["loaded"] = _data is not None
+    return s
@@ -2,39 +2,18 @@
 from typing import Optional, Tuple, Any
 from db_connection import get_db
 import paths
+import settings_cache
 
-SQLITE_TABLE = """
-CREATE TABLE IF NOT EXISTS app_settings (
-  key TEXT PRIMARY KEY,
-  value_bytes BLOB,
-  value_text TEXT,
-  mime TEXT,
-  updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-);
-"""
-PG_TABLE = """
-CREATE TABLE IF NOT EXISTS app_settings (
-  key TEXT PRIMARY KEY,
-  value_bytes BYTEA,
-  value_text TEXT,
-  mime TEXT,
-  updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-"""
+# Tabelle app_settings legt schema_migrations an (Migration 1);
+# Lesezugriffe kommen aus settings_cache
 
 def _is_pg(conn) -> bool:
     # Since conn might be ConnectionWrapper, check if it's not sqlite
     return hasattr(conn, 'is_sqlite') and not conn.is_sqlite
 
-def _ensure_table(conn):
-    cur = conn.cursor()
-    cur.execute(PG_TABLE if _is_pg(conn) else SQLITE_TABLE)
-    conn.commit()
-
 def set_blob(key: str, data: bytes, mime: Optional[str] = None) -> None:
     conn = get_db()
     try:
-        _ensure_table(conn)
         cur = conn.cursor()
         ph = "%s" if _is_pg(conn) else "?"
         if _is_pg(conn):
@@ -65,31 +44,14 @@ def set_blob(key: str, data: bytes, mime: Optional[str] = None) -> None:
         except Exception: pass
         try: conn.close()
         except Exception: pass
+        settings_cache.invalidate()
 
 def get_blob(key: str) -> Tuple[Optional[bytes], Optional[str]]:
-    conn = get_db()
-    try:
-        _ensure_table(conn)
-        cur = conn.cursor()
-        ph = "%s" if _is_pg(conn) else "?"
-        cur.execute(f"SELECT value_bytes, mime FROM app_settings WHERE key={ph} LIMIT 1", (key,))
-        row = cur.fetchone()
-        if not row:
-            return None, None
-        data, mime = row[0], row[1]
-        if isinstance(data, memoryview):
-            data = data.tobytes()
-        return data, mime
-    finally:
-        try: cur.close()
-        except Exception: pass
-        try: conn.close()
-        except Exception: pass
+    return settings_cache.get_blob(key)
 
 def set_text(key: str, value: str, mime: Optional[str] = None) -> None:
     conn = get_db()
     try:
-        _ensure_table(conn)
         cur = conn.cursor()
         ph = "%s" if _is_pg(conn) else "?"
         sql = (f"""
@@ -114,21 +76,10 @@ def set_text(key: str, value: str, mime: Optional[str] = None) -> None:
         except Exception: pass
         try: conn.close()
         except Exception: pass
+        settings_cache.invalidate()
 
 def get_text(key: str) -> Optional[str]:
-    conn = get_db()
-    try:
-        _ensure_table(conn)
-        cur = conn.cursor()
-        ph = "%s" if _is_pg(conn) else "?"
-        cur.execute(f"SELECT value_text FROM app_settings WHERE key={ph} LIMIT 1", (key,))
-        row = cur.fetchone()
-        return None if not row else row[0]
-    finally:
-        try: cur.close()
-        except Exception: pass
-        try: conn.close()
-        except Exception: pass
+    return settings_cache.get_text(key)
 
 def set_json(key: str, obj: Any) -> None:
     set_text(key, json.dumps(obj, ensure_ascii=False), mime="application/json")
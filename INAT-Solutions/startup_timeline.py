@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Zeitleiste des Programmstarts.
+
+main.py misst jeden Startschritt als Phase (Importe, Stylesheet, Login-DB,
+Schema-Thread, Login-Dialog, Auto-Backup, Splash, MainWindow, Updater, ...)
+und markiert den ersten Paint des Hauptfensters. Danach wird der Lauf an
+paths.logs_dir()/startup_timeline.json angehängt (die letzten MAX_LAEUFE
+Starts), damit sich auf langsamen Kunden-PCs nachsehen lässt, welcher
+Schritt dominiert.
+
+Phasen mit interaktiv=True (Login, Benutzeranlage) warten auf den Benutzer;
+ohne_interaktion_ms rechnet sie heraus.
+
+Für die Detailanalyse schreibt chrome_trace() das Chrome-Trace-Event-Format
+(chrome://tracing, Perfetto); automatisch beim Start mit --startup-trace oder
+INAT_STARTUP_TRACE=1, für alte Läufe tools/startup_trace.py.
+
+Alle Zeiten relativ zum Import dieses Moduls (main.py importiert es zuerst).
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+TIMELINE_DATEI = "startup_timeline.json"
+TRACE_DATEI = "startup_trace.json"
+MAX_LAEUFE = 30
+
+_t0 = time.perf_counter()
+_wall0 = time.time()
+_lock = threading.Lock()
+_phasen = []            # {"name", "start_ms", "dauer_ms", "thread", "interaktiv"}
+_marken = {}            # name -> ms
+_offen = {}             # name -> (start, interaktiv)
+_geschrieben = False
+
+
+def _jetzt_ms() -> float:
+    return (time.perf_counter() - _t0) * 1000.0
+
+
+def beginn(name: str, interaktiv: bool = False) -> None:
+    """Phase starten, die nicht in einen with-Block passt (z.B. Splash bis Callback)."""
+    with _lock:
+        _offen[name] = (_jetzt_ms(), interaktiv)
+
+
+def ende(name: str) -> None:
+    ende_ms = _jetzt_ms()
+    with _lock:
+        start = _offen.pop(name, None)
+        if start is None:
+            return
+        _phasen.append({
+            "name": name,
+            "start_ms": round(start[0], 2),
+            "dauer_ms": round(ende_ms - start[0], 2),
+            "thread": threading.current_thread().name,
+            "interaktiv": start[1],
+        })
+
+
+@contextmanager
+def phase(name: str, interaktiv: bool = False):
+    beginn(name, interaktiv)
+    try:
+        yield
+    finally:
+        ende(name)
+
+
+def markiere(name: str) -> None:
+    """Zeitpunkt ohne Dauer (z.B. first_paint); nur der erste zählt."""
+    with _lock:
+        _marken.setdefault(name, round(_jetzt_ms(), 2))
+
+
+def lauf() -> dict:
+    """Aktueller Start als dict (Phasen nach Beginn sortiert)."""
+    with _lock:
+        phasen = sorted((dict(p) for p in _phasen), key=lambda p: p["start_ms"])
+        marken = dict(_marken)
+    gesamt = marken.get("first_paint", max((p["start_ms"] + p["dauer_ms"] for p in phasen), default=0.0))
+    interaktiv = sum(p["dauer_ms"] for p in phasen if p["interaktiv"] and p["start_ms"] < gesamt)
+    try:
+        from version import __version__
+    except Exception:
+        __version__ = "?"
+    return {
+        "zeit": datetime.fromtimestamp(_wall0).isoformat(timespec="seconds"),
+        "version": __version__,
+        "frozen": bool(getattr(sys, "frozen", False)),
+        "gesamt_ms": round(gesamt, 2),
+        "ohne_interaktion_ms": round(gesamt - interaktiv, 2),
+        "marken": marken,
+        "phasen": phasen,
+    }
+
+
+def chrome_trace(eintrag: dict, path: str | None = None) -> str:
+    """Einen Lauf (lauf() oder Eintrag aus der Timeline-Datei) als Chrome-Trace schreiben."""
+    if path is None:
+        import paths
+        path = str(paths.logs_dir() / TRACE_DATEI)
+    tids = {}
+    events = []
+    for p in eintrag.get("phasen", []):
+        tid = tids.setdefault(p.get("thread", "MainThread"), len(tids) + 1)
+        events.append({
+            "name": p["name"], "cat": "interaktiv" if p.get("interaktiv") else "start",
+            "ph": "X", "ts": round(p["start_ms"] * 1000), "dur": round(p["dauer_ms"] * 1000),
+            "pid": 1, "tid": tid,
+        })
+    for name, ms in eintrag.get("marken", {}).items():
+        events.append({"name": name, "ph": "i", "s": "g", "ts": round(ms * 1000), "pid": 1, "tid": 1})
+    for name, tid in tids.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                   "otherData": {"zeit": eintrag.get("zeit"), "version": eintrag.get("version")}}, f)
+    return path
+
+
+def lade_timeline(path: str | None = None) -> list:
+    if path is None:
+        import paths
+        path = str(paths.logs_dir() / TIMELINE_DATEI)
+    try:
+        with open(path, encoding="utf-8") as f:
+            daten = json.load(f)
+        return daten if isinstance(daten, list) else []
+    except Exception:
+        return []
+
+
+def schreibe(trace: bool | None = None) -> str | None:
+    """
+    Aktuellen Lauf an die Timeline-Datei anhängen (einmal pro Prozess) und
+    optional den Chrome-Trace schreiben. Fehler werden nur protokolliert.
+    """
+    global _geschrieben
+    with _lock:
+        if _geschrieben:
+            return None
+        _geschrieben = True
+    try:
+        import paths
+        path = str(paths.logs_dir() / TIMELINE_DATEI)
+        eintrag = lauf()
+        laeufe = (lade_timeline(path) + [eintrag])[-MAX_LAEUFE:]
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(laeufe, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, path)
+        if trace is None:
+            trace = "--startup-trace" in sys.argv or os.environ.get("INAT_STARTUP_TRACE") == "1"
+        if trace:
+            print(f"[STARTUP] Chrome-Trace: {chrome_trace(eintrag)}", flush=True)
+        teuerste = sorted(eintrag["phasen"], key=lambda p: -p["dauer_ms"])[:3]
+        print(f"[STARTUP] erster Paint nach {eintrag['gesamt_ms']:.0f} ms "
+              f"({eintrag['ohne_interaktion_ms']:.0f} ms ohne Login); teuerste Phasen: "
+              + ", ".join(f"{p['name']} {p['dauer_ms']:.0f} ms" for p in teuerste), flush=True)
+        return path
+    except Exception as e:
+        print(f"[STARTUP] Timeline nicht geschrieben: {e}", flush=True)
+        return None
+
+
+def erster_paint(widget) -> None:
+    """
+    Markiert den ersten Paint von widget als first_paint und schreibt danach
+    die Timeline (per QTimer, damit der Paint selbst nicht wartet).
+    """
+    from PyQt5.QtCore import QEvent, QObject, QTimer
+
+    class _Filter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                markiere("first_paint")
+                obj.removeEventFilter(self)
+                QTimer.singleShot(0, schreibe)
+            return False
+
+    filt = _Filter(widget)
+    widget.installEventFilter(filt)
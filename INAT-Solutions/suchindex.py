@@ -0,0 +1,530 @@
+# -*- coding: utf-8 -*-
+"""
+Volltext-Suchindex für Kunden, Lieferanten, Lager, Dienstleistungen,
+Rechnungen und Aufträge.
+
+Je Quelltabelle eine Indextabelle suche_<tabelle> mit dem gefalteten
+Suchtext aller Suchspalten einer Zeile (Rechnungen samt den Bezeichnungen
+ihrer Positionen, siehe KINDER):
+
+    SQLite      FTS5-Tabelle (rowid = Schlüssel der Zeile, Spalte text),
+                Tokenizer unicode61 mit remove_diacritics, Präfix-Index 2/3
+    PostgreSQL  Tabelle (schluessel, text, tsv) mit GIN-Index auf tsv
+                ('simple'-Konfiguration) und, falls die Extension pg_trgm
+                angelegt werden kann, einem Trigramm-Index auf text
+
+Gepflegt wird der Index von Zeilen-Triggern auf den Quelltabellen
+(SQLite: AFTER INSERT/UPDATE OF/DELETE, PostgreSQL: plpgsql-Funktion je
+Tabelle), Trigger und rebuild() benutzen denselben Ausdruck aus _text_sql().
+Trigger auf den Kindtabellen bauen den Eintrag der Elternzeile neu auf.
+Die Faltung (Umlaute, ß, häufige Akzente, ae/oe/ue) steckt im SQL bzw. im
+FTS5-Tokenizer und wird für Suchbegriffe von falten() nachgebildet:
+"Müller", "Mueller" und "muller" finden sich gegenseitig.
+
+Suche: jeder Begriff muss Wortanfang eines Wortes der Zeile sein
+("mül ber" findet "Müller, Bern"), sortiert nach Relevanz (FTS5 bm25 bzw.
+ts_rank, bei sehr vielen Treffern nur unter den neuesten RANG_MAX). Auf
+PostgreSQL mit pg_trgm liefert suche() bei null Treffern zusätzlich
+ähnliche Schreibweisen (Tippfehler).
+
+Angelegt in Migration 8 (Rechnungen, Aufträge: Migration 9);
+tools/bench_suchindex.py misst die Suche auf 100k Zeilen.
+TRUNCATE (PostgreSQL) feuert keine Zeilen-Trigger:
+clear_selected_tables in db_connection ruft deshalb danach rebuild() auf.
+Die Indextabellen (bei FTS5 samt Schattentabellen suche_*_data, ...) sind
+keine Geschäftstabellen; Leeren/Sync überspringen sie über ist_index_tabelle().
+"""
+import re
+import threading
+
+PREFIX = "suche_"
+
+# Quelltabelle -> (Schlüsselspalte, Suchspalten)
+QUELLEN = {
+    "kunden": ("kundennr", ["name", "firma", "strasse", "plz", "stadt", "email", "telefon"]),
+    "lieferanten": ("id", ["name", "firma", "kontaktperson", "adresse", "strasse", "plz", "stadt",
+                           "email", "telefon", "portal_link", "notizen"]),
+    "artikellager": ("artikel_id", ["artikelnummer", "bezeichnung", "lagerort"]),
+    "materiallager": ("material_id", ["materialnummer", "bezeichnung", "lagerort", "bemerkung"]),
+    "reifenlager": ("reifen_id", ["kundennr", "kunde_anzeige", "fahrzeug", "dimension", "typ", "dot",
+                                  "lagerort", "bemerkung"]),
+    "dienstleistungen": ("dienstleistung_id", ["name", "beschreibung", "bemerkung"]),
+    "rechnungen": ("id", ["rechnung_nr", "kunde", "firma", "adresse"]),
+    "auftraege": ("id", ["titel", "beschreibung", "ort"]),
+}
+# Quelltabelle -> (Kindtabelle, Fremdschlüssel, Textspalte): die Texte der
+# Kindzeilen gehören zum Suchtext der Elternzeile
+KINDER = {
+    "rechnungen": ("rechnung_positionen", "rechnung_id", "bezeichnung"),
+}
+
+# Akzente -> Grundbuchstabe (Groß- und Kleinbuchstaben: SQLite senkt nur ASCII)
+_AKZENTE = {
+    "Ä": "a", "ä": "a", "Ö": "o", "ö": "o", "Ü": "u", "ü": "u",
+    "À": "a", "Á": "a", "Â": "a", "à": "a", "á": "a", "â": "a",
+    "È": "e", "É": "e", "Ê": "e", "Ë": "e", "è": "e", "é": "e", "ê": "e", "ë": "e",
+    "Î": "i", "Ï": "i", "î": "i", "ï": "i",
+    "Ô": "o", "ô": "o", "Û": "u", "ù": "u", "û": "u",
+    "Ç": "c", "ç": "c", "Ñ": "n", "ñ": "n",
+}
+# SQLite: nur diese vor den Umschreibungen im SQL ersetzen ("Raphaël" -> "raphael"
+# -> "raphal"), alle anderen Akzente entfernt der FTS5-Tokenizer. Eine
+# REPLACE-Kette über alle Zeichen sprengt den Parser-Stack von SQLite.
+_E_AKZENTE = "ÈÉÊËèéêë"
+# nach LOWER: Umschreibungen ae/oe/ue wie den Umlaut behandeln
+_UMSCHREIBUNG = [("ae", "a"), ("oe", "o"), ("ue", "u")]
+_TABELLE = str.maketrans(_AKZENTE)
+
+RANG_MAX = 1000             # so viele Treffer höchstens nach Relevanz sortieren
+
+_lock = threading.Lock()
+_status = {}                # (ziel, is_sqlite) -> verfügbare Quelltabellen
+
+
+def ist_index_tabelle(name: str) -> bool:
+    """Index- bzw. FTS5-Schattentabelle (nicht leeren, nicht synchronisieren)."""
+    return str(name).lower().startswith(PREFIX)
+
+
+def index_tabelle(tabelle: str) -> str:
+    return PREFIX + tabelle
+
+
+# -------------------- Faltung --------------------
+
+def falten(text: str) -> str:
+    """Python-Gegenstück zu _falten_sql() (samt Tokenizer) für Suchbegriffe."""
+    s = str(text or "").replace("ß", "ss").translate(_TABELLE).lower()
+    for alt, neu in _UMSCHREIBUNG:
+        s = s.replace(alt, neu)
+    return s
+
+
+def begriffe(text: str) -> list:
+    """Gefaltete Suchbegriffe (Buchstaben/Ziffern, Trenner wie der Tokenizer)."""
+    return re.findall(r"[^\W_]+", falten(text))
+
+
+def _falten_sql(ausdruck: str, is_sqlite: bool) -> str:
+    s = f"REPLACE({ausdruck}, 'ß', 'ss')"
+    if is_sqlite:
+        for zeichen in _E_AKZENTE:
+            s = f"REPLACE({s}, '{zeichen}', 'e')"
+    else:
+        von, nach = "".join(_AKZENTE), "".join(_AKZENTE.values())
+        s = f"translate({s}, '{von}', '{nach}')"
+    s = f"LOWER({s})"
+    for alt, neu in _UMSCHREIBUNG:
+        s = f"REPLACE({s}, '{alt}', '{neu}')"
+    return s
+
+
+def _text_sql(tabelle: str, r: str, is_sqlite: bool) -> str:
+    """Gefalteter Suchtext einer Zeile; r = NEW/OLD/Alias."""
+    key, spalten = QUELLEN[tabelle]
+    teile = [f"COALESCE(CAST({r}.{s} AS TEXT), '')" for s in spalten]
+    if tabelle in KINDER:
+        kind, fk, spalte = KINDER[tabelle]
+        agg = f"group_concat(k.{spalte}, ' ')" if is_sqlite else f"string_agg(k.{spalte}, ' ')"
+        teile.append(f"COALESCE((SELECT {agg} FROM {kind} k WHERE k.{fk} = {r}.{key}), '')")
+    text = " || ' ' || ".join(teile)
+    return _falten_sql(f"({text})", is_sqlite)
+
+
+def _tsv_sql(text: str) -> str:
+    # Satzzeichen vorher entfernen: der Standard-Parser hält sonst E-Mails,
+    # Pfade ("205/55") und Zahlen mit Punkt als ein Token zusammen
+    return f"to_tsvector('simple', regexp_replace({text}, '[^[:alnum:]]+', ' ', 'g'))"
+
+
+# -------------------- Hilfen --------------------
+
+def _columns(cur, table: str, is_sqlite: bool) -> set:
+    if is_sqlite:
+        cur.execute(f"PRAGMA table_info({table})")
+        return {str(r[1]).lower() for r in cur.fetchall()}
+    cur.execute(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = %s",
+        (table,),
+    )
+    return {str(r[0]).lower() for r in cur.fetchall()}
+
+
+def _try(cur, sql, params=None) -> bool:
+    cur.execute("SAVEPOINT suchindex_try")
+    try:
+        cur.execute(sql, params)
+    except Exception:
+        cur.execute("ROLLBACK TO SAVEPOINT suchindex_try")
+        cur.execute("RELEASE SAVEPOINT suchindex_try")
+        return False
+    cur.execute("RELEASE SAVEPOINT suchindex_try")
+    return True
+
+
+def _quellen(cur, is_sqlite: bool) -> list:
+    """Quelltabellen, die existieren und alle Such- und Schlüsselspalten haben."""
+    out = []
+    for tabelle, (key, spalten) in QUELLEN.items():
+        vorhanden = _columns(cur, tabelle, is_sqlite)
+        if not (key in vorhanden and set(spalten) <= vorhanden):
+            continue
+        if tabelle in KINDER:
+            kind, fk, spalte = KINDER[tabelle]
+            if not {fk, spalte} <= _columns(cur, kind, is_sqlite):
+                continue
+        out.append(tabelle)
+    return out
+
+
+# -------------------- Trigger --------------------
+
+def _install_sqlite(cur, tabelle: str) -> bool:
+    idx = index_tabelle(tabelle)
+    key, spalten = QUELLEN[tabelle]
+    if not _try(cur, f"CREATE VIRTUAL TABLE IF NOT EXISTS {idx} USING fts5("
+                     "text, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"):
+        print(f"[SCHEMA] Suchindex {tabelle}: FTS5 nicht verfügbar, Suche ohne Index", flush=True)
+        return False
+    einfuegen = (f"INSERT INTO {idx} (rowid, text) SELECT NEW.{key}, {_text_sql(tabelle, 'NEW', True)} "
+                 f"WHERE NEW.{key} IS NOT NULL;")
+    loeschen = f"DELETE FROM {idx} WHERE rowid = OLD.{key};"
+    for art in ("ins", "upd", "del"):
+        cur.execute(f"DROP TRIGGER IF EXISTS trg_su_{tabelle}_{art}")
+    cur.execute(f"CREATE TRIGGER trg_su_{tabelle}_ins AFTER INSERT ON {tabelle} BEGIN {einfuegen} END")
+    cur.execute(
+        f"CREATE TRIGGER trg_su_{tabelle}_upd AFTER UPDATE OF {key}, {', '.join(spalten)} ON {tabelle} "
+        f"BEGIN {loeschen} {einfuegen} END"
+    )
+    cur.execute(f"CREATE TRIGGER trg_su_{tabelle}_del AFTER DELETE ON {tabelle} BEGIN {loeschen} END")
+    if tabelle in KINDER:
+        _install_kind_sqlite(cur, tabelle)
+    return True
+
+
+def _neu_sqlite(tabelle: str, ref: str) -> str:
+    """Trigger-Anweisungen: Indexeintrag der Elternzeile ref (z.B. NEW.rechnung_id) neu aufbauen."""
+    idx = index_tabelle(tabelle)
+    key, _spalten = QUELLEN[tabelle]
+    return (f"DELETE FROM {idx} WHERE rowid = {ref}; "
+            f"INSERT INTO {idx} (rowid, text) SELECT t.{key}, {_text_sql(tabelle, 't', True)} "
+            f"FROM {tabelle} t WHERE t.{key} = {ref};")
+
+
+def _install_kind_sqlite(cur, tabelle: str) -> None:
+    kind, fk, spalte = KINDER[tabelle]
+    for art in ("ins", "upd", "del"):
+        cur.execute(f"DROP TRIGGER IF EXISTS trg_su_{tabelle}_k_{art}")
+    cur.execute(f"CREATE TRIGGER trg_su_{tabelle}_k_ins AFTER INSERT ON {kind} "
+                f"BEGIN {_neu_sqlite(tabelle, f'NEW.{fk}')} END")
+    cur.execute(f"CREATE TRIGGER trg_su_{tabelle}_k_upd AFTER UPDATE OF {fk}, {spalte} ON {kind} "
+                f"BEGIN {_neu_sqlite(tabelle, f'OLD.{fk}')} {_neu_sqlite(tabelle, f'NEW.{fk}')} END")
+    cur.execute(f"CREATE TRIGGER trg_su_{tabelle}_k_del AFTER DELETE ON {kind} "
+                f"BEGIN {_neu_sqlite(tabelle, f'OLD.{fk}')} END")
+
+
+def _install_pg(cur, tabelle: str, trgm: bool) -> bool:
+    idx = index_tabelle(tabelle)
+    key, spalten = QUELLEN[tabelle]
+    cur.execute(f"CREATE TABLE IF NOT EXISTS {idx} (schluessel BIGINT PRIMARY KEY, text TEXT, tsv TSVECTOR)")
+    cur.execute(f"CREATE INDEX IF NOT EXISTS idx_{idx}_tsv ON {idx} USING GIN (tsv)")
+    if trgm:
+        _try(cur, f"CREATE INDEX IF NOT EXISTS idx_{idx}_trgm ON {idx} USING GIN (text gin_trgm_ops)")
+    cur.execute(
+        f"CREATE OR REPLACE FUNCTION inat_su_{tabelle}() RETURNS trigger AS $$ "
+        "DECLARE t TEXT; "
+        "BEGIN "
+        f"IF TG_OP IN ('UPDATE', 'DELETE') THEN DELETE FROM {idx} WHERE schluessel = OLD.{key}; END IF; "
+        f"IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.{key} IS NOT NULL THEN "
+        f"t := {_text_sql(tabelle, 'NEW', False)}; "
+        f"INSERT INTO {idx} (schluessel, text, tsv) VALUES (NEW.{key}, t, {_tsv_sql('t')}) "
+        "ON CONFLICT (schluessel) DO UPDATE SET text = EXCLUDED.text, tsv = EXCLUDED.tsv; "
+        "END IF; "
+        "RETURN NULL; "
+        "END; $$ LANGUAGE plpgsql"
+    )
+    cur.execute(f"DROP TRIGGER IF EXISTS trg_su_{tabelle} ON {tabelle}")
+    cur.execute(
+        f"CREATE TRIGGER trg_su_{tabelle} AFTER INSERT OR DELETE OR UPDATE OF {key}, {', '.join(spalten)} "
+        f"ON {tabelle} FOR EACH ROW EXECUTE PROCEDURE inat_su_{tabelle}()"
+    )
+    if tabelle in KINDER:
+        _install_kind_pg(cur, tabelle)
+    return True
+
+
+def _install_kind_pg(cur, tabelle: str) -> None:
+    idx = index_tabelle(tabelle)
+    key, _spalten = QUELLEN[tabelle]
+    kind, fk, spalte = KINDER[tabelle]
+    cur.execute(
+        f"CREATE OR REPLACE FUNCTION inat_su_{tabelle}_neu(k BIGINT) RETURNS void AS $$ "
+        "BEGIN "
+        f"DELETE FROM {idx} WHERE schluessel = k; "
+        f"INSERT INTO {idx} (schluessel, text, tsv) SELECT x.schluessel, x.text, {_tsv_sql('x.text')} "
+        f"FROM (SELECT t.{key} AS schluessel, {_text_sql(tabelle, 't', False)} AS text "
+        f"FROM {tabelle} t WHERE t.{key} = k) x; "
+        "END; $$ LANGUAGE plpgsql"
+    )
+    cur.execute(
+        f"CREATE OR REPLACE FUNCTION inat_su_{tabelle}_kind() RETURNS trigger AS $$ "
+        "BEGIN "
+        f"IF TG_OP IN ('UPDATE', 'DELETE') THEN PERFORM inat_su_{tabelle}_neu(OLD.{fk}); END IF; "
+        f"IF TG_OP IN ('INSERT', 'UPDATE') THEN PERFORM inat_su_{tabelle}_neu(NEW.{fk}); END IF; "
+        "RETURN NULL; "
+        "END; $$ LANGUAGE plpgsql"
+    )
+    cur.execute(f"DROP TRIGGER IF EXISTS trg_su_{tabelle}_kind ON {kind}")
+    cur.execute(
+        f"CREATE TRIGGER trg_su_{tabelle}_kind AFTER INSERT OR DELETE OR UPDATE OF {fk}, {spalte} "
+        f"ON {kind} FOR EACH ROW EXECUTE PROCEDURE inat_su_{tabelle}_kind()"
+    )
+
+
+def install(cur, is_sqlite: bool, tabellen=None) -> list:
+    """
+    Indextabellen und Trigger der angegebenen (Default: aller) Quelltabellen
+    anlegen bzw. ersetzen (idempotent). Liefert die Quelltabellen.
+    """
+    trgm = not is_sqlite and _try(cur, "CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    fertig = []
+    for tabelle in _quellen(cur, is_sqlite):
+        if tabellen is not None and tabelle not in tabellen:
+            continue
+        ok = _install_sqlite(cur, tabelle) if is_sqlite else _install_pg(cur, tabelle, trgm)
+        if ok:
+            fertig.append(tabelle)
+    invalidate()
+    return fertig
+
+
+def uninstall(cur, is_sqlite: bool) -> None:
+    """
+    Nur die Trigger entfernen (z.B. vor ALTER COLUMN ... TYPE einer Suchspalte).
+    Danach install() und rebuild() aufrufen.
+    """
+    for tabelle in QUELLEN:
+        if is_sqlite:
+            for art in ("ins", "upd", "del", "k_ins", "k_upd", "k_del"):
+                cur.execute(f"DROP TRIGGER IF EXISTS trg_su_{tabelle}_{art}")
+        else:
+            _try(cur, f"DROP TRIGGER IF EXISTS trg_su_{tabelle} ON {tabelle}")
+            if tabelle in KINDER:
+                _try(cur, f"DROP TRIGGER IF EXISTS trg_su_{tabelle}_kind ON {KINDER[tabelle][0]}")
+
+
+# -------------------- Neuaufbau / Prüfung --------------------
+
+def _index_vorhanden(cur, tabelle: str, is_sqlite: bool) -> bool:
+    idx = index_tabelle(tabelle)
+    if is_sqlite:
+        cur.execute("SELECT 1 FROM sqlite_master WHERE name = %s", (idx,))
+    else:
+        cur.execute(
+            "SELECT 1 FROM information_schema.tables WHERE table_schema = current_schema() AND table_name = %s",
+            (idx,),
+        )
+    return cur.fetchone() is not None
+
+
+def rebuild(cur, is_sqlite: bool, tabellen=None) -> dict:
+    """
+    Index der angegebenen (Default: aller) Quelltabellen neu aufbauen; eine
+    Kindtabelle steht für ihre Elterntabelle. Liefert {tabelle: zeilen}.
+    """
+    eltern = {kind: t for t, (kind, _fk, _spalte) in KINDER.items()}
+    out = {}
+    for tabelle in dict.fromkeys(eltern.get(t, t) for t in (tabellen or QUELLEN)):
+        if tabelle not in QUELLEN or not _index_vorhanden(cur, tabelle, is_sqlite):
+            continue
+        idx = index_tabelle(tabelle)
+        key, _spalten = QUELLEN[tabelle]
+        cur.execute(f"DELETE FROM {idx}")
+        if is_sqlite:
+            cur.execute(
+                f"INSERT INTO {idx} (rowid, text) SELECT t.{key}, {_text_sql(tabelle, 't', True)} "
+                f"FROM {tabelle} t WHERE t.{key} IS NOT NULL"
+            )
+            cur.execute(f"INSERT INTO {idx} ({idx}) VALUES ('optimize')")
+        else:
+            cur.execute(
+                f"INSERT INTO {idx} (schluessel, text) SELECT t.{key}, {_text_sql(tabelle, 't', False)} "
+                f"FROM {tabelle} t WHERE t.{key} IS NOT NULL"
+            )
+            cur.execute(f"UPDATE {idx} SET tsv = {_tsv_sql('text')}")
+        cur.execute(f"SELECT COUNT(*) FROM {idx}")
+        out[tabelle] = int(cur.fetchone()[0])
+    return out
+
+
+def check(cur, is_sqlite: bool) -> list:
+    """Abweichungen [(tabelle, zeilen_quelle, zeilen_index)]; leer = konsistent."""
+    abweichungen = []
+    for tabelle, (key, _spalten) in QUELLEN.items():
+        if not _index_vorhanden(cur, tabelle, is_sqlite):
+            continue
+        cur.execute(f"SELECT COUNT(*) FROM {tabelle} WHERE {key} IS NOT NULL")
+        quelle = int(cur.fetchone()[0])
+        cur.execute(f"SELECT COUNT(*) FROM {index_tabelle(tabelle)}")
+        index = int(cur.fetchone()[0])
+        if quelle != index:
+            abweichungen.append((tabelle, quelle, index))
+    return abweichungen
+
+
+# -------------------- Suche --------------------
+
+def _ziel():
+    from db_connection import get_configured_url, get_local_db_path
+    return get_configured_url() or get_local_db_path()
+
+
+def verfuegbar(conn, tabelle: str) -> bool:
+    """Hat die DB hinter conn einen Index für tabelle? (einmal je Ziel und Prozess geprüft)"""
+    is_sqlite = getattr(conn, "is_sqlite", False)
+    schluessel = (_ziel(), is_sqlite)
+    with _lock:
+        tabellen = _status.get(schluessel)
+    if tabellen is None:
+        try:
+            with conn.cursor() as cur:
+                tabellen = {t for t in QUELLEN if _index_vorhanden(cur, t, is_sqlite)}
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            tabellen = set()
+        with _lock:
+            _status[schluessel] = tabellen
+    return tabelle in tabellen
+
+
+def invalidate() -> None:
+    """Vergisst die Verfügbarkeitsprüfung (nach install() oder Wechsel der DB)."""
+    with _lock:
+        _status.clear()
+
+
+def _abfrage(text: str, is_sqlite: bool):
+    woerter = begriffe(text)
+    if not woerter:
+        return None
+    if is_sqlite:
+        return " ".join(f'"{w}"*' for w in woerter)
+    return " & ".join(f"{w}:*" for w in woerter)
+
+
+def bedingung(conn, tabelle: str, text: str, key_expr: str):
+    """
+    WHERE-Teil "key_expr IN (Treffer)" mit Parametern, oder None, wenn es
+    keinen Index bzw. keine Suchbegriffe gibt (dann wie bisher mit LIKE suchen).
+    """
+    if not verfuegbar(conn, tabelle):
+        return None
+    is_sqlite = getattr(conn, "is_sqlite", False)
+    q = _abfrage(text, is_sqlite)
+    if q is None:
+        return None
+    idx = index_tabelle(tabelle)
+    if is_sqlite:
+        return f"{key_expr} IN (SELECT rowid FROM {idx} WHERE text MATCH %s)", [q]
+    return f"{key_expr} IN (SELECT schluessel FROM {idx} WHERE tsv @@ to_tsquery('simple', %s))", [q]
+
+
+def _treffer_sql(idx: str, is_sqlite: bool) -> str:
+    """
+    Treffer mit Relevanz (schluessel, rang; kleiner = besser), ein Parameter.
+    Die Relevanz (bm25/ts_rank) kostet je Treffer; bei sehr allgemeinen
+    Begriffen ("mü") wird deshalb nur unter den neuesten RANG_MAX sortiert.
+    """
+    if is_sqlite:
+        return (f"SELECT rowid AS schluessel, rank AS rang FROM {idx} WHERE text MATCH %s "
+                f"ORDER BY rowid DESC LIMIT {RANG_MAX}")
+    return (f"SELECT t.schluessel, -ts_rank(t.tsv, t.q) AS rang FROM ("
+            f"SELECT schluessel, tsv, q FROM {idx}, to_tsquery('simple', %s) q "
+            f"WHERE tsv @@ q ORDER BY schluessel DESC LIMIT {RANG_MAX}) t")
+
+
+def rang_join(conn, tabelle: str, text: str, key_expr: str, alias: str = "s"):
+    """
+    Für Abfragen mit Relevanz-Sortierung: (join, params, sortierung) oder None
+    (siehe bedingung()). Der JOIN beschränkt auf die Treffer, params gehören
+    zum JOIN, sortierung ist der ORDER-BY-Ausdruck (beste zuerst).
+    """
+    if not verfuegbar(conn, tabelle):
+        return None
+    is_sqlite = getattr(conn, "is_sqlite", False)
+    q = _abfrage(text, is_sqlite)
+    if q is None:
+        return None
+    sub = _treffer_sql(index_tabelle(tabelle), is_sqlite)
+    return f"JOIN ({sub}) {alias} ON {alias}.schluessel = {key_expr}", [q], f"{alias}.rang"
+
+
+def suche(tabelle: str, text: str, limit: int = None, rang: bool = True, conn=None):
+    """
+    Schlüssel der Treffer (mit rang beste zuerst, höchstens RANG_MAX; ohne
+    rang alle, ungeordnet); None, wenn es keinen Index bzw. keine
+    Suchbegriffe gibt.
+    """
+    own = conn is None
+    if own:
+        from db_connection import get_db
+        conn = get_db()
+    try:
+        if not verfuegbar(conn, tabelle):
+            return None
+        is_sqlite = getattr(conn, "is_sqlite", False)
+        q = _abfrage(text, is_sqlite)
+        if q is None:
+            return None
+        idx = index_tabelle(tabelle)
+        grenze = f" LIMIT {int(limit)}" if limit else ""
+        with conn.cursor() as cur:
+            if rang:
+                cur.execute(f"SELECT s.schluessel FROM ({_treffer_sql(idx, is_sqlite)}) s "
+                            f"ORDER BY s.rang{grenze}", [q])
+            elif is_sqlite:
+                cur.execute(f"SELECT rowid FROM {idx} WHERE text MATCH %s{grenze}", [q])
+            else:
+                cur.execute(f"SELECT schluessel FROM {idx} WHERE tsv @@ to_tsquery('simple', %s){grenze}", [q])
+            treffer = [r[0] for r in cur.fetchall()]
+            if not treffer and not is_sqlite and len(falten(text).strip()) >= 3:
+                treffer = _aehnlich(cur, idx, falten(text).strip(), limit)
+        return treffer
+    except Exception as e:
+        print(f"[DBG] suchindex.suche({tabelle}) error: {e}", flush=True)
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        return None
+    finally:
+        if own:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def _aehnlich(cur, idx: str, text: str, limit) -> list:
+    """
+    Tippfehler-tolerante Suche über pg_trgm (nur wenn die Extension da ist);
+    Operator <% nutzt den Trigramm-Index, Schwelle pg_trgm.word_similarity_threshold.
+    """
+    grenze = f" LIMIT {int(limit)}" if limit else ""
+    cur.execute("SAVEPOINT suchindex_trgm")
+    try:
+        cur.execute(
+            f"SELECT schluessel FROM {idx} WHERE %s <%% text "
+            f"ORDER BY word_similarity(%s, text) DESC{grenze}",
+            (text, text),
+        )
+        treffer = [r[0] for r in cur.fetchall()]
+    except Exception:
+        cur.execute("ROLLBACK TO SAVEPOINT suchindex_trgm")
+        treffer = []
+    cur.execute("RELEASE SAVEPOINT suchindex_trgm")
+    return treffer
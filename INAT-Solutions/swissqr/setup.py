@@ -39,9 +39,7 @@ setup(
     python_requires='>=3.9, <4',
     include_package_data=True,
     install_requires=[
-        "beautifulsoup4",
         "iso4217",
-        "lxml",
         "pyban",
         "pyban-swift",
         "pycountry",
@@ -2,4 +2,4 @@
 from swissqr.paymentparty import PaymentParty, AddressType
 from swissqr.qrdata import QRData
 from swissqr.qr import SwissQR
-
+from swissqr.profile import CreditorProfile
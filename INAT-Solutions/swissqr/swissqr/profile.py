@@ -0,0 +1,101 @@
+﻿from functools import lru_cache
+from typing import Union, Tuple
+from iso4217 import Currency
+from pyban.iban import IBAN
+
+from swissqr import PaymentParty
+from swissqr.qrdata import QRData, ReferenceType, check_amount, check_reference, check_message
+
+
+class CreditorProfile:
+    """
+    The fixed half of a QR bill (IBAN, creditor, currency), validated once.
+
+    Batch invoicing creates many QRData objects that only differ in amount,
+    debtor, reference and message. A profile runs the full QRData validation
+    for the creditor side when it is created and then builds payloads for the
+    variable fields with the same StandardViolation checks, without going
+    through pydantic (and pyban / iso4217) for every payment.
+
+        profile = CreditorProfile(iban="CH93...", creditor=party)
+        payload = profile.payload(amount=12.5, debtor={"name": ..., "country": "CH", ...})
+
+    payload() returns exactly str(QRData(...)) for the same arguments, so it
+    can be passed to SwissQR.render_many() directly.
+    """
+    cache_size = 4096
+
+    def __init__(self, iban: Union[IBAN, str], creditor: PaymentParty,
+                 currency: Union[Currency, str] = Currency.chf):
+        template = QRData(iban=iban, creditor=creditor, currency=currency)
+        self.template: QRData = template
+        self.iban: IBAN = template.iban
+        self.creditor: PaymentParty = template.creditor
+        self.currency: Currency = template.currency
+        # QRType, Version, Coding, IBAN, creditor, ultimate creditor
+        self._head = "\r\n".join([
+            template.qr_type,
+            template.version,
+            str(template.coding_type),
+            template.iban.iban,
+            str(template.creditor),
+            str(template.ultimate_creditor),
+        ])
+        self._empty_party = template.ultimate_debitor
+        self._empty_segment = str(self._empty_party)
+        self._party = lru_cache(maxsize=self.cache_size)(self._party_for)
+
+    @staticmethod
+    def _party_for(fields: Tuple) -> Tuple[PaymentParty, str]:
+        party = PaymentParty(**dict(fields))
+        return party, str(party)
+
+    def debtor(self, debtor: Union[PaymentParty, dict, None]) -> Tuple[PaymentParty, str]:
+        """
+        Validated debtor and its payload segment. Dicts are validated once per
+        distinct content and cached; PaymentParty objects are already validated.
+        """
+        if debtor is None:
+            return self._empty_party, self._empty_segment
+        if isinstance(debtor, PaymentParty):
+            return debtor, str(debtor)
+        return self._party(tuple(sorted(debtor.items(), key=lambda item: item[0])))
+
+    def _fields(self, amount, debtor, reference_type, reference, message):
+        amount = check_amount(amount)
+        check_reference(reference_type, reference)
+        check_message(message)
+        party, segment = self.debtor(debtor)
+        return amount, party, segment
+
+    def payload(self, amount: Union[float, str, None] = None, debtor: Union[PaymentParty, dict, None] = None,
+                reference_type: ReferenceType = ReferenceType.NON, reference: str = "",
+                message: str = "") -> str:
+        """QR payload for one payment; identical to str(QRData(...))."""
+        amount, _party, segment = self._fields(amount, debtor, reference_type, reference, message)
+        return "\r\n".join([
+            self._head,
+            "" if amount is None else "{:.2f}".format(amount),
+            self.currency.code,
+            segment,
+            reference_type.value,
+            reference,
+            message,
+            self.template.trailer,
+        ])
+
+    def qrdata(self, amount: Union[float, str, None] = None, debtor: Union[PaymentParty, dict, None] = None,
+               reference_type: ReferenceType = ReferenceType.NON, reference: str = "",
+               message: str = "") -> QRData:
+        """QRData for one payment, built from the validated fields without re-running pydantic."""
+        amount, party, _segment = self._fields(amount, debtor, reference_type, reference, message)
+        return self.template.model_copy(update={
+            "amount": amount,
+            "ultimate_debitor": party,
+            "reference_type": reference_type,
+            "reference": reference,
+            "message": message,
+        })
+
+    def cache_info(self):
+        return self._party.cache_info()
@@ -1,84 +1,93 @@
-﻿import io
-import qrcode
+﻿import qrcode
 import qrcode.image.svg
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Union
-from bs4 import BeautifulSoup
+from typing import Iterable, List, Union
 
 from swissqr import QRData
 
 
+XML_DECLARATION = '<?xml version="1.0" encoding="utf-8"?>'
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+
+
 class SwissQR:
 
     qrfactory = qrcode.image.svg.SvgPathFillImage
     correction = qrcode.ERROR_CORRECT_M
     qrsize = 46
     crosssize = 7
+    cache_size = 1024
+    _markup_cache = None  # lru_cache over _render_markup, rebuilt when cache_size changes
 
     def __init__(self, data: QRData):
         self.data: QRData = data
-        self.soup: Optional[BeautifulSoup] = None
 
-    def _make_soup(self):
+    @staticmethod
+    def _matrix(payload: str) -> List[List[bool]]:
         qr = qrcode.QRCode(
             version=None,  # Determine size automatically
             error_correction=SwissQR.correction,
             box_size=10,
             border=0
         )
-        qr.add_data(str(self.data))
-        vec = qr.make_image(fill_color="black", back_color="white", image_factory=qrcode.image.svg.SvgPathFillImage)
-        buf = io.BytesIO()
-        vec.save(buf)
-        tag = buf.getvalue().decode()
-        self.soup = BeautifulSoup(tag, "lxml-xml")
-
-    def _adjust_size(self):
-        self.soup.find("svg")["width"] = "{}mm".format(SwissQR.qrsize)
-        self.soup.find("svg")["height"] = "{}mm".format(SwissQR.qrsize)
-
-    def _add_cross(self):
-        viewbox = self.soup.find("svg")["viewBox"]
-        qsize = int(viewbox.split(" ")[2])
+        qr.add_data(payload)
+        qr.make(fit=True)
+        return qr.get_matrix()
+
+    @staticmethod
+    def _path_data(matrix: List[List[bool]]) -> str:
+        # One closed square per dark module, row by row (same path as qrcode's SvgPathFillImage)
+        return "".join(
+            "M{x},{y}H{x1}V{y1}H{x}z".format(x=x, y=y, x1=x + 1, y1=y + 1)
+            for y, row in enumerate(matrix)
+            for x, dark in enumerate(row)
+            if dark
+        )
+
+    @staticmethod
+    def _cross(qsize: int) -> str:
         csize = (qsize/SwissQR.qrsize) * SwissQR.crosssize
         coffset = (qsize - csize) / 2
         stroke_width = csize / 12
-        style = "fill:rgb(0,0,0);stroke-width:{};stroke:rgb(255,255,255)".format(stroke_width)
-        base = self.soup.new_tag("rect")
-        base["x"] = coffset
-        base["y"] = coffset
-        base["width"] = csize
-        base["height"] = csize
-        base["style"] = style
-        self.soup.find("svg").append(base)
-        style = "fill:rgb(255,255,255);"
         barwidth = csize / 5.5
         barlength = csize * 0.6
         hbar_x = (qsize - barlength) / 2
         hbar_y = (qsize - barwidth) / 2
-        hbar = self.soup.new_tag("rect")
-        hbar["x"] = hbar_x
-        hbar["y"] = hbar_y
-        hbar["width"] = barlength
-        hbar["height"] = barwidth
-        hbar["style"] = style
-        self.soup.find("svg").append(hbar)
-        vbar = self.soup.new_tag("rect")
-        vbar["x"] = hbar_y
-        vbar["y"] = hbar_x
-        vbar["width"] = barwidth
-        vbar["height"] = barlength
-        vbar["style"] = style
-        self.soup.find("svg").append(vbar)
+        return (
+            '<rect height="{c}" style="fill:rgb(0,0,0);stroke-width:{s};stroke:rgb(255,255,255)" '
+            'width="{c}" x="{o}" y="{o}"/>'
+            '<rect height="{bw}" style="fill:rgb(255,255,255);" width="{bl}" x="{hx}" y="{hy}"/>'
+            '<rect height="{bl}" style="fill:rgb(255,255,255);" width="{bw}" x="{hy}" y="{hx}"/>'
+        ).format(c=csize, s=stroke_width, o=coffset, bw=barwidth, bl=barlength, hx=hbar_x, hy=hbar_y)
+
+    @staticmethod
+    def _render_markup(payload: str) -> str:
+        matrix = SwissQR._matrix(payload)
+        qsize = len(matrix)
+        return (
+            '<svg back_color="white" fill_color="black" height="{size}mm" version="1.1" '
+            'viewBox="0 0 {q} {q}" width="{size}mm" xmlns="{ns}">'
+            '<rect fill="white" height="100%" width="100%" x="0" y="0"/>'
+            '<path d="{d}" fill="#000000" fill-opacity="1" fill-rule="nonzero" id="qr-path" stroke="none"/>'
+            '{cross}</svg>'
+        ).format(size=SwissQR.qrsize, q=qsize, ns=SVG_NAMESPACE,
+                 d=SwissQR._path_data(matrix), cross=SwissQR._cross(qsize))
+
+    @staticmethod
+    def _markup_for(payload: str) -> str:
+        cache = SwissQR._markup_cache
+        if cache is None or cache.cache_info().maxsize != SwissQR.cache_size:
+            cache = lru_cache(maxsize=SwissQR.cache_size)(SwissQR._render_markup)
+            SwissQR._markup_cache = cache
+        return cache(payload)
 
     def _svg_code(self) -> str:
-        self._make_soup()
-        self._adjust_size()
-        self._add_cross()
-        return str(self.soup)
+        return XML_DECLARATION + "\n" + self.get_markup()
 
     def get_markup(self) -> str:
-        return self._svg_code().splitlines(keepends=False)[1]
+        # Memoised per payload: equal QRData render once, mutated QRData render anew
+        return SwissQR._markup_for(str(self.data))
 
     def save(self, path: Union[str, Path]):
         if not isinstance(path, Path):
@@ -86,3 +95,19 @@ class SwissQR:
         with path.open('w') as f:
             f.write(self._svg_code())
 
+    @classmethod
+    def render_many(cls, data: Iterable[QRData], document: bool = False) -> List[str]:
+        """
+        Render the markup of many payment parts at once (e.g. batch invoicing).
+        Returns get_markup() for each QRData, or the complete SVG document as
+        written by save() if document is True.
+        """
+        markups = [cls._markup_for(str(d)) for d in data]
+        if document:
+            return [XML_DECLARATION + "\n" + m for m in markups]
+        return markups
+
+    @staticmethod
+    def clear_cache():
+        if SwissQR._markup_cache is not None:
+            SwissQR._markup_cache.cache_clear()
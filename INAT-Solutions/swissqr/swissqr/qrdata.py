@@ -8,11 +8,45 @@ from swissqr import PaymentParty, StandardViolation, AddressType
 
 
 class ReferenceType(Enum):
-    QRR = "QRR",
-    SCOR = "SCOR",
+    QRR = "QRR"
+    SCOR = "SCOR"
     NON = "NON"
 
 
+# Checks for the per-payment fields, shared with CreditorProfile (swissqr.profile)
+
+def check_amount(v: Union[float, str, None]) -> Optional[float]:
+    if v is None:
+        return v
+    v = float(v)
+    if not (0.01 <= v <= 999999999.99):
+        raise StandardViolation("Payment amount is out of allowed range")
+    return round(v, 2)
+
+
+def check_reference(reftype: ReferenceType, reference: str):
+    if reftype == ReferenceType.NON and reference != "":
+        raise StandardViolation("Reference must be empty for type NON")
+    if reftype == ReferenceType.QRR:
+        if len(reference) != 27:
+            raise StandardViolation("QR Reference must have a length of exactly 27")
+        if not reference.isnumeric():
+            raise StandardViolation("QR Reference must be numeric")
+    # TODO: Mod10 Validation
+    if reftype == ReferenceType.SCOR:
+        if not (5 <= len(reference) <= 25):
+            raise StandardViolation("SCOR Reference must be between 5 and 25 chars long")
+        if not reference.isalnum():
+            raise StandardViolation("SCOR Reference must be alphanumeric")
+    # TODO: Mod97 Validation
+
+
+def check_message(v: str) -> str:
+    if len(v) > 140:
+        raise StandardViolation("Unstructured message must not be longer than 140 chars")
+    return v
+
+
 class QRData(BaseModel):
     # Mandatory fields
     iban: Union[IBAN, str]
@@ -80,12 +114,7 @@ class QRData(BaseModel):
     @field_validator("amount")
     @classmethod
     def _validate_amount(cls, v: Union[float, str]):
-        if v is None:
-            return v
-        v = float(v)
-        if not (0.01 <= v <= 999999999.99):
-            raise StandardViolation("Payment amount is out of allowed range")
-        return round(v, 2)
+        return check_amount(v)
 
     @field_validator("currency")
     @classmethod
@@ -99,29 +128,13 @@ class QRData(BaseModel):
     @model_validator(mode="before")
     @classmethod
     def _check_reference(cls, values):
-        reftype, reference = values.get('reference_type'), values.get("reference")
-        if reftype == ReferenceType.NON and reference != "":
-            raise StandardViolation("Reference must be empty for type NON")
-        if reftype == ReferenceType.QRR:
-            if len(reference) != 27:
-                raise StandardViolation("QR Reference must have a length of exactly 27")
-            if not reference.isnumeric():
-                raise StandardViolation("QR Reference must be numeric")
-        # TODO: Mod10 Validation
-        if reftype == ReferenceType.SCOR:
-            if not (5 <= len(reference) <= 25):
-                raise StandardViolation("SCOR Reference must be between 5 and 25 chars long")
-            if not reference.isalnum():
-                raise StandardViolation("SCOR Reference must be alphanumeric")
-        # TODO: Mod97 Validation
+        check_reference(values.get('reference_type'), values.get("reference"))
         return values
 
     @field_validator("message")
     @classmethod
     def _validate_message(cls, v: str):
-        if len(v) > 140:
-            raise StandardViolation("Unstructured message must not be longer than 140 chars")
-        return v
+        return check_message(v)
 
     @field_validator("trailer")
     @classmethod
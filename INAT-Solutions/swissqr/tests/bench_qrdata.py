@@ -0,0 +1,67 @@
+﻿"""
+Benchmark: QR payload throughput, QRData per payment vs CreditorProfile.
+
+Builds N payloads (default 10000) for one creditor with varying amounts,
+references and debtors (a few hundred distinct customers, as in a batch
+invoice run), once through the pydantic models (QRData + PaymentParty per
+payment) and once through a prevalidated CreditorProfile, and checks that
+both produce the same strings.
+
+Run: python tests/bench_qrdata.py [N]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from swissqr import PaymentParty, QRData, CreditorProfile
+from swissqr.qrdata import ReferenceType
+
+IBAN = "CH4431999123000889012"
+CREDITOR = PaymentParty(name="Robert Schneider AG", street="Rue du Lac", street_no="1268",
+                        zipcode="2501", city="Biel", country="CH")
+CUSTOMERS = 300
+
+
+def payments(n):
+    for i in range(n):
+        debtor = dict(name="Kunde {}".format(i % CUSTOMERS), street="Marktgasse",
+                      street_no=str(i % CUSTOMERS), zipcode="9400", city="Rorschach", country="CH")
+        reference = "RF18{:012d}".format(i)
+        yield dict(amount=10 + i * 0.05, debtor=debtor, reference_type=ReferenceType.SCOR,
+                   reference=reference, message="Rechnung {}".format(i))
+
+
+def via_qrdata(items):
+    out = []
+    for p in items:
+        out.append(str(QRData(iban=IBAN, creditor=CREDITOR, amount=p["amount"],
+                              ultimate_debitor=PaymentParty(**p["debtor"]),
+                              reference_type=p["reference_type"], reference=p["reference"],
+                              message=p["message"])))
+    return out
+
+
+def via_profile(items):
+    profile = CreditorProfile(iban=IBAN, creditor=CREDITOR)
+    return [profile.payload(**p) for p in items]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    items = list(payments(n))
+    results = {}
+    print("{} payloads ({} distinct debtors):".format(n, min(n, CUSTOMERS)))
+    for name, fn in (("QRData per payment", via_qrdata), ("CreditorProfile", via_profile)):
+        start = time.perf_counter()
+        results[name] = fn(items)
+        seconds = time.perf_counter() - start
+        print("  {:20s} {:8.3f} s  {:10.0f} payloads/s".format(name, seconds, n / seconds))
+    legacy, fast = results.values()
+    print("  identical: {}".format(legacy == fast))
+    return 0 if legacy == fast else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+﻿"""
+Benchmark: SVG payment part rendering, BeautifulSoup pipeline vs direct emitter.
+
+The legacy implementation below is the previous SwissQR._svg_code (qrcode SVG
+-> BeautifulSoup "lxml-xml" -> edit -> serialise). The benchmark checks that the
+direct emitter produces byte-identical documents and markup, then times both
+for N different payloads (cold) and for repeated payloads (memoised).
+
+Run: python tests/bench_svg.py [N]   (needs beautifulsoup4 and lxml for the legacy path)
+"""
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import qrcode
+import qrcode.image.svg
+
+from swissqr import PaymentParty, QRData, SwissQR
+
+
+class LegacySwissQR:
+
+    def __init__(self, data: QRData):
+        from bs4 import BeautifulSoup
+        qr = qrcode.QRCode(version=None, error_correction=SwissQR.correction, box_size=10, border=0)
+        qr.add_data(str(data))
+        vec = qr.make_image(fill_color="black", back_color="white",
+                            image_factory=qrcode.image.svg.SvgPathFillImage)
+        buf = io.BytesIO()
+        vec.save(buf)
+        self.soup = BeautifulSoup(buf.getvalue().decode(), "lxml-xml")
+
+    def svg_code(self) -> str:
+        svg = self.soup.find("svg")
+        svg["width"] = "{}mm".format(SwissQR.qrsize)
+        svg["height"] = "{}mm".format(SwissQR.qrsize)
+        qsize = int(svg["viewBox"].split(" ")[2])
+        csize = (qsize/SwissQR.qrsize) * SwissQR.crosssize
+        coffset = (qsize - csize) / 2
+        base = self.soup.new_tag("rect")
+        base["x"] = coffset
+        base["y"] = coffset
+        base["width"] = csize
+        base["height"] = csize
+        base["style"] = "fill:rgb(0,0,0);stroke-width:{};stroke:rgb(255,255,255)".format(csize / 12)
+        svg.append(base)
+        barwidth = csize / 5.5
+        barlength = csize * 0.6
+        hbar_x = (qsize - barlength) / 2
+        hbar_y = (qsize - barwidth) / 2
+        for x, y, w, h in ((hbar_x, hbar_y, barlength, barwidth), (hbar_y, hbar_x, barwidth, barlength)):
+            bar = self.soup.new_tag("rect")
+            bar["x"] = x
+            bar["y"] = y
+            bar["width"] = w
+            bar["height"] = h
+            bar["style"] = "fill:rgb(255,255,255);"
+            svg.append(bar)
+        return str(self.soup)
+
+
+def payloads(n):
+    creditor = PaymentParty(name="Hambone Fakenamington", street="Madeup Street", street_no="1",
+                            zipcode="9999", city="Madeup Town", country="CH")
+    return [QRData(iban="CH9300762011623852957", creditor=creditor, amount=5.0 + i * 0.35,
+                   message="Invoice {}".format(i)) for i in range(n)]
+
+
+def timed(fn, items):
+    t = time.perf_counter()
+    result = [fn(d) for d in items]
+    return (time.perf_counter() - t) * 1000.0 / len(items), result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    try:
+        import bs4  # noqa: F401
+        import lxml  # noqa: F401
+    except ImportError as e:
+        print("Legacy path needs beautifulsoup4 and lxml: {}".format(e))
+        return 2
+    data = payloads(n)
+
+    SwissQR.clear_cache()
+    legacy_ms, legacy = timed(lambda d: LegacySwissQR(d).svg_code(), data)
+    t = time.perf_counter()
+    direct = SwissQR.render_many(data, document=True)
+    direct_ms = (time.perf_counter() - t) * 1000.0 / n
+    cached_ms, _ = timed(lambda d: SwissQR(d).get_markup(), data)
+    # shared by both paths: QR matrix incl. qrcode's mask selection
+    matrix_ms, _ = timed(lambda d: SwissQR._matrix(str(d)), data)
+
+    identical = legacy == direct and all(
+        doc.splitlines()[1] == SwissQR(d).get_markup() for doc, d in zip(legacy, data))
+    print("{} payloads, ms per payment part:".format(n))
+    print("  legacy (BeautifulSoup)   {:8.3f}".format(legacy_ms))
+    print("  direct (render_many)     {:8.3f}   {:.1f}x".format(direct_ms, legacy_ms / direct_ms))
+    print("  memoised (get_markup)    {:8.3f}   {:.0f}x".format(cached_ms, legacy_ms / cached_ms))
+    print("  SVG only, without matrix {:8.3f} vs {:.3f} (qrcode matrix {:.3f})".format(
+        max(direct_ms - matrix_ms, 0.0), max(legacy_ms - matrix_ms, 0.0), matrix_ms))
+    print("  byte-identical: {}".format(identical))
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+﻿import unittest
+from swissqr import PaymentParty, QRData, CreditorProfile, StandardViolation
+from swissqr.qrdata import ReferenceType
+
+
+class TestCreditorProfile(unittest.TestCase):
+
+    def setUp(self):
+        self.creditor = PaymentParty(
+            name="Hambone Fakenamington",
+            street="Madeup Street",
+            street_no="1",
+            zipcode="9999",
+            city="Madeup Town",
+            country="CH"
+        )
+        self.debtor = dict(name="Pia Rutschmann", street="Marktgasse", street_no="28",
+                           zipcode="9400", city="Rorschach", country="ch")
+        self.profile = CreditorProfile(iban="CH9300762011623852957", creditor=self.creditor)
+
+    def test_payload_matches_qrdata(self):
+        cases = [
+            dict(),
+            dict(amount=5.0, message="Have a beer!"),
+            dict(amount="1949.755", debtor=self.debtor),
+            dict(amount=12.5, debtor=self.debtor, reference_type=ReferenceType.QRR,
+                 reference="210000000003139471430009017"),
+            dict(debtor=self.debtor, reference_type=ReferenceType.SCOR, reference="RF18539007547034"),
+        ]
+        for case in cases:
+            with self.subTest(case=case):
+                fields = dict(case)
+                if "debtor" in fields:
+                    fields["ultimate_debitor"] = PaymentParty(**fields.pop("debtor"))
+                expected = str(QRData(iban="CH9300762011623852957", creditor=self.creditor, **fields))
+                self.assertEqual(self.profile.payload(**case), expected)
+                self.assertEqual(str(self.profile.qrdata(**case)), expected)
+
+    def test_same_violations(self):
+        invalid = [
+            dict(amount=0),
+            dict(amount=1e9),
+            dict(message="x" * 141),
+            dict(reference="123"),
+            dict(reference_type=ReferenceType.QRR, reference="12345"),
+            dict(reference_type=ReferenceType.SCOR, reference="RF18-5390"),
+            dict(debtor=dict(name="", country="CH", zipcode="9400", city="Rorschach")),
+        ]
+        for case in invalid:
+            with self.subTest(case=case):
+                with self.assertRaises(StandardViolation):
+                    self.profile.payload(**case)
+
+    def test_creditor_validated_once(self):
+        with self.assertRaises(StandardViolation):
+            CreditorProfile(iban="DE89370400440532013000", creditor=self.creditor)
+        with self.assertRaises(StandardViolation):
+            CreditorProfile(iban="CH9300762011623852957", creditor=self.creditor, currency="USD")
+
+    def test_debtor_cache(self):
+        for amount in (1.0, 2.0, 3.0):
+            self.profile.payload(amount=amount, debtor=dict(self.debtor))
+        info = self.profile.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
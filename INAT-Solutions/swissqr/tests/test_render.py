@@ -0,0 +1,57 @@
+﻿import unittest
+from swissqr import PaymentParty, QRData, SwissQR
+
+
+class TestRender(unittest.TestCase):
+
+    def setUp(self):
+        self.creditor = PaymentParty(
+            name="Hambone Fakenamington",
+            street="Madeup Street",
+            street_no="1",
+            zipcode="9999",
+            city="Madeup Town",
+            country="CH"
+        )
+
+    def _data(self, amount):
+        return QRData(
+            iban="CH9300762011623852957",
+            creditor=self.creditor,
+            amount=amount,
+            message="Have a beer!"
+        )
+
+    def test_render_many_matches_get_markup(self):
+        data = [self._data(amount) for amount in (5.0, 12.5, 5.0)]
+        markups = SwissQR.render_many(data)
+        self.assertEqual(markups, [SwissQR(d).get_markup() for d in data])
+        self.assertEqual(markups[0], markups[2])
+        self.assertNotEqual(markups[0], markups[1])
+
+    def test_document_layout(self):
+        d = self._data(5.0)
+        document = SwissQR.render_many([d], document=True)[0]
+        self.assertEqual(document, SwissQR(d)._svg_code())
+        self.assertEqual(document.splitlines()[1], SwissQR(d).get_markup())
+        self.assertTrue(document.startswith('<?xml version="1.0" encoding="utf-8"?>\n<svg '))
+        self.assertIn('height="46mm"', document)
+
+    def test_markup_follows_data_changes(self):
+        d = self._data(5.0)
+        q = SwissQR(d)
+        before = q.get_markup()
+        d.amount = 7.0
+        self.assertNotEqual(before, q.get_markup())
+
+    def test_cache_size_takes_effect(self):
+        old = SwissQR.cache_size
+        try:
+            SwissQR.cache_size = 2
+            for amount in (1.0, 2.0, 3.0):
+                SwissQR(self._data(amount)).get_markup()
+            info = SwissQR._markup_cache.cache_info()
+            self.assertEqual(info.maxsize, 2)
+            self.assertEqual(info.currsize, 2)
+        finally:
+            SwissQR.cache_size = old
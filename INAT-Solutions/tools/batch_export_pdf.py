@@ -0,0 +1,61 @@
+# batch_export_pdf.py
+# Exportiert Rechnungen ohne Oberfläche als PDFs in einen Ordner oder eine
+# ZIP-Datei (rechnung_batch, Prozesspool). Auswahl über Ids, Zeitraum
+# (Rechnungsdatum, beide Grenzen inklusive), Jahr und/oder Status.
+# Aufruf: python tools/batch_export_pdf.py --out ZIEL[.zip] [--jahr 2025]
+#             [--von 2025-01-01 --bis 2025-12-31] [--status bezahlt]
+#             [--ids 1,2,3] [--prozesse N]
+# Exit-Code 1, wenn eine Rechnung nicht exportiert werden konnte.
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Rechnungen als PDF-Stapel exportieren")
+    ap.add_argument("--out", required=True, help="Zielordner oder *.zip")
+    ap.add_argument("--jahr", type=int, default=None)
+    ap.add_argument("--von", default=None, help="Rechnungsdatum ab (inklusive)")
+    ap.add_argument("--bis", default=None, help="Rechnungsdatum bis (inklusive)")
+    ap.add_argument("--status", default=None, help="offen / bezahlt / überfällig")
+    ap.add_argument("--ids", default=None, help="Rechnungs-Ids, kommagetrennt")
+    ap.add_argument("--prozesse", type=int, default=None)
+    args = ap.parse_args()
+
+    import datum_iso
+    import rechnung_batch
+    import schema_migrations
+    schema_migrations.migrate()
+
+    von = bis = None
+    if args.jahr:
+        von, bis = datum_iso.jahr_bereich(args.jahr)
+    if args.von or args.bis:
+        von, bis = datum_iso.tag_bereich(args.von or "1900-01-01", args.bis or "9999-12-30")
+    ids = [int(i) for i in args.ids.split(",") if i.strip()] if args.ids else None
+
+    rechnungen = rechnung_batch.lade_rechnungen(ids=ids, von=von, bis=bis, status=args.status)
+    if not rechnungen:
+        print("Keine Rechnungen für diese Auswahl.")
+        return 0
+    print(f"{len(rechnungen)} Rechnungen -> {args.out}")
+
+    def fortschritt(fertig, gesamt, name):
+        print(f"  [{fertig}/{gesamt}] {name}", flush=True)
+
+    try:
+        ergebnis = rechnung_batch.exportiere(rechnungen, os.path.abspath(args.out),
+                                             prozesse=args.prozesse, fortschritt=fortschritt)
+    except KeyboardInterrupt:
+        print("Abgebrochen.")
+        return 1
+    for nr, text in ergebnis["fehler"]:
+        print(f"FEHLER {nr}: {text}")
+    print(f"{ergebnis['ok']} PDFs in {ergebnis['dauer_s']:.1f} s")
+    return 1 if ergebnis["fehler"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
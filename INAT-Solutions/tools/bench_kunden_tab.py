@@ -0,0 +1,135 @@
+# bench_kunden_tab.py
+# Misst Ladezeit und Speicher (RSS) des KundenTab mit N Kunden (Default: 20k)
+# in einer temporären SQLite-Datenbank: erste Seite, Neuladen mit Auswahl,
+# Suchfilter und Scrollen bis ans Listenende.
+# Aufruf: python tools/bench_kunden_tab.py [anzahl_kunden]
+import os
+import sys
+import time
+import random
+import tempfile
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+# Eigene Datenbank unter einem temporären PROGRAMDATA, ohne Fenster
+os.environ["PROGRAMDATA"] = tempfile.mkdtemp(prefix="inat_bench_")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def _rss_mb() -> float:
+    """Aktueller RSS in MB (Linux /proc, sonst Höchstwert aus resource/psutil)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except Exception:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except Exception:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except Exception:
+        return 0.0
+
+
+VORNAMEN = ["Anna", "Beat", "Claudia", "Daniel", "Eva", "Fritz", "Gabi", "Hans", "Irene", "Jürg"]
+NACHNAMEN = ["Müller", "Meier", "Schmid", "Keller", "Weber", "Huber", "Schneider", "Steiner", "Fischer", "Brunner"]
+ORTE = [("8000", "Zürich"), ("3000", "Bern"), ("4000", "Basel"), ("6000", "Luzern"), ("9000", "St. Gallen")]
+
+
+def _kunden(n, seed=42):
+    rnd = random.Random(seed)
+    for i in range(n):
+        name = f"{rnd.choice(VORNAMEN)} {rnd.choice(NACHNAMEN)} {i}"
+        plz, stadt = rnd.choice(ORTE)
+        firma = f"Garage {rnd.choice(NACHNAMEN)} AG" if rnd.random() < 0.3 else ""
+        yield ("Herr", name, firma, plz, f"Hauptstrasse {rnd.randint(1, 200)}", stadt,
+               f"kunde{i}@example.ch", "")
+
+
+def _ms(t0) -> float:
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+
+    import schema_migrations
+    from db_connection import get_db
+
+    schema_migrations.migrate()
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            cur.executemany(
+                "INSERT INTO kunden (anrede, name, firma, plz, strasse, stadt, email, bemerkung) "
+                "VALUES (%s,%s,%s,%s,%s,%s,%s,%s)",
+                _kunden(ROWS),
+            )
+        conn.commit()
+
+    from gui.kunden_tab import KundenTab
+
+    rss_vorher = _rss_mb()
+    t0 = time.perf_counter()
+    tab = KundenTab()
+    t_init = _ms(t0)
+    zeilen_init = tab.model.rowCount()
+    rss_init = _rss_mb()
+
+    tab.resize(1400, 900)
+    t0 = time.perf_counter()
+    tab.show()
+    app.processEvents()
+    t_show = _ms(t0)
+
+    # Auswahl mitten in der ersten Seite, Neuladen muss sie behalten
+    view = tab.list_view
+    view.setCurrentIndex(tab.model.index(50, 0))
+    key = view.current_key()
+    t0 = time.perf_counter()
+    tab.lade_kunden()
+    app.processEvents()
+    t_reload = _ms(t0)
+    stabil = view.current_key() == key
+
+    t0 = time.perf_counter()
+    view.set_filter_text("Müller")
+    view._filter_timer.stop()
+    view._apply_filter()
+    app.processEvents()
+    t_filter = _ms(t0)
+    treffer = tab.count_label.text()
+    view.set_filter_text("")
+    view._filter_timer.stop()
+    view._apply_filter()
+
+    # Scrollen bis ans Ende: jede Seite wird erst beim Erreichen geladen
+    t0 = time.perf_counter()
+    seiten = 0
+    while tab.model.canFetchMore():
+        view.scrollToBottom()
+        app.processEvents()
+        seiten += 1
+    t_scroll = _ms(t0)
+    rss_ende = _rss_mb()
+
+    print(f"Kunden:                {ROWS}")
+    print(f"KundenTab():           {t_init:9.1f} ms  ({zeilen_init} Zeilen geladen)")
+    print(f"show() + erstes Paint: {t_show:9.1f} ms")
+    print(f"lade_kunden():         {t_reload:9.1f} ms  (Auswahl erhalten: {'ja' if stabil else 'NEIN'})")
+    print(f"Filter 'Müller':       {t_filter:9.1f} ms  ({treffer})")
+    print(f"Scrollen bis Ende:     {t_scroll:9.1f} ms  ({seiten} Schritte, {tab.model.rowCount()} Zeilen)")
+    print(f"RSS vor Tab:           {rss_vorher:9.1f} MB")
+    print(f"RSS nach Tab:          {rss_init:9.1f} MB  (+{rss_init - rss_vorher:.1f})")
+    print(f"RSS nach Scrollen:     {rss_ende:9.1f} MB  (+{rss_ende - rss_vorher:.1f})")
+    tab.close()
+
+
+if __name__ == "__main__":
+    main()
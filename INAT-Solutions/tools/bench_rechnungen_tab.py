@@ -0,0 +1,108 @@
+# bench_rechnungen_tab.py
+# Misst Ladezeit und Speicher (RSS) des RechnungenTab mit N Rechnungen
+# (Default: 10k) in einer temporären SQLite-Datenbank.
+# Aufruf: python tools/bench_rechnungen_tab.py [anzahl_rechnungen]
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+# Eigene Datenbank unter einem temporären PROGRAMDATA, ohne Fenster
+os.environ["PROGRAMDATA"] = tempfile.mkdtemp(prefix="inat_bench_")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def _rss_mb() -> float:
+    """Aktueller RSS in MB (Linux /proc, sonst Höchstwert aus resource/psutil)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except Exception:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except Exception:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except Exception:
+        return 0.0
+
+
+def _rechnungen(n, seed=42):
+    rnd = random.Random(seed)
+    status = ("", "", "bezahlt", "offen", "überfällig")
+    for i in range(n):
+        positionen = [
+            {"beschreibung": f"Position {p}", "menge": rnd.randint(1, 5),
+             "einzelpreis": round(rnd.uniform(10, 500), 2)}
+            for p in range(rnd.randint(1, 6))
+        ]
+        yield (
+            f"{i + 1:06d}", f"Kunde {rnd.randint(1, 800)}", "", "Musterstrasse 1\n8000 Zürich",
+            f"20{rnd.randint(22, 25)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+            8.1, "zahlbar innert 30 Tagen", json.dumps(positionen), "", rnd.choice(status),
+        )
+
+
+def main():
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+
+    import schema_migrations
+    from db_connection import get_db
+    import rechnung_status
+    from rechnung_positionen import backfill
+
+    schema_migrations.migrate()
+    with get_db() as conn:
+        with conn.cursor() as cur:
+            cur.executemany(
+                "INSERT INTO rechnungen (rechnung_nr, kunde, firma, adresse, datum, mwst, "
+                "zahlungskonditionen, positionen, uid, abschluss) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)",
+                _rechnungen(ROWS),
+            )
+            backfill(cur)
+            rechnung_status.backfill(cur)
+        conn.commit()
+
+    from gui.rechnungen_tab import RechnungenTab
+
+    rss_vorher = _rss_mb()
+    t0 = time.perf_counter()
+    tab = RechnungenTab()
+    t_init = time.perf_counter() - t0
+    rss_init = _rss_mb()
+
+    tab.resize(1400, 900)
+    t0 = time.perf_counter()
+    tab.show()
+    app.processEvents()
+    t_show = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    tab.lade_rechnungen()
+    app.processEvents()
+    t_reload = time.perf_counter() - t0
+    rss_reload = _rss_mb()
+
+    print(f"Rechnungen:            {ROWS}")
+    print(f"RechnungenTab():       {t_init * 1000:9.1f} ms")
+    print(f"show() + erstes Paint: {t_show * 1000:9.1f} ms")
+    print(f"lade_rechnungen():     {t_reload * 1000:9.1f} ms")
+    print(f"RSS vor Tab:           {rss_vorher:9.1f} MB")
+    print(f"RSS nach Tab:          {rss_init:9.1f} MB  (+{rss_init - rss_vorher:.1f})")
+    print(f"RSS nach Neuladen:     {rss_reload:9.1f} MB  (+{rss_reload - rss_vorher:.1f})")
+    tab.close()
+
+
+if __name__ == "__main__":
+    main()
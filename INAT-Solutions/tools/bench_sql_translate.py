@@ -0,0 +1,64 @@
+# bench_sql_translate.py
+# Micro-Benchmark: Overhead von CursorWrapper.execute mit und ohne SQL-Übersetzungscache.
+# Aufruf: python tools/bench_sql_translate.py [anzahl_zeilen]
+import os
+import sys
+import time
+import sqlite3
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import db_connection as dbconn
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+INSERT_SQL = (
+    "INSERT INTO public.buchhaltung (datum, typ, kategorie, betrag, beschreibung) "
+    "VALUES (%s, %s, %s, %s::numeric, %s)"
+)
+
+
+def _uncached(sql, is_sqlite):
+    # Verhalten vor dem Cache: jede Ausführung übersetzt neu
+    if not is_sqlite:
+        return sql
+    return dbconn._normalize_sql_for_sqlite(sql).replace("%s", "?")
+
+
+def _run(translate):
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE buchhaltung (id INTEGER PRIMARY KEY, datum TEXT, typ TEXT, "
+                "kategorie TEXT, betrag NUMERIC, beschreibung TEXT)")
+    cur = dbconn.CursorWrapper(con.cursor(), True)
+    orig = dbconn._translate_for_cursor
+    dbconn._translate_for_cursor = translate
+    try:
+        t0 = time.perf_counter()
+        for i in range(ROWS):
+            cur.execute(INSERT_SQL, ("2024-01-01", "Einnahme", "Import", i, f"Zeile {i}"))
+        elapsed = time.perf_counter() - t0
+    finally:
+        dbconn._translate_for_cursor = orig
+        con.close()
+    return elapsed
+
+
+def _translate_only(translate):
+    t0 = time.perf_counter()
+    for _ in range(ROWS):
+        translate(INSERT_SQL, True)
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    dbconn._translate_sql.cache_clear()
+    before = _run(_uncached)
+    after = _run(dbconn._translate_for_cursor)
+    t_before = _translate_only(_uncached)
+    t_after = _translate_only(dbconn._translate_for_cursor)
+
+    print(f"{ROWS} x execute (sqlite :memory:)")
+    print(f"  ohne Cache: {before * 1000:8.1f} ms  ({before / ROWS * 1e6:6.2f} µs/execute)")
+    print(f"  mit Cache:  {after * 1000:8.1f} ms  ({after / ROWS * 1e6:6.2f} µs/execute)")
+    print("nur Übersetzung")
+    print(f"  ohne Cache: {t_before / ROWS * 1e6:6.2f} µs/statement")
+    print(f"  mit Cache:  {t_after / ROWS * 1e6:6.2f} µs/statement")
+    print("Cache:", dbconn.sql_cache_stats())
@@ -0,0 +1,94 @@
+# bench_sqlite_profile.py
+# Vergleicht SQLite-Standardeinstellungen mit db_connection.SQLITE_PROFILE
+# auf einer buchhaltung-Tabelle (Default: 100k Zeilen) in einer temporären Datei.
+# Aufruf: python tools/bench_sqlite_profile.py [anzahl_zeilen]
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import db_connection as dbconn
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+SINGLE_COMMITS = 2_000     # Einzel-Inserts mit Commit, wie sie die Dialoge machen
+READ_ROUNDS = 20
+
+SCHEMA = """
+CREATE TABLE buchhaltung (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    datum TEXT, typ TEXT, kategorie TEXT, betrag NUMERIC, beschreibung TEXT
+);
+CREATE INDEX idx_buchhaltung_datum ON buchhaltung(datum);
+"""
+
+
+def _rows(n, seed=42):
+    rnd = random.Random(seed)
+    for i in range(n):
+        yield (
+            f"20{rnd.randint(18, 25)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+            rnd.choice(("Einnahme", "Ausgabe")),
+            rnd.choice(("Material", "Miete", "Verkauf", "Service", "Diverses")),
+            round(rnd.uniform(1, 5000), 2),
+            f"Buchung {i}",
+        )
+
+
+def _bench(label, profile):
+    fd, path = tempfile.mkstemp(prefix="inat_bench_", suffix=".sqlite")
+    os.close(fd)
+    try:
+        con = sqlite3.connect(path)
+        if profile:
+            dbconn._init_sqlite_connection(con, profile)
+        con.executescript(SCHEMA)
+
+        t0 = time.perf_counter()
+        con.executemany(
+            "INSERT INTO buchhaltung (datum, typ, kategorie, betrag, beschreibung) VALUES (?,?,?,?,?)",
+            _rows(ROWS),
+        )
+        con.commit()
+        t_bulk = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for row in _rows(SINGLE_COMMITS, seed=7):
+            con.execute(
+                "INSERT INTO buchhaltung (datum, typ, kategorie, betrag, beschreibung) VALUES (?,?,?,?,?)",
+                row,
+            )
+            con.commit()
+        t_single = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for _ in range(READ_ROUNDS):
+            con.execute("SELECT * FROM buchhaltung").fetchall()
+        t_scan = (time.perf_counter() - t0) / READ_ROUNDS
+
+        t0 = time.perf_counter()
+        for _ in range(READ_ROUNDS):
+            con.execute(
+                "SELECT kategorie, SUM(betrag) FROM buchhaltung "
+                "WHERE datum >= '2024-01-01' AND datum < '2025-01-01' GROUP BY kategorie"
+            ).fetchall()
+        t_range = (time.perf_counter() - t0) / READ_ROUNDS
+        con.close()
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+    print(f"[{label}]")
+    print(f"  Bulk-Insert {ROWS} Zeilen:        {t_bulk * 1000:9.1f} ms  ({ROWS / t_bulk:,.0f} Zeilen/s)")
+    print(f"  {SINGLE_COMMITS} Inserts mit Commit:     {t_single * 1000:9.1f} ms  ({SINGLE_COMMITS / t_single:,.0f} Commits/s)")
+    print(f"  Full-Scan SELECT *:            {t_scan * 1000:9.1f} ms")
+    print(f"  Jahres-Aggregat (Index):       {t_range * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    _bench("SQLite-Default", None)
+    _bench("Tuned-Profil", dbconn.SQLITE_PROFILE)
@@ -0,0 +1,190 @@
+# bench_startup.py
+# Misst den Programmstart bis zum ersten Paint des Hauptfensters (offscreen,
+# leere SQLite-Datenbank unter einem temporären PROGRAMDATA):
+#   - python -X importtime: Importzeit von gui.main_window und die teuersten Pakete
+#   - Wanduhrzeit vom Prozessstart bis zum ersten Paint-Event des MainWindow
+# und prüft, dass schwere Bibliotheken (reportlab, pandas, msal, ...) beim
+# Start nicht geladen werden. Jede Messung läuft in einem frischen Prozess.
+#
+# Aufruf: python tools/bench_startup.py [--runs 5] [--save-baseline] [--baseline DATEI]
+#                                      [--max-import-ms N] [--max-paint-ms N] [--tolerance 0.25]
+# Exit-Code 1 bei Regression (schwere Bibliothek geladen, Budget oder
+# Baseline * (1 + tolerance) überschritten).
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+# Dürfen erst beim Öffnen der jeweiligen Seite / Funktion importiert werden
+SCHWERE_MODULE = ("reportlab", "svglib", "pandas", "fpdf", "qrbill", "msal", "requests")
+
+_RE_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+def _env(programdata: str) -> dict:
+    env = dict(os.environ)
+    env["PROGRAMDATA"] = programdata
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def _importtime(programdata: str) -> dict:
+    """Importzeit von gui.main_window laut -X importtime (ms) und Top-Pakete."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import gui.main_window"],
+        cwd=ROOT, env=_env(programdata), capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import gui.main_window fehlgeschlagen:\n{proc.stderr[-2000:]}")
+    gesamt_us = 0
+    pakete = {}
+    for line in proc.stderr.splitlines():
+        m = _RE_IMPORTTIME.match(line)
+        if not m:
+            continue
+        selbst, name = int(m.group(1)), m.group(3)
+        gesamt_us += selbst
+        # Eigenzeit je Paket (gui.x, PyQt5.y, ... zusammengefasst)
+        top = name.split(".")[0]
+        pakete[top] = pakete.get(top, 0) + selbst
+    return {
+        "import_ms": gesamt_us / 1000.0,
+        "top": sorted(((n, us / 1000.0) for n, us in pakete.items()), key=lambda x: -x[1])[:10],
+    }
+
+
+def _paint_messung() -> None:
+    """Kindprozess: MainWindow bauen, zeigen und bis zum ersten Paint warten."""
+    t_start = time.perf_counter()
+    from PyQt5.QtCore import QObject, QEvent, QTimer
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv)
+
+    import schema_migrations
+    schema_migrations.migrate()
+    t_schema = time.perf_counter()
+
+    from gui.main_window import MainWindow
+    t_import = time.perf_counter()
+
+    ergebnis = {}
+
+    class _ErsterPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and "paint" not in ergebnis:
+                ergebnis["paint"] = time.perf_counter()
+                QTimer.singleShot(0, app.quit)
+            return False
+
+    mw = MainWindow(benutzername="bench")
+    filt = _ErsterPaint()
+    mw.installEventFilter(filt)
+    mw.showNormal()
+    QTimer.singleShot(10_000, app.quit)
+    app.exec_()
+
+    print(json.dumps({
+        "schema_ms": (t_schema - t_start) * 1000.0,
+        "main_window_import_ms": (t_import - t_schema) * 1000.0,
+        # ohne Schema-Migration (gehört nicht zum Fenster)
+        "first_paint_ms": (ergebnis.get("paint", time.perf_counter()) - t_schema) * 1000.0,
+        "painted": "paint" in ergebnis,
+        "schwere_module": sorted({m.split(".")[0] for m in sys.modules} & set(SCHWERE_MODULE)),
+    }))
+
+
+def _first_paint(programdata: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--paint-child"],
+        cwd=ROOT, env=_env(programdata), capture_output=True, text=True,
+    )
+    zeilen = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+    if proc.returncode != 0 or not zeilen:
+        raise RuntimeError(f"Paint-Messung fehlgeschlagen:\n{proc.stderr[-2000:]}")
+    return json.loads(zeilen[-1])
+
+
+def _default_baseline() -> str:
+    try:
+        from paths import logs_dir
+        return str(logs_dir() / "startup_baseline.json")
+    except Exception:
+        return os.path.join(ROOT, "startup_baseline.json")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Startzeit bis zum ersten Paint messen")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--baseline", default=None)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--max-import-ms", type=float, default=None)
+    ap.add_argument("--max-paint-ms", type=float, default=None)
+    ap.add_argument("--paint-child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.paint_child:
+        _paint_messung()
+        return 0
+
+    programdata = tempfile.mkdtemp(prefix="inat_bench_start_")
+    imports, paints, schwer = [], [], set()
+    top = []
+    for _lauf in range(max(args.runs, 1)):
+        it = _importtime(programdata)
+        fp = _first_paint(programdata)
+        imports.append(it["import_ms"])
+        paints.append(fp["first_paint_ms"])
+        schwer.update(fp["schwere_module"])
+        top = it["top"]
+        if not fp["painted"]:
+            print("WARNUNG: kein Paint-Event innerhalb von 10 s")
+
+    werte = {
+        "import_ms": statistics.median(imports),
+        "first_paint_ms": statistics.median(paints),
+    }
+    print(f"Läufe:                        {len(paints)}")
+    print(f"Import gui.main_window:       {werte['import_ms']:9.1f} ms (Median, -X importtime)")
+    print(f"Prozessstart -> erster Paint: {werte['first_paint_ms']:9.1f} ms (Median, ohne Schema-Migration)")
+    print("Teuerste Pakete (Eigenzeit):")
+    for name, ms in top:
+        print(f"  {name:28s} {ms:9.1f} ms")
+
+    fehler = []
+    if schwer:
+        fehler.append(f"schwere Module beim Start geladen: {', '.join(sorted(schwer))}")
+    if args.max_import_ms is not None and werte["import_ms"] > args.max_import_ms:
+        fehler.append(f"Import {werte['import_ms']:.1f} ms > Budget {args.max_import_ms:.1f} ms")
+    if args.max_paint_ms is not None and werte["first_paint_ms"] > args.max_paint_ms:
+        fehler.append(f"erster Paint {werte['first_paint_ms']:.1f} ms > Budget {args.max_paint_ms:.1f} ms")
+
+    baseline_pfad = args.baseline or _default_baseline()
+    if args.save_baseline:
+        with open(baseline_pfad, "w", encoding="utf-8") as f:
+            json.dump(werte, f, indent=2)
+        print(f"Baseline gespeichert: {baseline_pfad}")
+    elif os.path.exists(baseline_pfad):
+        with open(baseline_pfad, encoding="utf-8") as f:
+            basis = json.load(f)
+        for key, wert in werte.items():
+            grenze = float(basis.get(key, 0)) * (1 + args.tolerance)
+            if grenze and wert > grenze:
+                fehler.append(f"{key} {wert:.1f} ms > Baseline {basis[key]:.1f} ms + {args.tolerance:.0%}")
+
+    for f in fehler:
+        print(f"REGRESSION: {f}")
+    return 1 if fehler else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
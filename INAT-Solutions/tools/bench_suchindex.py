@@ -0,0 +1,174 @@
+# bench_suchindex.py
+# Misst die Suche über den Suchindex (suchindex, Migration 8) gegen die
+# bisherige LIKE-Suche auf einer temporären SQLite-DB mit N Kunden und
+# N Artikeln (Default 100k), inkl. Insert-Kosten der Index-Trigger.
+#   Rang:  suchindex.suche(), beste 200 nach Relevanz (Auswahldialoge)
+#   Grid:  suchindex.bedingung() + Sortierung nach Spalte, erste Seite (Listen-Tabs)
+# Dazu N/2 Rechnungen mit je 2 Positionen und die globale Schnellsuche
+# (globale_suche.suche): Zeit bis zur ersten Kategorie und für alle.
+# Geprüft werden Präfix, Umlaut-Faltung und mehrere Begriffe; am Ende
+# muss suchindex.check() konsistent sein.
+# Aufruf: python tools/bench_suchindex.py [anzahl_zeilen]
+import os
+import sys
+import time
+import random
+import tempfile
+import statistics
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+ROUNDS = 20
+
+NACHNAMEN = ["Müller", "Meier", "Schmid", "Keller", "Weber", "Huber", "Schneider", "Meyer", "Steiner",
+             "Fischer", "Gerber", "Brunner", "Baumann", "Frei", "Zimmermann", "Moser", "Wyss", "Graf",
+             "Roth", "Bühler", "Käser", "Schärer", "Lüthi", "Sutter", "Studer", "Bättig", "Egli"]
+VORNAMEN = ["Hans", "Peter", "Anna", "Maria", "Daniel", "Thomas", "Sandra", "Nicole", "René", "Jörg",
+            "Andrea", "Martin", "Ursula", "Beat", "Esther", "Reto", "Sébastien", "Céline"]
+ORTE = [("8000", "Zürich"), ("3000", "Bern"), ("4000", "Basel"), ("6000", "Luzern"), ("9000", "St. Gallen"),
+        ("1200", "Genève"), ("2500", "Biel/Bienne"), ("8400", "Winterthur"), ("5000", "Aarau")]
+STRASSEN = ["Hauptstrasse", "Bahnhofstrasse", "Dorfstrasse", "Kirchweg", "Seestrasse", "Gartenweg"]
+ARTIKEL = ["Schraube", "Mutter", "Unterlegscheibe", "Dübel", "Scharnier", "Türgriff", "Kabelbinder",
+           "Schlauchschelle", "Ölfilter", "Luftfilter", "Wischerblatt", "Glühbirne", "Sicherung"]
+
+ABFRAGEN = [
+    ("kunden", "mü"),
+    ("kunden", "müller"),
+    ("kunden", "mueller bern"),
+    ("kunden", "rene zur"),
+    ("kunden", "hauptstr 12"),
+    ("kunden", "kaser"),
+    ("artikellager", "ölfil"),
+    ("artikellager", "schraube m8"),
+    ("kunden", "xyzzy"),
+]
+# Schlüssel, Sortierspalte wie im Tab, bisher per LIKE durchsuchte Spalten
+LIKE_SPALTEN = {
+    "kunden": ("kundennr", "name", ["name", "firma", "strasse", "plz", "stadt", "email", "telefon"]),
+    "artikellager": ("artikel_id", "bezeichnung", ["artikelnummer", "bezeichnung", "lagerort"]),
+}
+
+
+def _kunden(n, rnd):
+    for i in range(n):
+        vn, nn = rnd.choice(VORNAMEN), rnd.choice(NACHNAMEN)
+        plz, ort = rnd.choice(ORTE)
+        yield (f"{vn} {nn}", rnd.choice(["", "", f"{nn} AG", f"{nn} & Co."]),
+               f"{rnd.choice(STRASSEN)} {rnd.randint(1, 120)}", plz, ort,
+               f"{vn.lower()}.{nn.lower()}{i}@example.ch", f"079 {rnd.randint(100, 999)} {rnd.randint(10, 99)} 00")
+
+
+def _artikel(n, rnd):
+    for i in range(n):
+        yield (f"A-{i:06d}", f"{rnd.choice(ARTIKEL)} M{rnd.choice([4, 5, 6, 8, 10, 12])}",
+               rnd.randint(0, 500), f"Regal {rnd.randint(1, 40)}")
+
+
+def _rechnungen(n, rnd):
+    for i in range(n):
+        nn = rnd.choice(NACHNAMEN)
+        yield (f"{2020 + i % 7}-{i:06d}", f"{rnd.choice(VORNAMEN)} {nn}", rnd.choice(["", f"{nn} AG"]),
+               f"{2020 + i % 7}-{1 + i % 12:02d}-{1 + i % 28:02d}")
+
+
+def _ms(fn):
+    zeiten = []
+    for _ in range(ROUNDS):
+        t = time.perf_counter()
+        ergebnis = fn()
+        zeiten.append((time.perf_counter() - t) * 1000.0)
+    return statistics.median(zeiten), ergebnis
+
+
+def main():
+    import db_connection
+    import schema_migrations
+    import suchindex
+
+    fd, path = tempfile.mkstemp(prefix="inat_bench_suche_", suffix=".sqlite")
+    os.close(fd)
+    conn = db_connection.connect_sqlite_at(path)
+    try:
+        schema_migrations.migrate(conn)
+        rnd = random.Random(42)
+        with conn.cursor() as cur:
+            t = time.perf_counter()
+            cur.executemany(
+                "INSERT INTO kunden (name, firma, strasse, plz, stadt, email, telefon) VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                list(_kunden(ROWS, rnd)),
+            )
+            cur.executemany(
+                "INSERT INTO artikellager (artikelnummer, bezeichnung, bestand, lagerort) VALUES (%s, %s, %s, %s)",
+                list(_artikel(ROWS, rnd)),
+            )
+            conn.commit()
+            print(f"{ROWS} Kunden + {ROWS} Artikel eingefügt (mit Index-Triggern): {time.perf_counter() - t:.1f} s")
+            t = time.perf_counter()
+            cur.executemany(
+                "INSERT INTO rechnungen (rechnung_nr, kunde, firma, datum) VALUES (%s, %s, %s, %s)",
+                list(_rechnungen(ROWS // 2, rnd)),
+            )
+            cur.executemany(
+                "INSERT INTO rechnung_positionen (rechnung_id, position_index, bezeichnung, menge, preis, mwst, gesamt) "
+                "VALUES (%s, %s, %s, 1, 10, 8.1, 10)",
+                [(i // 2 + 1, i % 2, rnd.choice(ARTIKEL)) for i in range(ROWS)],
+            )
+            conn.commit()
+            print(f"{ROWS // 2} Rechnungen + {ROWS} Positionen eingefügt (mit Index-Triggern): "
+                  f"{time.perf_counter() - t:.1f} s")
+
+        print(f"Median über {ROUNDS} Läufe, ms (Treffer, max. 200):")
+        print(f"  {'Tabelle':13s} {'Suche':16s} {'Rang':>8s} {'Grid':>8s} {'LIKE':>8s}")
+        for tabelle, text in ABFRAGEN:
+            idx_ms, treffer = _ms(lambda: suchindex.suche(tabelle, text, limit=200, conn=conn))
+            key, sortierung, spalten = LIKE_SPALTEN[tabelle]
+            bedingung, params = suchindex.bedingung(conn, tabelle, text, key)
+
+            def _grid():
+                with conn.cursor() as cur:
+                    cur.execute(f"SELECT {key} FROM {tabelle} WHERE {bedingung} "
+                                f"ORDER BY COALESCE({sortierung}, ''), {key} LIMIT 200", params)
+                    return cur.fetchall()
+            grid_ms, _grid_treffer = _ms(_grid)
+            like = " OR ".join(f"LOWER({s}) LIKE %s" for s in spalten)
+            muster = [f"%{text.lower()}%"] * len(spalten)
+
+            def _like():
+                with conn.cursor() as cur:
+                    cur.execute(f"SELECT {key} FROM {tabelle} WHERE {like} LIMIT 200", muster)
+                    return cur.fetchall()
+            like_ms, like_treffer = _ms(_like)
+            print(f"  {tabelle:13s} {text!r:16s} {idx_ms:8.2f} {grid_ms:8.2f} {like_ms:8.2f}"
+                  f"   ({len(treffer)} / {len(like_treffer)})")
+
+        import globale_suche
+        print("Globale Suche (alle Kategorien), ms: erste Kategorie / alle")
+        for text in ("müller", "mueller ag", "ölfilter", "2024-0012"):
+            erste, gesamt = [], []
+            for _ in range(ROUNDS):
+                t = time.perf_counter()
+                meldungen = []
+
+                def melde(kategorie, treffer, t=t):
+                    if not meldungen:
+                        erste.append((time.perf_counter() - t) * 1000.0)
+                    meldungen.append((kategorie, len(treffer)))
+                globale_suche.suche(text, melde, conn=conn)
+                gesamt.append((time.perf_counter() - t) * 1000.0)
+            print(f"  {text!r:16s} {statistics.median(erste):8.2f} {statistics.median(gesamt):8.2f}   {meldungen}")
+
+        with conn.cursor() as cur:
+            cur.execute("UPDATE kunden SET name = 'Zoë Überholz' WHERE kundennr = 1")
+            cur.execute("DELETE FROM kunden WHERE kundennr = 2")
+            conn.commit()
+            gefunden = suchindex.suche("kunden", "zoe uberholz", conn=conn)
+            abweichungen = suchindex.check(cur, True)
+        print(f"Update gefunden: {gefunden == [1]}, check(): {abweichungen or 'konsistent'}")
+        return 0 if gefunden == [1] and not abweichungen else 1
+    finally:
+        conn.close()
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
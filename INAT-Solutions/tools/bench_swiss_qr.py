@@ -0,0 +1,95 @@
+# bench_swiss_qr.py
+# Misst den Swiss-QR-Zahlteil pro Rechnung, bisher gegen neu:
+#   vorher:  qrbill.as_svg -> temporäre SVG-Datei -> svglib.svg2rlg -> renderPDF.draw
+#   nachher: QRBill.qr_data -> qr_zahlteil.zeichne (direkt auf den Canvas)
+# Beide zeichnen N Rechnungen (verschiedene Beträge und Zahler, gleicher
+# Kreditor) auf einen reportlab-Canvas im Speicher.
+# Aufruf: python tools/bench_swiss_qr.py [anzahl_rechnungen]   (braucht qrbill, svglib)
+import io
+import os
+import sys
+import time
+import tempfile
+import statistics
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+CREDITOR = {'name': "Deine Firma GmbH", 'street': "Musterstrasse 1",
+            'pcode': "8000", 'city': "Zürich", 'country': "CH"}
+IBAN = "CH5800791123000889012"
+
+
+def _rechnungen():
+    for i in range(N):
+        debtor = {'name': f"Kunde {i % 50}", 'street': f"Weg {i % 50}",
+                  'pcode': "3000", 'city': "Bern", 'country': "CH"}
+        yield Decimal(f"{100 + i * 3.35:.2f}"), debtor
+
+
+def _bill(betrag, debtor):
+    from qrbill import QRBill
+    return QRBill(account=IBAN, creditor=CREDITOR, amount=betrag, debtor=debtor,
+                  currency="CHF", language='de')
+
+
+def vorher(c, betrag, debtor):
+    from svglib.svglib import svg2rlg
+    from reportlab.graphics import renderPDF
+    bill = _bill(betrag, debtor)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".svg", mode="w", encoding="utf-8") as tmp:
+        bill.as_svg(tmp)
+        pfad = tmp.name
+    drawing = svg2rlg(pfad)
+    renderPDF.draw(drawing, c, 0, 0)
+    os.remove(pfad)
+
+
+def nachher(c, betrag, debtor):
+    import qr_zahlteil
+    bill = _bill(betrag, debtor)
+    qr_zahlteil.zeichne(c, bill.qr_data(), IBAN, CREDITOR, "CHF", betrag, debtor)
+
+
+def _messen(fn):
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import A4
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    zeiten = []
+    for betrag, debtor in _rechnungen():
+        t = time.perf_counter()
+        fn(c, betrag, debtor)
+        zeiten.append((time.perf_counter() - t) * 1000.0)
+        c.showPage()
+    c.save()
+    return zeiten, len(buf.getvalue())
+
+
+def main():
+    try:
+        import qrbill  # noqa: F401
+        import svglib  # noqa: F401
+    except ImportError as e:
+        print(f"Benchmark braucht qrbill und svglib: {e}")
+        return 2
+    print(f"{N} Rechnungen, Zeit pro Zahlteil (ms):")
+    basis = None
+    for name, fn in (("vorher (SVG-Datei)", vorher), ("nachher (Canvas)", nachher)):
+        zeiten, groesse = _messen(fn)
+        median = statistics.median(zeiten)
+        print(f"  {name:22s} Median {median:7.2f}  p95 {sorted(zeiten)[int(len(zeiten) * 0.95) - 1]:7.2f}"
+              f"  PDF {groesse / 1024:8.0f} KB")
+        if basis is None:
+            basis = median
+        else:
+            print(f"  Faktor: {basis / median:.1f}x")
+    import qr_zahlteil
+    print(f"  Textblock-Cache: {qr_zahlteil.konto_block.cache_info()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+# check_dashboard_metrics.py
+# Vergleicht die Dashboard-Rollups (dashboard_metrics) mit den Basistabellen
+# der aktiven Datenbank und baut sie bei Bedarf neu auf.
+# Aufruf: python tools/check_dashboard_metrics.py [--fix]
+#   --fix  Trigger neu anlegen und alle Kennzahlen neu berechnen
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import dashboard_metrics
+from db_connection import get_db
+
+
+def main():
+    fix = "--fix" in sys.argv[1:]
+    conn = get_db()
+    try:
+        is_sqlite = getattr(conn, "is_sqlite", False)
+        with conn.cursor() as cur:
+            abweichungen = dashboard_metrics.check(cur, is_sqlite)
+            for schluessel, ist, soll in abweichungen:
+                print(f"{schluessel:<28} gespeichert {ist:>14.2f}   soll {soll:>14.2f}")
+            if not abweichungen:
+                print("Dashboard-Kennzahlen konsistent.")
+            if fix:
+                dashboard_metrics.install(cur, is_sqlite)
+                n = dashboard_metrics.rebuild(cur, is_sqlite)
+                print(f"Trigger erneuert, {n} Kennzahlen neu berechnet.")
+        conn.commit()
+    finally:
+        conn.close()
+    return 1 if abweichungen and not fix else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
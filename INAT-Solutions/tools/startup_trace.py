@@ -0,0 +1,45 @@
+# startup_trace.py
+# Zeigt die Start-Zeitleisten aus logs/startup_timeline.json (siehe
+# startup_timeline.py) und schreibt einen Lauf als Chrome-Trace-Datei
+# (chrome://tracing oder https://ui.perfetto.dev öffnen).
+# Aufruf: python tools/startup_trace.py [timeline.json] [--lauf -1] [--out trace.json]
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import startup_timeline
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Start-Zeitleiste anzeigen / als Chrome-Trace exportieren")
+    ap.add_argument("timeline", nargs="?", default=None, help="Standard: logs/startup_timeline.json")
+    ap.add_argument("--lauf", type=int, default=-1, help="Index des Laufs (Standard: letzter)")
+    ap.add_argument("--out", default=None, help="Ziel der Trace-Datei (Standard: logs/startup_trace.json)")
+    args = ap.parse_args()
+
+    laeufe = startup_timeline.lade_timeline(args.timeline)
+    if not laeufe:
+        print("Keine Start-Zeitleisten gefunden.")
+        return 1
+
+    print(f"{'Zeit':20s} {'Version':10s} {'erster Paint':>13s} {'ohne Login':>11s}")
+    for eintrag in laeufe:
+        print(f"{eintrag.get('zeit', '?'):20s} {str(eintrag.get('version', '?')):10s} "
+              f"{eintrag.get('gesamt_ms', 0):10.0f} ms {eintrag.get('ohne_interaktion_ms', 0):8.0f} ms")
+
+    try:
+        eintrag = laeufe[args.lauf]
+    except IndexError:
+        print(f"Lauf {args.lauf} existiert nicht ({len(laeufe)} Läufe).")
+        return 1
+    print(f"\nPhasen ({eintrag.get('zeit', '?')}):")
+    for p in eintrag.get("phasen", []):
+        merker = " (Benutzer)" if p.get("interaktiv") else ""
+        print(f"  {p['start_ms']:9.0f} ms  {p['dauer_ms']:9.1f} ms  {p['name']}{merker}  [{p.get('thread', '')}]")
+    print(f"Chrome-Trace: {startup_timeline.chrome_trace(eintrag, args.out)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())